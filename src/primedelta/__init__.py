@@ -1,4 +1,8 @@
+from .async_primedelta import AsyncPrimeDelta
+from .async_primedelta_client import AsyncPrimeDeltaClient
+from .chain_clock import ChainClock
 from .dex.handlers import (
+    InsufficientLiquidity,
     PoolNotFound,
     PositionManagerNotConfigured,
     RouterNotConfigured,
@@ -6,11 +10,17 @@ from .dex.handlers import (
 from .dex.params import (
     AMMAddLiquidity,
     AMMRemoveLiquidity,
+    ApprovalPolicy,
     PoolType,
     PriceFeedAddLiquidity,
     PriceFeedRemoveLiquidity,
+    SwapLeg,
+    SwapLegResult,
     SwapSide,
 )
+from .dex.quotes import MintQuote, PoolState, Quote
+from .dex.routing import Route, RouteKind, RouteOptimizer
+from .gas import FeeOracle, GasStrategy
 from .primedelta import (
     AccountNotVerified,
     DigitalIdentityAlreadyClaimed,
@@ -19,5 +29,10 @@ from .primedelta import (
     TransactionFailed,
     WdelNotConfigured,
 )
+from .price_batches import PriceBatch, PriceBatcher, batch_prices
+from .price_book import PriceBook
+from .price_log import PriceLogReader, PriceRecorder
 from .primedelta_client import NotLoggedIn, UserSignedMessageVerificationError
+from .receipts import ReceiptTracker
+from .streaming import OverflowPolicy
 from .types import *
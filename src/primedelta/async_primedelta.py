@@ -0,0 +1,774 @@
+import asyncio
+import math
+from datetime import date
+from decimal import Decimal
+from typing import Any, AsyncIterator, Optional
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import AsyncWeb3
+from web3.contract.async_contract import AsyncContractFunction
+from web3.exceptions import ContractLogicError, TimeExhausted
+from web3.middleware import async_geth_poa_middleware
+
+from primedelta.async_primedelta_client import AsyncPrimeDeltaClient
+from primedelta.caching import TTLValue
+from primedelta.chain_clock import ChainClock
+from primedelta.contracts import Contracts
+from primedelta.dex.async_handlers import (
+    _AsyncAMMPoolHandler,
+    _AsyncDclexPoolHandler,
+    _AsyncRouterSwapHandler,
+    _resolve_stock_token,
+)
+from primedelta.dex.handlers import PositionManagerNotConfigured, _require_pool_abi
+from primedelta.dex.params import (
+    AddLiquidityParams,
+    PoolType,
+    RemoveLiquidityParams,
+    SwapSide,
+)
+from primedelta.gas import GasStrategy
+from primedelta.nonces import NonceManager
+from primedelta.pagination import aiter_pages
+from primedelta.price_book import PriceBook
+from primedelta.primedelta import (
+    AccountNotVerified,
+    DigitalIdentityAlreadyClaimed,
+    NotEnoughFunds,
+    TransactionFailed,
+    WdelNotConfigured,
+    WithdrawalNotFound,
+    _decode_revert,
+    _expected_nonce,
+    _siwe_message,
+    _with_deepest_trace,
+)
+from primedelta.primedelta_client import APIError, NotLoggedIn
+from primedelta.settings import PRIMEDELTA_APP_URL
+from primedelta.types import (
+    AccountStatus,
+    ClaimableWithdrawal,
+    Distribution,
+    LPPosition,
+    Order,
+    OrderSide,
+    OrderStatus,
+    Portfolio,
+    Price,
+    Stock,
+    Transfer,
+)
+
+
+class AsyncPrimeDelta:
+    """asyncio counterpart of `PrimeDelta`.
+
+    Mirrors the blocking API method-for-method, with every network call
+    awaited: backend calls go through `AsyncPrimeDeltaClient` (aiohttp) and
+    chain calls through `AsyncWeb3`. Receipt waits poll without blocking the
+    loop, so many strategies can share one process.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        web3_provider_url: str,
+        network: str = "dev",
+        http_connection_limit: int = 100,
+        http_connection_limit_per_host: int = 10,
+        gas_strategy: Optional[GasStrategy] = None,
+        account_status_ttl: float = 5.0,
+    ) -> None:
+        self._account = Account.from_key(private_key)
+        self._web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(web3_provider_url))
+        # See PrimeDelta: Besu PoA extraData needs the PoA formatter.
+        self._web3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+        self._primedelta_client = AsyncPrimeDeltaClient(
+            connection_limit=http_connection_limit,
+            connection_limit_per_host=http_connection_limit_per_host,
+        )
+        from primedelta import networks
+        self._contracts: Contracts = networks.load(network)
+        # See PrimeDelta: DID_MINTED is cached for the session, other
+        # states for `account_status_ttl` seconds, and a 401/403 drops it.
+        self._account_status_cache: TTLValue[AccountStatus] = TTLValue(
+            account_status_ttl
+        )
+        self._primedelta_client.on_auth_failure(self._account_status_cache.invalidate)
+        # Local nonce allocation shared by concurrent coroutines; see
+        # `NonceManager`.
+        self._nonces = NonceManager()
+        self._gas = gas_strategy or GasStrategy()
+        # Deadlines from a calibrated local clock; see `ChainClock`.
+        self._chain_clock = ChainClock()
+        self._dclex_handler = _AsyncDclexPoolHandler(
+            web3=self._web3,
+            account=self._account,
+            contracts_provider=self._get_contracts,
+            send_tx=self._build_and_send_transaction,
+            chain_clock=self._chain_clock,
+        )
+        self._amm_handler = _AsyncAMMPoolHandler(
+            web3=self._web3,
+            account=self._account,
+            contracts_provider=self._get_contracts,
+            send_tx=self._build_and_send_transaction,
+            chain_clock=self._chain_clock,
+        )
+        self._router_swapper = _AsyncRouterSwapHandler(
+            web3=self._web3,
+            account=self._account,
+            contracts_provider=self._get_contracts,
+            signed_prices_fetcher=self._primedelta_client.get_signed_price_updates,
+            send_tx=self._build_and_send_transaction,
+            chain_clock=self._chain_clock,
+        )
+
+    async def aclose(self) -> None:
+        """Release pooled HTTP connections held by the backend client."""
+        await self._primedelta_client.aclose()
+
+    async def __aenter__(self) -> "AsyncPrimeDelta":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _get_contracts(self) -> Contracts:
+        return self._contracts
+
+    async def login(self) -> None:
+        nonce = await self._primedelta_client.get_nonce()
+        message = _siwe_message(
+            self._account.address, self._get_contracts().chain_id, nonce
+        )
+        signature = self._account.sign_message(
+            encode_defunct(text=message),
+        ).signature.hex()
+        self._account_status_cache.invalidate()
+        await self._primedelta_client.login(
+            message=message, signature=signature, nonce=nonce
+        )
+
+    async def logged_in(self) -> bool:
+        try:
+            await self._account_status()
+        except NotLoggedIn:
+            return False
+        return True
+
+    async def logout(self) -> None:
+        self._account_status_cache.invalidate()
+        await self._primedelta_client.logout()
+
+    async def get_account_status(self) -> AccountStatus:
+        """Read the verification status from the backend, bypassing the cache."""
+        status = await self._primedelta_client.get_account_status()
+        self._account_status_cache.set(
+            status, ttl=math.inf if status == AccountStatus.DID_MINTED else None
+        )
+        return status
+
+    async def _account_status(self) -> AccountStatus:
+        status = self._account_status_cache.get()
+        if status is None:
+            status = await self.get_account_status()
+        return status
+
+    def verification_url(self) -> str:
+        return PRIMEDELTA_APP_URL
+
+    async def claim_digital_identity(self) -> str:
+        account_status = await self._account_status()
+        if account_status == AccountStatus.DID_MINTED:
+            raise DigitalIdentityAlreadyClaimed()
+        if account_status != AccountStatus.VERIFIED:
+            raise AccountNotVerified()
+
+        signature = await self._primedelta_client.create_digital_identity_signature()
+        digital_identity = self._get_contracts().core.digital_identity
+        digital_identity_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(digital_identity.address),
+            abi=digital_identity.abi,
+        )
+        tx_hash = await self._build_and_send_transaction(
+            digital_identity_contract.functions.mint(
+                {
+                    "account": self._account.address,
+                    "nonce": int.from_bytes(bytes.fromhex(signature.nonce), "big"),
+                    "isPro": signature.is_pro,
+                    "data": bytes.fromhex(signature.data),
+                },
+                bytes.fromhex(signature.signature),
+            )
+        )
+        self._account_status_cache.invalidate()
+        return tx_hash
+
+    async def deposit_stablecoin(self, amount: Decimal) -> str:
+        account_status = await self._account_status()
+        if account_status not in [AccountStatus.VERIFIED, AccountStatus.DID_MINTED]:
+            raise AccountNotVerified()
+
+        contracts = self._get_contracts()
+        stablecoin_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(contracts.core.stablecoin.address),
+            abi=contracts.core.stablecoin.abi,
+        )
+        return await self._build_and_send_transaction(
+            stablecoin_contract.functions.transfer(
+                contracts.core.vault.address, int(amount * Decimal(10**6))
+            )
+        )
+
+    async def request_stablecoin_withdrawal(self, amount: Decimal):
+        account_status = await self._account_status()
+        if account_status not in [AccountStatus.VERIFIED, AccountStatus.DID_MINTED]:
+            raise AccountNotVerified()
+
+        try:
+            return await self._primedelta_client.request_stablecoin_withdrawal(
+                amount=amount
+            )
+        except APIError as exc:
+            if exc.error_code == "INSUFFICIENT_FUNDS":
+                raise NotEnoughFunds()
+
+    async def claim_stablecoin_withdrawal(self, withdrawal_id: int) -> str:
+        withdrawal = await self._get_claimable_withdrawal(withdrawal_id)
+        signature = await self._primedelta_client.get_withdraw_signature(
+            withdrawal_id=withdrawal_id,
+        )
+
+        contracts = self._get_contracts()
+        vault_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(contracts.core.vault.address),
+            abi=contracts.core.vault.abi,
+        )
+        return await self._build_and_send_transaction(
+            vault_contract.functions.withdraw(
+                {
+                    "token": contracts.core.stablecoin.address,
+                    "account": contracts.core.vault.address,
+                    "to": self._account.address,
+                    "amount": int(withdrawal.amount * Decimal(10**6)),
+                    "nonce": withdrawal_id,
+                },
+                bytes.fromhex(signature),
+            )
+        )
+
+    async def deposit_stock_token(self, stock_symbol: str, amount: int) -> str:
+        account_status = await self._account_status()
+        if account_status != AccountStatus.DID_MINTED:
+            raise AccountNotVerified()
+
+        signature = await self._primedelta_client.get_deposit_stocks_signature(
+            amount=amount,
+            symbol=stock_symbol,
+        )
+        factory = self._get_contracts().core.factory
+        factory_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(factory.address), abi=factory.abi
+        )
+        return await self._build_and_send_transaction(
+            factory_contract.functions.burnStocks(
+                {
+                    "symbol": stock_symbol,
+                    "amount": int(amount * Decimal(10**18)),
+                    "account": self._account.address,
+                    "nonce": int.from_bytes(bytes.fromhex(signature.nonce[2:]), "big"),
+                },
+                bytes.fromhex(signature.signature),
+            )
+        )
+
+    async def request_stock_withdrawal(self, stock_symbol: str, amount: int):
+        account_status = await self._account_status()
+        if account_status != AccountStatus.DID_MINTED:
+            raise AccountNotVerified()
+
+        try:
+            return await self._primedelta_client.request_stock_withdrawal(
+                amount=amount,
+                asset_type=stock_symbol,
+            )
+        except APIError as exc:
+            if exc.error_code == "INSUFFICIENT_FUNDS":
+                raise NotEnoughFunds()
+
+    async def claim_stock_withdrawal(self, withdrawal_id: int) -> str:
+        withdrawal = await self._get_claimable_withdrawal(withdrawal_id)
+        signature = await self._primedelta_client.get_withdraw_signature(
+            withdrawal_id=withdrawal_id,
+        )
+        factory = self._get_contracts().core.factory
+        factory_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(factory.address), abi=factory.abi
+        )
+        return await self._build_and_send_transaction(
+            factory_contract.functions.mintStocks(
+                {
+                    "symbol": withdrawal.asset_type,
+                    "amount": int(withdrawal.amount * Decimal(10**18)),
+                    "account": self._account.address,
+                    "nonce": withdrawal_id,
+                },
+                bytes.fromhex(signature),
+            )
+        )
+
+    async def _get_claimable_withdrawal(self, withdrawal_id: int) -> ClaimableWithdrawal:
+        claimable_withdrawals = await self._primedelta_client.claimable_withdrawals()
+        matching_withdrawals = [
+            withdrawal
+            for withdrawal in claimable_withdrawals
+            if withdrawal.withdrawal_id == withdrawal_id
+        ]
+        if len(matching_withdrawals) == 0:
+            raise WithdrawalNotFound()
+        if len(matching_withdrawals) > 1:
+            raise RuntimeError(
+                "Received multiple claimable withdrawals with the same id"
+            )
+        return matching_withdrawals[0]
+
+    async def pending_transfers(
+        self, page_number: int = 1, page_size: int = 1000
+    ) -> list[Transfer]:
+        return await self._primedelta_client.get_pending_transfers(
+            page_number, page_size
+        )
+
+    async def closed_transfers(
+        self, page_number: int = 1, page_size: int = 1000
+    ) -> list[Transfer]:
+        return await self._primedelta_client.get_closed_transfers(
+            page_number, page_size
+        )
+
+    async def distributions(
+        self, page_number: int = 1, page_size: int = 1000
+    ) -> list[Distribution]:
+        return await self._primedelta_client.get_distributions(page_number, page_size)
+
+    def iter_pending_transfers(self, page_size: int = 100) -> AsyncIterator[Transfer]:
+        """Async `PrimeDelta.iter_pending_transfers`."""
+        return aiter_pages(self._primedelta_client.get_pending_transfers, page_size)
+
+    def iter_closed_transfers(self, page_size: int = 100) -> AsyncIterator[Transfer]:
+        return aiter_pages(self._primedelta_client.get_closed_transfers, page_size)
+
+    def iter_distributions(self, page_size: int = 100) -> AsyncIterator[Distribution]:
+        return aiter_pages(self._primedelta_client.get_distributions, page_size)
+
+    async def get_stablecoin_available_balance(self) -> Decimal:
+        return (await self._primedelta_client.portfolio()).buying_power
+
+    async def get_stablecoin_total_balance(self) -> Decimal:
+        return (await self._primedelta_client.portfolio()).total_funds
+
+    async def get_stock_available_balance(self, symbol: str) -> Decimal:
+        for stock_item in (await self._primedelta_client.portfolio()).positions:
+            if stock_item.symbol == symbol:
+                return stock_item.available_to_sell
+        return Decimal(0)
+
+    async def get_stock_total_balance(self, symbol: str) -> Decimal:
+        for stock_item in (await self._primedelta_client.portfolio()).positions:
+            if stock_item.symbol == symbol:
+                return stock_item.total_owned
+        return Decimal(0)
+
+    async def get_onchain_stablecoin_balance(self) -> Decimal:
+        stablecoin = self._get_contracts().core.stablecoin
+        token = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(stablecoin.address),
+            abi=stablecoin.abi,
+        )
+        raw = await token.functions.balanceOf(self._account.address).call()
+        return Decimal(raw) / Decimal(10**6)
+
+    async def get_onchain_stock_balance(self, symbol: str) -> Decimal:
+        contracts = self._get_contracts()
+        stock_addr = await _resolve_stock_token(self._web3, contracts, symbol)
+        token = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(stock_addr),
+            abi=_require_pool_abi(contracts, "erc20"),
+        )
+        raw = await token.functions.balanceOf(self._account.address).call()
+        return Decimal(raw) / Decimal(10**18)
+
+    async def get_native_del_balance(self) -> Decimal:
+        raw = await self._web3.eth.get_balance(self._account.address)
+        return Decimal(raw) / Decimal(10**18)
+
+    async def wrap_del(self, amount: Decimal) -> str:
+        wdel = self._require_wdel()
+        wdel_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(wdel.address), abi=wdel.abi
+        )
+        return await self._build_and_send_transaction(
+            wdel_contract.functions.deposit(),
+            value=int(amount * Decimal(10**18)),
+        )
+
+    async def unwrap_del(self, amount: Decimal) -> str:
+        wdel = self._require_wdel()
+        wdel_contract = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(wdel.address), abi=wdel.abi
+        )
+        return await self._build_and_send_transaction(
+            wdel_contract.functions.withdraw(int(amount * Decimal(10**18))),
+        )
+
+    def _require_wdel(self):
+        wdel = self._get_contracts().core.wdel
+        if wdel is None:
+            raise WdelNotConfigured()
+        return wdel
+
+    async def portfolio(self) -> Portfolio:
+        try:
+            return await self._primedelta_client.portfolio()
+        except APIError as exc:
+            if exc.error_code == "ACCOUNT_NOT_FOUND":
+                raise AccountNotVerified()
+            raise
+
+    async def claimable_withdrawals(self) -> list[ClaimableWithdrawal]:
+        return await self._primedelta_client.claimable_withdrawals()
+
+    async def send_limit_order(
+        self,
+        side: OrderSide,
+        stock_symbol: str,
+        amount: int,
+        price_limit: Decimal,
+        date_of_cancellation: Optional[date] = None,
+    ) -> int:
+        try:
+            return await self._primedelta_client.send_limit_order(
+                amount=amount,
+                asset_type=stock_symbol,
+                order_side=side,
+                price_limit=price_limit,
+                date_of_cancellation=date_of_cancellation,
+            )
+        except APIError as exc:
+            if exc.error_code == "INSUFFICIENT_FUNDS":
+                raise NotEnoughFunds()
+            raise
+
+    async def send_sell_market_order(self, stock_symbol: str, amount: int) -> int:
+        try:
+            return await self._primedelta_client.send_sell_market_order(
+                amount=amount,
+                asset_type=stock_symbol,
+            )
+        except APIError as exc:
+            if exc.error_code == "INSUFFICIENT_FUNDS":
+                raise NotEnoughFunds()
+            raise
+
+    async def cancel_order(self, order_id: int) -> None:
+        await self._primedelta_client.cancel_order(order_id)
+
+    async def get_order_status(self, order_id: int) -> OrderStatus:
+        return await self._primedelta_client.get_order_status(order_id)
+
+    async def open_orders(
+        self, page_number: int = 1, page_size: int = 1000
+    ) -> list[Order]:
+        return await self._primedelta_client.open_orders(page_number, page_size)
+
+    async def closed_orders(
+        self, page_number: int = 1, page_size: int = 1000
+    ) -> list[Order]:
+        return await self._primedelta_client.closed_orders(page_number, page_size)
+
+    def iter_open_orders(self, page_size: int = 100) -> AsyncIterator[Order]:
+        return aiter_pages(self._primedelta_client.open_orders, page_size)
+
+    def iter_closed_orders(self, page_size: int = 100) -> AsyncIterator[Order]:
+        return aiter_pages(self._primedelta_client.closed_orders, page_size)
+
+    async def stocks(self) -> dict[str, Stock]:
+        return await self._primedelta_client.stocks()
+
+    async def prices_stream(
+        self, symbols: Optional[list[str]] = None
+    ) -> AsyncIterator[Price]:
+        """Async `PrimeDelta.prices_stream`: broker stream when logged in,
+        public Pyth stream otherwise."""
+        if await self.logged_in():
+            account_status = await self._account_status()
+            if account_status not in [AccountStatus.VERIFIED, AccountStatus.DID_MINTED]:
+                raise AccountNotVerified(
+                    "Account not verified. Use pyth_prices_stream() for public prices "
+                    "or verify your account at https://app.primedelta.io"
+                )
+            token = self._primedelta_client.prices_stream_access_token()
+            stream = self._primedelta_client.prices_stream(token)
+        else:
+            if symbols is None:
+                symbols = list((await self.stocks()).keys())
+            stream = self._primedelta_client.pyth_prices_stream(symbols)
+        async for price in stream:
+            yield price
+
+    def price_book(self, symbols: Optional[list[str]] = None) -> PriceBook:
+        """Async `PrimeDelta.price_book`; drains on a task of the running loop."""
+        return PriceBook().start_async(self.prices_stream(symbols))
+
+    async def pyth_prices_stream(
+        self, symbols: Optional[list[str]] = None
+    ) -> AsyncIterator[Price]:
+        if symbols is None:
+            symbols = list((await self.stocks()).keys())
+        async for price in self._primedelta_client.pyth_prices_stream(symbols):
+            yield price
+
+    async def swap_exact_input(
+        self,
+        symbol: str,
+        side: SwapSide,
+        amount_in: Decimal,
+        min_amount_out: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        await self._require_logged_in_and_did_minted()
+        return await self._router_swapper.swap_exact_input(
+            symbol, side, amount_in, min_amount_out, deadline_seconds, update_fee
+        )
+
+    async def swap_exact_output(
+        self,
+        symbol: str,
+        side: SwapSide,
+        amount_out: Decimal,
+        max_amount_in: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        await self._require_logged_in_and_did_minted()
+        return await self._router_swapper.swap_exact_output(
+            symbol, side, amount_out, max_amount_in, deadline_seconds, update_fee
+        )
+
+    async def swap_token_to_token_exact_input(
+        self,
+        input_symbol: str,
+        output_symbol: str,
+        amount_in: Decimal,
+        min_amount_out: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        await self._require_logged_in_and_did_minted()
+        return await self._router_swapper.swap_token_to_token_exact_input(
+            input_symbol,
+            output_symbol,
+            amount_in,
+            min_amount_out,
+            deadline_seconds,
+            update_fee,
+        )
+
+    async def swap_token_to_token_exact_output(
+        self,
+        input_symbol: str,
+        output_symbol: str,
+        amount_out: Decimal,
+        max_amount_in: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        await self._require_logged_in_and_did_minted()
+        return await self._router_swapper.swap_token_to_token_exact_output(
+            input_symbol,
+            output_symbol,
+            amount_out,
+            max_amount_in,
+            deadline_seconds,
+            update_fee,
+        )
+
+    async def add_liquidity(self, params: AddLiquidityParams) -> str:
+        await self._require_logged_in_and_did_minted()
+        return await self._handler_for(params.pool_type).add_liquidity(params)
+
+    async def remove_liquidity(self, params: RemoveLiquidityParams) -> str:
+        return await self._handler_for(params.pool_type).remove_liquidity(params)
+
+    async def collect_fees(self, position_id: int) -> str:
+        await self._require_logged_in_and_did_minted()
+        return await self._amm_handler.collect_fees(position_id)
+
+    async def lp_positions(self) -> list[int]:
+        npm = self._npm_contract()
+        count = await npm.functions.balanceOf(self._account.address).call()
+        return list(
+            await asyncio.gather(
+                *(
+                    npm.functions.tokenOfOwnerByIndex(self._account.address, i).call()
+                    for i in range(count)
+                )
+            )
+        )
+
+    async def lp_position(self, position_id: int) -> LPPosition:
+        npm = self._npm_contract()
+        p = await npm.functions.positions(position_id).call()
+        return LPPosition(
+            token_id=position_id,
+            token0=p[2],
+            token1=p[3],
+            fee=p[4],
+            tick_lower=p[5],
+            tick_upper=p[6],
+            liquidity=p[7],
+            tokens_owed_0=p[10],
+            tokens_owed_1=p[11],
+        )
+
+    def _npm_contract(self):
+        npm_ref = self._get_contracts().core.position_manager
+        if npm_ref is None:
+            raise PositionManagerNotConfigured()
+        return self._web3.eth.contract(
+            address=self._web3.to_checksum_address(npm_ref.address),
+            abi=npm_ref.abi,
+        )
+
+    def _handler_for(self, pool_type: PoolType):
+        if pool_type == PoolType.PRICE_FEED:
+            return self._dclex_handler
+        if pool_type == PoolType.AMM:
+            return self._amm_handler
+        raise ValueError(f"Unknown pool type: {pool_type}")
+
+    async def _require_logged_in_and_did_minted(self) -> None:
+        account_status = await self._account_status()
+        if account_status != AccountStatus.DID_MINTED:
+            raise AccountNotVerified()
+
+    async def _build_and_send_transaction(
+        self, contract_function: AsyncContractFunction, value: int = 0
+    ) -> str:
+        # Same "nonce too low" recovery as PrimeDelta.
+        last_error: Optional[TransactionFailed] = None
+        for _ in range(5):
+            try:
+                return await self._build_and_send_transaction_once(
+                    contract_function, value
+                )
+            except TransactionFailed as e:
+                if "nonce too low" not in (e.reason or "").lower():
+                    raise
+                last_error = e
+                self._nonces.resync(_expected_nonce(e.reason))
+        assert last_error is not None
+        raise last_error
+
+    async def _build_and_send_transaction_once(
+        self, contract_function: AsyncContractFunction, value: int = 0
+    ) -> str:
+        fn_name = getattr(contract_function, "fn_name", None) or "<unknown>"
+        to_address = getattr(contract_function, "address", None)
+        try:
+            calldata = contract_function._encode_transaction_data()
+        except Exception:
+            calldata = None
+        fees = await self._gas.fees_async(self._web3)
+        nonce = await self._reserve_nonce()
+        tx_params = {
+            "from": self._account.address,
+            "nonce": nonce,
+            "value": value,
+            **fees,
+        }
+        # See PrimeDelta: the nonce goes back on any failure before broadcast.
+        try:
+            try:
+                # Learned limits only, `estimate_gas` is sync-only.
+                tx_params["gas"] = self._gas.gas_limit(
+                    self._web3,
+                    {"to": to_address, "data": calldata},
+                    can_estimate=False,
+                )
+                transaction = await contract_function.build_transaction(tx_params)
+            except ContractLogicError as e:
+                trace = await self._try_debug_trace_call(
+                    {
+                        "from": self._account.address,
+                        "to": to_address,
+                        "data": calldata,
+                        "value": hex(value) if value else "0x0",
+                    }
+                )
+                raise TransactionFailed(
+                    fn_name,
+                    _with_deepest_trace(_decode_revert(e), trace),
+                    to=to_address,
+                    data=calldata,
+                    trace=trace,
+                ) from e
+            signed_transaction = self._account.sign_transaction(transaction)
+        except BaseException:
+            self._nonces.release(nonce)
+            raise
+
+        try:
+            tx_hash = await self._web3.eth.send_raw_transaction(
+                signed_transaction.rawTransaction
+            )
+        except Exception:
+            self._nonces.resync()
+            raise
+        try:
+            receipt = await self._web3.eth.wait_for_transaction_receipt(tx_hash)
+        except TimeExhausted:
+            self._nonces.resync()
+            raise
+        self._gas.observe(transaction, receipt)
+        if receipt["status"] == 0:
+            reason = "reverted with no reason"
+            try:
+                await self._web3.eth.call(transaction, receipt["blockNumber"] - 1)
+            except ContractLogicError as e:
+                reason = _decode_revert(e)
+            except Exception as e:
+                reason = str(e)
+            trace = await self._try_debug_trace_call(transaction)
+            raise TransactionFailed(
+                fn_name,
+                _with_deepest_trace(reason, trace),
+                tx_hash=tx_hash.hex(),
+                to=to_address,
+                data=calldata,
+                trace=trace,
+            )
+        return tx_hash.hex()
+
+    async def _reserve_nonce(self) -> int:
+        return await self._nonces.allocate_async(self._chain_nonce)
+
+    async def _chain_nonce(self) -> int:
+        return await self._web3.eth.get_transaction_count(
+            self._account.address, "pending"
+        )
+
+    async def _try_debug_trace_call(self, tx: dict) -> Optional[Any]:
+        try:
+            return await self._web3.manager.coro_request(
+                "debug_traceCall",
+                [tx, "latest", {"tracer": "callTracer"}],
+            )
+        except Exception:
+            return None
+
+    async def is_market_open(self) -> bool:
+        return await self._primedelta_client.is_market_open()
@@ -0,0 +1,397 @@
+import asyncio
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Optional
+
+import aiohttp
+
+from primedelta.primedelta_client import (
+    NotLoggedIn,
+    UserSignedMessageVerificationError,
+    _limit_order_request,
+    _parse_broker_price,
+    _parse_claimable_withdrawals,
+    _parse_closed_orders,
+    _parse_digital_identity_signature,
+    _parse_distributions,
+    _parse_open_orders,
+    _parse_portfolio,
+    _parse_pyth_prices,
+    _parse_signed_price_updates,
+    _parse_stocks,
+    _parse_transfers,
+    _pyth_stream_url,
+    _raise_for_api_status,
+)
+from primedelta.pyth_feeds import PythFeedIndex, feed_id_for
+from primedelta.settings import PRIMEDELTA_BASE_URL, PYTH_HERMES_BASE_URL
+from primedelta.types import (
+    AccountStatus,
+    ClaimableWithdrawal,
+    DepositStocksSignature,
+    DigitalIdentitySignature,
+    Distribution,
+    Order,
+    OrderSide,
+    OrderStatus,
+    Portfolio,
+    Price,
+    Stock,
+    Transfer,
+)
+
+# SSE streams stay open indefinitely, so they opt out of the session's total
+# timeout. Hermes frames for many feeds can exceed aiohttp's 64 KiB default
+# line buffer, hence the larger read buffer.
+_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_read=None)
+_STREAM_READ_BUFSIZE = 2**20
+
+
+async def _iter_sse_data(response: aiohttp.ClientResponse) -> AsyncIterator[str]:
+    """Yield the `data` payload of each server-sent event on `response`."""
+    data_lines: list[str] = []
+    async for raw_line in response.content:
+        line = raw_line.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue  # comment / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+
+
+class AsyncPrimeDeltaClient:
+    """asyncio counterpart of `PrimeDeltaClient` built on aiohttp.
+
+    Same endpoints and return types; every call is a coroutine, and the price
+    streams are async generators. Connections are pooled by a single
+    `aiohttp.ClientSession`, created lazily inside the running event loop.
+    """
+
+    def __init__(
+        self,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 10,
+        pyth_feed_ttl: float = 24 * 60 * 60,
+    ) -> None:
+        self._token = None
+        self._connection_limit = connection_limit
+        self._connection_limit_per_host = connection_limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pyth_feeds = PythFeedIndex(ttl=pyth_feed_ttl)
+        self._auth_failure_callbacks: list[Callable[[], None]] = []
+
+    def on_auth_failure(self, callback: Callable[[], None]) -> None:
+        """Call `callback` whenever the backend answers 401 or 403."""
+        self._auth_failure_callbacks.append(callback)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._connection_limit,
+                    limit_per_host=self._connection_limit_per_host,
+                ),
+                read_bufsize=_STREAM_READ_BUFSIZE,
+                trace_configs=[self._auth_trace_config()],
+            )
+        return self._session
+
+    def _auth_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_end(session, context, params) -> None:
+            if params.response.status in (401, 403) and str(params.url).startswith(
+                PRIMEDELTA_BASE_URL
+            ):
+                for callback in self._auth_failure_callbacks:
+                    callback()
+
+        config = aiohttp.TraceConfig()
+        config.on_request_end.append(on_request_end)
+        return config
+
+    async def aclose(self) -> None:
+        """Close pooled connections. The client may be reused afterwards."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncPrimeDeltaClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def get_nonce(self) -> str:
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}/users/nonce/"
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["nonce"]
+
+    async def login(self, message: str, signature: str, nonce: str) -> None:
+        async with self._get_session().post(
+            f"{PRIMEDELTA_BASE_URL}/users/verify/",
+            data={"message": message, "signature": signature, "nonce": nonce},
+        ) as response:
+            if response.status == 400:
+                body = await response.json(content_type=None)
+                if body.get("errorCode") == "MESSAGE_VERIFICATION_ERROR":
+                    raise UserSignedMessageVerificationError()
+            response.raise_for_status()
+            self._token = (await response.json())["token"]
+
+    async def logout(self) -> None:
+        await self._authorized_post("/logout/", {})
+        self._token = None
+
+    async def get_account_status(self) -> AccountStatus:
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}/verification-status/",
+            headers={"Authorization": f"Token {self._token}"},
+        ) as response:
+            if response.status == 401:
+                raise NotLoggedIn()
+            response.raise_for_status()
+            return AccountStatus((await response.json())["status"])
+
+    async def get_pending_transfers(self, page: int, size: int) -> list[Transfer]:
+        response = await self._authorized_get(
+            "/pending-transfers/", {"page": page, "size": size}
+        )
+        return _parse_transfers(response)
+
+    async def get_closed_transfers(self, page: int, size: int) -> list[Transfer]:
+        response = await self._authorized_get(
+            "/closed-transfers/", {"page": page, "size": size}
+        )
+        return _parse_transfers(response)
+
+    async def get_distributions(self, page: int, size: int) -> list[Distribution]:
+        response = await self._authorized_get(
+            "/closed-distributions/", {"page": page, "size": size}
+        )
+        return _parse_distributions(response)
+
+    async def create_digital_identity_signature(self) -> DigitalIdentitySignature:
+        response = await self._authorized_post(
+            "/digital-identity-signature/", {"requestedFromLibrary": True}
+        )
+        return _parse_digital_identity_signature(response)
+
+    async def cancel_order(self, order_id: int) -> None:
+        await self._authorized_delete(f"/open-orders/{order_id}/")
+
+    async def get_order_status(self, order_id: int) -> OrderStatus:
+        response = await self._authorized_get(f"/orders/{order_id}/status/")
+        return OrderStatus(response["orderStatus"])
+
+    async def open_orders(self, page: int, size: int) -> list[Order]:
+        response = await self._authorized_get(
+            "/open-orders/", {"page": page, "size": size}
+        )
+        return _parse_open_orders(response)
+
+    async def closed_orders(self, page: int, size: int) -> list[Order]:
+        response = await self._authorized_get(
+            "/closed-orders/", {"page": page, "size": size}
+        )
+        return _parse_closed_orders(response)
+
+    async def get_deposit_stocks_signature(
+        self, amount: int, symbol: str
+    ) -> DepositStocksSignature:
+        response = await self._authorized_post(
+            "/deposit-stocks-signature/", {"amount": str(amount), "symbol": symbol}
+        )
+        return DepositStocksSignature(
+            signature=response["signature"],
+            nonce=response["nonce"],
+        )
+
+    async def request_stablecoin_withdrawal(self, amount: Decimal) -> int:
+        response = await self._authorized_post(
+            "/initialize-usdc-withdraw/", {"amount": str(amount)}
+        )
+        return response["withdrawalId"]
+
+    async def request_stock_withdrawal(self, amount: int, asset_type: str) -> int:
+        response = await self._authorized_post(
+            "/initialize-stocks-withdraw/",
+            {"amount": str(amount), "assetType": asset_type},
+        )
+        return response["withdrawalId"]
+
+    async def get_withdraw_signature(self, withdrawal_id: int) -> str:
+        response = await self._authorized_post(
+            f"/withdraw-signature/{withdrawal_id}/", {}
+        )
+        return response["signature"]
+
+    async def portfolio(self) -> Portfolio:
+        response = await self._authorized_get("/portfolio/")
+        return _parse_portfolio(response)
+
+    async def claimable_withdrawals(self) -> list[ClaimableWithdrawal]:
+        response = await self._authorized_get("/claimable-withdrawals/")
+        return _parse_claimable_withdrawals(response)
+
+    async def send_limit_order(
+        self,
+        amount: int,
+        asset_type: str,
+        order_side: OrderSide,
+        price_limit: Decimal,
+        date_of_cancellation: Optional[date],
+    ) -> int:
+        request_data = _limit_order_request(
+            amount, asset_type, price_limit, date_of_cancellation
+        )
+        response = await self._authorized_post(
+            f"/orders/limit/{order_side.value.lower()}/", request_data
+        )
+        return response["orderId"]
+
+    async def send_sell_market_order(self, amount: int, asset_type: str) -> int:
+        response = await self._authorized_post(
+            "/orders/market/sell/",
+            {
+                "amount": str(amount),
+                "stockSymbol": asset_type,
+            },
+        )
+        return response["orderId"]
+
+    async def stocks(self) -> dict[str, Stock]:
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}/stocks/", params={"size": 100}
+        ) as response:
+            response.raise_for_status()
+            return _parse_stocks(await response.json())
+
+    def prices_stream_access_token(self) -> str:
+        if not self._token:
+            raise NotLoggedIn()
+        return self._token
+
+    async def prices_stream(self, prices_stream_access_token: str) -> AsyncIterator[Price]:
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}/prices-stream/",
+            params={"token": prices_stream_access_token},
+            headers={"Cache-Control": "no-cache", "Accept": "text/event-stream"},
+            timeout=_STREAM_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            async for data in _iter_sse_data(response):
+                yield _parse_broker_price(json.loads(data))
+
+    async def is_market_open(self) -> bool:
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}/market-status/"
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["isMarketOpen"]
+
+    async def get_signed_price_updates(self, symbols: list[str]) -> list[bytes]:
+        """Async `PrimeDeltaClient.get_signed_price_updates`."""
+        if not symbols:
+            return []
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}/signed-prices/",
+            params={"symbols": ",".join(symbols)},
+            headers={"Authorization": f"Bearer {self._token}"},
+        ) as response:
+            if response.status == 401:
+                raise NotLoggedIn()
+            response.raise_for_status()
+            return _parse_signed_price_updates(await response.json())
+
+    async def get_pyth_feed_ids(self, symbols: list[str]) -> dict[str, str]:
+        """Async `PrimeDeltaClient.get_pyth_feed_ids`, over the same
+        `PythFeedIndex` logic with aiohttp fetches."""
+        symbols = list(dict.fromkeys(symbols))
+        if self._pyth_feeds.claim_listing():
+            try:
+                feeds = await self._list_pyth_equity_feeds()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass  # The claim holds off the next attempt.
+            else:
+                self._pyth_feeds.listed(feeds)
+        if self._pyth_feeds.stale():
+            missing = self._pyth_feeds.missing(symbols)
+            found = await asyncio.gather(*(self._query_pyth_feed_id(s) for s in missing))
+            self._pyth_feeds.found(dict(zip(missing, found)))
+        return self._pyth_feeds.lookup(symbols)
+
+    async def _list_pyth_equity_feeds(self, query: Optional[str] = None) -> list[dict]:
+        params = {"asset_type": "equity"}
+        if query is not None:
+            params["query"] = query
+        async with self._get_session().get(
+            f"{PYTH_HERMES_BASE_URL}/v2/price_feeds", params=params
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _query_pyth_feed_id(self, symbol: str) -> Optional[str]:
+        return feed_id_for(await self._list_pyth_equity_feeds(symbol), symbol)
+
+    async def pyth_prices_stream(self, symbols: list[str]) -> AsyncIterator[Price]:
+        """Async `PrimeDeltaClient.pyth_prices_stream`; no login required."""
+        feed_ids = await self.get_pyth_feed_ids(symbols)
+        if not feed_ids:
+            return
+
+        id_to_symbol = {v: k for k, v in feed_ids.items()}
+        async with self._get_session().get(
+            _pyth_stream_url(feed_ids.values()),
+            headers={"Cache-Control": "no-cache", "Accept": "text/event-stream"},
+            timeout=_STREAM_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            async for data in _iter_sse_data(response):
+                if not data:
+                    continue
+                for price in _parse_pyth_prices(data, id_to_symbol):
+                    yield price
+
+    async def _authorized_post(self, endpoint: str, request_data: dict) -> dict:
+        async with self._get_session().post(
+            f"{PRIMEDELTA_BASE_URL}{endpoint}",
+            headers={"Authorization": f"Token {self._token}"},
+            json=request_data,
+        ) as response:
+            await _raise_for_response_status(response)
+            if response.status == 204:
+                return {}
+            return await response.json()
+
+    async def _authorized_get(
+        self, endpoint: str, params: Optional[dict[str, str | int]] = None
+    ) -> Any:
+        async with self._get_session().get(
+            f"{PRIMEDELTA_BASE_URL}{endpoint}",
+            headers={"Authorization": f"Token {self._token}"},
+            params=params,
+        ) as response:
+            await _raise_for_response_status(response)
+            return await response.json()
+
+    async def _authorized_delete(self, endpoint: str) -> None:
+        async with self._get_session().delete(
+            f"{PRIMEDELTA_BASE_URL}{endpoint}",
+            headers={"Authorization": f"Token {self._token}"},
+        ) as response:
+            if response.status == 401:
+                raise NotLoggedIn()
+            response.raise_for_status()
+
+
+async def _raise_for_response_status(response: aiohttp.ClientResponse) -> None:
+    body = await response.json(content_type=None) if response.status == 400 else None
+    _raise_for_api_status(response.status, lambda: body)
+    response.raise_for_status()
@@ -0,0 +1,42 @@
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLValue(Generic[V]):
+    """A single cached value that expires `ttl` seconds after it was stored.
+
+    `ttl=0` disables caching: `get()` always misses. The (value, expiry) pair
+    is replaced in one assignment, so concurrent readers see either the old
+    or the new entry, never a mix.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._entry: Optional[tuple[V, float]] = None
+
+    def get(self) -> Optional[V]:
+        entry = self._entry
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if self._clock() >= expires_at:
+            return None
+        return value
+
+    def set(self, value: V, ttl: Optional[float] = None) -> None:
+        """Store `value`; `ttl` overrides the default lifetime for this entry."""
+        lifetime = self._ttl if ttl is None else ttl
+        self._entry = (value, self._clock() + lifetime)
+
+    def get_or_load(self, load: Callable[[], V]) -> V:
+        value = self.get()
+        if value is None:
+            value = load()
+            self.set(value)
+        return value
+
+    def invalidate(self) -> None:
+        self._entry = None
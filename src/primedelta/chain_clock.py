@@ -0,0 +1,131 @@
+"""Chain time for transaction deadlines without a block read per send.
+
+Swap and liquidity deadlines are `block.timestamp + deadline_seconds`.
+Reading `eth_getBlockByNumber("latest")` for that costs a whole block
+payload per transaction. `ChainClock` instead keeps the offset between the
+local clock and the chain's block timestamps, calibrated from any block the
+SDK already has in hand (`observe`) and re-read in the background once it
+gets old, so `now()` is arithmetic.
+
+A block's timestamp is when it was built, so the calibrated time trails
+real time by up to a block interval; deadlines derived from it err early,
+never late.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class ChainClock:
+    """Estimated chain timestamp and head block number.
+
+    Args:
+        refresh_interval: Seconds a calibration is trusted. After that,
+            `now()` keeps serving the estimate and recalibrates in the
+            background (one `get_block("latest")`); only the first call,
+            before any block has been seen, waits for the node.
+        clock: Local wall clock, in seconds.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (chain timestamp - local time, local time of calibration)
+        self._offset: Optional[tuple[float, float]] = None
+        self._head_block: Optional[int] = None
+        self._last_now = 0
+        self._refreshing = False
+
+    @property
+    def head_block(self) -> Optional[int]:
+        """Number of the newest block seen, if any."""
+        return self._head_block
+
+    def observe(self, block: Any) -> None:
+        """Calibrate from a block the caller already fetched."""
+        number = block.get("number")
+        timestamp = block.get("timestamp")
+        if timestamp is None:
+            return
+        with self._lock:
+            if number is not None and self._head_block is not None:
+                if number < self._head_block:
+                    return  # An old block says nothing new about the head.
+            if number is not None:
+                self._head_block = number
+            local = self._clock()
+            self._offset = (int(timestamp) - local, local)
+
+    def now(self, web3) -> int:
+        """Current chain timestamp, estimated from the local clock."""
+        if self._offset is None:
+            self.observe(web3.eth.get_block("latest"))
+        elif self._stale():
+            self._refresh_in_background(web3)
+        return self._estimate()
+
+    async def now_async(self, web3) -> int:
+        """`now` for `AsyncWeb3`; the background refresh runs as a task."""
+        if self._offset is None:
+            self.observe(await web3.eth.get_block("latest"))
+        elif self._stale() and self._claim_refresh():
+            asyncio.get_running_loop().create_task(self._refresh_async(web3))
+        return self._estimate()
+
+    def invalidate(self) -> None:
+        """Forget the calibration; the next `now()` reads the chain."""
+        with self._lock:
+            self._offset = None
+
+    def _estimate(self) -> int:
+        with self._lock:
+            if self._offset is not None:  # Unless invalidated meanwhile.
+                offset, _ = self._offset
+                # Never step backwards when a recalibration lowers the offset.
+                self._last_now = max(self._last_now, int(self._clock() + offset))
+            return self._last_now
+
+    def _stale(self) -> bool:
+        offset = self._offset
+        return offset is None or self._clock() - offset[1] >= self._refresh_interval
+
+    def _claim_refresh(self) -> bool:
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def _refresh_in_background(self, web3) -> None:
+        if not self._claim_refresh():
+            return
+        threading.Thread(
+            target=self._refresh,
+            args=(web3,),
+            name="primedelta-chain-clock",
+            daemon=True,
+        ).start()
+
+    def _refresh(self, web3) -> None:
+        try:
+            self.observe(web3.eth.get_block("latest"))
+        except Exception:
+            pass  # Keep the old calibration; the next stale read retries.
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    async def _refresh_async(self, web3) -> None:
+        try:
+            self.observe(await web3.eth.get_block("latest"))
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
@@ -22,6 +23,7 @@ class CoreContracts:
     position_manager: Optional[ContractRef] = None
     oracle: Optional[ContractRef] = None
     wdel: Optional[ContractRef] = None
+    multicall: Optional[ContractRef] = None
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "CoreContracts":
@@ -50,6 +52,11 @@ class CoreContracts:
                 if data.get("wdel") and data["wdel"].get("address")
                 else None
             ),
+            multicall=(
+                ContractRef.from_dict(data["multicall"])
+                if data.get("multicall") and data["multicall"].get("address")
+                else None
+            ),
         )
 
 
@@ -70,7 +77,7 @@ class StockPools:
 class Contracts:
     chain_id: int
     core: CoreContracts
-    pool_abis: dict[str, list[Any]] = field(default_factory=dict)
+    pool_abis: Mapping[str, list[Any]] = field(default_factory=dict)
     pools: dict[str, StockPools] = field(default_factory=dict)
 
     @classmethod
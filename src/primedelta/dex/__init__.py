@@ -1,6 +1,7 @@
 from primedelta.dex.params import (
     AMMAddLiquidity,
     AMMRemoveLiquidity,
+    ApprovalPolicy,
     PoolType,
     PriceFeedAddLiquidity,
     PriceFeedRemoveLiquidity,
@@ -10,6 +11,7 @@ from primedelta.dex.params import (
 __all__ = [
     "AMMAddLiquidity",
     "AMMRemoveLiquidity",
+    "ApprovalPolicy",
     "PoolType",
     "PriceFeedAddLiquidity",
     "PriceFeedRemoveLiquidity",
@@ -0,0 +1,116 @@
+"""Allowance bookkeeping so swaps and liquidity calls skip redundant approvals.
+
+Every DEX action needs the router / pool / position manager to hold enough
+ERC-20 allowance. Sending `approve` unconditionally costs an extra
+transaction (and, unpipelined, an extra block) per action. The manager
+reads `allowance()` once per (token, spender), tracks what the SDK's own
+approvals and spends do to it, and only sends `approve` when the remaining
+allowance can't cover the next action.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from primedelta.dex.params import ApprovalPolicy
+
+MAX_UINT256 = 2**256 - 1
+
+# OpenZeppelin (and most ERC-20s) don't decrement an "infinite" allowance on
+# transferFrom; anything this large is treated as never running out.
+_UNLIMITED_THRESHOLD = MAX_UINT256 // 2
+
+
+class AllowanceManager:
+    """Cached per-(token, spender) allowances for one owner.
+
+    Args:
+        web3: Web3 instance for the network.
+        owner: Address the SDK signs for.
+        send_tx: Submits a prepared `approve(...)` call.
+        policy: `EXACT` approves only what the next action spends; `MAX`
+            grants a standing `2**256 - 1` approval once per spender.
+        ttl: Seconds a cached allowance is trusted before re-reading chain.
+            Guards against approvals changed outside the SDK.
+    """
+
+    def __init__(
+        self,
+        web3,
+        owner: str,
+        send_tx: Callable[..., str],
+        policy: ApprovalPolicy = ApprovalPolicy.EXACT,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._web3 = web3
+        self._owner = owner
+        self._send_tx = send_tx
+        self._policy = ApprovalPolicy(policy)
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._allowances: dict[tuple[str, str], tuple[int, float]] = {}
+
+    def ensure(self, token, spender: str, amount: int) -> Optional[str]:
+        """Make sure `spender` may pull `amount` of `token`; approve if not.
+
+        `token` is a web3 contract exposing the ERC-20 ABI. Returns the
+        approve tx hash, or None when the existing allowance sufficed. The
+        cached allowance is reduced by `amount`, assuming the action that
+        follows spends it. A pipelined approve is cached before it mines;
+        the caller invalidates the entry if its receipt fails.
+        """
+        spender = self._web3.to_checksum_address(spender)
+        key = (token.address.lower(), spender.lower())
+        with self._lock:
+            current = self._cached(key)
+            if current is not None and current >= amount:
+                self._store(key, current, amount)
+                return None
+        # Neither the read nor the approve holds the lock: outside a pipeline
+        # the approve's send blocks until it has mined.
+        if current is None:
+            current = token.functions.allowance(self._owner, spender).call()
+        if current >= amount:
+            with self._lock:
+                self._store(key, current, amount)
+            return None
+        target = MAX_UINT256 if self._policy == ApprovalPolicy.MAX else amount
+        try:
+            tx_hash = self._send_tx(token.functions.approve(spender, target))
+        except Exception:
+            with self._lock:
+                self._allowances.pop(key, None)
+            raise
+        with self._lock:
+            self._store(key, target, amount)
+        return tx_hash
+
+    def invalidate(
+        self, token_address: Optional[str] = None, spender: Optional[str] = None
+    ) -> None:
+        """Forget cached allowances (for one token, one spender of it, or all)."""
+        with self._lock:
+            if token_address is None:
+                self._allowances.clear()
+                return
+            token_key = token_address.lower()
+            if spender is not None:
+                self._allowances.pop((token_key, spender.lower()), None)
+                return
+            for key in [k for k in self._allowances if k[0] == token_key]:
+                del self._allowances[key]
+
+    def _store(self, key: tuple[str, str], current: int, spent: int) -> None:
+        if current < _UNLIMITED_THRESHOLD:
+            current -= spent
+        self._allowances[key] = (current, self._clock() + self._ttl)
+
+    def _cached(self, key: tuple[str, str]) -> Optional[int]:
+        entry = self._allowances.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if self._clock() >= expires_at:
+            return None
+        return value
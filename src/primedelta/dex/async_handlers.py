@@ -0,0 +1,499 @@
+"""asyncio mirrors of the DEX handlers in `handlers.py`.
+
+Same call sequence and argument encoding as the blocking handlers, but every
+view call, nonce lookup and send is awaited on an `AsyncWeb3` instance so many
+swaps can be in flight on one event loop.
+"""
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Optional
+
+from web3.exceptions import ContractLogicError
+
+from primedelta.chain_clock import ChainClock
+from primedelta.contracts import ContractRef, Contracts
+from primedelta.dex.handlers import (
+    _AMM_FEE_TIER,
+    _STABLECOIN_DECIMALS,
+    _STOCK_DECIMALS,
+    PoolNotFound,
+    PositionManagerNotConfigured,
+    RouterNotConfigured,
+    _dedupe,
+    _map_amounts,
+    _require_pool_abi,
+)
+from primedelta.dex.params import (
+    AMMAddLiquidity,
+    AMMRemoveLiquidity,
+    PriceFeedAddLiquidity,
+    PriceFeedRemoveLiquidity,
+    SwapSide,
+)
+
+
+async def _call_view(fn_name: str, call_fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Async `handlers._call_view`."""
+    from primedelta.primedelta import TransactionFailed, _decode_revert
+
+    try:
+        return await call_fn()
+    except ContractLogicError as e:
+        raise TransactionFailed(fn_name, _decode_revert(e)) from e
+
+
+async def _resolve_stock_token(web3, contracts: Contracts, symbol: str) -> str:
+    """Async `handlers._resolve_stock_token`."""
+    pool = contracts.pools.get(symbol)
+    if pool is not None:
+        return pool.stock_token_address
+    router_ref = contracts.core.dex_router
+    if router_ref is None:
+        raise PoolNotFound(symbol)
+    addr = await _resolve_via_router(web3, contracts, router_ref, symbol)
+    if addr is None:
+        raise PoolNotFound(symbol)
+    return addr
+
+
+async def _resolve_via_router(
+    web3, contracts: Contracts, router_ref: ContractRef, symbol: str
+) -> Optional[str]:
+    erc20_abi = _require_pool_abi(contracts, "erc20")
+    try:
+        router = web3.eth.contract(
+            address=web3.to_checksum_address(router_ref.address),
+            abi=router_ref.abi,
+        )
+        all_tokens = await router.functions.allStockTokens().call()
+    except Exception:
+        return None
+    for addr in all_tokens:
+        try:
+            stock = web3.eth.contract(
+                address=web3.to_checksum_address(addr),
+                abi=erc20_abi,
+            )
+            if await stock.functions.symbol().call() == symbol:
+                return addr
+        except Exception:
+            continue
+    return None
+
+
+class _AsyncHandlerBase:
+    def __init__(
+        self,
+        web3,
+        account,
+        contracts_provider: Callable[[], Contracts],
+        send_tx: Callable[..., Awaitable[str]],
+        chain_clock: Optional[ChainClock] = None,
+    ) -> None:
+        self._web3 = web3
+        self._account = account
+        self._contracts_provider = contracts_provider
+        self._send_tx = send_tx
+        self._chain_clock = chain_clock
+
+    def _require_router(self, contracts: Contracts) -> ContractRef:
+        if contracts.core.dex_router is None:
+            raise RouterNotConfigured()
+        return contracts.core.dex_router
+
+    async def _require_stock_token(self, contracts: Contracts, symbol: str) -> str:
+        return await _resolve_stock_token(self._web3, contracts, symbol)
+
+    async def _now(self) -> int:
+        if self._chain_clock is not None:
+            return await self._chain_clock.now_async(self._web3)
+        return int((await self._web3.eth.get_block("latest"))["timestamp"])
+
+    def _contract(self, ref: ContractRef):
+        return self._web3.eth.contract(
+            address=self._web3.to_checksum_address(ref.address), abi=ref.abi
+        )
+
+    def _erc20_at(self, address: str):
+        return self._web3.eth.contract(
+            address=self._web3.to_checksum_address(address),
+            abi=_require_pool_abi(self._contracts_provider(), "erc20"),
+        )
+
+    async def _approve(self, token_ref: ContractRef, spender: str, amount: int) -> None:
+        token = self._contract(token_ref)
+        await self._send_tx(
+            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        )
+
+    async def _approve_at(self, token_address: str, spender: str, amount: int) -> None:
+        token = self._erc20_at(token_address)
+        await self._send_tx(
+            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        )
+
+
+class _AsyncRouterSwapHandler(_AsyncHandlerBase):
+    def __init__(
+        self,
+        web3,
+        account,
+        contracts_provider: Callable[[], Contracts],
+        signed_prices_fetcher: Callable[[list[str]], Awaitable[list[bytes]]],
+        send_tx: Callable[..., Awaitable[str]],
+        chain_clock: Optional[ChainClock] = None,
+    ) -> None:
+        super().__init__(web3, account, contracts_provider, send_tx, chain_clock)
+        self._signed_prices_fetcher = signed_prices_fetcher
+
+    async def swap_exact_input(
+        self,
+        symbol: str,
+        side: SwapSide,
+        amount_in: Decimal,
+        min_amount_out: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        stock_token_addr = await self._require_stock_token(contracts, symbol)
+
+        update_data = await self._signed_prices_fetcher([symbol])
+        deadline = await self._now() + deadline_seconds
+        router = self._contract(router_ref)
+
+        if side == SwapSide.STABLECOIN_TO_STOCK:
+            amount_in_units = int(amount_in * _STABLECOIN_DECIMALS)
+            min_out_units = int(min_amount_out * _STOCK_DECIMALS)
+            await self._approve(
+                contracts.core.stablecoin, router_ref.address, amount_in_units
+            )
+            tx_function = router.functions.buyExactInput(
+                stock_token_addr, amount_in_units, min_out_units, deadline, update_data
+            )
+        else:
+            amount_in_units = int(amount_in * _STOCK_DECIMALS)
+            min_out_units = int(min_amount_out * _STABLECOIN_DECIMALS)
+            await self._approve_at(stock_token_addr, router_ref.address, amount_in_units)
+            tx_function = router.functions.sellExactInput(
+                stock_token_addr, amount_in_units, min_out_units, deadline, update_data
+            )
+        msg_value = await self._resolve_msg_value(contracts, update_data, update_fee)
+        return await self._send_tx(tx_function, value=msg_value)
+
+    async def swap_exact_output(
+        self,
+        symbol: str,
+        side: SwapSide,
+        amount_out: Decimal,
+        max_amount_in: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        stock_token_addr = await self._require_stock_token(contracts, symbol)
+
+        update_data = await self._signed_prices_fetcher([symbol])
+        deadline = await self._now() + deadline_seconds
+        router = self._contract(router_ref)
+
+        if side == SwapSide.STABLECOIN_TO_STOCK:
+            amount_out_units = int(amount_out * _STOCK_DECIMALS)
+            max_in_units = int(max_amount_in * _STABLECOIN_DECIMALS)
+            await self._approve(contracts.core.stablecoin, router_ref.address, max_in_units)
+            tx_function = router.functions.buyExactOutput(
+                stock_token_addr, amount_out_units, max_in_units, deadline, update_data
+            )
+        else:
+            amount_out_units = int(amount_out * _STABLECOIN_DECIMALS)
+            max_in_units = int(max_amount_in * _STOCK_DECIMALS)
+            await self._approve_at(stock_token_addr, router_ref.address, max_in_units)
+            tx_function = router.functions.sellExactOutput(
+                stock_token_addr, amount_out_units, max_in_units, deadline, update_data
+            )
+        msg_value = await self._resolve_msg_value(contracts, update_data, update_fee)
+        return await self._send_tx(tx_function, value=msg_value)
+
+    async def swap_token_to_token_exact_input(
+        self,
+        input_symbol: str,
+        output_symbol: str,
+        amount_in: Decimal,
+        min_amount_out: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        if input_symbol == output_symbol:
+            raise ValueError("input_symbol and output_symbol must differ")
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        input_token_addr = await self._require_stock_token(contracts, input_symbol)
+        output_token_addr = await self._require_stock_token(contracts, output_symbol)
+
+        update_data = await self._signed_prices_fetcher(
+            _dedupe([input_symbol, output_symbol])
+        )
+        deadline = await self._now() + deadline_seconds
+        router = self._contract(router_ref)
+
+        amount_in_units = int(amount_in * _STOCK_DECIMALS)
+        min_out_units = int(min_amount_out * _STOCK_DECIMALS)
+        await self._approve_at(input_token_addr, router_ref.address, amount_in_units)
+        tx_function = router.functions.swapExactInput(
+            input_token_addr,
+            output_token_addr,
+            amount_in_units,
+            min_out_units,
+            deadline,
+            update_data,
+        )
+        msg_value = await self._resolve_msg_value(contracts, update_data, update_fee)
+        return await self._send_tx(tx_function, value=msg_value)
+
+    async def swap_token_to_token_exact_output(
+        self,
+        input_symbol: str,
+        output_symbol: str,
+        amount_out: Decimal,
+        max_amount_in: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> str:
+        if input_symbol == output_symbol:
+            raise ValueError("input_symbol and output_symbol must differ")
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        input_token_addr = await self._require_stock_token(contracts, input_symbol)
+        output_token_addr = await self._require_stock_token(contracts, output_symbol)
+
+        update_data = await self._signed_prices_fetcher(
+            _dedupe([input_symbol, output_symbol])
+        )
+        deadline = await self._now() + deadline_seconds
+        router = self._contract(router_ref)
+
+        amount_out_units = int(amount_out * _STOCK_DECIMALS)
+        max_in_units = int(max_amount_in * _STOCK_DECIMALS)
+        await self._approve_at(input_token_addr, router_ref.address, max_in_units)
+        tx_function = router.functions.swapExactOutput(
+            input_token_addr,
+            output_token_addr,
+            amount_out_units,
+            max_in_units,
+            deadline,
+            update_data,
+        )
+        msg_value = await self._resolve_msg_value(contracts, update_data, update_fee)
+        return await self._send_tx(tx_function, value=msg_value)
+
+    async def _resolve_msg_value(
+        self,
+        contracts: Contracts,
+        update_data: list[bytes],
+        explicit_value: int,
+    ) -> int:
+        if explicit_value:
+            return explicit_value
+        oracle_ref = contracts.core.oracle
+        if oracle_ref is None or not update_data:
+            return 0
+        oracle = self._contract(oracle_ref)
+        return await _call_view(
+            "Oracle.getUpdateFee",
+            lambda: oracle.functions.getUpdateFee(update_data).call(),
+        )
+
+
+class _AsyncDclexPoolHandler(_AsyncHandlerBase):
+    async def add_liquidity(self, params: PriceFeedAddLiquidity) -> str:
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        stock_token_addr = await self._require_stock_token(contracts, params.symbol)
+
+        pool_address = await self._lookup_dclex_pool(router_ref, stock_token_addr)
+        pool = self._dclex_pool(contracts, pool_address)
+
+        liquidity_units = int(params.liquidity_amount)
+        max_stock_units = int(params.max_stock_amount * _STOCK_DECIMALS)
+        max_stablecoin_units = int(params.max_stablecoin_amount * _STABLECOIN_DECIMALS)
+
+        await self._approve_at(stock_token_addr, pool_address, max_stock_units)
+        await self._approve(contracts.core.stablecoin, pool_address, max_stablecoin_units)
+        return await self._send_tx(pool.functions.addLiquidity(liquidity_units))
+
+    async def remove_liquidity(self, params: PriceFeedRemoveLiquidity) -> str:
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        stock_token_addr = await self._require_stock_token(contracts, params.symbol)
+
+        pool_address = await self._lookup_dclex_pool(router_ref, stock_token_addr)
+        pool = self._dclex_pool(contracts, pool_address)
+        liquidity_units = int(params.liquidity_amount)
+        return await self._send_tx(pool.functions.removeLiquidity(liquidity_units))
+
+    async def _lookup_dclex_pool(
+        self, router_ref: ContractRef, stock_token_addr: str
+    ) -> str:
+        router = self._contract(router_ref)
+        pool_addr = await _call_view(
+            "DclexRouter.stockTokenToPool",
+            lambda: router.functions.stockTokenToPool(
+                self._web3.to_checksum_address(stock_token_addr)
+            ).call(),
+        )
+        if int(pool_addr, 16) == 0:
+            raise PoolNotFound(f"no DCLEX pool registered for {stock_token_addr}")
+        return pool_addr
+
+    def _dclex_pool(self, contracts: Contracts, pool_address: str):
+        return self._web3.eth.contract(
+            address=self._web3.to_checksum_address(pool_address),
+            abi=_require_pool_abi(contracts, "dclex_pool"),
+        )
+
+
+class _AsyncAMMPoolHandler(_AsyncHandlerBase):
+    async def add_liquidity(self, params: AMMAddLiquidity) -> str:
+        contracts = self._contracts_provider()
+        npm_ref = self._require_npm(contracts)
+        stock_token_addr = await self._require_stock_token(contracts, params.symbol)
+
+        pool_address = await self._lookup_amm_pool(npm_ref, contracts, stock_token_addr)
+        token0, token1, fee = await self._read_pool_tokens(contracts, pool_address)
+
+        amounts = _map_amounts(
+            stock_token_addr,
+            token0,
+            stock=params.amount_stock_desired,
+            stablecoin=params.amount_stablecoin_desired,
+        )
+        amounts_min = _map_amounts(
+            stock_token_addr,
+            token0,
+            stock=params.amount_stock_min,
+            stablecoin=params.amount_stablecoin_min,
+        )
+
+        npm = self._contract(npm_ref)
+        await self._approve_at(token0, npm_ref.address, amounts[0])
+        await self._approve_at(token1, npm_ref.address, amounts[1])
+
+        deadline = await self._now() + 600
+        return await self._send_tx(
+            npm.functions.mint(
+                {
+                    "token0": self._web3.to_checksum_address(token0),
+                    "token1": self._web3.to_checksum_address(token1),
+                    "fee": fee,
+                    "tickLower": params.tick_lower,
+                    "tickUpper": params.tick_upper,
+                    "amount0Desired": amounts[0],
+                    "amount1Desired": amounts[1],
+                    "amount0Min": amounts_min[0],
+                    "amount1Min": amounts_min[1],
+                    "recipient": self._account.address,
+                    "deadline": deadline,
+                }
+            )
+        )
+
+    async def remove_liquidity(self, params: AMMRemoveLiquidity) -> str:
+        contracts = self._contracts_provider()
+        npm_ref = self._require_npm(contracts)
+        npm = self._contract(npm_ref)
+        deadline = await self._now() + 600
+
+        amount_stock_min_units = int(params.amount_stock_min * _STOCK_DECIMALS)
+        amount_stablecoin_min_units = int(
+            params.amount_stablecoin_min * _STABLECOIN_DECIMALS
+        )
+
+        max_uint128 = (1 << 128) - 1
+        decrease_call = npm.encodeABI(
+            fn_name="decreaseLiquidity",
+            args=[
+                (
+                    params.position_id,
+                    params.liquidity,
+                    amount_stock_min_units,
+                    amount_stablecoin_min_units,
+                    deadline,
+                )
+            ],
+        )
+        collect_call = npm.encodeABI(
+            fn_name="collect",
+            args=[
+                (
+                    params.position_id,
+                    self._account.address,
+                    max_uint128,
+                    max_uint128,
+                )
+            ],
+        )
+        return await self._send_tx(
+            npm.functions.multicall([decrease_call, collect_call])
+        )
+
+    async def collect_fees(self, position_id: int) -> str:
+        contracts = self._contracts_provider()
+        npm = self._contract(self._require_npm(contracts))
+        max_uint128 = (1 << 128) - 1
+        return await self._send_tx(
+            npm.functions.collect(
+                {
+                    "tokenId": position_id,
+                    "recipient": self._account.address,
+                    "amount0Max": max_uint128,
+                    "amount1Max": max_uint128,
+                }
+            )
+        )
+
+    def _require_npm(self, contracts: Contracts) -> ContractRef:
+        if contracts.core.position_manager is None:
+            raise PositionManagerNotConfigured()
+        return contracts.core.position_manager
+
+    async def _lookup_amm_pool(
+        self, npm_ref: ContractRef, contracts: Contracts, stock_token_addr: str
+    ) -> str:
+        npm = self._contract(npm_ref)
+        v3_factory_addr = await _call_view(
+            "NonfungiblePositionManager.factory",
+            lambda: npm.functions.factory().call(),
+        )
+        v3_factory = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(v3_factory_addr),
+            abi=_require_pool_abi(contracts, "univ3_factory"),
+        )
+        pool_addr = await _call_view(
+            "UniswapV3Factory.getPool",
+            lambda: v3_factory.functions.getPool(
+                self._web3.to_checksum_address(stock_token_addr),
+                self._web3.to_checksum_address(contracts.core.stablecoin.address),
+                _AMM_FEE_TIER,
+            ).call(),
+        )
+        if int(pool_addr, 16) == 0:
+            raise PoolNotFound(f"no AMM pool registered for {stock_token_addr}")
+        return pool_addr
+
+    async def _read_pool_tokens(
+        self, contracts: Contracts, pool_address: str
+    ) -> tuple[str, str, int]:
+        pool = self._web3.eth.contract(
+            address=self._web3.to_checksum_address(pool_address),
+            abi=_require_pool_abi(contracts, "univ3_pool"),
+        )
+        return (
+            await _call_view(
+                "UniswapV3Pool.token0", lambda: pool.functions.token0().call()
+            ),
+            await _call_view(
+                "UniswapV3Pool.token1", lambda: pool.functions.token1().call()
+            ),
+            await _call_view("UniswapV3Pool.fee", lambda: pool.functions.fee().call()),
+        )
@@ -1,16 +1,22 @@
+from concurrent.futures import Future
 from decimal import Decimal
 from typing import Any, Callable, Optional
 
 from web3.exceptions import ContractLogicError
 
+from primedelta.chain_clock import ChainClock
 from primedelta.contracts import ContractRef, Contracts
+from primedelta.dex.allowances import AllowanceManager
 from primedelta.dex.params import (
     AMMAddLiquidity,
     AMMRemoveLiquidity,
     PriceFeedAddLiquidity,
     PriceFeedRemoveLiquidity,
+    SwapLeg,
     SwapSide,
 )
+from primedelta.dex.registry import StockTokenRegistry
+from primedelta.multicall import BatchReader
 
 
 _STABLECOIN_DECIMALS = Decimal(10**6)
@@ -42,14 +48,55 @@ def _call_view(fn_name: str, call_fn: Callable[[], Any]) -> Any:
         raise TransactionFailed(fn_name, _decode_revert(e)) from e
 
 
-def _resolve_stock_token(web3, contracts: "Contracts", symbol: str) -> str:
+def _dedupe(symbols: list[str]) -> list[str]:
+    seen: set[str] = set()
+    unique: list[str] = []
+    for s in symbols:
+        if s not in seen:
+            seen.add(s)
+            unique.append(s)
+    return unique
+
+
+def _map_amounts(
+    stock_token_addr: str, token0: str, *, stock: Decimal, stablecoin: Decimal
+) -> tuple[int, int]:
+    """Order (stock, stablecoin) amounts as the V3 pool's (token0, token1)."""
+    stock_units = int(stock * _STOCK_DECIMALS)
+    stablecoin_units = int(stablecoin * _STABLECOIN_DECIMALS)
+    if token0.lower() == stock_token_addr.lower():
+        return (stock_units, stablecoin_units)
+    return (stablecoin_units, stock_units)
+
+
+def _send_approve(
+    web3,
+    send_tx: Callable[..., str],
+    allowances: Optional[AllowanceManager],
+    token,
+    spender: str,
+    amount: int,
+) -> None:
+    if allowances is not None:
+        allowances.ensure(token, spender, amount)
+        return
+    send_tx(token.functions.approve(web3.to_checksum_address(spender), amount))
+
+
+def _resolve_stock_token(
+    web3,
+    contracts: "Contracts",
+    symbol: str,
+    registry: Optional[StockTokenRegistry] = None,
+) -> str:
     """Resolve a stock symbol to its on-chain token address.
 
     Prefers the backend's `/contracts/` pools (fast dict lookup). Falls back
     to enumerating `Router.allStockTokens()` on-chain so AMM-only tokens that
     aren't synced to the backend DB (AMMT1/AMMT2/WDEL) still resolve. This
     mirrors how the DEX frontend (primedelta-dex/src/registry.ts) discovers
-    tokens.
+    tokens. With a `registry`, the enumeration happens once per network
+    rather than once per call.
     """
     pool = contracts.pools.get(symbol)
     if pool is not None:
@@ -57,7 +104,10 @@ def _resolve_stock_token(web3, contracts: "Contracts", symbol: str) -> str:
     router_ref = contracts.core.dex_router
     if router_ref is None:
         raise PoolNotFound(symbol)
-    addr = _resolve_via_router(web3, contracts, router_ref, symbol)
+    if registry is not None:
+        addr = registry.resolve(symbol)
+    else:
+        addr = _resolve_via_router(web3, contracts, router_ref, symbol)
     if addr is None:
         raise PoolNotFound(symbol)
     return addr
@@ -96,6 +146,10 @@ class RouterNotConfigured(Exception):
     pass
 
 
+class InsufficientLiquidity(Exception):
+    pass
+
+
 class PositionManagerNotConfigured(Exception):
     pass
 
@@ -108,12 +162,22 @@ class _RouterSwapHandler:
         contracts_provider: Callable[[], Contracts],
         signed_prices_fetcher: Callable[[list[str]], list[bytes]],
         send_tx: Callable[..., str],
+        token_registry: Optional[StockTokenRegistry] = None,
+        allowances: Optional[AllowanceManager] = None,
+        signed_prices_by_symbol: Optional[
+            Callable[[list[str]], dict[str, bytes]]
+        ] = None,
+        chain_clock: Optional[ChainClock] = None,
     ) -> None:
         self._web3 = web3
         self._account = account
         self._contracts_provider = contracts_provider
         self._signed_prices_fetcher = signed_prices_fetcher
+        self._signed_prices_by_symbol = signed_prices_by_symbol
+        self._chain_clock = chain_clock
         self._send_tx = send_tx
+        self._token_registry = token_registry
+        self._allowances = allowances
 
     def swap_exact_input(
         self,
@@ -124,38 +188,11 @@ class _RouterSwapHandler:
         deadline_seconds: int = 600,
         update_fee: int = 0,
     ) -> str:
-        contracts = self._contracts_provider()
-        router_ref = self._require_router(contracts)
-        stock_token_addr = self._require_stock_token(contracts, symbol)
-
-        update_data = self._fetch_pyth_update_data(symbol)
-        deadline = self._now() + deadline_seconds
-        router = self._contract(router_ref)
-
-        if side == SwapSide.STABLECOIN_TO_STOCK:
-            amount_in_units = int(amount_in * _STABLECOIN_DECIMALS)
-            min_out_units = int(min_amount_out * _STOCK_DECIMALS)
-            self._approve(contracts.core.stablecoin, router_ref.address, amount_in_units)
-            tx_function = router.functions.buyExactInput(
-                stock_token_addr,
-                amount_in_units,
-                min_out_units,
-                deadline,
-                update_data,
-            )
-        else:
-            amount_in_units = int(amount_in * _STOCK_DECIMALS)
-            min_out_units = int(min_amount_out * _STABLECOIN_DECIMALS)
-            self._approve_stock(stock_token_addr, router_ref.address, amount_in_units)
-            tx_function = router.functions.sellExactInput(
-                stock_token_addr,
-                amount_in_units,
-                min_out_units,
-                deadline,
-                update_data,
-            )
-        msg_value = self._resolve_msg_value(contracts, update_data, update_fee)
-        return self._send_tx(tx_function, value=msg_value)
+        return self._swap(
+            SwapLeg(symbol, side, amount_in, min_amount_out),
+            deadline_seconds,
+            update_fee,
+        )
 
     def swap_exact_output(
         self,
@@ -166,39 +203,137 @@ class _RouterSwapHandler:
         deadline_seconds: int = 600,
         update_fee: int = 0,
     ) -> str:
+        return self._swap(
+            SwapLeg(symbol, side, amount_out, max_amount_in, exact_output=True),
+            deadline_seconds,
+            update_fee,
+        )
+
+    def _swap(self, leg: SwapLeg, deadline_seconds: int, update_fee: int) -> str:
         contracts = self._contracts_provider()
         router_ref = self._require_router(contracts)
-        stock_token_addr = self._require_stock_token(contracts, symbol)
+        stock_token_addr = self._require_stock_token(contracts, leg.symbol)
 
-        update_data = self._fetch_pyth_update_data(symbol)
+        update_data = self._fetch_pyth_update_data(leg.symbol)
         deadline = self._now() + deadline_seconds
         router = self._contract(router_ref)
 
-        if side == SwapSide.STABLECOIN_TO_STOCK:
-            amount_out_units = int(amount_out * _STOCK_DECIMALS)
-            max_in_units = int(max_amount_in * _STABLECOIN_DECIMALS)
-            self._approve(contracts.core.stablecoin, router_ref.address, max_in_units)
-            tx_function = router.functions.buyExactOutput(
-                stock_token_addr,
-                amount_out_units,
-                max_in_units,
-                deadline,
-                update_data,
-            )
+        tx_function, spent_units = self._swap_call(
+            router, stock_token_addr, leg, deadline, update_data
+        )
+        if leg.side == SwapSide.STABLECOIN_TO_STOCK:
+            self._approve(contracts.core.stablecoin, router_ref.address, spent_units)
         else:
-            amount_out_units = int(amount_out * _STABLECOIN_DECIMALS)
-            max_in_units = int(max_amount_in * _STOCK_DECIMALS)
-            self._approve_stock(stock_token_addr, router_ref.address, max_in_units)
-            tx_function = router.functions.sellExactOutput(
-                stock_token_addr,
-                amount_out_units,
-                max_in_units,
-                deadline,
-                update_data,
-            )
+            self._approve_stock(stock_token_addr, router_ref.address, spent_units)
         msg_value = self._resolve_msg_value(contracts, update_data, update_fee)
         return self._send_tx(tx_function, value=msg_value)
 
+    def swap_batch(
+        self,
+        legs: list[SwapLeg],
+        submit: Callable[..., Future],
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> list[Future | Exception]:
+        """Submit every leg with shared setup; one future or error per leg.
+
+        Signed prices for all symbols come from one fetch, the deadline and
+        oracle fee are read once, and each token is approved once for the
+        sum the legs spend. Approvals go through `send_tx`; swaps through
+        `submit`, which must broadcast without waiting. A leg that can't be
+        built, or whose approval couldn't be sent, gets its exception.
+        """
+        contracts = self._contracts_provider()
+        router_ref = self._require_router(contracts)
+        router = self._contract(router_ref)
+        outcomes: dict[int, Future | Exception] = {}
+
+        stock_tokens: dict[int, str] = {}
+        for i, leg in enumerate(legs):
+            try:
+                stock_tokens[i] = self._require_stock_token(contracts, leg.symbol)
+            except Exception as e:
+                outcomes[i] = e
+        updates = self._fetch_pyth_updates_by_symbol(
+            _dedupe([legs[i].symbol for i in stock_tokens])
+        )
+        deadline = self._now() + deadline_seconds
+
+        calls: dict[int, Any] = {}
+        update_counts: dict[int, int] = {}
+        spend: dict[Optional[str], int] = {}
+        spend_token: dict[int, Optional[str]] = {}  # None: the stablecoin.
+        for i, stock_token_addr in stock_tokens.items():
+            leg = legs[i]
+            update = updates.get(leg.symbol)
+            update_data = [update] if update is not None else []
+            update_counts[i] = len(update_data)
+            try:
+                calls[i], spent_units = self._swap_call(
+                    router, stock_token_addr, leg, deadline, update_data
+                )
+            except Exception as e:
+                outcomes[i] = e
+                continue
+            spend_token[i] = (
+                stock_token_addr if leg.side == SwapSide.STOCK_TO_STABLECOIN else None
+            )
+            spend[spend_token[i]] = spend.get(spend_token[i], 0) + spent_units
+
+        for token, units in spend.items():
+            try:
+                if token is None:
+                    self._approve(contracts.core.stablecoin, router_ref.address, units)
+                else:
+                    self._approve_stock(token, router_ref.address, units)
+            except Exception as e:
+                for i in [i for i in calls if spend_token[i] == token]:
+                    del calls[i]
+                    outcomes[i] = e
+
+        # The oracle charges per update, so one quote prices every leg; a
+        # leg shipping no update owes nothing.
+        fee_per_update: Optional[int] = None
+        for i, tx_function in calls.items():
+            try:
+                msg_value = 0
+                if update_counts[i]:
+                    if fee_per_update is None:
+                        fee_per_update = self._resolve_msg_value(
+                            contracts, list(updates.values())[:1], update_fee
+                        )
+                    msg_value = fee_per_update * update_counts[i]
+                outcomes[i] = submit(tx_function, value=msg_value)
+            except Exception as e:
+                outcomes[i] = e
+        # Every leg ended in exactly one of the branches above.
+        return [outcomes[i] for i in range(len(legs))]
+
+    def _swap_call(
+        self,
+        router,
+        stock_token_addr: str,
+        leg: SwapLeg,
+        deadline: int,
+        update_data: list[bytes],
+    ) -> tuple[Any, int]:
+        """The router call for `leg` and the most it may spend, in token units."""
+        buying = leg.side == SwapSide.STABLECOIN_TO_STOCK
+        in_decimals = _STABLECOIN_DECIMALS if buying else _STOCK_DECIMALS
+        out_decimals = _STOCK_DECIMALS if buying else _STABLECOIN_DECIMALS
+        if leg.exact_output:
+            name = "buyExactOutput" if buying else "sellExactOutput"
+            amount_units = int(leg.amount * out_decimals)
+            limit_units = spent_units = int(leg.limit * in_decimals)
+        else:
+            name = "buyExactInput" if buying else "sellExactInput"
+            amount_units = spent_units = int(leg.amount * in_decimals)
+            limit_units = int(leg.limit * out_decimals)
+        tx_function = getattr(router.functions, name)(
+            stock_token_addr, amount_units, limit_units, deadline, update_data
+        )
+        return tx_function, spent_units
+
     def swap_token_to_token_exact_input(
         self,
         input_symbol: str,
@@ -281,7 +416,9 @@ class _RouterSwapHandler:
         return contracts.core.dex_router
 
     def _require_stock_token(self, contracts: Contracts, symbol: str) -> str:
-        return _resolve_stock_token(self._web3, contracts, symbol)
+        return _resolve_stock_token(
+            self._web3, contracts, symbol, self._token_registry
+        )
 
     def _fetch_pyth_update_data(self, symbol: str) -> list[bytes]:
         # Backend's `/signed-prices/` returns 117-byte FIOracle-format updates
@@ -293,13 +430,18 @@ class _RouterSwapHandler:
     def _fetch_pyth_update_data_for(self, symbols: list[str]) -> list[bytes]:
         # Cross-dex routes may touch a custom pool on either leg; fetch signed
         # prices for both symbols (de-duped, order preserved).
-        seen: set[str] = set()
-        unique: list[str] = []
-        for s in symbols:
-            if s not in seen:
-                seen.add(s)
-                unique.append(s)
-        return self._signed_prices_fetcher(unique)
+        return self._signed_prices_fetcher(_dedupe(symbols))
+
+    def _fetch_pyth_updates_by_symbol(self, symbols: list[str]) -> dict[str, bytes]:
+        if self._signed_prices_by_symbol is not None:
+            return self._signed_prices_by_symbol(symbols)
+        # Positional results skip unpriced symbols, so ask one at a time.
+        updates = {}
+        for symbol in symbols:
+            fetched = self._signed_prices_fetcher([symbol])
+            if fetched:
+                updates[symbol] = fetched[0]
+        return updates
 
     def _resolve_msg_value(
         self,
@@ -326,6 +468,8 @@ class _RouterSwapHandler:
         )
 
     def _now(self) -> int:
+        if self._chain_clock is not None:
+            return self._chain_clock.now(self._web3)
         return int(self._web3.eth.get_block("latest")["timestamp"])
 
     def _contract(self, ref: ContractRef):
@@ -335,14 +479,14 @@ class _RouterSwapHandler:
 
     def _approve(self, token_ref: ContractRef, spender: str, amount: int) -> None:
         token = self._contract(token_ref)
-        self._send_tx(
-            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        _send_approve(
+            self._web3, self._send_tx, self._allowances, token, spender, amount
         )
 
     def _approve_stock(self, stock_token_address: str, spender: str, amount: int) -> None:
         token = self._erc20_at(stock_token_address)
-        self._send_tx(
-            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        _send_approve(
+            self._web3, self._send_tx, self._allowances, token, spender, amount
         )
 
     def _erc20_at(self, address: str):
@@ -359,11 +503,15 @@ class _DclexPoolHandler:
         account,
         contracts_provider: Callable[[], Contracts],
         send_tx: Callable[..., str],
+        token_registry: Optional[StockTokenRegistry] = None,
+        allowances: Optional[AllowanceManager] = None,
     ) -> None:
         self._web3 = web3
         self._account = account
         self._contracts_provider = contracts_provider
         self._send_tx = send_tx
+        self._token_registry = token_registry
+        self._allowances = allowances
 
     def add_liquidity(self, params: PriceFeedAddLiquidity) -> str:
         contracts = self._contracts_provider()
@@ -399,7 +547,9 @@ class _DclexPoolHandler:
         return contracts.core.dex_router
 
     def _require_stock_token(self, contracts: Contracts, symbol: str) -> str:
-        return _resolve_stock_token(self._web3, contracts, symbol)
+        return _resolve_stock_token(
+            self._web3, contracts, symbol, self._token_registry
+        )
 
     def _lookup_dclex_pool(self, router_ref: ContractRef, stock_token_addr: str) -> str:
         router = self._web3.eth.contract(
@@ -428,8 +578,8 @@ class _DclexPoolHandler:
         token = self._web3.eth.contract(
             address=self._web3.to_checksum_address(token_ref.address), abi=token_ref.abi
         )
-        self._send_tx(
-            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        _send_approve(
+            self._web3, self._send_tx, self._allowances, token, spender, amount
         )
 
     def _approve_at(self, token_address: str, spender: str, amount: int) -> None:
@@ -437,8 +587,8 @@ class _DclexPoolHandler:
             address=self._web3.to_checksum_address(token_address),
             abi=_require_pool_abi(self._contracts_provider(), "erc20"),
         )
-        self._send_tx(
-            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        _send_approve(
+            self._web3, self._send_tx, self._allowances, token, spender, amount
         )
 
 
@@ -449,11 +599,19 @@ class _AMMPoolHandler:
         account,
         contracts_provider: Callable[[], Contracts],
         send_tx: Callable[..., str],
+        token_registry: Optional[StockTokenRegistry] = None,
+        allowances: Optional[AllowanceManager] = None,
+        batch_reader: Optional[BatchReader] = None,
+        chain_clock: Optional[ChainClock] = None,
     ) -> None:
         self._web3 = web3
         self._account = account
         self._contracts_provider = contracts_provider
         self._send_tx = send_tx
+        self._token_registry = token_registry
+        self._allowances = allowances
+        self._batch_reader = batch_reader
+        self._chain_clock = chain_clock
 
     def add_liquidity(self, params: AMMAddLiquidity) -> str:
         contracts = self._contracts_provider()
@@ -534,6 +692,13 @@ class _AMMPoolHandler:
         )
         return self._send_tx(npm.functions.multicall([decrease_call, collect_call]))
 
+    def pool_address(self, symbol: str) -> str:
+        """Address of `symbol`'s AMM pool."""
+        contracts = self._contracts_provider()
+        npm_ref = self._require_npm(contracts)
+        stock_token_addr = self._require_stock_token(contracts, symbol)
+        return self._lookup_amm_pool(npm_ref, contracts, stock_token_addr)
+
     def collect_fees(self, position_id: int) -> str:
         contracts = self._contracts_provider()
         npm_ref = self._require_npm(contracts)
@@ -561,7 +726,9 @@ class _AMMPoolHandler:
         return contracts.core.dex_router
 
     def _require_stock_token(self, contracts: Contracts, symbol: str) -> str:
-        return _resolve_stock_token(self._web3, contracts, symbol)
+        return _resolve_stock_token(
+            self._web3, contracts, symbol, self._token_registry
+        )
 
     def _lookup_amm_pool(
         self, npm_ref: ContractRef, contracts: Contracts, stock_token_addr: str
@@ -599,6 +766,11 @@ class _AMMPoolHandler:
         pool = self._web3.eth.contract(
             address=self._web3.to_checksum_address(pool_address), abi=abi
         )
+        if self._batch_reader is not None:
+            token0, token1, fee = self._batch_reader.read(
+                [pool.functions.token0(), pool.functions.token1(), pool.functions.fee()]
+            )
+            return (token0, token1, fee)
         return (
             _call_view("UniswapV3Pool.token0", lambda: pool.functions.token0().call()),
             _call_view("UniswapV3Pool.token1", lambda: pool.functions.token1().call()),
@@ -608,13 +780,11 @@ class _AMMPoolHandler:
     def _map_amounts(
         self, stock_token_addr: str, token0: str, *, stock: Decimal, stablecoin: Decimal
     ) -> tuple[int, int]:
-        stock_units = int(stock * _STOCK_DECIMALS)
-        stablecoin_units = int(stablecoin * _STABLECOIN_DECIMALS)
-        if token0.lower() == stock_token_addr.lower():
-            return (stock_units, stablecoin_units)
-        return (stablecoin_units, stock_units)
+        return _map_amounts(stock_token_addr, token0, stock=stock, stablecoin=stablecoin)
 
     def _now(self) -> int:
+        if self._chain_clock is not None:
+            return self._chain_clock.now(self._web3)
         return int(self._web3.eth.get_block("latest")["timestamp"])
 
     def _contract(self, ref: ContractRef):
@@ -627,8 +797,6 @@ class _AMMPoolHandler:
             address=self._web3.to_checksum_address(token_address),
             abi=_require_pool_abi(self._contracts_provider(), "erc20"),
         )
-        self._send_tx(
-            token.functions.approve(self._web3.to_checksum_address(spender), amount)
+        _send_approve(
+            self._web3, self._send_tx, self._allowances, token, spender, amount
         )
-
-
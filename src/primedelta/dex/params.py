@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum
-from typing import ClassVar, Union
+from typing import ClassVar, Optional, Union
 
 
 class PoolType(str, Enum):
@@ -14,6 +14,39 @@ class SwapSide(str, Enum):
     STOCK_TO_STABLECOIN = "STOCK_TO_STABLECOIN"
 
 
+class ApprovalPolicy(str, Enum):
+    EXACT = "EXACT"
+    MAX = "MAX"
+
+
+@dataclass(frozen=True)
+class SwapLeg:
+    """One router swap in a `swap_batch`.
+
+    `amount` is the exact input, or the exact output when `exact_output`
+    is set; `limit` is the matching `min_amount_out` / `max_amount_in`.
+    """
+
+    symbol: str
+    side: SwapSide
+    amount: Decimal
+    limit: Decimal
+    exact_output: bool = False
+
+
+@dataclass(frozen=True)
+class SwapLegResult:
+    """Outcome of one `SwapLeg`: its mined tx hash, or why it failed."""
+
+    leg: SwapLeg
+    tx_hash: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 @dataclass(frozen=True)
 class PriceFeedAddLiquidity:
     symbol: str
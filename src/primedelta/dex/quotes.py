@@ -0,0 +1,711 @@
+"""Off-chain swap quotes for DCLEX price-feed pools and AMM pools.
+
+A price-feed pool prices every swap at the oracle price and charges a fee
+that grows with the share of the output reserve the swap takes:
+
+    fee_rate = baseFeeRate + sensitivity * amount_out / output_reserve
+
+(both set by `setFeeCurve`, 18-decimal fixed point). The fee is kept in the
+output token, and `protocolFeeRate` of it is set aside for the protocol.
+The pool exposes no getters for these parameters, so they're read from its
+`FeeCurveUpdated` / `ProtocolFeeRateChanged` events, scanned in bounded
+chunks from the block the pool was deployed in; reserves are its token
+balances minus the protocol fees it holds. A pool whose history holds no
+`FeeCurveUpdated` quotes without fees and says so (`Quote.fees_known`).
+
+AMM pools are Uniswap V3 pools; their swaps are simulated tick by tick
+with `v3_math` over a per-block snapshot of the pool.
+
+Quotes are estimates for choosing `min_amount_out` / `max_amount_in`; the
+router still enforces those bounds on-chain.
+"""
+import functools
+import threading
+import time
+from dataclasses import dataclass, replace
+from decimal import ROUND_DOWN, ROUND_UP, Decimal
+from typing import Any, Callable, Optional
+
+from primedelta.caching import TTLValue
+from primedelta.contracts import Contracts
+from primedelta.dex.handlers import (
+    _STABLECOIN_DECIMALS,
+    _STOCK_DECIMALS,
+    InsufficientLiquidity,
+    PoolNotFound,
+    RouterNotConfigured,
+    _call_view,
+    _require_pool_abi,
+    _resolve_stock_token,
+)
+from primedelta.dex.params import AMMAddLiquidity, SwapSide
+from primedelta.dex.registry import StockTokenRegistry
+from primedelta.dex.v3_math import (
+    MAX_TICK,
+    MIN_TICK,
+    OutsideSnapshot,
+    V3PoolSnapshot,
+    mint_amounts,
+    simulate_swap,
+)
+from primedelta.multicall import BatchReader
+from primedelta.price_updates import oracle_price
+
+_FEE_RATE_SCALE = Decimal(10**18)
+# Blocks per `eth_getLogs` request; nodes reject (or time out on) wider ones.
+_LOG_CHUNK_BLOCKS = 5_000
+# `tickBitmap` words read on each side of the current tick's word. One word
+# spans 256 tick spacings, which most swaps never leave.
+_BITMAP_WINDOW = 2
+_STOCK_QUANTUM = Decimal(1) / _STOCK_DECIMALS
+_STABLECOIN_QUANTUM = Decimal(1) / _STABLECOIN_DECIMALS
+
+
+@dataclass(frozen=True)
+class PoolState:
+    """What a quote needs from a price-feed pool, in token units."""
+
+    stock_reserve: Decimal
+    stablecoin_reserve: Decimal
+    base_fee_rate: Decimal = Decimal(0)
+    sensitivity: Decimal = Decimal(0)
+    protocol_fee_rate: Decimal = Decimal(0)
+    fees_known: bool = True
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Expected result of a swap.
+
+    `oracle_price` and `effective_price` are stablecoin per stock token.
+    `oracle_price` is the signed oracle price for price-feed pools and the
+    pre-trade pool price for AMM pools. `fee` and `protocol_fee` are valued
+    in the output token. `price_impact` is how much worse than
+    `oracle_price` the swap executes, as a fraction. `fees_known` is False
+    when the pool's fee curve couldn't be found on-chain; the amounts then
+    leave its fee out.
+    """
+
+    symbol: str
+    side: SwapSide
+    amount_in: Decimal
+    amount_out: Decimal
+    oracle_price: Decimal
+    fee: Decimal
+    fee_rate: Decimal
+    protocol_fee: Decimal
+    fees_known: bool = True
+
+    @property
+    def effective_price(self) -> Decimal:
+        if self.side == SwapSide.STABLECOIN_TO_STOCK:
+            return self.amount_in / self.amount_out
+        return self.amount_out / self.amount_in
+
+    @property
+    def price_impact(self) -> Decimal:
+        if self.side == SwapSide.STABLECOIN_TO_STOCK:
+            return self.effective_price / self.oracle_price - 1
+        return 1 - self.effective_price / self.oracle_price
+
+    def min_amount_out(self, slippage: Decimal) -> Decimal:
+        """`amount_out` less `slippage` (a fraction), for exact-input swaps."""
+        return _quantize(self.amount_out * (1 - slippage), self._out_quantum, ROUND_DOWN)
+
+    def max_amount_in(self, slippage: Decimal) -> Decimal:
+        """`amount_in` plus `slippage` (a fraction), for exact-output swaps."""
+        return _quantize(self.amount_in * (1 + slippage), self._in_quantum, ROUND_UP)
+
+    @property
+    def _in_quantum(self) -> Decimal:
+        if self.side == SwapSide.STABLECOIN_TO_STOCK:
+            return _STABLECOIN_QUANTUM
+        return _STOCK_QUANTUM
+
+    @property
+    def _out_quantum(self) -> Decimal:
+        if self.side == SwapSide.STABLECOIN_TO_STOCK:
+            return _STOCK_QUANTUM
+        return _STABLECOIN_QUANTUM
+
+
+def _quantize(amount: Decimal, quantum: Decimal, rounding: str) -> Decimal:
+    return amount.quantize(quantum, rounding=rounding)
+
+
+def _output_reserve(state: PoolState, side: SwapSide) -> Decimal:
+    if side == SwapSide.STABLECOIN_TO_STOCK:
+        return state.stock_reserve
+    return state.stablecoin_reserve
+
+
+def _gross_out(side: SwapSide, amount_in: Decimal, price: Decimal) -> Decimal:
+    if side == SwapSide.STABLECOIN_TO_STOCK:
+        return amount_in / price
+    return amount_in * price
+
+
+def _gross_in(side: SwapSide, gross_out: Decimal, price: Decimal) -> Decimal:
+    if side == SwapSide.STABLECOIN_TO_STOCK:
+        return gross_out * price
+    return gross_out / price
+
+
+def quote_exact_input(
+    state: PoolState,
+    symbol: str,
+    side: SwapSide,
+    amount_in: Decimal,
+    stock_price: Decimal,
+    stablecoin_price: Decimal = Decimal(1),
+) -> Quote:
+    """Output of swapping exactly `amount_in` against a pool in `state`."""
+    price = stock_price / stablecoin_price
+    reserve = _output_reserve(state, side)
+    if reserve <= 0:
+        raise InsufficientLiquidity(symbol)
+    gross = _gross_out(side, amount_in, price)
+    # out = gross * (1 - base - sensitivity * out / reserve), solved for out.
+    amount_out = gross * (1 - state.base_fee_rate) / (
+        1 + gross * state.sensitivity / reserve
+    )
+    return _quote(state, symbol, side, amount_in, amount_out, gross, price, reserve)
+
+
+def quote_exact_output(
+    state: PoolState,
+    symbol: str,
+    side: SwapSide,
+    amount_out: Decimal,
+    stock_price: Decimal,
+    stablecoin_price: Decimal = Decimal(1),
+) -> Quote:
+    """Input needed to receive exactly `amount_out` from a pool in `state`."""
+    price = stock_price / stablecoin_price
+    reserve = _output_reserve(state, side)
+    if amount_out >= reserve:
+        raise InsufficientLiquidity(symbol)
+    fee_rate = state.base_fee_rate + state.sensitivity * amount_out / reserve
+    if fee_rate >= 1:
+        raise InsufficientLiquidity(symbol)
+    gross = amount_out / (1 - fee_rate)
+    amount_in = _gross_in(side, gross, price)
+    return _quote(state, symbol, side, amount_in, amount_out, gross, price, reserve)
+
+
+def _quote(
+    state: PoolState,
+    symbol: str,
+    side: SwapSide,
+    amount_in: Decimal,
+    amount_out: Decimal,
+    gross_out: Decimal,
+    price: Decimal,
+    reserve: Decimal,
+) -> Quote:
+    if amount_out > reserve:
+        raise InsufficientLiquidity(symbol)
+    in_quantum, out_quantum = (
+        (_STABLECOIN_QUANTUM, _STOCK_QUANTUM)
+        if side == SwapSide.STABLECOIN_TO_STOCK
+        else (_STOCK_QUANTUM, _STABLECOIN_QUANTUM)
+    )
+    fee = gross_out - amount_out
+    return Quote(
+        symbol=symbol,
+        side=side,
+        amount_in=_quantize(amount_in, in_quantum, ROUND_UP),
+        amount_out=_quantize(amount_out, out_quantum, ROUND_DOWN),
+        oracle_price=price,
+        fee=_quantize(fee, out_quantum, ROUND_UP),
+        fee_rate=fee / gross_out if gross_out else state.base_fee_rate,
+        protocol_fee=_quantize(fee * state.protocol_fee_rate, out_quantum, ROUND_DOWN),
+        fees_known=state.fees_known,
+    )
+
+
+class _DclexQuoter:
+    """Quotes router swaps against price-feed pools without sending anything.
+
+    Pool state is read at most once per `block_time` seconds per pool (one
+    batched read for reserves, plus an incremental, chunked log scan for
+    fee parameter changes); the oracle price comes from the signed update the
+    swap itself would carry, so repeated quotes cost no RPC at all.
+    """
+
+    def __init__(
+        self,
+        web3,
+        contracts_provider: Callable[[], Contracts],
+        signed_prices_fetcher: Callable[[list[str]], list[bytes]],
+        token_registry: Optional[StockTokenRegistry] = None,
+        batch_reader: Optional[BatchReader] = None,
+        block_time: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._web3 = web3
+        self._contracts_provider = contracts_provider
+        self._signed_prices_fetcher = signed_prices_fetcher
+        self._token_registry = token_registry
+        self._batch_reader = batch_reader
+        self._block_time = block_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pools: dict[str, tuple[str, str]] = {}
+        self._states: dict[str, TTLValue[PoolState]] = {}
+        # pool address -> (last scanned block, (base, sensitivity) once a
+        # `FeeCurveUpdated` has been seen, protocol rate)
+        self._fee_params: dict[
+            str, tuple[int, Optional[tuple[Decimal, Decimal]], Decimal]
+        ] = {}
+
+    def quote_exact_input(self, symbol: str, side: SwapSide, amount_in: Decimal) -> Quote:
+        return quote_exact_input(
+            self.pool_state(symbol), symbol, side, amount_in, self._oracle_price(symbol)
+        )
+
+    def quote_exact_output(self, symbol: str, side: SwapSide, amount_out: Decimal) -> Quote:
+        return quote_exact_output(
+            self.pool_state(symbol), symbol, side, amount_out, self._oracle_price(symbol)
+        )
+
+    def pool_state(self, symbol: str) -> PoolState:
+        return self._state_cache(symbol).get_or_load(
+            lambda: self._read_pool_states([symbol])[symbol]
+        )
+
+    def prefetch(self, symbols: list[str]) -> None:
+        """Load every stale pool state among `symbols` in one batched read."""
+        stale = [s for s in dict.fromkeys(symbols) if self._state_cache(s).get() is None]
+        if not stale:
+            return
+        for symbol, state in self._read_pool_states(stale).items():
+            self._state_cache(symbol).set(state)
+
+    def has_pool(self, symbol: str) -> bool:
+        try:
+            self._lookup_pool(self._contracts_provider(), symbol)
+        except PoolNotFound:
+            return False
+        return True
+
+    def _state_cache(self, symbol: str) -> TTLValue[PoolState]:
+        with self._lock:
+            cached = self._states.get(symbol)
+            if cached is None:
+                cached = self._states[symbol] = TTLValue(self._block_time, self._clock)
+        return cached
+
+    def _oracle_price(self, symbol: str) -> Decimal:
+        updates = self._signed_prices_fetcher([symbol])
+        price = oracle_price(updates[0]) if updates else None
+        if price is None or price <= 0:
+            raise ValueError(f"no signed oracle price for {symbol}")
+        return price
+
+    def _read_pool_states(self, symbols: list[str]) -> dict[str, PoolState]:
+        contracts = self._contracts_provider()
+        erc20_abi = _require_pool_abi(contracts, "erc20")
+        stablecoin = self._contract(contracts.core.stablecoin.address, erc20_abi)
+        pools = {}
+        calls = []
+        for symbol in symbols:
+            pool_address, stock_token_addr = self._lookup_pool(contracts, symbol)
+            pool = self._contract(pool_address, _require_pool_abi(contracts, "dclex_pool"))
+            stock = self._contract(stock_token_addr, erc20_abi)
+            owner = self._web3.to_checksum_address(pool_address)
+            pools[symbol] = (pool_address, pool)
+            calls += [
+                stock.functions.balanceOf(owner),
+                stablecoin.functions.balanceOf(owner),
+                pool.functions.collectedProtocolFees(),
+            ]
+        if self._batch_reader is not None:
+            results = self._batch_reader.read(calls)
+        else:
+            results = [_call_view(f"DclexPool.{fn.fn_name}", fn.call) for fn in calls]
+        states = {}
+        for i, (symbol, (pool_address, pool)) in enumerate(pools.items()):
+            stock_balance, stablecoin_balance, (stock_fees, stablecoin_fees) = (
+                results[3 * i : 3 * i + 3]
+            )
+            curve, protocol_fee_rate = self._read_fee_params(pool_address, pool)
+            base_fee_rate, sensitivity = curve or (Decimal(0), Decimal(0))
+            states[symbol] = PoolState(
+                stock_reserve=Decimal(stock_balance - stock_fees) / _STOCK_DECIMALS,
+                stablecoin_reserve=(
+                    Decimal(stablecoin_balance - stablecoin_fees) / _STABLECOIN_DECIMALS
+                ),
+                base_fee_rate=base_fee_rate,
+                sensitivity=sensitivity,
+                protocol_fee_rate=protocol_fee_rate,
+                fees_known=curve is not None,
+            )
+        return states
+
+    def _read_fee_params(
+        self, pool_address: str, pool
+    ) -> tuple[Optional[tuple[Decimal, Decimal]], Decimal]:
+        """(base fee rate, sensitivity) or None, and the protocol fee rate."""
+        head = self._web3.eth.block_number
+        entry = self._fee_params.get(pool_address)
+        if entry is None:
+            entry = (self._deployment_block(pool_address, head) - 1, None, Decimal(0))
+        scanned, curve, protocol = entry
+        while scanned < head:
+            to_block = min(scanned + _LOG_CHUNK_BLOCKS, head)
+            curve_logs = pool.events.FeeCurveUpdated.get_logs(
+                fromBlock=scanned + 1, toBlock=to_block
+            )
+            if curve_logs:
+                args = curve_logs[-1]["args"]
+                curve = (
+                    Decimal(args["baseFeeRate"]) / _FEE_RATE_SCALE,
+                    Decimal(args["sensitivity"]) / _FEE_RATE_SCALE,
+                )
+            protocol_logs = pool.events.ProtocolFeeRateChanged.get_logs(
+                fromBlock=scanned + 1, toBlock=to_block
+            )
+            if protocol_logs:
+                protocol = Decimal(protocol_logs[-1]["args"]["feeRate"]) / _FEE_RATE_SCALE
+            scanned = to_block
+            # Keep each chunk's progress: a failed request resumes from here.
+            self._fee_params[pool_address] = (scanned, curve, protocol)
+        return curve, protocol
+
+    def _deployment_block(self, address: str, head: int) -> int:
+        """First block at which `address` has code, by bisection."""
+        address = self._web3.to_checksum_address(address)
+        low, high = 0, head
+        while low < high:
+            mid = (low + high) // 2
+            if self._web3.eth.get_code(address, block_identifier=mid):
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def _lookup_pool(self, contracts: Contracts, symbol: str) -> tuple[str, str]:
+        found = self._pools.get(symbol)
+        if found is not None:
+            return found
+        router_ref = contracts.core.dex_router
+        if router_ref is None:
+            raise RouterNotConfigured()
+        stock_token_addr = _resolve_stock_token(
+            self._web3, contracts, symbol, self._token_registry
+        )
+        router = self._contract(router_ref.address, router_ref.abi)
+        pool_address = _call_view(
+            "DclexRouter.stockTokenToPool",
+            lambda: router.functions.stockTokenToPool(
+                self._web3.to_checksum_address(stock_token_addr)
+            ).call(),
+        )
+        if int(pool_address, 16) == 0:
+            raise PoolNotFound(f"no DCLEX pool registered for {stock_token_addr}")
+        self._pools[symbol] = (pool_address, stock_token_addr)
+        return self._pools[symbol]
+
+    def _contract(self, address: str, abi):
+        return self._web3.eth.contract(
+            address=self._web3.to_checksum_address(address), abi=abi
+        )
+
+
+@dataclass(frozen=True)
+class MintQuote:
+    """Amounts an AMM position over [tick_lower, tick_upper) would take."""
+
+    symbol: str
+    tick_lower: int
+    tick_upper: int
+    liquidity: int
+    amount_stock: Decimal
+    amount_stablecoin: Decimal
+
+    def to_params(self, slippage: Decimal) -> AMMAddLiquidity:
+        """`add_liquidity` params with minimums `slippage` (a fraction) below."""
+        return AMMAddLiquidity(
+            symbol=self.symbol,
+            tick_lower=self.tick_lower,
+            tick_upper=self.tick_upper,
+            amount_stock_desired=self.amount_stock,
+            amount_stablecoin_desired=self.amount_stablecoin,
+            amount_stock_min=_quantize(
+                self.amount_stock * (1 - slippage), _STOCK_QUANTUM, ROUND_DOWN
+            ),
+            amount_stablecoin_min=_quantize(
+                self.amount_stablecoin * (1 - slippage), _STABLECOIN_QUANTUM, ROUND_DOWN
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class _AMMPoolInfo:
+    address: str
+    stock_is_token0: bool
+    tick_spacing: int
+    fee: int
+
+
+def _bitmap_word(tick: int, tick_spacing: int) -> int:
+    return (tick // tick_spacing) >> 8
+
+
+class _AMMQuoter:
+    """Quotes AMM (Uniswap V3) pools from a per-block snapshot.
+
+    A snapshot is `slot0`, `liquidity`, the `tickBitmap` words around the
+    current tick and the `ticks` entry of each initialized tick in them,
+    all read at one block at most once per `block_time` seconds. A swap
+    that walks past those words widens the snapshot (at the same block)
+    and is simulated again; everything else is local arithmetic.
+
+    Args:
+        pool_lookup: Address of a symbol's AMM pool.
+    """
+
+    def __init__(
+        self,
+        web3,
+        contracts_provider: Callable[[], Contracts],
+        pool_lookup: Callable[[str], str],
+        batch_reader: Optional[BatchReader] = None,
+        block_time: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._web3 = web3
+        self._contracts_provider = contracts_provider
+        self._pool_lookup = pool_lookup
+        self._batch_reader = batch_reader
+        self._block_time = block_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pools: dict[str, _AMMPoolInfo] = {}
+        # symbol -> (snapshot, slot0 feeProtocol, block it was read at)
+        self._snapshots: dict[str, TTLValue[tuple[V3PoolSnapshot, int, int]]] = {}
+
+    def snapshot(self, symbol: str) -> V3PoolSnapshot:
+        return self._snapshot(symbol)[0]
+
+    def quote_exact_input(self, symbol: str, side: SwapSide, amount_in: Decimal) -> Quote:
+        return self._quote(symbol, side, amount_in, exact_in=True)
+
+    def quote_exact_output(self, symbol: str, side: SwapSide, amount_out: Decimal) -> Quote:
+        return self._quote(symbol, side, amount_out, exact_in=False)
+
+    def mint_amounts(
+        self,
+        symbol: str,
+        tick_lower: int,
+        tick_upper: int,
+        amount_stock: Decimal,
+        amount_stablecoin: Decimal,
+    ) -> MintQuote:
+        """Liquidity and amounts minting up to the given amounts would take."""
+        info = self._info(symbol)
+        pool, _, _ = self._snapshot(symbol)
+        stock_units = int(amount_stock * _STOCK_DECIMALS)
+        stablecoin_units = int(amount_stablecoin * _STABLECOIN_DECIMALS)
+        desired = (
+            (stock_units, stablecoin_units)
+            if info.stock_is_token0
+            else (stablecoin_units, stock_units)
+        )
+        liquidity, amount0, amount1 = mint_amounts(pool, tick_lower, tick_upper, *desired)
+        stock, stablecoin = (
+            (amount0, amount1) if info.stock_is_token0 else (amount1, amount0)
+        )
+        return MintQuote(
+            symbol=symbol,
+            tick_lower=tick_lower,
+            tick_upper=tick_upper,
+            liquidity=liquidity,
+            amount_stock=Decimal(stock) / _STOCK_DECIMALS,
+            amount_stablecoin=Decimal(stablecoin) / _STABLECOIN_DECIMALS,
+        )
+
+    def _quote(
+        self, symbol: str, side: SwapSide, amount: Decimal, exact_in: bool
+    ) -> Quote:
+        info = self._info(symbol)
+        pool, fee_protocol, _ = self._snapshot(symbol)
+        buying = side == SwapSide.STABLECOIN_TO_STOCK
+        in_scale, out_scale = (
+            (_STABLECOIN_DECIMALS, _STOCK_DECIMALS)
+            if buying
+            else (_STOCK_DECIMALS, _STABLECOIN_DECIMALS)
+        )
+        # token0 -> token1 when the input token is token0.
+        zero_for_one = info.stock_is_token0 != buying
+        specified = (
+            int(amount * in_scale) if exact_in else -int(amount * out_scale)
+        )
+        while True:
+            try:
+                result = simulate_swap(pool, zero_for_one, specified)
+                break
+            except OutsideSnapshot as e:
+                pool = self._extend_snapshot(symbol, e.word)
+            except InsufficientLiquidity as e:
+                raise InsufficientLiquidity(symbol) from e
+        amount_in = Decimal(result.amount_in) / in_scale
+        amount_out = Decimal(result.amount_out) / out_scale
+        # The pool charges its fee in the input token; value it in the output.
+        net_in = result.amount_in - result.fee
+        fee = (
+            Decimal(result.fee) * result.amount_out / net_in / out_scale
+            if net_in
+            else Decimal(0)
+        )
+        protocol_share = fee_protocol % 16 if zero_for_one else fee_protocol >> 4
+        return Quote(
+            symbol=symbol,
+            side=side,
+            amount_in=amount_in,
+            amount_out=amount_out,
+            oracle_price=self._mid_price(pool, info),
+            fee=_quantize(fee, _STOCK_QUANTUM if buying else _STABLECOIN_QUANTUM, ROUND_UP),
+            fee_rate=Decimal(pool.fee) / 1_000_000,
+            protocol_fee=(
+                _quantize(
+                    fee / protocol_share,
+                    _STOCK_QUANTUM if buying else _STABLECOIN_QUANTUM,
+                    ROUND_DOWN,
+                )
+                if protocol_share
+                else Decimal(0)
+            ),
+        )
+
+    def _mid_price(self, pool: V3PoolSnapshot, info: _AMMPoolInfo) -> Decimal:
+        # token1 units per token0 unit.
+        raw = Decimal(pool.sqrt_price_x96) ** 2 / Decimal(1 << 192)
+        if info.stock_is_token0:
+            return raw * _STOCK_DECIMALS / _STABLECOIN_DECIMALS
+        return _STOCK_DECIMALS / _STABLECOIN_DECIMALS / raw
+
+    def _snapshot(self, symbol: str) -> tuple[V3PoolSnapshot, int, int]:
+        return self._snapshot_cache(symbol).get_or_load(
+            lambda: self._read_snapshot(symbol)
+        )
+
+    def _snapshot_cache(self, symbol: str) -> TTLValue[tuple[V3PoolSnapshot, int, int]]:
+        with self._lock:
+            cached = self._snapshots.get(symbol)
+            if cached is None:
+                cached = self._snapshots[symbol] = TTLValue(self._block_time, self._clock)
+        return cached
+
+    def _read_snapshot(self, symbol: str) -> tuple[V3PoolSnapshot, int, int]:
+        info = self._info(symbol)
+        pool = self._pool_contract(info.address)
+        block = self._web3.eth.block_number
+        slot0, liquidity = self._read(
+            [pool.functions.slot0(), pool.functions.liquidity()], block
+        )
+        current = _bitmap_word(slot0[1], info.tick_spacing)
+        low, high = self._clamp_words(
+            info, current - _BITMAP_WINDOW, current + _BITMAP_WINDOW
+        )
+        snapshot = V3PoolSnapshot(
+            sqrt_price_x96=slot0[0],
+            tick=slot0[1],
+            liquidity=liquidity,
+            fee=info.fee,
+            tick_spacing=info.tick_spacing,
+            ticks=self._read_ticks(pool, info, range(low, high + 1), block),
+            words=self._words(info, low, high),
+        )
+        return snapshot, slot0[5], block
+
+    def _extend_snapshot(self, symbol: str, word: int) -> V3PoolSnapshot:
+        """Widen the cached snapshot to cover `word`, read at its block."""
+        cache = self._snapshot_cache(symbol)
+        snapshot, fee_protocol, block = self._snapshot(symbol)
+        info = self._info(symbol)
+        low, high = snapshot.words or self._clamp_words(info, word, word)
+        # Double the covered width each time, so a long walk costs log reads.
+        width = high - low + 1
+        if word < low:
+            new_low, new_high = self._clamp_words(info, min(word, low - width), low - 1)
+        else:
+            new_low, new_high = self._clamp_words(info, high + 1, max(word, high + width))
+        ticks = self._read_ticks(
+            self._pool_contract(info.address), info, range(new_low, new_high + 1), block
+        )
+        extended = replace(
+            snapshot,
+            ticks={**snapshot.ticks, **ticks},
+            words=self._words(info, min(low, new_low), max(high, new_high)),
+        )
+        cache.set((extended, fee_protocol, block))
+        return extended
+
+    def _read_ticks(
+        self, pool, info: _AMMPoolInfo, words: range, block: int
+    ) -> dict[int, int]:
+        """`liquidityNet` of every initialized tick in `words`."""
+        bitmaps = self._read([pool.functions.tickBitmap(word) for word in words], block)
+        initialized = []
+        for word, bitmap in zip(words, bitmaps):
+            while bitmap:
+                lowest = bitmap & -bitmap
+                bit = lowest.bit_length() - 1
+                initialized.append(((word << 8) + bit) * info.tick_spacing)
+                bitmap ^= lowest
+        tick_data = self._read([pool.functions.ticks(tick) for tick in initialized], block)
+        return {tick: data[1] for tick, data in zip(initialized, tick_data)}
+
+    def _clamp_words(self, info: _AMMPoolInfo, low: int, high: int) -> tuple[int, int]:
+        return (
+            max(low, _bitmap_word(MIN_TICK, info.tick_spacing)),
+            min(high, _bitmap_word(MAX_TICK, info.tick_spacing)),
+        )
+
+    def _words(
+        self, info: _AMMPoolInfo, low: int, high: int
+    ) -> Optional[tuple[int, int]]:
+        # Every word read: nothing left to load on demand.
+        if (low, high) == self._clamp_words(info, low - 1, high + 1):
+            return None
+        return low, high
+
+    def _info(self, symbol: str) -> _AMMPoolInfo:
+        info = self._pools.get(symbol)
+        if info is not None:
+            return info
+        address = self._pool_lookup(symbol)
+        pool = self._pool_contract(address)
+        token0, tick_spacing, fee = self._read(
+            [pool.functions.token0(), pool.functions.tickSpacing(), pool.functions.fee()]
+        )
+        stablecoin = self._contracts_provider().core.stablecoin.address
+        info = _AMMPoolInfo(
+            address=address,
+            stock_is_token0=token0.lower() != stablecoin.lower(),
+            tick_spacing=tick_spacing,
+            fee=fee,
+        )
+        self._pools[symbol] = info
+        return info
+
+    def _read(self, calls: list[Any], block: Any = "latest") -> list[Any]:
+        if not calls:
+            return []
+        if self._batch_reader is not None:
+            return self._batch_reader.read(calls, block_identifier=block)
+        return [
+            _call_view(
+                f"UniswapV3Pool.{fn.fn_name}",
+                functools.partial(fn.call, block_identifier=block),
+            )
+            for fn in calls
+        ]
+
+    def _pool_contract(self, address: str):
+        return self._web3.eth.contract(
+            address=self._web3.to_checksum_address(address),
+            abi=_require_pool_abi(self._contracts_provider(), "univ3_pool"),
+        )
@@ -0,0 +1,220 @@
+"""Symbol → stock-token address registry for one network's DclexRouter.
+
+`networks.load` ships no pool list, so without this every swap, liquidity
+call and on-chain balance read would enumerate `Router.allStockTokens()` and
+call `symbol()` on each token until it found a match. The registry does that
+walk once, keeps the result, and only rebuilds when the router emits one of
+its pool-registration events. Optionally the map is persisted to disk so a
+warm start skips discovery entirely.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from web3 import Web3
+
+from primedelta.contracts import ContractRef, Contracts
+from primedelta.multicall import BatchReader
+
+# Any of these means a token gained or changed pools; the cheapest correct
+# reaction is to rebuild the whole map on next lookup.
+_POOL_EVENT_SIGNATURES = (
+    "PoolSetForToken(address,address,uint8)",
+    "AMMPoolSet(address,address)",
+    "CustomPoolSet(address,address)",
+)
+_POOL_EVENT_TOPICS = [
+    "0x" + Web3.keccak(text=signature).hex().removeprefix("0x")
+    for signature in _POOL_EVENT_SIGNATURES
+]
+
+
+def _enumerate_stock_tokens(
+    web3,
+    contracts: Contracts,
+    router_ref: ContractRef,
+    batch_reader: Optional[BatchReader] = None,
+) -> Optional[dict[str, str]]:
+    """Read every router-listed token's `symbol()`; unreadable tokens are skipped.
+
+    Returns None when the router itself can't be read, so the caller doesn't
+    cache an empty map.
+    """
+    from primedelta.dex.handlers import _require_pool_abi
+
+    erc20_abi = _require_pool_abi(contracts, "erc20")
+    try:
+        router = web3.eth.contract(
+            address=web3.to_checksum_address(router_ref.address),
+            abi=router_ref.abi,
+        )
+        all_tokens = router.functions.allStockTokens().call()
+    except Exception:
+        return None
+    tokens: dict[str, str] = {}
+    if batch_reader is not None:
+        symbol_calls = [
+            web3.eth.contract(
+                address=web3.to_checksum_address(addr), abi=erc20_abi
+            ).functions.symbol()
+            for addr in all_tokens
+        ]
+        symbols = batch_reader.read(symbol_calls, allow_failure=True)
+        for addr, symbol in zip(all_tokens, symbols):
+            if symbol is not None:
+                tokens.setdefault(symbol, addr)
+        return tokens
+    for addr in all_tokens:
+        try:
+            stock = web3.eth.contract(
+                address=web3.to_checksum_address(addr),
+                abi=erc20_abi,
+            )
+            symbol = stock.functions.symbol().call()
+        except Exception:
+            continue
+        tokens.setdefault(symbol, addr)
+    return tokens
+
+
+class StockTokenRegistry:
+    """Lazily built, event-invalidated symbol → token address map.
+
+    Args:
+        web3: Web3 instance for the network.
+        contracts_provider: Returns the network's `Contracts`.
+        cache_path: Optional JSON file to persist the map across processes.
+            Entries are tagged with chain id and router address, so one file
+            per network is safe to reuse.
+        event_poll_interval: Minimum seconds between `eth_getLogs` checks
+            for pool-registration events. Lookups in between are pure dict
+            reads.
+        batch_reader: Fetches every token's `symbol()` in one round-trip
+            during enumeration instead of one `eth_call` per token.
+    """
+
+    def __init__(
+        self,
+        web3,
+        contracts_provider: Callable[[], Contracts],
+        cache_path: Optional[str | os.PathLike] = None,
+        event_poll_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        batch_reader: Optional[BatchReader] = None,
+    ) -> None:
+        self._web3 = web3
+        self._batch_reader = batch_reader
+        self._contracts_provider = contracts_provider
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self._event_poll_interval = event_poll_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens: Optional[dict[str, str]] = None
+        self._synced_block: Optional[int] = None
+        self._next_event_poll = 0.0
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """Return the token address for `symbol`, or None if the router has none."""
+        contracts = self._contracts_provider()
+        router_ref = contracts.core.dex_router
+        if router_ref is None:
+            return None
+        with self._lock:
+            if self._tokens is None:
+                self._load(contracts, router_ref)
+            elif self._clock() >= self._next_event_poll:
+                self._poll_pool_events(contracts, router_ref)
+            if self._tokens is None:
+                self._build(contracts, router_ref)
+            if self._tokens is None:
+                return None
+            return self._tokens.get(symbol)
+
+    def invalidate(self) -> None:
+        """Drop the in-memory map; the next lookup re-enumerates the router."""
+        with self._lock:
+            self._tokens = None
+            self._synced_block = None
+
+    def _load(self, contracts: Contracts, router_ref: ContractRef) -> None:
+        cached = self._read_cache_file(contracts, router_ref)
+        if cached is None:
+            return
+        self._tokens = cached["tokens"]
+        self._synced_block = cached["block"]
+        # Catch up on anything registered since the file was written.
+        self._poll_pool_events(contracts, router_ref)
+
+    def _build(self, contracts: Contracts, router_ref: ContractRef) -> None:
+        # Take the head first so events emitted during enumeration are
+        # re-checked on the next poll instead of being missed.
+        head = self._web3.eth.block_number
+        tokens = _enumerate_stock_tokens(
+            self._web3, contracts, router_ref, self._batch_reader
+        )
+        if tokens is None:
+            return
+        self._tokens = tokens
+        self._synced_block = head
+        self._next_event_poll = self._clock() + self._event_poll_interval
+        self._write_cache_file(contracts, router_ref)
+
+    def _poll_pool_events(self, contracts: Contracts, router_ref: ContractRef) -> None:
+        self._next_event_poll = self._clock() + self._event_poll_interval
+        try:
+            head = self._web3.eth.block_number
+            if self._synced_block is not None and head <= self._synced_block:
+                return
+            logs = self._web3.eth.get_logs(
+                {
+                    "address": self._web3.to_checksum_address(router_ref.address),
+                    "fromBlock": (self._synced_block or 0) + 1,
+                    "toBlock": head,
+                    "topics": [_POOL_EVENT_TOPICS],
+                }
+            )
+        except Exception:
+            # Range too large, node without log index, ... — rebuilding is
+            # always correct, just slower.
+            self._tokens = None
+            return
+        if logs:
+            self._tokens = None
+        else:
+            self._synced_block = head
+
+    def _read_cache_file(
+        self, contracts: Contracts, router_ref: ContractRef
+    ) -> Optional[dict[str, Any]]:
+        if self._cache_path is None or not self._cache_path.exists():
+            return None
+        try:
+            data = json.loads(self._cache_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if (
+            data.get("chain_id") != contracts.chain_id
+            or str(data.get("router", "")).lower() != router_ref.address.lower()
+        ):
+            return None
+        return data
+
+    def _write_cache_file(self, contracts: Contracts, router_ref: ContractRef) -> None:
+        if self._cache_path is None:
+            return
+        payload = {
+            "chain_id": contracts.chain_id,
+            "router": router_ref.address,
+            "block": self._synced_block,
+            "tokens": self._tokens,
+        }
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_suffix(self._cache_path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(payload))
+            os.replace(tmp_path, self._cache_path)
+        except OSError:
+            pass  # Persistence is an optimisation; never fail a lookup over it.
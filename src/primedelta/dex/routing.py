@@ -0,0 +1,269 @@
+"""Cheapest-path selection for token-to-token swaps.
+
+Every stock-to-stock trade goes through dUSD: the router sells the input
+token for dUSD on the pool it has registered for that token, then buys the
+output token with it on that token's pool. That can run as one
+`swapExactInput` / `swapExactOutput` call, or as two single-leg calls
+(`sellExactInput` then `buyExactInput`, and their exact-output mirrors).
+
+`RouteOptimizer` quotes each path from cached pool state (price-feed or
+AMM, whichever the token trades on), charges it the gas its transactions
+are expected to burn, valued in the token being optimised, and ranks the
+paths by what the caller ends up with. Both paths trade on the same pools,
+so their amounts match and gas decides: once receipts have taught
+`GasStrategy` what each router function really uses, that replaces the
+defaults, and the split path wins whenever its two calls burn less than
+the one router call. Results are memoised for one block time, so
+re-asking for the same trade in a loop costs nothing.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Optional
+
+from web3 import Web3
+
+from primedelta.caching import TTLValue
+from primedelta.dex.params import SwapSide
+from primedelta.dex.quotes import Quote
+
+_WEI_PER_NATIVE = Decimal(10**18)
+# Until receipts teach `GasStrategy` better; these are only used to rank
+# paths, never as transaction gas limits.
+DEFAULT_ROUTE_GAS = {
+    "ROUTER": 450_000,
+    "SPLIT_LEGS": 2 * 300_000,
+}
+_SWAP_ARGS = "(address,uint256,uint256,uint256,bytes[])"
+_TOKEN_SWAP_ARGS = "(address,address,uint256,uint256,uint256,bytes[])"
+# Memoised routes are dropped wholesale past this many distinct trades.
+_MAX_MEMOISED = 1024
+
+
+class RouteKind(str, Enum):
+    ROUTER = "ROUTER"  # one router call: input -> dUSD -> output
+    SPLIT_LEGS = "SPLIT_LEGS"  # sell input for dUSD, then buy output with it
+
+
+def _selector(signature: str) -> str:
+    return "0x" + Web3.keccak(text=signature).hex().removeprefix("0x")[:8]
+
+
+# Router functions each path calls, by (kind, exact_input), as selectors.
+_ROUTE_SELECTORS = {
+    (RouteKind.ROUTER, True): [_selector("swapExactInput" + _TOKEN_SWAP_ARGS)],
+    (RouteKind.ROUTER, False): [_selector("swapExactOutput" + _TOKEN_SWAP_ARGS)],
+    (RouteKind.SPLIT_LEGS, True): [
+        _selector("sellExactInput" + _SWAP_ARGS),
+        _selector("buyExactInput" + _SWAP_ARGS),
+    ],
+    (RouteKind.SPLIT_LEGS, False): [
+        _selector("sellExactOutput" + _SWAP_ARGS),
+        _selector("buyExactOutput" + _SWAP_ARGS),
+    ],
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    """One way of trading `input_symbol` for `output_symbol`, quoted.
+
+    `sell` is the input -> dUSD leg and `buy` the dUSD -> output leg.
+    `gas_cost` is the expected gas spend valued in the optimised token:
+    the output token for exact-input routes, the input token for
+    exact-output ones.
+    """
+
+    kind: RouteKind
+    input_symbol: str
+    output_symbol: str
+    exact_input: bool
+    sell: Quote
+    buy: Quote
+    gas: int
+    gas_cost: Decimal
+
+    @property
+    def amount_in(self) -> Decimal:
+        return self.sell.amount_in
+
+    @property
+    def amount_out(self) -> Decimal:
+        return self.buy.amount_out
+
+    @property
+    def net_amount(self) -> Decimal:
+        """Output less gas for exact-input routes; input plus gas otherwise."""
+        if self.exact_input:
+            return self.amount_out - self.gas_cost
+        return self.amount_in + self.gas_cost
+
+    def min_amount_out(self, slippage: Decimal) -> Decimal:
+        return self.buy.min_amount_out(slippage)
+
+    def max_amount_in(self, slippage: Decimal) -> Decimal:
+        return self.sell.max_amount_in(slippage)
+
+
+QuoteFn = Callable[[str, SwapSide, Decimal], Quote]
+
+
+class RouteOptimizer:
+    """Quotes and ranks every `RouteKind` for a token-to-token trade.
+
+    `quote_exact_input` / `quote_exact_output` quote one leg on the pool
+    the router uses for that symbol. `prefetch`, when given, is called with
+    both symbols before quoting so their pool state loads in one read.
+    `gas_price` returns the current wei per gas, and `native_token_price`
+    is dUSD per native coin; leave it at 0 to rank on amounts alone (ties
+    go to the path expected to burn less gas). `learned_gas`, when given,
+    returns the largest `gasUsed` receipts have shown for a router function
+    selector across all tokens (None if it hasn't mined yet); a path whose
+    every call has history is ranked on that. Otherwise `gas_estimates`
+    overrides `DEFAULT_ROUTE_GAS` per kind name.
+    """
+
+    def __init__(
+        self,
+        quote_exact_input: QuoteFn,
+        quote_exact_output: QuoteFn,
+        gas_price: Callable[[], int],
+        native_token_price: Decimal = Decimal(0),
+        gas_estimates: Optional[dict[str, int]] = None,
+        prefetch: Optional[Callable[[list[str]], None]] = None,
+        learned_gas: Optional[Callable[[str], Optional[int]]] = None,
+        block_time: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._quote_exact_input = quote_exact_input
+        self._quote_exact_output = quote_exact_output
+        self._gas_price = gas_price
+        self._native_token_price = native_token_price
+        self._gas_estimates = {**DEFAULT_ROUTE_GAS, **(gas_estimates or {})}
+        self._prefetch = prefetch
+        self._learned_gas = learned_gas
+        self._block_time = block_time
+        self._clock = clock
+        self._memo: dict[tuple, TTLValue[list[Route]]] = {}
+        self._lock = threading.Lock()
+
+    def best_exact_input(
+        self, input_symbol: str, output_symbol: str, amount_in: Decimal
+    ) -> Route:
+        return self.routes_exact_input(input_symbol, output_symbol, amount_in)[0]
+
+    def best_exact_output(
+        self, input_symbol: str, output_symbol: str, amount_out: Decimal
+    ) -> Route:
+        return self.routes_exact_output(input_symbol, output_symbol, amount_out)[0]
+
+    def routes_exact_input(
+        self, input_symbol: str, output_symbol: str, amount_in: Decimal
+    ) -> list[Route]:
+        """Every path for selling `amount_in`, best net output first."""
+        _require_distinct(input_symbol, output_symbol)
+        return self._memoised(
+            (input_symbol, output_symbol, True, amount_in),
+            lambda: self._rank_exact_input(input_symbol, output_symbol, amount_in),
+        )
+
+    def routes_exact_output(
+        self, input_symbol: str, output_symbol: str, amount_out: Decimal
+    ) -> list[Route]:
+        """Every path for buying `amount_out`, cheapest net input first."""
+        _require_distinct(input_symbol, output_symbol)
+        return self._memoised(
+            (input_symbol, output_symbol, False, amount_out),
+            lambda: self._rank_exact_output(input_symbol, output_symbol, amount_out),
+        )
+
+    def _rank_exact_input(
+        self, input_symbol: str, output_symbol: str, amount_in: Decimal
+    ) -> list[Route]:
+        self._load([input_symbol, output_symbol])
+        sell = self._quote_exact_input(
+            input_symbol, SwapSide.STOCK_TO_STABLECOIN, amount_in
+        )
+        buy = self._quote_exact_input(
+            output_symbol, SwapSide.STABLECOIN_TO_STOCK, sell.amount_out
+        )
+        routes = self._routes(input_symbol, output_symbol, True, sell, buy, buy.oracle_price)
+        return sorted(routes, key=lambda r: (-r.net_amount, r.gas))
+
+    def _rank_exact_output(
+        self, input_symbol: str, output_symbol: str, amount_out: Decimal
+    ) -> list[Route]:
+        self._load([input_symbol, output_symbol])
+        buy = self._quote_exact_output(
+            output_symbol, SwapSide.STABLECOIN_TO_STOCK, amount_out
+        )
+        sell = self._quote_exact_output(
+            input_symbol, SwapSide.STOCK_TO_STABLECOIN, buy.amount_in
+        )
+        routes = self._routes(input_symbol, output_symbol, False, sell, buy, sell.oracle_price)
+        return sorted(routes, key=lambda r: (r.net_amount, r.gas))
+
+    def _routes(
+        self,
+        input_symbol: str,
+        output_symbol: str,
+        exact_input: bool,
+        sell: Quote,
+        buy: Quote,
+        optimised_token_price: Decimal,
+    ) -> list[Route]:
+        # Both kinds trade on the same pools, so they share leg quotes and
+        # differ in what their transactions cost.
+        gas_price = self._gas_price() if self._native_token_price else 0
+        routes = []
+        for kind in RouteKind:
+            gas = self._route_gas(kind, exact_input)
+            gas_cost = Decimal(0)
+            if gas_price and optimised_token_price > 0:
+                gas_cost = (
+                    Decimal(gas * gas_price)
+                    / _WEI_PER_NATIVE
+                    * self._native_token_price
+                    / optimised_token_price
+                )
+            routes.append(
+                Route(
+                    kind=kind,
+                    input_symbol=input_symbol,
+                    output_symbol=output_symbol,
+                    exact_input=exact_input,
+                    sell=sell,
+                    buy=buy,
+                    gas=gas,
+                    gas_cost=gas_cost,
+                )
+            )
+        return routes
+
+    def _route_gas(self, kind: RouteKind, exact_input: bool) -> int:
+        if self._learned_gas is not None:
+            learned = [self._learned_gas(s) for s in _ROUTE_SELECTORS[kind, exact_input]]
+            known = [gas for gas in learned if gas is not None]
+            if len(known) == len(learned):
+                return sum(known)
+        return self._gas_estimates[kind.value]
+
+    def _load(self, symbols: list[str]) -> None:
+        if self._prefetch is not None:
+            self._prefetch(symbols)
+
+    def _memoised(self, key: tuple, load: Callable[[], list[Route]]) -> list[Route]:
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is None:
+                if len(self._memo) >= _MAX_MEMOISED:
+                    self._memo.clear()
+                cached = self._memo[key] = TTLValue(self._block_time, self._clock)
+        return cached.get_or_load(load)
+
+
+def _require_distinct(input_symbol: str, output_symbol: str) -> None:
+    if input_symbol == output_symbol:
+        raise ValueError("input_symbol and output_symbol must differ")
@@ -0,0 +1,384 @@
+"""Uniswap V3 pool math, ported to Python integers.
+
+Mirrors TickMath, SqrtPriceMath, SwapMath and LiquidityAmounts from
+v3-core / v3-periphery, rounding exactly as the contracts do, so a swap
+simulated over a `V3PoolSnapshot` gives the amounts the pool would. The
+snapshot holds every initialized tick in the bitmap words it covers, so
+the simulation needs no RPC; a swap that walks past them raises
+`OutsideSnapshot` naming the word to load.
+"""
+import bisect
+import math
+from dataclasses import dataclass, field
+from typing import Optional
+
+from primedelta.dex.handlers import InsufficientLiquidity
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 1 << 96
+_UINT256_MAX = (1 << 256) - 1
+_FEE_DENOMINATOR = 1_000_000
+
+
+class OutsideSnapshot(Exception):
+    """The swap reached a `tickBitmap` word the snapshot doesn't hold."""
+
+    def __init__(self, word: int) -> None:
+        super().__init__(f"tickBitmap word {word} is outside the snapshot")
+        self.word = word
+
+# (bit of |tick|, 1/sqrt(1.0001)^bit as Q128.128) from TickMath.getSqrtRatioAtTick.
+_TICK_RATIOS = (
+    (0x2, 0xFFF97272373D413259A46990580E213A),
+    (0x4, 0xFFF2E50F5F656932EF12357CF3C7FDCC),
+    (0x8, 0xFFE5CACA7E10E4E61C3624EAA0941CD0),
+    (0x10, 0xFFCB9843D60F6159C9DB58835C926644),
+    (0x20, 0xFF973B41FA98C081472E6896DFB254C0),
+    (0x40, 0xFF2EA16466C96A3843EC78B326B52861),
+    (0x80, 0xFE5DEE046A99A2A811C461F1969C3053),
+    (0x100, 0xFCBE86C7900A88AEDCFFC83B479AA3A4),
+    (0x200, 0xF987A7253AC413176F2B074CF7815E54),
+    (0x400, 0xF3392B0822B70005940C7A398E4B70F3),
+    (0x800, 0xE7159475A2C29B7443B29C7FA6E889D9),
+    (0x1000, 0xD097F3BDFD2022B8845AD8F792AA5825),
+    (0x2000, 0xA9F746462D870FDF8A65DC1F90E061E5),
+    (0x4000, 0x70D869A156D2A1B890BB3DF62BAF32F7),
+    (0x8000, 0x31BE135F97D08FD981231505542FCFA6),
+    (0x10000, 0x9AA508B5B7A84E1C677DE54F3E99BC9),
+    (0x20000, 0x5D6AF8DEDB81196699C329225EE604),
+    (0x40000, 0x2216E584F5FA1EA926041BEDFE98),
+    (0x80000, 0x48A170391F7DC42444E8FA2),
+)
+
+
+def _mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def _mul_div_up(a: int, b: int, denominator: int) -> int:
+    quotient, remainder = divmod(a * b, denominator)
+    return quotient + (remainder > 0)
+
+
+def _div_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def sqrt_ratio_at_tick(tick: int) -> int:
+    """sqrt(1.0001^tick) as a Q64.96, rounded up (`getSqrtRatioAtTick`)."""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+    ratio = (
+        0xFFFCB933BD6FAD37AA2D162D1A594001
+        if abs_tick & 0x1
+        else 0x100000000000000000000000000000000
+    )
+    for bit, factor in _TICK_RATIOS:
+        if abs_tick & bit:
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = _UINT256_MAX // ratio
+    return (ratio >> 32) + (ratio & 0xFFFFFFFF != 0)
+
+
+def tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Greatest tick whose sqrt ratio is <= `sqrt_price_x96` (`getTickAtSqrtRatio`)."""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError("sqrt price out of range")
+    # A float estimate is within a tick or two; settle it exactly.
+    tick = math.floor(2 * math.log(sqrt_price_x96 / Q96) / math.log(1.0001))
+    tick = max(MIN_TICK, min(MAX_TICK, tick))
+    while tick > MIN_TICK and sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while tick < MAX_TICK and sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+def amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return _div_up(_mul_div_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return _mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return _mul_div_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return _mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+def _next_sqrt_price_from_amount0(
+    sqrt_price: int, liquidity: int, amount: int, add: bool
+) -> int:
+    if amount == 0:
+        return sqrt_price
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price
+    if add:
+        if product <= _UINT256_MAX and numerator1 + product <= _UINT256_MAX:
+            return _mul_div_up(numerator1, sqrt_price, numerator1 + product)
+        return _div_up(numerator1, numerator1 // sqrt_price + amount)
+    if product > _UINT256_MAX or numerator1 <= product:
+        raise InsufficientLiquidity("output exceeds liquidity")
+    return _mul_div_up(numerator1, sqrt_price, numerator1 - product)
+
+
+def _next_sqrt_price_from_amount1(
+    sqrt_price: int, liquidity: int, amount: int, add: bool
+) -> int:
+    if add:
+        return sqrt_price + (amount << 96) // liquidity
+    quotient = _div_up(amount << 96, liquidity)
+    if sqrt_price <= quotient:
+        raise InsufficientLiquidity("output exceeds liquidity")
+    return sqrt_price - quotient
+
+
+def compute_swap_step(
+    sqrt_price: int,
+    sqrt_target: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee_pips: int,
+) -> tuple[int, int, int, int]:
+    """One step of a swap within a tick range (`SwapMath.computeSwapStep`).
+
+    `amount_remaining` is positive for exact input, negative for exact
+    output. Returns (next sqrt price, amount in, amount out, fee).
+    """
+    zero_for_one = sqrt_price >= sqrt_target
+    exact_in = amount_remaining >= 0
+    amount_in = amount_out = 0
+    if exact_in:
+        remaining_less_fee = _mul_div(
+            amount_remaining, _FEE_DENOMINATOR - fee_pips, _FEE_DENOMINATOR
+        )
+        amount_in = (
+            amount0_delta(sqrt_target, sqrt_price, liquidity, True)
+            if zero_for_one
+            else amount1_delta(sqrt_price, sqrt_target, liquidity, True)
+        )
+        if remaining_less_fee >= amount_in:
+            sqrt_next = sqrt_target
+        elif zero_for_one:
+            sqrt_next = _next_sqrt_price_from_amount0(
+                sqrt_price, liquidity, remaining_less_fee, True
+            )
+        else:
+            sqrt_next = _next_sqrt_price_from_amount1(
+                sqrt_price, liquidity, remaining_less_fee, True
+            )
+    else:
+        amount_out = (
+            amount1_delta(sqrt_target, sqrt_price, liquidity, False)
+            if zero_for_one
+            else amount0_delta(sqrt_price, sqrt_target, liquidity, False)
+        )
+        if -amount_remaining >= amount_out:
+            sqrt_next = sqrt_target
+        elif zero_for_one:
+            sqrt_next = _next_sqrt_price_from_amount1(
+                sqrt_price, liquidity, -amount_remaining, False
+            )
+        else:
+            sqrt_next = _next_sqrt_price_from_amount0(
+                sqrt_price, liquidity, -amount_remaining, False
+            )
+
+    reached_target = sqrt_target == sqrt_next
+    if zero_for_one:
+        if not (reached_target and exact_in):
+            amount_in = amount0_delta(sqrt_next, sqrt_price, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = amount1_delta(sqrt_next, sqrt_price, liquidity, False)
+    else:
+        if not (reached_target and exact_in):
+            amount_in = amount1_delta(sqrt_price, sqrt_next, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = amount0_delta(sqrt_price, sqrt_next, liquidity, False)
+
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+    if exact_in and sqrt_next != sqrt_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = _mul_div_up(amount_in, fee_pips, _FEE_DENOMINATOR - fee_pips)
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+@dataclass(frozen=True)
+class V3PoolSnapshot:
+    """A pool's swap-relevant state at one block.
+
+    `ticks` maps every initialized tick to its `liquidityNet`, within the
+    inclusive range of `tickBitmap` words `words` (None: all of them).
+    """
+
+    sqrt_price_x96: int
+    tick: int
+    liquidity: int
+    fee: int
+    tick_spacing: int
+    ticks: dict[int, int] = field(default_factory=dict)
+    words: Optional[tuple[int, int]] = None
+    _compressed: tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self,
+            "_compressed",
+            tuple(sorted(t // self.tick_spacing for t in self.ticks)),
+        )
+
+    def next_initialized_tick(self, tick: int, lte: bool) -> tuple[int, bool]:
+        """`TickBitmap.nextInitializedTickWithinOneWord` over the snapshot."""
+        compressed = tick // self.tick_spacing
+        self._require_word((compressed if lte else compressed + 1) >> 8)
+        if lte:
+            word_start = (compressed >> 8) << 8
+            i = bisect.bisect_right(self._compressed, compressed) - 1
+            if i >= 0 and self._compressed[i] >= word_start:
+                return self._compressed[i] * self.tick_spacing, True
+            return word_start * self.tick_spacing, False
+        compressed += 1
+        word_end = ((compressed >> 8) << 8) + 255
+        i = bisect.bisect_left(self._compressed, compressed)
+        if i < len(self._compressed) and self._compressed[i] <= word_end:
+            return self._compressed[i] * self.tick_spacing, True
+        return word_end * self.tick_spacing, False
+
+    def _require_word(self, word: int) -> None:
+        if self.words is not None and not self.words[0] <= word <= self.words[1]:
+            raise OutsideSnapshot(word)
+
+
+@dataclass(frozen=True)
+class V3SwapResult:
+    amount_in: int
+    amount_out: int
+    fee: int
+    sqrt_price_x96: int
+    tick: int
+
+
+def simulate_swap(
+    pool: V3PoolSnapshot,
+    zero_for_one: bool,
+    amount_specified: int,
+    sqrt_price_limit_x96: Optional[int] = None,
+) -> V3SwapResult:
+    """Run `UniswapV3Pool.swap` over `pool` without touching the chain.
+
+    `amount_specified` is positive for exact input, negative for exact
+    output, as in the contract. Without a price limit, a swap the pool
+    can't fill completely raises InsufficientLiquidity.
+    """
+    if amount_specified == 0:
+        raise ValueError("amount_specified must be non-zero")
+    exact_in = amount_specified > 0
+    limit = sqrt_price_limit_x96
+    if limit is None:
+        limit = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+    if zero_for_one and not MIN_SQRT_RATIO < limit < pool.sqrt_price_x96:
+        raise ValueError("price limit must be below the current price")
+    if not zero_for_one and not pool.sqrt_price_x96 < limit < MAX_SQRT_RATIO:
+        raise ValueError("price limit must be above the current price")
+
+    remaining = amount_specified
+    calculated = 0
+    fees = 0
+    sqrt_price = pool.sqrt_price_x96
+    tick = pool.tick
+    liquidity = pool.liquidity
+    while remaining != 0 and sqrt_price != limit:
+        step_start = sqrt_price
+        tick_next, initialized = pool.next_initialized_tick(tick, zero_for_one)
+        tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+        sqrt_next = sqrt_ratio_at_tick(tick_next)
+        if zero_for_one:
+            target = limit if sqrt_next < limit else sqrt_next
+        else:
+            target = limit if sqrt_next > limit else sqrt_next
+        sqrt_price, amount_in, amount_out, fee = compute_swap_step(
+            sqrt_price, target, liquidity, remaining, pool.fee
+        )
+        fees += fee
+        if exact_in:
+            remaining -= amount_in + fee
+            calculated -= amount_out
+        else:
+            remaining += amount_out
+            calculated += amount_in + fee
+        if sqrt_price == sqrt_next:
+            if initialized:
+                net = pool.ticks[tick_next]
+                liquidity += -net if zero_for_one else net
+            tick = tick_next - 1 if zero_for_one else tick_next
+        elif sqrt_price != step_start:
+            tick = tick_at_sqrt_ratio(sqrt_price)
+
+    if remaining != 0 and sqrt_price_limit_x96 is None:
+        raise InsufficientLiquidity("swap exhausts the pool's liquidity")
+    if exact_in:
+        amount_in, amount_out = amount_specified - remaining, -calculated
+    else:
+        amount_in, amount_out = calculated, -amount_specified + remaining
+    return V3SwapResult(amount_in, amount_out, fees, sqrt_price, tick)
+
+
+def liquidity_for_amounts(
+    sqrt_price_x96: int, sqrt_a: int, sqrt_b: int, amount0: int, amount1: int
+) -> int:
+    """Max liquidity `amount0`/`amount1` can mint (`LiquidityAmounts`)."""
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+
+    def for_amount0(lower: int, upper: int) -> int:
+        return _mul_div(amount0, _mul_div(lower, upper, Q96), upper - lower)
+
+    def for_amount1(lower: int, upper: int) -> int:
+        return _mul_div(amount1, Q96, upper - lower)
+
+    if sqrt_price_x96 <= sqrt_a:
+        return for_amount0(sqrt_a, sqrt_b)
+    if sqrt_price_x96 < sqrt_b:
+        return min(for_amount0(sqrt_price_x96, sqrt_b), for_amount1(sqrt_a, sqrt_price_x96))
+    return for_amount1(sqrt_a, sqrt_b)
+
+
+def mint_amounts(
+    pool: V3PoolSnapshot,
+    tick_lower: int,
+    tick_upper: int,
+    amount0_desired: int,
+    amount1_desired: int,
+) -> tuple[int, int, int]:
+    """(liquidity, amount0, amount1) a position manager `mint` would take."""
+    if tick_lower >= tick_upper:
+        raise ValueError("tick_lower must be below tick_upper")
+    if tick_lower % pool.tick_spacing or tick_upper % pool.tick_spacing:
+        raise ValueError(f"ticks must be multiples of {pool.tick_spacing}")
+    sqrt_a = sqrt_ratio_at_tick(tick_lower)
+    sqrt_b = sqrt_ratio_at_tick(tick_upper)
+    liquidity = liquidity_for_amounts(
+        pool.sqrt_price_x96, sqrt_a, sqrt_b, amount0_desired, amount1_desired
+    )
+    amount0 = amount1 = 0
+    if pool.tick < tick_lower:
+        amount0 = amount0_delta(sqrt_a, sqrt_b, liquidity, True)
+    elif pool.tick < tick_upper:
+        amount0 = amount0_delta(pool.sqrt_price_x96, sqrt_b, liquidity, True)
+        amount1 = amount1_delta(sqrt_a, pool.sqrt_price_x96, liquidity, True)
+    else:
+        amount1 = amount1_delta(sqrt_a, sqrt_b, liquidity, True)
+    return liquidity, amount0, amount1
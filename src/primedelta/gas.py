@@ -0,0 +1,232 @@
+"""Gas limits and fees for outgoing transactions.
+
+Every transaction used to carry a fixed 5M gas limit and a fresh
+`eth_gasPrice` read. On chains that reserve block space by gas *limit*
+that wastes most of each block, and the price read is one more RPC per
+send. `GasStrategy` learns a tight limit per (contract, function) from the
+receipts of transactions that already mined, and `FeeOracle` reads fee
+data at most once per block.
+
+`estimate_gas` is not called by default: Besu advances the account's
+pending nonce while simulating, so an estimate right before a send gets
+that send rejected as "nonce too low", and a pipelined transaction can't
+be simulated before the one it depends on has mined.
+"""
+import math
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Optional
+
+from web3.exceptions import ContractLogicError
+
+from primedelta.caching import TTLValue
+
+# (contract address, 4-byte selector, address arguments), all lower-case hex.
+GasKey = tuple[str, str, tuple[str, ...]]
+
+DEFAULT_GAS_LIMIT = 5_000_000
+# Leading argument words searched for addresses. Tokens, pools and
+# spenders sit in the static head of every call this SDK makes; the
+# price-update payloads that follow are opaque and vary per call.
+_KEY_WORDS = 8
+
+
+def gas_key(to: Optional[str], data: Any) -> Optional[GasKey]:
+    """Cache key for a call to `to` with calldata `data`, if it has one.
+
+    Calls to one function with different token or pool arguments can burn
+    very different gas (a price-feed pool vs an AMM, one hop vs two), so
+    the addresses among the leading argument words are part of the key.
+    """
+    if not to or not data:
+        return None
+    if isinstance(data, (bytes, bytearray)):
+        calldata = bytes(data)
+    else:
+        try:
+            calldata = bytes.fromhex(str(data).removeprefix("0x"))
+        except ValueError:
+            return None
+    if len(calldata) < 4:
+        return None
+    addresses = []
+    for offset in range(4, min(len(calldata), 4 + 32 * _KEY_WORDS) - 31, 32):
+        word = int.from_bytes(calldata[offset : offset + 32], "big")
+        # An address: 12 zero bytes, then 20 that don't read as an amount.
+        if word >> 160 == 0 and word >> 152:
+            addresses.append("0x" + calldata[offset + 12 : offset + 32].hex())
+    return str(to).lower(), "0x" + calldata[:4].hex(), tuple(addresses)
+
+
+class FeeOracle:
+    """Fee fields for a transaction, refreshed about once per block.
+
+    Args:
+        eip1559: Send type-2 transactions (`maxFeePerGas` /
+            `maxPriorityFeePerGas`) instead of legacy `gasPrice`. Falls back
+            to `gasPrice` if the latest block has no base fee.
+        priority_fee: Tip in wei; None asks the node (`eth_maxPriorityFeePerGas`).
+        base_fee_multiplier: `maxFeePerGas` headroom over the current base
+            fee, so the transaction stays valid while the base fee rises.
+        block_time: Seconds fee data is reused — about one block.
+    """
+
+    def __init__(
+        self,
+        eip1559: bool = False,
+        priority_fee: Optional[int] = None,
+        base_fee_multiplier: int = 2,
+        block_time: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._eip1559 = eip1559
+        self._priority_fee = priority_fee
+        self._base_fee_multiplier = base_fee_multiplier
+        self._fees: TTLValue[dict[str, int]] = TTLValue(block_time, clock=clock)
+
+    def fees(self, web3) -> dict[str, int]:
+        fees = self._fees.get()
+        if fees is None:
+            if self._eip1559:
+                block = web3.eth.get_block("latest")
+                base_fee = block.get("baseFeePerGas")
+                if base_fee is None:
+                    fees = {"gasPrice": web3.eth.gas_price}
+                else:
+                    tip = self._priority_fee
+                    if tip is None:
+                        tip = web3.eth.max_priority_fee
+                    fees = self._dynamic_fees(base_fee, tip)
+            else:
+                fees = {"gasPrice": web3.eth.gas_price}
+            self._fees.set(fees)
+        return fees
+
+    async def fees_async(self, web3) -> dict[str, int]:
+        """`fees` for an `AsyncWeb3`."""
+        fees = self._fees.get()
+        if fees is None:
+            if self._eip1559:
+                block = await web3.eth.get_block("latest")
+                base_fee = block.get("baseFeePerGas")
+                if base_fee is None:
+                    fees = {"gasPrice": await web3.eth.gas_price}
+                else:
+                    tip = self._priority_fee
+                    if tip is None:
+                        tip = await web3.eth.max_priority_fee
+                    fees = self._dynamic_fees(base_fee, tip)
+            else:
+                fees = {"gasPrice": await web3.eth.gas_price}
+            self._fees.set(fees)
+        return fees
+
+    def invalidate(self) -> None:
+        self._fees.invalidate()
+
+    def _dynamic_fees(self, base_fee: int, tip: int) -> dict[str, int]:
+        return {
+            "maxFeePerGas": base_fee * self._base_fee_multiplier + tip,
+            "maxPriorityFeePerGas": tip,
+        }
+
+
+class GasStrategy:
+    """Chooses each transaction's gas limit and fee fields.
+
+    The limit for a call is the largest `gasUsed` seen in successful
+    receipts of calls with the same contract, function and address
+    arguments (see `gas_key`), times `margin`; until one has mined,
+    `default_gas_limit` is used. Any failed receipt drops what was learned
+    for that key: a revert can't always be told apart from running out of
+    gas, and relearning costs one default-limit send. Subclass and override
+    `gas_limit` / `fees` for other policies.
+
+    A learned limit is a bet that the next call costs about what the last
+    ones did. Amounts, the number of price updates and pool state are not
+    part of the key, so a call that crosses more AMM ticks or verifies
+    more updates than any seen before can run out of gas; `margin` is the
+    headroom against that, and the failed receipt resets the key.
+
+    Args:
+        default_gas_limit: Limit for functions with no history.
+        margin: Headroom over the largest observed `gasUsed`; state changes
+            (a first-time storage write, a longer path) can cost more than
+            the previous call did.
+        estimate: Call `estimate_gas` for functions with no history instead
+            of using `default_gas_limit`. Only safe on nodes without Besu's
+            estimate/nonce race; never used for pipelined sends.
+        fee_oracle: Source of fee fields; legacy `gasPrice` by default.
+    """
+
+    def __init__(
+        self,
+        default_gas_limit: int = DEFAULT_GAS_LIMIT,
+        margin: float = 1.5,
+        estimate: bool = False,
+        fee_oracle: Optional[FeeOracle] = None,
+    ) -> None:
+        self._default_gas_limit = default_gas_limit
+        self._margin = margin
+        self._estimate = estimate
+        self._fee_oracle = fee_oracle or FeeOracle()
+        self._lock = threading.Lock()
+        self._gas_used: dict[GasKey, int] = {}
+
+    def gas_limit(self, web3, call: dict[str, Any], can_estimate: bool = True) -> int:
+        """Limit for `call` (`from`/`to`/`data`/`value`).
+
+        Raises ContractLogicError if estimation shows the call would revert.
+        """
+        key = gas_key(call.get("to"), call.get("data"))
+        if key is not None:
+            gas_used = self._gas_used.get(key)
+            if gas_used is not None:
+                return self._padded(gas_used)
+            if self._estimate and can_estimate:
+                try:
+                    return self._padded(web3.eth.estimate_gas(call))
+                except ContractLogicError:
+                    raise
+                except Exception:
+                    pass  # Fall back to the default rather than fail the send.
+        return self._default_gas_limit
+
+    def gas_used(self, key: GasKey) -> Optional[int]:
+        """Largest `gasUsed` seen for `key`, or None with no history."""
+        return self._gas_used.get(key)
+
+    def function_gas_used(self, to: str, selector: str) -> Optional[int]:
+        """Largest `gasUsed` seen for any call to one function of `to`."""
+        to, selector = to.lower(), selector.lower()
+        with self._lock:
+            seen = [
+                gas_used
+                for (contract, fn, _), gas_used in self._gas_used.items()
+                if contract == to and fn == selector
+            ]
+        return max(seen, default=None)
+
+    def fees(self, web3) -> dict[str, int]:
+        return self._fee_oracle.fees(web3)
+
+    async def fees_async(self, web3) -> dict[str, int]:
+        return await self._fee_oracle.fees_async(web3)
+
+    def observe(self, transaction: Mapping[str, Any], receipt: Any) -> None:
+        """Learn from the receipt of a mined `transaction`."""
+        key = gas_key(transaction.get("to"), transaction.get("data"))
+        gas_used = receipt.get("gasUsed")
+        if key is None or not isinstance(gas_used, int):
+            return
+        with self._lock:
+            if receipt.get("status") == 1:
+                self._gas_used[key] = max(gas_used, self._gas_used.get(key, 0))
+            else:
+                # Possibly out of gas below the limit (a 63/64 call-gas
+                # cutoff), so a learned limit may be what failed it.
+                self._gas_used.pop(key, None)
+
+    def _padded(self, gas_used: int) -> int:
+        return math.ceil(gas_used * self._margin)
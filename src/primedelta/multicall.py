@@ -0,0 +1,192 @@
+"""Batched view reads: many `eth_call`s for the price of one round-trip.
+
+`BatchReader.read` takes prepared web3 `ContractFunction`s (the same objects
+you'd otherwise `.call()`) and returns their decoded results in order. It
+prefers a Multicall3 `aggregate3` call; when no aggregator is deployed it
+sends a single JSON-RPC batch of `eth_call`s instead, and as a last resort
+(non-HTTP providers) issues the calls one by one.
+"""
+import json
+from typing import Any, Optional, Sequence
+
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import make_post_request
+from web3.contract.contract import ContractFunction
+from web3.exceptions import ContractLogicError
+
+from primedelta.contracts import ContractRef
+
+# Deterministic deployment address of Multicall3 on every chain it exists on.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def _decode_output(web3, fn: ContractFunction, data: bytes) -> Any:
+    """Decode `data` exactly as `fn.call()` would have returned it."""
+    output_types = get_abi_output_types(fn.abi)
+    decoded = web3.codec.decode(output_types, data)
+    normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    if len(normalized) == 1:
+        return normalized[0]
+    return tuple(normalized)
+
+
+def _call_failed(fn: ContractFunction, return_data: Any) -> Exception:
+    from primedelta.primedelta import TransactionFailed, _decode_revert
+
+    if isinstance(return_data, bytes):
+        return_data = "0x" + return_data.hex()
+    if isinstance(return_data, str) and return_data.startswith("0x"):
+        err = ContractLogicError("execution reverted", data=return_data)
+    else:
+        err = ContractLogicError(return_data or "execution reverted")
+    return TransactionFailed(fn.fn_name, _decode_revert(err))
+
+
+class BatchReader:
+    """Aggregates view calls into as few RPC round-trips as possible.
+
+    Args:
+        web3: Web3 instance the calls are bound to.
+        multicall: Multicall3 deployment to aggregate through. Its bytecode is
+            probed once; an empty account falls back to JSON-RPC batching.
+        max_batch_size: Calls per aggregate / JSON-RPC batch. Keeps single
+            requests under node gas and payload limits.
+    """
+
+    def __init__(
+        self,
+        web3,
+        multicall: Optional[ContractRef] = None,
+        max_batch_size: int = 200,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self._web3 = web3
+        self._multicall_ref = multicall
+        self._max_batch_size = max_batch_size
+        self._aggregator_checked = False
+        self._aggregator = None
+
+    def read(
+        self,
+        calls: Sequence[ContractFunction],
+        allow_failure: bool = False,
+        block_identifier: Any = "latest",
+    ) -> list[Any]:
+        """Return each call's decoded result, in order.
+
+        With `allow_failure`, a reverting call yields None in its slot;
+        otherwise the first revert raises TransactionFailed.
+        """
+        results: list[Any] = []
+        for start in range(0, len(calls), self._max_batch_size):
+            chunk = calls[start : start + self._max_batch_size]
+            results.extend(self._read_chunk(chunk, allow_failure, block_identifier))
+        return results
+
+    def _read_chunk(
+        self,
+        calls: Sequence[ContractFunction],
+        allow_failure: bool,
+        block_identifier: Any,
+    ) -> list[Any]:
+        if not calls:
+            return []
+        aggregator = self._get_aggregator()
+        if aggregator is not None:
+            raw = self._read_via_aggregator(aggregator, calls, block_identifier)
+        elif hasattr(self._web3.provider, "endpoint_uri"):
+            raw = self._read_via_rpc_batch(calls, block_identifier)
+        else:
+            return self._read_sequentially(calls, allow_failure, block_identifier)
+        results = []
+        for fn, (success, data) in zip(calls, raw):
+            if success:
+                try:
+                    results.append(_decode_output(self._web3, fn, data))
+                    continue
+                except Exception:
+                    # Call to an address without code "succeeds" with no data.
+                    pass
+            if not allow_failure:
+                raise _call_failed(fn, data)
+            results.append(None)
+        return results
+
+    def _get_aggregator(self):
+        if self._multicall_ref is None:
+            return None
+        if not self._aggregator_checked:
+            address = self._web3.to_checksum_address(self._multicall_ref.address)
+            if self._web3.eth.get_code(address):
+                self._aggregator = self._web3.eth.contract(
+                    address=address, abi=self._multicall_ref.abi
+                )
+            self._aggregator_checked = True
+        return self._aggregator
+
+    def _read_via_aggregator(
+        self, aggregator, calls: Sequence[ContractFunction], block_identifier: Any
+    ) -> list[tuple[bool, bytes]]:
+        # allowFailure is always on so one revert can be attributed to the
+        # call that caused it instead of failing the whole aggregate.
+        encoded = [
+            (fn.address, True, fn._encode_transaction_data()) for fn in calls
+        ]
+        return aggregator.functions.aggregate3(encoded).call(
+            block_identifier=block_identifier
+        )
+
+    def _read_via_rpc_batch(
+        self, calls: Sequence[ContractFunction], block_identifier: Any
+    ) -> list[tuple[bool, Any]]:
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "eth_call",
+                "params": [
+                    {"to": fn.address, "data": fn._encode_transaction_data()},
+                    block_identifier,
+                ],
+            }
+            for i, fn in enumerate(calls)
+        ]
+        provider = self._web3.provider
+        raw = make_post_request(
+            provider.endpoint_uri,
+            json.dumps(payload).encode(),
+            **provider.get_request_kwargs(),
+        )
+        responses = {response["id"]: response for response in json.loads(raw)}
+        results: list[tuple[bool, Any]] = []
+        for i in range(len(calls)):
+            response = responses.get(i, {})
+            if "result" in response:
+                results.append((True, bytes.fromhex(response["result"][2:])))
+            else:
+                error = response.get("error") or {}
+                results.append((False, error.get("data") or error.get("message")))
+        return results
+
+    def _read_sequentially(
+        self,
+        calls: Sequence[ContractFunction],
+        allow_failure: bool,
+        block_identifier: Any,
+    ) -> list[Any]:
+        results = []
+        for fn in calls:
+            try:
+                results.append(fn.call(block_identifier=block_identifier))
+            except Exception as e:
+                if allow_failure:
+                    results.append(None)
+                elif isinstance(e, ContractLogicError):
+                    raise _call_failed(fn, e.data or e.message) from e
+                else:
+                    raise
+        return results
@@ -8,12 +8,22 @@ Shipping a config file in the SDK lets the user pin addresses without depending
 on backend ops cycles.
 
 Edit `<network>.json` to change addresses for that network.
+
+ABIs are read lazily, the first time a contract's `.abi` is used, and cached
+for the whole process. `python -m primedelta.networks` writes a pickled
+bundle of every ABI next to the JSON files; when present (and in sync with
+them) it replaces per-file JSON parsing.
 """
+import functools
+import hashlib
 import json
+import pickle
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from primedelta.contracts import ContractRef, Contracts, CoreContracts
+from primedelta.multicall import MULTICALL3_ADDRESS
 
 
 _NETWORKS_DIR = Path(__file__).parent
@@ -28,6 +38,7 @@ _CORE_ABIS = {
     "position_manager": "position_manager.json",
     "oracle": "oracle.json",
     "wdel": "wdel.json",
+    "multicall": "multicall3.json",
 }
 
 _POOL_ABIS = {
@@ -38,12 +49,91 @@ _POOL_ABIS = {
 }
 
 
+_BUNDLE_PATH = _ABIS_DIR / "abis.pickle"
+
+
+@functools.lru_cache(maxsize=None)
 def _read_abi(filename: str) -> list[Any]:
+    bundled = _load_bundle().get(filename)
+    if bundled is not None:
+        return bundled
     return json.loads((_ABIS_DIR / filename).read_text())
 
 
+@functools.lru_cache(maxsize=1)
+def _load_bundle() -> dict[str, list[Any]]:
+    """ABIs from the pickled bundle whose source JSON hasn't changed.
+
+    Each entry is checked against the sha256 of its source file: hashing
+    is far cheaper than parsing the JSON, and unlike the size or mtime it
+    catches same-length edits and survives reinstalls.
+    """
+    try:
+        with _BUNDLE_PATH.open("rb") as f:
+            bundle = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return {}
+    abis = {}
+    for filename, digest in bundle.get("sources", {}).items():
+        try:
+            if _digest(_ABIS_DIR / filename) == digest:
+                abis[filename] = bundle["abis"][filename]
+        except (OSError, KeyError):
+            continue
+    return abis
+
+
+def build_abi_bundle(path: Path = _BUNDLE_PATH) -> Path:
+    """Pickle every bundled ABI into `path`; run at build/packaging time."""
+    sources = sorted(_ABIS_DIR.glob("*.json"))
+    bundle = {
+        "sources": {source.name: _digest(source) for source in sources},
+        "abis": {source.name: json.loads(source.read_text()) for source in sources},
+    }
+    with path.open("wb") as f:
+        pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class _LazyContractRef(ContractRef):
+    """A ContractRef whose ABI is read on first `.abi` access."""
+
+    _abi_filename: str
+
+    def __init__(self, address: str, abi_filename: str) -> None:
+        object.__setattr__(self, "address", address)
+        object.__setattr__(self, "_abi_filename", abi_filename)
+
+    @property
+    def abi(self) -> list[Any]:
+        return _read_abi(self._abi_filename)
+
+    def __repr__(self) -> str:
+        return f"ContractRef(address={self.address!r}, abi=<{self._abi_filename}>)"
+
+
+class _LazyABIs(Mapping):
+    """`pool_abis` mapping that reads each ABI file on first lookup."""
+
+    def __init__(self, filenames: dict[str, str]) -> None:
+        self._filenames = filenames
+
+    def __getitem__(self, key: str) -> list[Any]:
+        return _read_abi(self._filenames[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._filenames)
+
+    def __len__(self) -> int:
+        return len(self._filenames)
+
+
 def _make_ref(address: str, abi_filename: str) -> ContractRef:
-    return ContractRef(address=address, abi=_read_abi(abi_filename))
+    return _LazyContractRef(address, abi_filename)
 
 
 def load(network: str) -> Contracts:
@@ -89,8 +179,13 @@ def load(network: str) -> Contracts:
             if core_cfg.get("wdel")
             else None
         ),
+        # Multicall3 sits at the same address on every chain that has it;
+        # `BatchReader` probes for bytecode before relying on it.
+        multicall=_make_ref(
+            core_cfg.get("multicall") or MULTICALL3_ADDRESS, _CORE_ABIS["multicall"]
+        ),
     )
-    pool_abis = {key: _read_abi(filename) for key, filename in _POOL_ABIS.items()}
+    pool_abis = _LazyABIs(_POOL_ABIS)
     return Contracts(
         chain_id=config["chain_id"],
         core=core,
@@ -0,0 +1,5 @@
+"""Write the pickled ABI bundle: `python -m primedelta.networks`."""
+from primedelta.networks import build_abi_bundle
+
+if __name__ == "__main__":
+    print(build_abi_bundle())
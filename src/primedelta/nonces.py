@@ -0,0 +1,90 @@
+"""Local transaction nonce allocation.
+
+Asking the node for `eth_getTransactionCount(pending)` before every
+transaction costs a round-trip and races when several threads (or
+coroutines) share one account: both read the same count and one of them is
+rejected. `NonceManager` reads the chain once, then hands out consecutive
+nonces from memory under a lock. It goes back to the chain only when told
+the local view is wrong — a "nonce too low" rejection, a transaction that
+never mined — so the many-in-flight case needs no RPC at all.
+"""
+import heapq
+import threading
+from typing import Awaitable, Callable, Optional
+
+
+class NonceManager:
+    """Thread- and asyncio-safe nonce allocator for one account.
+
+    The lock is never held across an await, so one instance can serve
+    threads and coroutines alike. Nonces that were allocated but never
+    broadcast are handed back with `release` and reused first, so a failed
+    build doesn't leave a gap that would stall every later transaction.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next: Optional[int] = None
+        self._released: list[int] = []
+
+    @property
+    def synced(self) -> bool:
+        return self._next is not None
+
+    def allocate(self, chain_nonce: Callable[[], int]) -> int:
+        """Next nonce; `chain_nonce` (the pending tx count) is read only if unsynced."""
+        with self._lock:
+            if self._next is None:
+                self._sync(chain_nonce())
+            return self._take()
+
+    async def allocate_async(self, chain_nonce: Callable[[], Awaitable[int]]) -> int:
+        """`allocate` for coroutines; the chain read doesn't hold the lock."""
+        while True:
+            if self._next is None:
+                fetched = await chain_nonce()
+                with self._lock:
+                    if self._next is None:
+                        self._sync(fetched)
+            with self._lock:
+                if self._next is not None:
+                    return self._take()
+
+    def release(self, nonce: int) -> None:
+        """Return a nonce whose transaction was never broadcast."""
+        with self._lock:
+            if self._next is None or nonce >= self._next:
+                return
+            heapq.heappush(self._released, nonce)
+            # Released nonces just below the counter fold back into it.
+            while self._next - 1 in self._released:
+                self._released.remove(self._next - 1)
+                self._next -= 1
+            heapq.heapify(self._released)
+
+    def resync(self, chain_nonce: Optional[int] = None) -> None:
+        """Adopt `chain_nonce` as the next nonce, or re-read the chain next time.
+
+        Use after the chain disagreed with us: "nonce too low" carries the
+        nonce the chain expects; a dropped transaction means the chain's
+        pending count is behind ours, and resyncing refills that gap.
+        """
+        with self._lock:
+            if chain_nonce is None:
+                self._next = None
+                self._released = []
+            else:
+                self._sync(chain_nonce)
+
+    def _sync(self, chain_nonce: int) -> None:
+        self._next = chain_nonce
+        self._released = []
+
+    def _take(self) -> int:
+        if self._released:
+            return heapq.heappop(self._released)
+        # Callers sync under the lock before taking.
+        assert self._next is not None, "NonceManager used before syncing"
+        nonce = self._next
+        self._next += 1
+        return nonce
@@ -0,0 +1,66 @@
+"""Lazy page walkers for the backend's `page`/`size` list endpoints.
+
+Both walkers hold at most two pages in memory: the one being consumed and
+the next one, which is fetched in the background while the caller iterates.
+A page shorter than `page_size` marks the end of the listing.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+def iter_pages(
+    fetch_page: Callable[[int, int], list[T]],
+    page_size: int,
+    first_page: int = 1,
+) -> Iterator[T]:
+    """Yield every item across pages, prefetching the next page on a worker thread."""
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="primedelta-page")
+    try:
+        page_number = first_page
+        items = fetch_page(page_number, page_size)
+        while items:
+            next_page = None
+            if len(items) >= page_size:
+                next_page = executor.submit(fetch_page, page_number + 1, page_size)
+            yield from items
+            if next_page is None:
+                return
+            page_number += 1
+            items = next_page.result()
+    finally:
+        # Abandoned iteration: don't wait on (or keep) an in-flight prefetch.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_pages(
+    fetch_page: Callable[[int, int], Awaitable[list[T]]],
+    page_size: int,
+    first_page: int = 1,
+) -> AsyncIterator[T]:
+    """Async `iter_pages`; the prefetch runs as a task on the current loop."""
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    page_number = first_page
+    items = await fetch_page(page_number, page_size)
+    next_page = None
+    try:
+        while items:
+            next_page = None
+            if len(items) >= page_size:
+                next_page = asyncio.ensure_future(
+                    fetch_page(page_number + 1, page_size)
+                )
+            for item in items:
+                yield item
+            if next_page is None:
+                return
+            page_number += 1
+            items = await next_page
+    finally:
+        if next_page is not None and not next_page.done():
+            next_page.cancel()
@@ -0,0 +1,192 @@
+"""Columnar price tick batches.
+
+Recording a full feed as `Price` objects costs two `Decimal`s, a tz-aware
+`datetime` and a frozen dataclass per tick. `PriceBatch` keeps the same
+information as flat typed columns (stdlib `array`s), which expose the
+buffer protocol, so `to_numpy()` wraps them without copying. NumPy is only
+needed for that conversion.
+"""
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from primedelta.types import Price
+
+_NS_PER_SECOND = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class PriceBatch:
+    """A run of ticks stored column-wise.
+
+    `symbol_ids` index into `symbols`, which is shared by every batch of
+    one stream. `prices` are float64, or int64 holding `price * 10**price_scale`
+    when the batch was built with a `price_scale`. Timestamps are Unix
+    epoch nanoseconds (UTC).
+    """
+
+    symbols: tuple[str, ...]
+    symbol_ids: array
+    prices: array
+    timestamps_ns: array
+    percentage_changes: array
+    price_scale: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.symbol_ids)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Zero-copy NumPy views of the columns (requires numpy)."""
+        try:
+            import numpy as np  # type: ignore[import-not-found]
+        except ImportError as e:
+            raise ImportError("PriceBatch.to_numpy() requires numpy") from e
+        return {
+            "symbol_ids": np.frombuffer(self.symbol_ids, dtype=np.int32),
+            "prices": np.frombuffer(
+                self.prices, dtype=np.float64 if self.price_scale is None else np.int64
+            ),
+            "timestamps_ns": np.frombuffer(self.timestamps_ns, dtype=np.int64),
+            "percentage_changes": np.frombuffer(self.percentage_changes, dtype=np.float64),
+        }
+
+    def to_prices(self) -> Iterator[Price]:
+        """Expand back into `Price` objects (for debugging and small batches)."""
+        for i in range(len(self)):
+            price = self.prices[i]
+            yield Price(
+                symbol=self.symbols[self.symbol_ids[i]],
+                last_price=(
+                    Decimal(repr(price))
+                    if self.price_scale is None
+                    else Decimal(price).scaleb(-self.price_scale)
+                ),
+                timestamp=datetime.fromtimestamp(
+                    self.timestamps_ns[i] / _NS_PER_SECOND, tz=timezone.utc
+                ),
+                percentage_change=Decimal(repr(self.percentage_changes[i])),
+            )
+
+
+class PriceBatcher:
+    """Accumulates ticks and cuts a `PriceBatch` by size or time window.
+
+    Args:
+        max_size: Ticks per batch.
+        max_interval: Seconds after a batch's first tick at which it is cut
+            (checked as ticks arrive, and by `poll` while none do).
+        price_scale: Store prices as int64 scaled by `10**price_scale`
+            instead of float64.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        max_interval: float = 1.0,
+        price_scale: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self._max_size = max_size
+        self._max_interval = max_interval
+        self._price_scale = price_scale
+        self._clock = clock
+        self._symbol_ids: dict[str, int] = {}
+        self._symbols: tuple[str, ...] = ()
+        self._started: Optional[float] = None
+        self._reset()
+
+    def append(
+        self,
+        symbol: str,
+        mantissa: int,
+        exponent: int,
+        timestamp_ns: int,
+        percentage_change: float = 0.0,
+    ) -> Optional[PriceBatch]:
+        """Add the tick `mantissa * 10**exponent`; return a batch if one is cut."""
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[symbol] = len(self._symbol_ids)
+            self._symbols += (symbol,)
+        if self._started is None:
+            self._started = self._clock()
+        self._ids.append(symbol_id)
+        if self._price_scale is None:
+            self._prices.append(mantissa * 10.0**exponent)
+        else:
+            shift = self._price_scale + exponent
+            self._prices.append(
+                mantissa * 10**shift if shift >= 0 else mantissa // 10**-shift
+            )
+        self._timestamps.append(timestamp_ns)
+        self._changes.append(percentage_change)
+        if (
+            len(self._ids) >= self._max_size
+            or self._clock() - self._started >= self._max_interval
+        ):
+            return self.flush()
+        return None
+
+    def due_in(self) -> Optional[float]:
+        """Seconds until the pending batch's window ends; None if none is pending."""
+        if self._started is None:
+            return None
+        return max(0.0, self._started + self._max_interval - self._clock())
+
+    def poll(self) -> Optional[PriceBatch]:
+        """Cut the pending batch if its window has ended; for quiet feeds."""
+        due_in = self.due_in()
+        return self.flush() if due_in is not None and due_in <= 0 else None
+
+    def append_price(self, price: Price) -> Optional[PriceBatch]:
+        sign, digits, exponent = price.last_price.as_tuple()
+        mantissa = int("".join(map(str, digits)) or "0")
+        return self.append(
+            price.symbol,
+            -mantissa if sign else mantissa,
+            int(exponent),
+            int(price.timestamp.timestamp()) * _NS_PER_SECOND
+            + price.timestamp.microsecond * 1000,
+            float(price.percentage_change),
+        )
+
+    def flush(self) -> Optional[PriceBatch]:
+        """Cut whatever is pending; None if nothing is."""
+        if not self._ids:
+            return None
+        batch = PriceBatch(
+            symbols=self._symbols,
+            symbol_ids=self._ids,
+            prices=self._prices,
+            timestamps_ns=self._timestamps,
+            percentage_changes=self._changes,
+            price_scale=self._price_scale,
+        )
+        self._reset()
+        return batch
+
+    def _reset(self) -> None:
+        self._ids = array("i")
+        self._prices: array[Any] = array("d" if self._price_scale is None else "q")
+        self._timestamps = array("q")
+        self._changes = array("d")
+        self._started = None
+
+
+def batch_prices(
+    prices: Iterable[Price], batcher: Optional[PriceBatcher] = None
+) -> Iterator[PriceBatch]:
+    """Regroup any `Price` stream into `PriceBatch`es."""
+    batcher = batcher or PriceBatcher()
+    for price in prices:
+        batch = batcher.append_price(price)
+        if batch is not None:
+            yield batch
+    batch = batcher.flush()
+    if batch is not None:
+        yield batch
@@ -0,0 +1,199 @@
+"""Latest-price table fed by a price stream.
+
+`prices_stream`/`pyth_prices_stream` yield every tick, so a consumer that
+only cares about the current price per symbol has to keep up with the
+whole feed or fall ever further behind. `PriceBook` drains a stream on its
+own thread (or task) into a last-value table: readers always see the newest
+price, never queue up stale ones, and never hold up the network reader.
+
+The drainer is the only writer. Each symbol's entry is an immutable
+`(version, price)` tuple replaced by a single dict assignment, so reads and
+snapshots take no lock; only waiters touch the condition variable.
+"""
+import asyncio
+import threading
+from typing import AsyncIterable, Iterable, Optional
+
+from primedelta.types import Price
+
+
+class PriceBook:
+    """Newest `Price` per symbol, with per-symbol version counters.
+
+    Feed it with `start(stream)` (a thread) or `start_async(stream)` (a
+    task), or call `update` yourself. Versions start at 1 with a symbol's
+    first price and grow by one per update; `version` is 0 for a symbol
+    not seen yet.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[int, Price]] = {}
+        self._updates = 0
+        self._cond = threading.Condition()
+        self._async_waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._closed = False
+        self._feed: Optional[Iterable[Price]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+        self.error: Optional[BaseException] = None
+
+    def update(self, price: Price) -> None:
+        entry = self._entries.get(price.symbol)
+        self._entries[price.symbol] = ((entry[0] if entry else 0) + 1, price)
+        self._updates += 1
+        self._wake()
+
+    def get(self, symbol: str) -> Optional[Price]:
+        entry = self._entries.get(symbol)
+        return entry[1] if entry else None
+
+    def version(self, symbol: str) -> int:
+        entry = self._entries.get(symbol)
+        return entry[0] if entry else 0
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None) -> dict[str, Price]:
+        """Consistent copy of the latest prices (only `symbols`, if given)."""
+        entries = self._entries.copy()
+        if symbols is not None:
+            return {s: entries[s][1] for s in symbols if s in entries}
+        return {s: entry[1] for s, entry in entries.items()}
+
+    def versions(self) -> dict[str, int]:
+        return {s: entry[0] for s, entry in self._entries.copy().items()}
+
+    def wait_for_update(
+        self,
+        symbol: Optional[str] = None,
+        since: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[Price]:
+        """Block until `symbol` has a version above `since`.
+
+        `since` defaults to the current version, i.e. wait for the next
+        update. With no `symbol`, waits for an update to any symbol and
+        returns None. Also returns None on `timeout` or once the book is
+        closed; a feed error is re-raised.
+        """
+        ready = self._ready(symbol, since)
+        with self._cond:
+            self._cond.wait_for(lambda: ready() or self._closed, timeout)
+        return self._result(symbol, ready)
+
+    async def wait_for_update_async(
+        self,
+        symbol: Optional[str] = None,
+        since: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[Price]:
+        """`wait_for_update` for asyncio code; never blocks the event loop."""
+        ready = self._ready(symbol, since)
+        loop = asyncio.get_running_loop()
+
+        async def wait() -> None:
+            while not (ready() or self._closed):
+                waiter = (loop, loop.create_future())
+                self._async_waiters.add(waiter)
+                try:
+                    if not (ready() or self._closed):
+                        await waiter[1]
+                finally:
+                    self._async_waiters.discard(waiter)
+
+        try:
+            await asyncio.wait_for(wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._result(symbol, ready)
+
+    def start(self, stream: Iterable[Price]) -> "PriceBook":
+        """Drain `stream` into the book on a daemon thread."""
+        self._feed = stream
+        self._thread = threading.Thread(
+            target=self._drain, args=(stream,), name="primedelta-price-book", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def start_async(self, stream: AsyncIterable[Price]) -> "PriceBook":
+        """Drain `stream` into the book on a task of the running loop."""
+        self._task = asyncio.get_running_loop().create_task(self._drain_async(stream))
+        return self
+
+    def close(self) -> None:
+        """Stop feeding the book and release every waiter.
+
+        A feed whose `close` works from another thread (the streams
+        `prices_stream` returns do) is closed at once, connection and all;
+        a plain generator stops at its next price.
+        """
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+        stream_close = getattr(self._feed, "close", None)
+        if stream_close is not None:
+            try:
+                stream_close()
+            except Exception:
+                pass
+        self._wake()
+
+    def __enter__(self) -> "PriceBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _drain(self, stream: Iterable[Price]) -> None:
+        try:
+            for price in stream:
+                if self._closed:
+                    break
+                self.update(price)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._closed = True
+            stream_close = getattr(stream, "close", None)
+            if stream_close is not None:
+                try:
+                    stream_close()
+                except Exception:
+                    pass
+            self._wake()
+
+    async def _drain_async(self, stream: AsyncIterable[Price]) -> None:
+        try:
+            async for price in stream:
+                self.update(price)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error = e
+        finally:
+            self._closed = True
+            self._wake()
+
+    def _ready(self, symbol: Optional[str], since: Optional[int]):
+        if symbol is None:
+            baseline = self._updates if since is None else since
+            return lambda: self._updates > baseline
+        baseline = self.version(symbol) if since is None else since
+        return lambda: self.version(symbol) > baseline
+
+    def _result(self, symbol: Optional[str], ready) -> Optional[Price]:
+        if not ready():
+            if self.error is not None:
+                raise self.error
+            return None
+        return self.get(symbol) if symbol is not None else None
+
+    def _wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+        for loop, future in list(self._async_waiters):
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,448 @@
+"""Append-only binary log of price ticks, for record and replay.
+
+A log is two files next to each other:
+
+- `<path>`: an 8-byte magic header followed by fixed-size 40-byte records
+  (little-endian): receive time ns, tick time ns, price mantissa,
+  percentage-change mantissa (all int64), symbol id (int32), price and
+  percentage-change exponents (int8) and two bytes of padding. Prices are
+  stored as exact decimal mantissa/exponent pairs, so replayed `Price`s
+  compare equal to the recorded ones.
+- `<path>.symbols`: the symbol index, one name per line; a symbol's id is
+  its line number.
+- `<path>.index`: which blocks of 1024 records each symbol appears in, as
+  8-byte (symbol id, block number) int32 pairs appended the first time a
+  symbol shows up in a block.
+
+Records are appended in receive order and receive times never decrease, so
+the record file is its own time index: a time range is found by binary
+search over the mapped file. A `symbols` filter reads only the blocks the
+block index lists for those symbols, so one thinly traded symbol in a busy
+log costs a few blocks rather than a scan. Nothing is ever rewritten, so a
+crashed recorder leaves a readable log (a torn trailing record is ignored);
+the block index is written before the records it covers, and a log without
+one is read in full.
+
+`PriceLogReader.batches` slices whole columns straight out of the mapping
+(strided memoryviews, copied in C) and is the path for millions of ticks
+per second; `ticks` decodes one tuple per record; `prices`/`replay`
+rebuild full `Price` objects and are bound by `Decimal` construction.
+"""
+import itertools
+import mmap
+import operator
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from primedelta.price_batches import PriceBatch
+from primedelta.types import Price
+
+_MAGIC = b"PDPLOG1\0"
+_RECORD = struct.Struct("<qqqqibbxx")
+_RECEIVED = struct.Struct("<q")
+_SYMBOL_ID = struct.Struct("<i")
+_INDEX_ENTRY = struct.Struct("<ii")
+_BLOCK_RECORDS = 1024
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_FLUSH_BYTES = 1 << 16
+# Exponents are int8, so a lookup table covers every one of them; negative
+# exponents index from the end.
+_POWERS_OF_TEN = [10.0**e for e in range(128)] + [10.0**e for e in range(-128, 0)]
+# (typecode, item width, item position) of each record field in the mapping.
+_COLUMNS = (
+    ("q", 8, 0),
+    ("q", 8, 1),
+    ("q", 8, 2),
+    ("q", 8, 3),
+    ("i", 4, 8),
+    ("b", 1, 36),
+    ("b", 1, 37),
+)
+
+
+class Tick(NamedTuple):
+    """One decoded log record; prices are `mantissa * 10**exponent`."""
+
+    received_ns: int
+    timestamp_ns: int
+    price_mantissa: int
+    change_mantissa: int
+    symbol_id: int
+    price_exponent: int
+    change_exponent: int
+
+
+def _split_decimal(value: Decimal) -> tuple[int, int]:
+    sign, digits, exponent = value.as_tuple()
+    if not isinstance(exponent, int):
+        raise ValueError(f"Cannot record non-finite price {value}")
+    mantissa = int("".join(map(str, digits)) or "0")
+    return (-mantissa if sign else mantissa), exponent
+
+
+def _to_ns(timestamp: datetime) -> int:
+    return (timestamp - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _from_ns(timestamp_ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1000)
+
+
+def _companion(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def _scale_int(mantissa: int, shift: int) -> int:
+    return mantissa * 10**shift if shift >= 0 else mantissa // 10**-shift
+
+
+def _scale_floats(mantissas: array, exponents: array) -> array:
+    return array(
+        "d", map(operator.mul, mantissas, map(_POWERS_OF_TEN.__getitem__, exponents))
+    )
+
+
+class PriceRecorder:
+    """Appends `Price`s to a log; see the module docstring for the layout.
+
+    Wrap a stream with `tee` to record it while consuming it as usual.
+    Records are buffered; `flush` (or `close`) writes them out.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike, clock_ns: Callable[[], int] = time.time_ns
+    ) -> None:
+        self._path = Path(path)
+        self._clock_ns = clock_ns
+        self._symbol_ids: dict[str, int] = {}
+        symbols_path = _companion(self._path, ".symbols")
+        if symbols_path.exists():
+            for line in symbols_path.read_text().splitlines():
+                self._symbol_ids[line] = len(self._symbol_ids)
+        self._last_received = 0
+        self._records: BinaryIO = open(self._path, "a+b")
+        size = self._records.seek(0, os.SEEK_END)
+        if size == 0:
+            self._records.write(_MAGIC)
+        else:
+            # Drop a torn trailing record left by a crash so new ones stay aligned.
+            size -= (size - len(_MAGIC)) % _RECORD.size
+            self._records.truncate(size)
+            if size > len(_MAGIC):
+                self._records.seek(size - _RECORD.size)
+                (self._last_received,) = _RECEIVED.unpack(
+                    self._records.read(_RECEIVED.size)
+                )
+        self._count = (size - len(_MAGIC)) // _RECORD.size
+        self._symbols = open(symbols_path, "a")
+        self._buffer = bytearray()
+        self._open_index()
+
+    def _open_index(self) -> None:
+        index_path = _companion(self._path, ".index")
+        self._block = self._count // _BLOCK_RECORDS
+        # Symbols already listed in the index for the block being filled.
+        self._block_symbols: set[int] = set()
+        self._index_buffer = bytearray()
+        if index_path.exists():
+            self._index: BinaryIO = open(index_path, "a+b")
+            size = self._index.seek(0, os.SEEK_END)
+            self._index.truncate(size - size % _INDEX_ENTRY.size)
+            self._index.seek(0)
+            for symbol_id, block in _INDEX_ENTRY.iter_unpack(self._index.read()):
+                if block == self._block:
+                    self._block_symbols.add(symbol_id)
+            return
+        self._index = open(index_path, "a+b")
+        # A log recorded before block indexes existed: index what's there.
+        self._records.seek(len(_MAGIC))
+        for record in range(self._count):
+            (symbol_id,) = _SYMBOL_ID.unpack_from(self._records.read(_RECORD.size), 32)
+            self._index_block(record // _BLOCK_RECORDS, symbol_id)
+        self._records.seek(0, os.SEEK_END)
+
+    def _index_block(self, block: int, symbol_id: int) -> None:
+        if block != self._block:
+            self._block = block
+            self._block_symbols.clear()
+        if symbol_id not in self._block_symbols:
+            self._block_symbols.add(symbol_id)
+            self._index_buffer += _INDEX_ENTRY.pack(symbol_id, block)
+
+    def record(self, price: Price, received_ns: Optional[int] = None) -> None:
+        symbol_id = self._symbol_ids.get(price.symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[price.symbol] = len(self._symbol_ids)
+            self._symbols.write(price.symbol + "\n")
+        if received_ns is None:
+            received_ns = self._clock_ns()
+        # Keep receive times sorted (wall clocks can step back) so readers
+        # can binary-search them.
+        received_ns = self._last_received = max(received_ns, self._last_received)
+        self._index_block(self._count // _BLOCK_RECORDS, symbol_id)
+        self._count += 1
+        price_mantissa, price_exponent = _split_decimal(price.last_price)
+        change_mantissa, change_exponent = _split_decimal(price.percentage_change)
+        self._buffer += _RECORD.pack(
+            received_ns,
+            _to_ns(price.timestamp),
+            price_mantissa,
+            change_mantissa,
+            symbol_id,
+            price_exponent,
+            change_exponent,
+        )
+        if len(self._buffer) >= _FLUSH_BYTES:
+            self.flush()
+
+    def tee(self, prices: Iterable[Price]) -> Iterator[Price]:
+        """Yield `prices` unchanged, recording each one first."""
+        for price in prices:
+            self.record(price)
+            yield price
+
+    def flush(self) -> None:
+        # Symbols and block index first: a reader must never see a record
+        # whose symbol id it can't resolve or whose block it would skip.
+        self._symbols.flush()
+        self._index.write(self._index_buffer)
+        self._index.flush()
+        self._index_buffer.clear()
+        self._records.write(self._buffer)
+        self._records.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._records.close()
+        self._symbols.close()
+        self._index.close()
+
+    def __enter__(self) -> "PriceRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class PriceLogReader:
+    """Memory-mapped reader and replay source for a `PriceRecorder` log.
+
+    Every read takes the same filters: `symbols` by name, and `start`
+    (inclusive) / `end` (exclusive) datetimes on the receive time. With
+    `symbols`, only blocks the log's block index lists for them are read.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self._path = Path(path)
+        with open(self._path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{self._path} is not a price log")
+            size = os.fstat(f.fileno()).st_size
+            self._count = (size - len(_MAGIC)) // _RECORD.size
+            self._mmap = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self._count else None
+            )
+        symbols_path = _companion(self._path, ".symbols")
+        self.symbols: tuple[str, ...] = tuple(symbols_path.read_text().splitlines())
+        # Read after the records, so it covers every record mapped above.
+        self._blocks: Optional[dict[int, list[int]]] = None
+        index_path = _companion(self._path, ".index")
+        if index_path.exists():
+            data = index_path.read_bytes()
+            self._blocks = {}
+            entries = memoryview(data)[: len(data) - len(data) % _INDEX_ENTRY.size]
+            for symbol_id, block in _INDEX_ENTRY.iter_unpack(entries):
+                self._blocks.setdefault(symbol_id, []).append(block)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def ticks(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Tick]:
+        """Raw records in recorded order."""
+        wanted = self._symbol_ids(symbols)
+        ranges = self._ranges(wanted, *self._bounds(start, end))
+        records = itertools.chain.from_iterable(itertools.starmap(self._unpack, ranges))
+        ticks = map(Tick._make, records)
+        if wanted is None:
+            return ticks
+        return (tick for tick in ticks if tick.symbol_id in wanted)
+
+    def prices(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Price]:
+        """The recorded `Price`s, as fast as they can be rebuilt."""
+        return map(self._price, self.ticks(symbols, start, end))
+
+    def batches(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        max_size: int = 65536,
+        price_scale: Optional[int] = None,
+    ) -> Iterator[PriceBatch]:
+        """Recorded ticks as columnar `PriceBatch`es.
+
+        Each batch covers up to `max_size` records of the log (fewer ticks
+        if `symbols` filters some out). Symbol ids are the log's own.
+        """
+        wanted = self._symbol_ids(symbols)
+        chunks = (
+            (chunk, min(chunk + max_size, stop))
+            for first, stop in self._ranges(wanted, *self._bounds(start, end))
+            for chunk in range(first, stop, max_size)
+        )
+        for chunk, chunk_stop in chunks:
+            columns = self._columns(chunk, chunk_stop)
+            if wanted is not None:
+                keep = list(map(wanted.__contains__, columns[4]))
+                columns = [
+                    array(column.typecode, itertools.compress(column, keep))
+                    for column in columns
+                ]
+            _, timestamps, prices, changes, ids, price_exps, change_exps = columns
+            if not ids:
+                continue
+            yield PriceBatch(
+                symbols=self.symbols,
+                symbol_ids=ids,
+                prices=(
+                    _scale_floats(prices, price_exps)
+                    if price_scale is None
+                    else array(
+                        "q", map(_scale_int, prices, map(price_scale.__add__, price_exps))
+                    )
+                ),
+                timestamps_ns=timestamps,
+                percentage_changes=_scale_floats(changes, change_exps),
+                price_scale=price_scale,
+            )
+
+    def replay(
+        self,
+        speed: Optional[float] = 1.0,
+        symbols: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> Iterator[Price]:
+        """Yield the recorded `Price`s paced like the original stream.
+
+        `speed=1` reproduces the recorded inter-arrival gaps, `speed=10`
+        plays ten times faster, and `speed=None` doesn't wait at all (same
+        as `prices`). The result is a drop-in for `prices_stream`.
+        """
+        if not speed:
+            yield from self.prices(symbols, start, end)
+            return
+        origin_ns: Optional[int] = None
+        started = clock()
+        for tick in self.ticks(symbols, start, end):
+            if origin_ns is None:
+                origin_ns = tick.received_ns
+            delay = (tick.received_ns - origin_ns) / 1e9 / speed - (clock() - started)
+            if delay > 0:
+                sleep(delay)
+            yield self._price(tick)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> "PriceLogReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _price(self, tick: Tick) -> Price:
+        return Price(
+            symbol=self.symbols[tick.symbol_id],
+            last_price=Decimal(tick.price_mantissa).scaleb(tick.price_exponent),
+            timestamp=_from_ns(tick.timestamp_ns),
+            percentage_change=Decimal(tick.change_mantissa).scaleb(tick.change_exponent),
+        )
+
+    def _offset(self, record: int) -> int:
+        return len(_MAGIC) + record * _RECORD.size
+
+    def _bisect(self, mapped: mmap.mmap, received_ns: int) -> int:
+        """First record received at or after `received_ns`."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if _RECEIVED.unpack_from(mapped, self._offset(middle))[0] < received_ns:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _bounds(self, start: Optional[datetime], end: Optional[datetime]) -> tuple[int, int]:
+        if self._mmap is None:
+            return 0, 0
+        first = self._bisect(self._mmap, _to_ns(start)) if start is not None else 0
+        stop = self._bisect(self._mmap, _to_ns(end)) if end is not None else self._count
+        return first, max(first, stop)
+
+    def _ranges(
+        self, wanted: Optional[frozenset[int]], first: int, stop: int
+    ) -> Iterator[tuple[int, int]]:
+        """Record ranges within `first:stop` that can hold `wanted` symbols."""
+        if wanted is None or self._blocks is None:
+            if first < stop:
+                yield first, stop
+            return
+        blocks = sorted({b for i in wanted for b in self._blocks.get(i, ())})
+        # Merge runs of consecutive blocks into one range each.
+        for _, run in itertools.groupby(enumerate(blocks), lambda ib: ib[1] - ib[0]):
+            run_blocks = [block for _, block in run]
+            low = max(first, run_blocks[0] * _BLOCK_RECORDS)
+            high = min(stop, (run_blocks[-1] + 1) * _BLOCK_RECORDS)
+            if low < high:
+                yield low, high
+
+    def _unpack(self, first: int, stop: int) -> Iterator[tuple]:
+        if first >= stop or self._mmap is None:
+            return
+        with memoryview(self._mmap) as mapped:
+            with mapped[self._offset(first) : self._offset(stop)] as view:
+                yield from _RECORD.iter_unpack(view)
+
+    def _columns(self, first: int, stop: int) -> list[array]:
+        """The seven record fields of records `first:stop` as typed arrays."""
+        if sys.byteorder != "little":
+            fields = zip(*self._unpack(first, stop))
+            return [array(code, field) for (code, _, _), field in zip(_COLUMNS, fields)]
+        columns = [array(code) for code, _, _ in _COLUMNS]
+        if first >= stop or self._mmap is None:
+            return columns
+        with memoryview(self._mmap) as mapped:
+            with mapped[self._offset(first) : self._offset(stop)] as view:
+                for column, (code, width, position) in zip(columns, _COLUMNS):
+                    with view.cast(code) as typed:
+                        step = _RECORD.size // width
+                        column.frombytes(typed[position::step].tobytes())
+        return columns
+
+    def _symbol_ids(self, symbols: Optional[Iterable[str]]) -> Optional[frozenset[int]]:
+        if symbols is None:
+            return None
+        ids = {name: i for i, name in enumerate(self.symbols)}
+        return frozenset(ids[s] for s in symbols if s in ids)
@@ -0,0 +1,148 @@
+"""Per-symbol cache of the backend's signed FIOracle price updates.
+
+Every router swap ships `pythUpdateData` fetched from `/signed-prices/`. A
+strategy trading the same symbol several times a second would otherwise
+repeat that HTTP round-trip for an identical 117-byte payload. Entries are
+keyed by symbol and aged by the publishTime packed inside the update, so the
+cache never hands out an update older than the configured window no matter
+how long it has been held locally.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Callable, Optional
+
+# feedId (32) + price (8) + expo (4) precede the big-endian uint64 publishTime.
+_PRICE_OFFSET = 32
+_EXPO_OFFSET = 32 + 8
+_PUBLISH_TIME_OFFSET = 32 + 8 + 4
+_UPDATE_LENGTH = 117
+
+
+def publish_time(update: bytes) -> Optional[int]:
+    """Unix publishTime of a packed FIOracle update, or None if malformed."""
+    if len(update) != _UPDATE_LENGTH:
+        return None
+    return int.from_bytes(
+        update[_PUBLISH_TIME_OFFSET : _PUBLISH_TIME_OFFSET + 8], "big"
+    )
+
+
+def oracle_price(update: bytes) -> Optional[Decimal]:
+    """The signed price (int64 price * 10**int32 expo) of a packed update."""
+    if len(update) != _UPDATE_LENGTH:
+        return None
+    price = int.from_bytes(update[_PRICE_OFFSET:_EXPO_OFFSET], "big", signed=True)
+    expo = int.from_bytes(
+        update[_EXPO_OFFSET:_PUBLISH_TIME_OFFSET], "big", signed=True
+    )
+    return Decimal(price).scaleb(expo)
+
+
+class SignedPriceUpdateCache:
+    """Serves signed updates from memory while they're fresh enough.
+
+    Args:
+        fetch: Fetches updates keyed by symbol (see
+            `PrimeDeltaClient.get_signed_price_updates_by_symbol`).
+        max_age: Seconds after publishTime an update is still served.
+        refresh_margin: Once an update is within this many seconds of
+            `max_age`, serving it also schedules a background refetch, so a
+            steady trader keeps hitting the cache instead of the network.
+            0 disables background refresh.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[list[str]], dict[str, bytes]],
+        max_age: float = 10.0,
+        refresh_margin: float = 3.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._fetch = fetch
+        self._max_age = max_age
+        self._refresh_margin = refresh_margin
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._updates: dict[str, tuple[bytes, int]] = {}
+        self._refreshing: set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get(self, symbols: list[str]) -> list[bytes]:
+        """Return updates for `symbols` in order, fetching only the misses.
+
+        Symbols the backend has no price for are skipped, as with
+        `PrimeDeltaClient.get_signed_price_updates`.
+        """
+        return list(self.get_by_symbol(symbols).values())
+
+    def get_by_symbol(self, symbols: list[str]) -> dict[str, bytes]:
+        """Like `get`, keyed by symbol in request order."""
+        now = self._clock()
+        found: dict[str, bytes] = {}
+        missing: list[str] = []
+        expiring: list[str] = []
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                entry = self._updates.get(symbol)
+                if entry is None or now - entry[1] >= self._max_age:
+                    missing.append(symbol)
+                    continue
+                found[symbol] = entry[0]
+                if now - entry[1] >= self._max_age - self._refresh_margin:
+                    expiring.append(symbol)
+        if missing:
+            found.update(self._fetch_and_store(missing))
+        if expiring and self._refresh_margin > 0:
+            self._refresh_in_background(expiring)
+        return {
+            symbol: found[symbol] for symbol in dict.fromkeys(symbols) if symbol in found
+        }
+
+    __call__ = get
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._updates.clear()
+
+    def close(self) -> None:
+        """Stop the background refresher; pending refreshes are dropped."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_and_store(self, symbols: list[str]) -> dict[str, bytes]:
+        fetched = self._fetch(symbols)
+        with self._lock:
+            for symbol, update in fetched.items():
+                published = publish_time(update)
+                if published is None:
+                    continue  # Can't age it, so don't keep it.
+                current = self._updates.get(symbol)
+                if current is None or current[1] <= published:
+                    self._updates[symbol] = (update, published)
+        return fetched
+
+    def _refresh_in_background(self, symbols: list[str]) -> None:
+        with self._lock:
+            symbols = [s for s in symbols if s not in self._refreshing]
+            if not symbols:
+                return
+            self._refreshing.update(symbols)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="primedelta-prices"
+                )
+            executor = self._executor
+        executor.submit(self._refresh, symbols)
+
+    def _refresh(self, symbols: list[str]) -> None:
+        try:
+            self._fetch_and_store(symbols)
+        except Exception:
+            pass  # The next foreground miss will surface the error.
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(symbols)
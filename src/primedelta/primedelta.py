@@ -1,16 +1,28 @@
+import contextlib
+import functools
+import math
+import os
+import re
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 
 from eth_account.messages import encode_defunct
 from siwe import SiweMessage
 from eth_abi import decode as abi_decode
 from web3 import Web3
 from web3.contract.contract import ContractFunction
-from web3.exceptions import ContractLogicError
+from web3.exceptions import ContractLogicError, TimeExhausted
 from web3.middleware import geth_poa_middleware
+from web3.types import TxParams
 
+from primedelta.caching import TTLValue
+from primedelta.chain_clock import ChainClock
 from primedelta.contracts import Contracts
+from primedelta.dex.allowances import AllowanceManager
 from primedelta.dex.handlers import (
     _AMMPoolHandler,
     _DclexPoolHandler,
@@ -20,19 +32,34 @@ from primedelta.dex.params import (
     AddLiquidityParams,
     AMMAddLiquidity,
     AMMRemoveLiquidity,
+    ApprovalPolicy,
     PoolType,
     PriceFeedAddLiquidity,
     PriceFeedRemoveLiquidity,
     RemoveLiquidityParams,
+    SwapLeg,
+    SwapLegResult,
     SwapSide,
 )
+from primedelta.dex.quotes import MintQuote, Quote, _AMMQuoter, _DclexQuoter
+from primedelta.dex.registry import StockTokenRegistry
+from primedelta.dex.routing import Route, RouteKind, RouteOptimizer
+from primedelta.gas import GasStrategy
+from primedelta.multicall import BatchReader
+from primedelta.nonces import NonceManager
+from primedelta.pagination import iter_pages
+from primedelta.price_batches import PriceBatch, PriceBatcher
+from primedelta.price_book import PriceBook
+from primedelta.price_updates import SignedPriceUpdateCache
 from primedelta.primedelta_client import APIError, PrimeDeltaClient, NotLoggedIn
+from primedelta.receipts import ReceiptTracker
 from primedelta.settings import (
     PRIMEDELTA_APP_URL,
     SIWE_DOMAIN,
     SIWE_MESSAGE,
     SIWE_URI,
 )
+from primedelta.streaming import OverflowPolicy, PriceStreamHub
 from primedelta.types import (
     AccountStatus,
     ClaimableWithdrawal,
@@ -42,6 +69,7 @@ from primedelta.types import (
     OrderSide,
     OrderStatus,
     Portfolio,
+    Position,
     Stock,
     Transfer,
 )
@@ -165,12 +193,120 @@ def _deepest_trace_error(trace: Any) -> Optional[str]:
     return deepest
 
 
+def _with_deepest_trace(reason: str, trace: Any) -> str:
+    deepest = _deepest_trace_error(trace)
+    if deepest and deepest != reason and "revert" in reason.lower():
+        return f"{deepest} (top-level: {reason})"
+    return reason
+
+
+def _expected_nonce(reason: str) -> Optional[int]:
+    """Parse the nonce Besu expects out of a "nonce too low" rejection."""
+    match = re.search(r"account nonce (\d+)", reason)
+    return int(match.group(1)) if match else None
+
+
+def _approve_spender(pending: "_PendingTransaction") -> Optional[str]:
+    """The spender of an `approve(address,uint256)` call, if `pending` is one."""
+    data = pending.data
+    if pending.fn_name != "approve" or not isinstance(pending.to, str):
+        return None
+    if not isinstance(data, str) or len(data) < 74:
+        return None
+    # 0x + 4-byte selector + the address left-padded to 32 bytes.
+    return "0x" + data[34:74]
+
+
+def _siwe_message(address: str, chain_id: int, nonce: str) -> str:
+    issued_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return SiweMessage(
+        {
+            "domain": SIWE_DOMAIN,
+            "address": address,
+            "statement": SIWE_MESSAGE,
+            "uri": SIWE_URI,
+            "version": "1",
+            "chain_id": chain_id,
+            "nonce": nonce,
+            "issued_at": issued_at,
+        }
+    ).prepare_message()
+
+
+def _invalidates_portfolio(method: Callable) -> Callable:
+    """Drop the cached portfolio once `method` returns or raises.
+
+    Invalidating afterwards (not before) keeps a concurrent balance read from
+    re-caching the pre-submission portfolio while the request is in flight.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._portfolio_cache.invalidate()
+
+    return wrapper
+
+
+def _pipelined(method: Callable) -> Callable:
+    """Run `method` inside `self.pipelined()` unless pipelining is disabled."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._pipeline_transactions:
+            return method(self, *args, **kwargs)
+        with self.pipelined():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+@dataclass(frozen=True)
+class _PendingTransaction:
+    """A broadcast transaction whose receipt hasn't been checked yet."""
+
+    fn_name: str
+    tx_hash: Any
+    transaction: TxParams
+    to: Optional[str]
+    data: Optional[str]
+
+
+@dataclass(frozen=True)
+class _PortfolioSnapshot:
+    portfolio: Portfolio
+    positions: dict[str, Position]
+
+    @classmethod
+    def of(cls, portfolio: Portfolio) -> "_PortfolioSnapshot":
+        return cls(
+            portfolio=portfolio,
+            positions={position.symbol: position for position in portfolio.positions},
+        )
+
+
 class PrimeDelta:
     def __init__(
         self,
         private_key: str,
         web3_provider_url: str,
         network: str = "dev",
+        http_pool_connections: int = 10,
+        http_pool_maxsize: int = 10,
+        portfolio_cache_ttl: float = 1.0,
+        token_cache_path: Optional[str | os.PathLike] = None,
+        pipeline_transactions: bool = True,
+        approval_policy: ApprovalPolicy = ApprovalPolicy.EXACT,
+        signed_price_max_age: float = 10.0,
+        pyth_feed_cache_path: Optional[str | os.PathLike] = None,
+        track_receipts: bool = False,
+        receipt_confirmations: int = 0,
+        receipt_timeout: float = 120.0,
+        gas_strategy: Optional[GasStrategy] = None,
+        native_token_price: Decimal = Decimal(0),
+        account_status_ttl: float = 5.0,
     ) -> None:
         self._account = Web3().eth.account.from_key(private_key)
         self._web3 = Web3(Web3.HTTPProvider(web3_provider_url))
@@ -178,70 +314,196 @@ class PrimeDelta:
         # field; web3.py's default response formatter rejects anything > 32B.
         # Injecting the PoA middleware is a no-op on non-PoA chains.
         self._web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        self._primedelta_client = PrimeDeltaClient()
+        self._primedelta_client = PrimeDeltaClient(
+            pool_connections=http_pool_connections,
+            pool_maxsize=http_pool_maxsize,
+            pyth_feed_cache_path=pyth_feed_cache_path,
+        )
         # Contracts come from the SDK's bundled `networks/<name>.json` — not
         # from the backend. Pin addresses by editing that file.
         from primedelta import networks
         self._contracts: Contracts = networks.load(network)
-        # Some Besu/PoA RPC nodes lag in updating the nonce counter even after
-        # the previous tx's receipt is back. Track locally to avoid collisions
-        # in chained submissions (e.g. approve → swap, mint → remove).
-        self._next_nonce: Optional[int] = None
+        # Balance getters read from one portfolio snapshot instead of a fresh
+        # `/portfolio/` round-trip each. Anything the SDK submits that can
+        # move balances invalidates it; see `invalidate_portfolio_cache`.
+        self._portfolio_cache: TTLValue[_PortfolioSnapshot] = TTLValue(
+            portfolio_cache_ttl
+        )
+        # Actions check the verification status first. DID_MINTED is final,
+        # so it's kept until the session ends; earlier states are re-read
+        # after `account_status_ttl` seconds. Any 401/403 forgets it.
+        self._account_status_cache: TTLValue[AccountStatus] = TTLValue(
+            account_status_ttl
+        )
+        self._primedelta_client.on_auth_failure(self._account_status_cache.invalidate)
+        # Streams started without symbols follow every listed stock; the
+        # listing rarely changes, so don't refetch it per stream.
+        self._listed_symbols_cache: TTLValue[list[str]] = TTLValue(300.0)
+        # Nonces are allocated locally (the chain is read once, and again only
+        # after it disagreed with us), so threads sharing this client and
+        # chained submissions (approve → swap) never collide or wait on RPC.
+        self._nonces = NonceManager()
+        # Multi-transaction operations (approve → swap, approve → approve →
+        # add) broadcast back-to-back and wait for receipts once at the end;
+        # see `pipelined`. Each thread has its own pipeline, so a send from
+        # one thread never joins a block another thread has open.
+        self._pipeline_transactions = pipeline_transactions
+        self._pipeline = threading.local()
+        self._gas = gas_strategy or GasStrategy()
+        # Deadlines come from the local clock offset to chain time, kept
+        # calibrated by blocks the receipt tracker reads anyway, instead of
+        # a `get_block("latest")` per swap or liquidity call.
+        self._chain_clock = ChainClock()
+        # One thread follows new blocks and resolves every in-flight receipt;
+        # `submit` always uses it, and `track_receipts` routes blocking sends
+        # through it too instead of polling each hash. Built on first use.
+        self._receipts: Optional[ReceiptTracker] = None
+        self._receipt_confirmations = receipt_confirmations
+        self._receipt_timeout = receipt_timeout
+        self._track_receipts = track_receipts
+        # Symbols missing from `_contracts.pools` resolve through the router;
+        # the registry does that enumeration once per network, not per call.
+        # View reads that fan out (symbols, balances, positions) go through
+        # one aggregated call instead of one `eth_call` each.
+        self._batch_reader = BatchReader(self._web3, self._contracts.core.multicall)
+        self._token_registry = StockTokenRegistry(
+            web3=self._web3,
+            contracts_provider=self._get_contracts,
+            cache_path=token_cache_path,
+            batch_reader=self._batch_reader,
+        )
+        # Approvals are skipped when the spender's allowance already covers
+        # the action; `ApprovalPolicy.MAX` grants standing approvals instead.
+        self._allowances = AllowanceManager(
+            web3=self._web3,
+            owner=self._account.address,
+            send_tx=self._build_and_send_transaction,
+            policy=approval_policy,
+        )
+        # Swaps reuse a signed price update while its publishTime is within
+        # `signed_price_max_age` seconds; 0 fetches a fresh one every time.
+        self._signed_prices = SignedPriceUpdateCache(
+            self._primedelta_client.get_signed_price_updates_by_symbol,
+            max_age=signed_price_max_age,
+        )
         self._dclex_handler = _DclexPoolHandler(
             web3=self._web3,
             account=self._account,
             contracts_provider=self._get_contracts,
             send_tx=self._build_and_send_transaction,
+            token_registry=self._token_registry,
+            allowances=self._allowances,
         )
         self._amm_handler = _AMMPoolHandler(
             web3=self._web3,
             account=self._account,
             contracts_provider=self._get_contracts,
             send_tx=self._build_and_send_transaction,
+            token_registry=self._token_registry,
+            allowances=self._allowances,
+            batch_reader=self._batch_reader,
+            chain_clock=self._chain_clock,
+        )
+        self._quoter = _DclexQuoter(
+            web3=self._web3,
+            contracts_provider=self._get_contracts,
+            signed_prices_fetcher=(
+                self._signed_prices.get
+                if signed_price_max_age > 0
+                else self._primedelta_client.get_signed_price_updates
+            ),
+            token_registry=self._token_registry,
+            batch_reader=self._batch_reader,
+        )
+        self._amm_quoter = _AMMQuoter(
+            web3=self._web3,
+            contracts_provider=self._get_contracts,
+            pool_lookup=self._amm_handler.pool_address,
+            batch_reader=self._batch_reader,
+        )
+        # Token-to-token trades are quoted per path (one router call or two
+        # single-leg calls) on the pool the router uses for each token, and
+        # weighed with gas at `native_token_price` dUSD per native coin.
+        self._pool_types: dict[str, PoolType] = {}
+        self._routes = RouteOptimizer(
+            quote_exact_input=self._quote_router_leg_exact_input,
+            quote_exact_output=self._quote_router_leg_exact_output,
+            gas_price=self._gas_price,
+            native_token_price=native_token_price,
+            prefetch=self._prefetch_router_legs,
+            learned_gas=self._learned_router_gas,
         )
         self._router_swapper = _RouterSwapHandler(
             web3=self._web3,
             account=self._account,
             contracts_provider=self._get_contracts,
-            signed_prices_fetcher=self._primedelta_client.get_signed_price_updates,
+            signed_prices_fetcher=(
+                self._signed_prices.get
+                if signed_price_max_age > 0
+                else self._primedelta_client.get_signed_price_updates
+            ),
             send_tx=self._build_and_send_transaction,
+            token_registry=self._token_registry,
+            allowances=self._allowances,
+            signed_prices_by_symbol=(
+                self._signed_prices.get_by_symbol
+                if signed_price_max_age > 0
+                else self._primedelta_client.get_signed_price_updates_by_symbol
+            ),
+            chain_clock=self._chain_clock,
         )
+        # Every logged-in `prices_stream` call shares one broker connection.
+        self._price_hub = PriceStreamHub(self._open_broker_price_stream)
+
+    def close(self) -> None:
+        """Release pooled HTTP connections held by the backend client."""
+        self._signed_prices.close()
+        self._price_hub.close()
+        if self._receipts is not None:
+            self._receipts.close()
+        self._primedelta_client.close()
+
+    def __enter__(self) -> "PrimeDelta":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def _get_contracts(self) -> Contracts:
         return self._contracts
 
+    @property
+    def _pending_transactions(self) -> Optional[list[_PendingTransaction]]:
+        return getattr(self._pipeline, "pending", None)
+
+    @_pending_transactions.setter
+    def _pending_transactions(self, pending: Optional[list[_PendingTransaction]]) -> None:
+        self._pipeline.pending = pending
+
     def login(self) -> None:
         nonce = self._primedelta_client.get_nonce()
-        issued_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        message = SiweMessage(
-            {
-                "domain": SIWE_DOMAIN,
-                "address": self._account.address,
-                "statement": SIWE_MESSAGE,
-                "uri": SIWE_URI,
-                "version": "1",
-                "chain_id": self._get_contracts().chain_id,
-                "nonce": nonce,
-                "issued_at": issued_at,
-            }
-        ).prepare_message()
+        message = _siwe_message(
+            self._account.address, self._get_contracts().chain_id, nonce
+        )
         signature = self._account.sign_message(
             encode_defunct(text=message),
         ).signature.hex()
+        self._account_status_cache.invalidate()
         self._primedelta_client.login(message=message, signature=signature, nonce=nonce)
 
     def logged_in(self) -> bool:
         try:
-            self.get_account_status()
+            self._account_status()
         except NotLoggedIn:
             return False
         return True
 
     def logout(self) -> None:
+        self._account_status_cache.invalidate()
         self._primedelta_client.logout()
 
     def claim_digital_identity(self) -> str:
-        account_status = self._primedelta_client.get_account_status()
+        account_status = self._account_status()
         if account_status == AccountStatus.DID_MINTED:
             raise DigitalIdentityAlreadyClaimed()
         if account_status != AccountStatus.VERIFIED:
@@ -256,7 +518,7 @@ class PrimeDelta:
         digital_identity_contract = self._web3.eth.contract(
             address=digital_identity_contract_address, abi=digital_identity.abi
         )
-        return self._build_and_send_transaction(
+        tx_hash = self._build_and_send_transaction(
             digital_identity_contract.functions.mint(
                 {
                     "account": self._account.address,
@@ -267,9 +529,23 @@ class PrimeDelta:
                 bytes.fromhex(signature.signature),
             )
         )
+        # The cached VERIFIED is stale once the backend sees the mint.
+        self._account_status_cache.invalidate()
+        return tx_hash
 
     def get_account_status(self) -> AccountStatus:
-        return self._primedelta_client.get_account_status()
+        """Read the verification status from the backend, bypassing the cache."""
+        status = self._primedelta_client.get_account_status()
+        self._account_status_cache.set(
+            status, ttl=math.inf if status == AccountStatus.DID_MINTED else None
+        )
+        return status
+
+    def _account_status(self) -> AccountStatus:
+        status = self._account_status_cache.get()
+        if status is None:
+            status = self.get_account_status()
+        return status
 
     def verification_url(self) -> str:
         """Return the URL of the web page where the user completes KYC.
@@ -294,7 +570,7 @@ class PrimeDelta:
         return url
 
     def deposit_stablecoin(self, amount: Decimal) -> str:
-        account_status = self._primedelta_client.get_account_status()
+        account_status = self._account_status()
         if account_status not in [AccountStatus.VERIFIED, AccountStatus.DID_MINTED]:
             raise AccountNotVerified()
 
@@ -311,8 +587,9 @@ class PrimeDelta:
             )
         )
 
+    @_invalidates_portfolio
     def request_stablecoin_withdrawal(self, amount: Decimal):
-        account_status = self._primedelta_client.get_account_status()
+        account_status = self._account_status()
         if account_status not in [AccountStatus.VERIFIED, AccountStatus.DID_MINTED]:
             raise AccountNotVerified()
 
@@ -347,7 +624,7 @@ class PrimeDelta:
         )
 
     def deposit_stock_token(self, stock_symbol: str, amount: int) -> str:
-        account_status = self._primedelta_client.get_account_status()
+        account_status = self._account_status()
         if account_status != AccountStatus.DID_MINTED:
             raise AccountNotVerified()
 
@@ -373,8 +650,9 @@ class PrimeDelta:
             )
         )
 
+    @_invalidates_portfolio
     def request_stock_withdrawal(self, stock_symbol: str, amount: int):
-        account_status = self._primedelta_client.get_account_status()
+        account_status = self._account_status()
         if account_status != AccountStatus.DID_MINTED:
             raise AccountNotVerified()
 
@@ -440,23 +718,61 @@ class PrimeDelta:
     ) -> list[Distribution]:
         return self._primedelta_client.get_distributions(page_number, page_size)
 
+    def iter_pending_transfers(self, page_size: int = 100) -> Iterator[Transfer]:
+        """Lazily yield every pending transfer, one page at a time.
+
+        The next page is fetched in the background while the current one is
+        consumed, so at most two pages are held in memory.
+        """
+        return iter_pages(self._primedelta_client.get_pending_transfers, page_size)
+
+    def iter_closed_transfers(self, page_size: int = 100) -> Iterator[Transfer]:
+        """Lazily yield every closed transfer. See `iter_pending_transfers`."""
+        return iter_pages(self._primedelta_client.get_closed_transfers, page_size)
+
+    def iter_distributions(self, page_size: int = 100) -> Iterator[Distribution]:
+        """Lazily yield every distribution. See `iter_pending_transfers`."""
+        return iter_pages(self._primedelta_client.get_distributions, page_size)
+
     def get_stablecoin_available_balance(self) -> Decimal:
-        return self._primedelta_client.portfolio().buying_power
+        return self._portfolio_snapshot().portfolio.buying_power
 
     def get_stablecoin_total_balance(self) -> Decimal:
-        return self._primedelta_client.portfolio().total_funds
+        return self._portfolio_snapshot().portfolio.total_funds
 
     def get_stock_available_balance(self, symbol: str) -> Decimal:
-        for stock_item in self._primedelta_client.portfolio().positions:
-            if stock_item.symbol == symbol:
-                return stock_item.available_to_sell
-        return Decimal(0)
+        position = self._portfolio_snapshot().positions.get(symbol)
+        return position.available_to_sell if position is not None else Decimal(0)
 
     def get_stock_total_balance(self, symbol: str) -> Decimal:
-        for stock_item in self._primedelta_client.portfolio().positions:
-            if stock_item.symbol == symbol:
-                return stock_item.total_owned
-        return Decimal(0)
+        position = self._portfolio_snapshot().positions.get(symbol)
+        return position.total_owned if position is not None else Decimal(0)
+
+    def invalidate_portfolio_cache(self) -> None:
+        """Force the next balance getter to fetch a fresh portfolio.
+
+        The SDK does this itself after orders, swaps, deposits, withdrawals
+        and any other transaction it sends; call it when balances change
+        through some other channel (e.g. the web app).
+        """
+        self._portfolio_cache.invalidate()
+
+    def _portfolio_snapshot(self) -> _PortfolioSnapshot:
+        snapshot = self._portfolio_cache.get()
+        if snapshot is None:
+            snapshot = self._fetch_portfolio_snapshot()
+        return snapshot
+
+    def _fetch_portfolio_snapshot(self) -> _PortfolioSnapshot:
+        try:
+            portfolio = self._primedelta_client.portfolio()
+        except APIError as exc:
+            if exc.error_code == "ACCOUNT_NOT_FOUND":
+                raise AccountNotVerified()
+            raise
+        snapshot = _PortfolioSnapshot.of(portfolio)
+        self._portfolio_cache.set(snapshot)
+        return snapshot
 
     def get_onchain_stablecoin_balance(self) -> Decimal:
         """Read stablecoin balance from chain (bypasses backend indexer lag)."""
@@ -476,7 +792,9 @@ class PrimeDelta:
         from primedelta.dex.handlers import _require_pool_abi, _resolve_stock_token
 
         contracts = self._get_contracts()
-        stock_addr = _resolve_stock_token(self._web3, contracts, symbol)
+        stock_addr = _resolve_stock_token(
+            self._web3, contracts, symbol, self._token_registry
+        )
         token = self._web3.eth.contract(
             address=self._web3.to_checksum_address(stock_addr),
             abi=_require_pool_abi(contracts, "erc20"),
@@ -484,6 +802,27 @@ class PrimeDelta:
         raw = token.functions.balanceOf(self._account.address).call()
         return Decimal(raw) / Decimal(10**18)
 
+    def get_onchain_stock_balances(self, symbols: list[str]) -> dict[str, Decimal]:
+        """Read several stock token balances from chain in one batched call."""
+        from primedelta.dex.handlers import _require_pool_abi, _resolve_stock_token
+
+        contracts = self._get_contracts()
+        erc20_abi = _require_pool_abi(contracts, "erc20")
+        unique = list(dict.fromkeys(symbols))
+        calls = []
+        for symbol in unique:
+            stock_addr = _resolve_stock_token(
+                self._web3, contracts, symbol, self._token_registry
+            )
+            token = self._web3.eth.contract(
+                address=self._web3.to_checksum_address(stock_addr), abi=erc20_abi
+            )
+            calls.append(token.functions.balanceOf(self._account.address))
+        raws = self._batch_reader.read(calls)
+        return {
+            symbol: Decimal(raw) / Decimal(10**18) for symbol, raw in zip(unique, raws)
+        }
+
     def get_native_del_balance(self) -> Decimal:
         """Read native DEL balance from chain."""
         raw = self._web3.eth.get_balance(self._account.address)
@@ -521,16 +860,13 @@ class PrimeDelta:
         return wdel
 
     def portfolio(self) -> Portfolio:
-        try:
-            return self._primedelta_client.portfolio()
-        except APIError as exc:
-            if exc.error_code == "ACCOUNT_NOT_FOUND":
-                raise AccountNotVerified()
-            raise
+        """Fetch a fresh portfolio (also refreshes the balance-getter cache)."""
+        return self._fetch_portfolio_snapshot().portfolio
 
     def claimable_withdrawals(self) -> list[ClaimableWithdrawal]:
         return self._primedelta_client.claimable_withdrawals()
 
+    @_invalidates_portfolio
     def send_limit_order(
         self,
         side: OrderSide,
@@ -552,6 +888,7 @@ class PrimeDelta:
                 raise NotEnoughFunds()
             raise
 
+    @_invalidates_portfolio
     def send_sell_market_order(self, stock_symbol: str, amount: int) -> int:
         try:
             return self._primedelta_client.send_sell_market_order(
@@ -563,6 +900,7 @@ class PrimeDelta:
                 raise NotEnoughFunds()
             raise
 
+    @_invalidates_portfolio
     def cancel_order(self, order_id: int) -> None:
         return self._primedelta_client.cancel_order(order_id)
 
@@ -575,38 +913,90 @@ class PrimeDelta:
     def closed_orders(self, page_number: int = 1, page_size: int = 1000) -> list[Order]:
         return self._primedelta_client.closed_orders(page_number, page_size)
 
+    def iter_open_orders(self, page_size: int = 100) -> Iterator[Order]:
+        """Lazily yield every open order. See `iter_pending_transfers`."""
+        return iter_pages(self._primedelta_client.open_orders, page_size)
+
+    def iter_closed_orders(self, page_size: int = 100) -> Iterator[Order]:
+        """Lazily yield every closed order. See `iter_pending_transfers`."""
+        return iter_pages(self._primedelta_client.closed_orders, page_size)
+
     def stocks(self) -> dict[str, Stock]:
         return self._primedelta_client.stocks()
 
-    def prices_stream(self, symbols: Optional[list[str]] = None):
+    def _listed_symbols(self) -> list[str]:
+        return self._listed_symbols_cache.get_or_load(lambda: list(self.stocks().keys()))
+
+    def prices_stream(
+        self,
+        symbols: Optional[list[str]] = None,
+        maxsize: int = 1024,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
         """Stream real-time price updates.
 
-        When logged in, uses the broker's authenticated price stream.
+        When logged in, uses the broker's authenticated price stream. All
+        logged-in subscriptions share a single connection; each gets only
+        its `symbols`, buffered in its own queue of at most `maxsize`
+        prices, with `overflow` deciding what a slow consumer loses.
+        Close the returned subscription (or stop iterating it) to leave.
         When not logged in, uses Pyth Hermes API for public price feeds.
 
         Args:
             symbols: List of stock symbols to stream prices for.
-                     Only used when not logged in (Pyth stream).
                      If None, streams all available stocks.
+            maxsize: Queue bound per subscription (logged in only).
+            overflow: What a full queue drops (logged in only).
 
         Raises:
             AccountNotVerified: If logged in but account is not verified.
                                 Use pyth_prices_stream() or verify at https://app.primedelta.io
         """
         if self.logged_in():
-            account_status = self._primedelta_client.get_account_status()
+            account_status = self._account_status()
             if account_status not in [AccountStatus.VERIFIED, AccountStatus.DID_MINTED]:
                 raise AccountNotVerified(
                     "Account not verified. Use pyth_prices_stream() for public prices "
                     "or verify your account at https://app.primedelta.io"
                 )
-            prices_stream_access_token = self._primedelta_client.prices_stream_access_token()
-            return self._primedelta_client.prices_stream(prices_stream_access_token)
+            return self._price_hub.subscribe(symbols, maxsize=maxsize, policy=overflow)
         else:
             if symbols is None:
-                symbols = list(self.stocks().keys())
+                symbols = self._listed_symbols()
             return self._primedelta_client.pyth_prices_stream(symbols)
 
+    def price_book(self, symbols: Optional[list[str]] = None) -> PriceBook:
+        """Latest price per symbol, kept current from `prices_stream`.
+
+        The stream is drained on a background thread; read the book with
+        `get`/`snapshot` or block on `wait_for_update`. Close it when done.
+        """
+        return PriceBook().start(self.prices_stream(symbols))
+
+    def pyth_price_batches(
+        self,
+        symbols: Optional[list[str]] = None,
+        max_size: int = 4096,
+        max_interval: float = 1.0,
+        price_scale: Optional[int] = None,
+    ) -> Iterator[PriceBatch]:
+        """Pyth prices as columnar `PriceBatch`es instead of `Price` objects.
+
+        A batch is cut after `max_size` ticks or `max_interval` seconds.
+        Prices are float64, or int64 scaled by `10**price_scale` if given;
+        `PriceBatch.to_numpy()` views the columns as NumPy arrays.
+        """
+        if symbols is None:
+            symbols = self._listed_symbols()
+        return self._primedelta_client.pyth_price_batches(
+            symbols,
+            PriceBatcher(max_size, max_interval, price_scale=price_scale),
+        )
+
+    def _open_broker_price_stream(self):
+        prices_stream_access_token = self._primedelta_client.prices_stream_access_token()
+        return self._primedelta_client.prices_stream(prices_stream_access_token)
+
     def pyth_prices_stream(self, symbols: Optional[list[str]] = None):
         """Stream prices from Pyth Hermes API.
 
@@ -617,9 +1007,57 @@ class PrimeDelta:
                      If None, streams all available stocks.
         """
         if symbols is None:
-            symbols = list(self.stocks().keys())
+            symbols = self._listed_symbols()
         return self._primedelta_client.pyth_prices_stream(symbols)
 
+    def quote_exact_input(
+        self,
+        symbol: str,
+        side: SwapSide,
+        amount_in: Decimal,
+        pool_type: PoolType = PoolType.PRICE_FEED,
+    ) -> Quote:
+        """Expected output of `swap_exact_input`, computed locally.
+
+        Price-feed pools are quoted from their fee curve, reserves and the
+        signed oracle price; AMM pools by simulating the V3 swap over a
+        snapshot of the pool's ticks. Pool state is read at most once per
+        block, so candidate trades can be evaluated in a tight loop. Use
+        `Quote.min_amount_out(slippage)` for the swap's bound.
+        """
+        if pool_type == PoolType.AMM:
+            return self._amm_quoter.quote_exact_input(symbol, side, amount_in)
+        return self._quoter.quote_exact_input(symbol, side, amount_in)
+
+    def quote_exact_output(
+        self,
+        symbol: str,
+        side: SwapSide,
+        amount_out: Decimal,
+        pool_type: PoolType = PoolType.PRICE_FEED,
+    ) -> Quote:
+        """Expected input of `swap_exact_output`; see `quote_exact_input`."""
+        if pool_type == PoolType.AMM:
+            return self._amm_quoter.quote_exact_output(symbol, side, amount_out)
+        return self._quoter.quote_exact_output(symbol, side, amount_out)
+
+    def quote_amm_liquidity(
+        self,
+        symbol: str,
+        tick_lower: int,
+        tick_upper: int,
+        amount_stock: Decimal,
+        amount_stablecoin: Decimal,
+    ) -> MintQuote:
+        """What an AMM position over [tick_lower, tick_upper) would take.
+
+        `MintQuote.to_params(slippage)` turns it into `AMMAddLiquidity`.
+        """
+        return self._amm_quoter.mint_amounts(
+            symbol, tick_lower, tick_upper, amount_stock, amount_stablecoin
+        )
+
+    @_pipelined
     def swap_exact_input(
         self,
         symbol: str,
@@ -634,6 +1072,7 @@ class PrimeDelta:
             symbol, side, amount_in, min_amount_out, deadline_seconds, update_fee
         )
 
+    @_pipelined
     def swap_exact_output(
         self,
         symbol: str,
@@ -648,6 +1087,45 @@ class PrimeDelta:
             symbol, side, amount_out, max_amount_in, deadline_seconds, update_fee
         )
 
+    def swap_batch(
+        self,
+        legs: list[SwapLeg],
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> list[SwapLegResult]:
+        """Run many router swaps together; one result per leg, in order.
+
+        Account status is checked once, signed prices for every symbol come
+        from one `/signed-prices/` request, and each token is approved once
+        for the total the legs spend. Approvals and swaps go out back-to-back
+        with consecutive nonces, then every receipt is awaited. A failing leg
+        (unknown symbol, revert, timeout) carries its exception in
+        `SwapLegResult.error` and doesn't stop the others.
+        """
+        self._require_logged_in_and_did_minted()
+        outcomes: list = []
+        try:
+            with self.pipelined():
+                outcomes = self._router_swapper.swap_batch(
+                    legs, self.submit, deadline_seconds, update_fee
+                )
+        except TransactionFailed:
+            # A reverted approval; the swaps relying on it revert as well
+            # and report that below.
+            if not outcomes:
+                raise
+        results = []
+        for leg, outcome in zip(legs, outcomes):
+            if isinstance(outcome, Exception):
+                results.append(SwapLegResult(leg, error=outcome))
+                continue
+            try:
+                results.append(SwapLegResult(leg, tx_hash=outcome.result()))
+            except Exception as e:
+                results.append(SwapLegResult(leg, error=e))
+        return results
+
+    @_pipelined
     def swap_token_to_token_exact_input(
         self,
         input_symbol: str,
@@ -672,6 +1150,7 @@ class PrimeDelta:
             update_fee,
         )
 
+    @_pipelined
     def swap_token_to_token_exact_output(
         self,
         input_symbol: str,
@@ -692,10 +1171,145 @@ class PrimeDelta:
             update_fee,
         )
 
+    def best_route_exact_input(
+        self, input_symbol: str, output_symbol: str, amount_in: Decimal
+    ) -> Route:
+        """The path that turns `amount_in` into the most output net of gas.
+
+        Each token is quoted on the pool the router trades it on; see
+        `RouteOptimizer`. Pass the result to `swap_route`.
+        """
+        return self._routes.best_exact_input(input_symbol, output_symbol, amount_in)
+
+    def best_route_exact_output(
+        self, input_symbol: str, output_symbol: str, amount_out: Decimal
+    ) -> Route:
+        """The path that buys `amount_out` for the least input net of gas."""
+        return self._routes.best_exact_output(input_symbol, output_symbol, amount_out)
+
+    @_pipelined
+    def swap_route(
+        self,
+        route: Route,
+        slippage: Decimal,
+        deadline_seconds: int = 600,
+        update_fee: int = 0,
+    ) -> list[str]:
+        """Execute `route` with its bounds widened by `slippage` (a fraction).
+
+        Returns the swap tx hashes in order. A split exact-input route buys
+        with the sell leg's minimum dUSD output, so any dUSD beyond it stays
+        in the wallet, and its output bound is re-quoted for that smaller
+        input; a split exact-output route sells for the buy leg's maximum
+        dUSD input.
+        """
+        self._require_logged_in_and_did_minted()
+        swapper = self._router_swapper
+        if route.kind == RouteKind.ROUTER:
+            if route.exact_input:
+                tx_hash = swapper.swap_token_to_token_exact_input(
+                    route.input_symbol,
+                    route.output_symbol,
+                    route.amount_in,
+                    route.min_amount_out(slippage),
+                    deadline_seconds,
+                    update_fee,
+                )
+            else:
+                tx_hash = swapper.swap_token_to_token_exact_output(
+                    route.input_symbol,
+                    route.output_symbol,
+                    route.amount_out,
+                    route.max_amount_in(slippage),
+                    deadline_seconds,
+                    update_fee,
+                )
+            return [tx_hash]
+        if route.exact_input:
+            stablecoin = route.sell.min_amount_out(slippage)
+            buy = self._quote_router_leg_exact_input(
+                route.output_symbol, SwapSide.STABLECOIN_TO_STOCK, stablecoin
+            )
+            return [
+                swapper.swap_exact_input(
+                    route.input_symbol,
+                    SwapSide.STOCK_TO_STABLECOIN,
+                    route.amount_in,
+                    stablecoin,
+                    deadline_seconds,
+                    update_fee,
+                ),
+                swapper.swap_exact_input(
+                    route.output_symbol,
+                    SwapSide.STABLECOIN_TO_STOCK,
+                    stablecoin,
+                    buy.min_amount_out(slippage),
+                    deadline_seconds,
+                    update_fee,
+                ),
+            ]
+        stablecoin = route.buy.max_amount_in(slippage)
+        sell = self._quote_router_leg_exact_output(
+            route.input_symbol, SwapSide.STOCK_TO_STABLECOIN, stablecoin
+        )
+        return [
+            swapper.swap_exact_output(
+                route.input_symbol,
+                SwapSide.STOCK_TO_STABLECOIN,
+                stablecoin,
+                sell.max_amount_in(slippage),
+                deadline_seconds,
+                update_fee,
+            ),
+            swapper.swap_exact_output(
+                route.output_symbol,
+                SwapSide.STABLECOIN_TO_STOCK,
+                route.amount_out,
+                stablecoin,
+                deadline_seconds,
+                update_fee,
+            ),
+        ]
+
+    def _router_pool_type(self, symbol: str) -> PoolType:
+        # The router trades a token on its price-feed pool when it has one.
+        pool_type = self._pool_types.get(symbol)
+        if pool_type is None:
+            pool_type = PoolType.PRICE_FEED if self._quoter.has_pool(symbol) else PoolType.AMM
+            self._pool_types[symbol] = pool_type
+        return pool_type
+
+    def _quote_router_leg_exact_input(
+        self, symbol: str, side: SwapSide, amount_in: Decimal
+    ) -> Quote:
+        return self.quote_exact_input(symbol, side, amount_in, self._router_pool_type(symbol))
+
+    def _quote_router_leg_exact_output(
+        self, symbol: str, side: SwapSide, amount_out: Decimal
+    ) -> Quote:
+        return self.quote_exact_output(symbol, side, amount_out, self._router_pool_type(symbol))
+
+    def _prefetch_router_legs(self, symbols: list[str]) -> None:
+        self._quoter.prefetch(
+            [s for s in symbols if self._router_pool_type(s) == PoolType.PRICE_FEED]
+        )
+
+    def _learned_router_gas(self, selector: str) -> Optional[int]:
+        router_ref = self._get_contracts().core.dex_router
+        if router_ref is None:
+            return None
+        return self._gas.function_gas_used(router_ref.address, selector)
+
+    def _gas_price(self) -> int:
+        fees = self._gas.fees(self._web3)
+        return fees.get("gasPrice") or fees["maxFeePerGas"]
+
+    @_pipelined
     def add_liquidity(self, params: AddLiquidityParams) -> str:
         self._require_logged_in_and_did_minted()
         return self._handler_for(params.pool_type).add_liquidity(params)
 
+    @_pipelined
     def remove_liquidity(self, params: RemoveLiquidityParams) -> str:
         return self._handler_for(params.pool_type).remove_liquidity(params)
 
@@ -707,12 +1321,12 @@ class PrimeDelta:
         """Return all AMM (V3) position NFT token IDs owned by the wallet."""
         npm = self._npm_contract()
         count = npm.functions.balanceOf(self._account.address).call()
-        return [
-            npm.functions.tokenOfOwnerByIndex(
-                self._account.address, i
-            ).call()
-            for i in range(count)
-        ]
+        return self._batch_reader.read(
+            [
+                npm.functions.tokenOfOwnerByIndex(self._account.address, i)
+                for i in range(count)
+            ]
+        )
 
     def lp_position(self, position_id: int) -> LPPosition:
         """Read AMM (V3) position info for a given NFT token ID."""
@@ -749,136 +1363,255 @@ class PrimeDelta:
         raise ValueError(f"Unknown pool type: {pool_type}")
 
     def _require_logged_in_and_did_minted(self) -> None:
-        account_status = self._primedelta_client.get_account_status()
+        account_status = self._account_status()
         if account_status != AccountStatus.DID_MINTED:
             raise AccountNotVerified()
 
+    @_invalidates_portfolio
     def _build_and_send_transaction(
         self, contract_function: ContractFunction, value: int = 0
     ) -> str:
         # Besu's "pending" nonce occasionally lags behind the actual account
         # state after a fresh receipt. When the chain rejects "nonce too low"
-        # it tells us the expected nonce in the error — parse it and retry.
-        import re
-
-        import time
-
+        # it tells us the expected nonce in the error — adopt it and retry.
         last_error: Optional[TransactionFailed] = None
-        for attempt in range(5):
+        for _ in range(5):
             try:
                 return self._build_and_send_transaction_once(contract_function, value)
             except TransactionFailed as e:
                 if "nonce too low" not in (e.reason or "").lower():
                     raise
                 last_error = e
-                # The error tells us exactly what the chain expects next; pin
-                # our local counter to that and let the chain settle briefly
-                # before retrying so failed-status mined txs propagate.
-                match = re.search(r"account nonce (\d+)", e.reason)
-                if match:
-                    self._next_nonce = int(match.group(1)) - 1  # reserve bumps +1
-                else:
-                    self._next_nonce = None
-                time.sleep(1.0 + attempt)  # back off: 1s, 2s, 3s, 4s, 5s
+                self._nonces.resync(_expected_nonce(e.reason))
         assert last_error is not None
         raise last_error
 
     def _build_and_send_transaction_once(
         self, contract_function: ContractFunction, value: int = 0
     ) -> str:
+        pending = self._sign_and_broadcast(contract_function, value)
+        if self._pending_transactions is not None:
+            # Inside `pipelined()`: the receipt is checked when the block exits.
+            self._pending_transactions.append(pending)
+        else:
+            self._await_receipts([pending])
+        return pending.tx_hash.hex()
+
+    def submit(self, contract_function: ContractFunction, value: int = 0) -> Future:
+        """Broadcast a transaction and return a future instead of blocking.
+
+        The future resolves to the tx hash once the receipt has the
+        configured confirmations, or raises TransactionFailed if it
+        reverted (TimeExhausted if it never mined). Receipts for every
+        submitted transaction are collected by one block-following thread.
+        """
+        pending = self._sign_and_broadcast(contract_function, value)
+        result: Future = Future()
+
+        def settle(receipt_future: Future) -> None:
+            self._portfolio_cache.invalidate()
+            try:
+                receipt = receipt_future.result()
+                self._gas.observe(pending.transaction, receipt)
+                if receipt["status"] == 0:
+                    raise self._reverted(pending, receipt)
+            except TimeExhausted as e:
+                self._nonces.resync()
+                result.set_exception(e)
+            except Exception as e:
+                result.set_exception(e)
+            else:
+                result.set_result(pending.tx_hash.hex())
+
+        self._receipt_tracker().track(pending.tx_hash).add_done_callback(settle)
+        return result
+
+    def _receipt_tracker(self) -> ReceiptTracker:
+        if self._receipts is None:
+            self._receipts = ReceiptTracker(
+                self._web3,
+                confirmations=self._receipt_confirmations,
+                timeout=self._receipt_timeout,
+                on_block=self._chain_clock.observe,
+            )
+        return self._receipts
+
+    @contextlib.contextmanager
+    def pipelined(self) -> Iterator[None]:
+        """Broadcast transactions sent inside the block without waiting on each.
+
+        Every transaction gets the next consecutive nonce from the local
+        tracker and goes out immediately, so dependent calls (approve → swap)
+        still execute in order but share block time instead of waiting one
+        block each. Receipts are awaited together when the block exits; the
+        first reverted transaction raises TransactionFailed naming the call
+        that caused it. Tx hashes returned inside the block are not mined yet.
+
+        Nested blocks join the outermost one. Multi-transaction methods such
+        as `swap_exact_input` and `add_liquidity` already run pipelined
+        unless the client was created with `pipeline_transactions=False`.
+        """
+        if self._pending_transactions is not None:
+            yield
+            return
+        pending: list[_PendingTransaction] = []
+        self._pending_transactions = pending
+        try:
+            yield
+        finally:
+            self._pending_transactions = None
+        self._await_receipts(pending)
+
+    def _sign_and_broadcast(
+        self, contract_function: ContractFunction, value: int = 0
+    ) -> _PendingTransaction:
         fn_name = getattr(contract_function, "fn_name", None) or "<unknown>"
         to_address = getattr(contract_function, "address", None)
         try:
             calldata = contract_function._encode_transaction_data()
         except Exception:
             calldata = None
+        fees = self._gas.fees(self._web3)
+        nonce = self._reserve_nonce()
         tx_params = {
             "from": self._account.address,
-            "gasPrice": self._web3.eth.gas_price,
-            "nonce": self._reserve_nonce(),
+            "nonce": nonce,
             "value": value,
-            # Pre-set a generous gas limit; chain refunds unused. Skipping the
-            # automatic `estimate_gas` step avoids a Besu race where the node
-            # advances the account nonce during simulation, causing the next
-            # submission to be rejected as "nonce too low".
-            "gas": 5_000_000,
+            **fees,
         }
-        # Pre-submit revert (gas estimation): no tx_hash exists yet.
+        # Nothing below reaches the node until `send_raw_transaction`, so any
+        # failure (a revert, a dropped RPC, a bad signature) hands the nonce
+        # back rather than leaving a gap every later send would queue behind.
         try:
-            transaction = contract_function.build_transaction(tx_params)
-        except ContractLogicError as e:
-            # Don't burn this nonce — the tx never went out.
-            self._next_nonce = None
-            trace = self._try_debug_trace_call(
-                {
-                    "from": self._account.address,
-                    "to": to_address,
-                    "data": calldata,
-                    "value": hex(value) if value else "0x0",
-                }
-            )
-            reason = _decode_revert(e)
-            deepest = _deepest_trace_error(trace)
-            if deepest and deepest != reason and "revert" in reason.lower():
-                reason = f"{deepest} (top-level: {reason})"
-            raise TransactionFailed(
-                fn_name,
-                reason,
-                to=to_address,
-                data=calldata,
-                trace=trace,
-            ) from e
-
-        signed_transaction = self._account.sign_transaction(transaction)
-        tx_hash = self._web3.eth.send_raw_transaction(
-            signed_transaction.rawTransaction
-        )
-        # Wait for the receipt so chained calls (e.g. approve → swap) see the
-        # state change. Without this the next tx's gas estimation runs against
-        # pre-approve state on chains with real block time (dev/prod), reverting.
-        receipt = self._web3.eth.wait_for_transaction_receipt(tx_hash)
-        if receipt["status"] == 0:
-            # Re-run as eth_call at the block BEFORE our tx mined to extract
-            # the revert reason. Using the mined block itself would replay
-            # against post-tx state — the account's nonce is already past
-            # ours, and Besu would mis-report "Nonce too low" instead of the
-            # actual revert.
-            reason = "reverted with no reason"
             try:
-                self._web3.eth.call(transaction, receipt["blockNumber"] - 1)
+                # Always pass a limit so web3 skips its own `estimate_gas`
+                # (see `GasStrategy` for the Besu nonce race); pipelined sends
+                # can't be simulated before the transaction they depend on
+                # has mined.
+                tx_params["gas"] = self._gas.gas_limit(
+                    self._web3,
+                    {
+                        "from": self._account.address,
+                        "to": to_address,
+                        "data": calldata,
+                        "value": value,
+                    },
+                    can_estimate=self._pending_transactions is None,
+                )
+                transaction = contract_function.build_transaction(tx_params)
             except ContractLogicError as e:
-                reason = _decode_revert(e)
-            except Exception as e:
-                reason = str(e)
-            trace = self._try_debug_trace_call(transaction)
-            deepest = _deepest_trace_error(trace)
-            if deepest and deepest != reason and "revert" in reason.lower():
-                reason = f"{deepest} (top-level: {reason})"
-            raise TransactionFailed(
-                fn_name,
-                reason,
-                tx_hash=tx_hash.hex(),
-                to=to_address,
-                data=calldata,
-                trace=trace,
+                # Pre-submit revert (gas estimation): no tx_hash exists yet.
+                trace = self._try_debug_trace_call(
+                    {
+                        "from": self._account.address,
+                        "to": to_address,
+                        "data": calldata,
+                        "value": hex(value) if value else "0x0",
+                    }
+                )
+                reason = _with_deepest_trace(_decode_revert(e), trace)
+                raise TransactionFailed(
+                    fn_name,
+                    reason,
+                    to=to_address,
+                    data=calldata,
+                    trace=trace,
+                ) from e
+            signed_transaction = self._account.sign_transaction(transaction)
+        except BaseException:
+            self._nonces.release(nonce)
+            raise
+
+        try:
+            tx_hash = self._web3.eth.send_raw_transaction(
+                signed_transaction.rawTransaction
             )
-        return tx_hash.hex()
+        except Exception:
+            # The node may or may not have taken it; ask the chain next time.
+            self._nonces.resync()
+            raise
+        return _PendingTransaction(
+            fn_name=fn_name,
+            tx_hash=tx_hash,
+            transaction=transaction,
+            to=to_address,
+            data=calldata,
+        )
 
-    def _reserve_nonce(self) -> int:
-        """Return the next nonce to use.
+    def _await_receipts(self, pending: list[_PendingTransaction]) -> None:
+        """Wait until every pending tx has mined; raise for the first revert.
 
-        Queries chain via `eth_getTransactionCount(pending)` each time. If the
-        chain's view hasn't caught up since our last submission (some Besu/PoA
-        nodes lag), bump past our last-used value. Never goes backwards.
+        All of them were broadcast already, so waiting on each in nonce order
+        costs roughly as long as the last one takes to mine — not one block
+        per transaction.
         """
-        chain_nonce = self._web3.eth.get_transaction_count(
+        try:
+            if self._track_receipts:
+                receipts = self._receipt_tracker().wait([p.tx_hash for p in pending])
+            else:
+                receipts = [
+                    self._web3.eth.wait_for_transaction_receipt(p.tx_hash)
+                    for p in pending
+                ]
+        except TimeExhausted:
+            # Likely dropped from the mempool: its nonce (and every later one
+            # of ours) is free again, so re-read the chain before the next tx.
+            self._nonces.resync()
+            for p in pending:
+                self._forget_approval(p)
+            raise
+        finally:
+            if pending:
+                self._portfolio_cache.invalidate()
+        for p, receipt in zip(pending, receipts):
+            self._gas.observe(p.transaction, receipt)
+            if receipt["status"] == 0:
+                self._forget_approval(p)
+        for p, receipt in zip(pending, receipts):
+            if receipt["status"] == 0:
+                raise self._reverted(p, receipt)
+
+    def _forget_approval(self, pending: _PendingTransaction) -> None:
+        """Drop the cached allowance an unmined or reverted approve set."""
+        spender = _approve_spender(pending)
+        if spender is not None:
+            self._allowances.invalidate(pending.to, spender)
+
+    def _reverted(
+        self, pending: _PendingTransaction, receipt: Any
+    ) -> TransactionFailed:
+        # Re-run as eth_call at the block BEFORE our tx mined to extract
+        # the revert reason. Using the mined block itself would replay
+        # against post-tx state — the account's nonce is already past
+        # ours, and Besu would mis-report "Nonce too low" instead of the
+        # actual revert.
+        reason = "reverted with no reason"
+        try:
+            self._web3.eth.call(pending.transaction, receipt["blockNumber"] - 1)
+        except ContractLogicError as e:
+            reason = _decode_revert(e)
+        except Exception as e:
+            reason = str(e)
+        trace = self._try_debug_trace_call(pending.transaction)
+        reason = _with_deepest_trace(reason, trace)
+        return TransactionFailed(
+            pending.fn_name,
+            reason,
+            tx_hash=pending.tx_hash.hex(),
+            to=pending.to,
+            data=pending.data,
+            trace=trace,
+        )
+
+    def _reserve_nonce(self) -> int:
+        """Return the next nonce to use; see `NonceManager`."""
+        return self._nonces.allocate(self._chain_nonce)
+
+    def _chain_nonce(self) -> int:
+        return self._web3.eth.get_transaction_count(
             self._web3.to_checksum_address(self._account.address),
             "pending",
         )
-        if self._next_nonce is not None and chain_nonce <= self._next_nonce:
-            chain_nonce = self._next_nonce + 1
-        self._next_nonce = chain_nonce
-        return chain_nonce
 
     def _try_debug_trace_call(self, tx: dict) -> Optional[Any]:
         """Attempt `debug_traceCall` for a richer call trace.
@@ -1,12 +1,19 @@
 import json
+import os
+import queue
+import threading
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, TypeVar
 
 import requests
+from requests.adapters import HTTPAdapter
 from sseclient import SSEClient
 
+from primedelta.price_batches import PriceBatch, PriceBatcher
+from primedelta.pyth_feeds import PythFeedDirectory
 from primedelta.settings import PRIMEDELTA_BASE_URL, PYTH_HERMES_BASE_URL
+from primedelta.streaming import ResilientPriceStream
 from primedelta.types import (
     AccountStatus,
     ClaimableWithdrawal,
@@ -27,6 +34,9 @@ from primedelta.types import (
 )
 
 
+_T = TypeVar("_T")
+
+
 class NotLoggedIn(Exception):
     pass
 
@@ -44,18 +54,77 @@ class UserSignedMessageVerificationError(Exception):
     pass
 
 
+def _pooled_session(
+    pool_connections: int, pool_maxsize: int, pool_block: bool
+) -> requests.Session:
+    """Build a keep-alive session backed by urllib3 connection pools.
+
+    `pool_connections` is the number of per-host pools kept alive (we talk to
+    the backend and Hermes, so a handful is plenty); `pool_maxsize` caps the
+    sockets held open to any single host. With `pool_block=True` callers wait
+    for a free socket instead of opening a throwaway one past the limit.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
 class PrimeDeltaClient:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        pyth_feed_cache_path: Optional[str | os.PathLike] = None,
+        pyth_feed_ttl: float = 24 * 60 * 60,
+    ) -> None:
         self._token = None
+        # Every endpoint goes through this session so repeated calls reuse
+        # the same TCP+TLS connection instead of handshaking per request.
+        self._session = _pooled_session(pool_connections, pool_maxsize, pool_block)
+        # Feed ids come from one bulk Hermes listing, reused for
+        # `pyth_feed_ttl` seconds (and across processes via the cache file).
+        self._pyth_feeds = PythFeedDirectory(
+            self._list_pyth_equity_feeds,
+            ttl=pyth_feed_ttl,
+            cache_path=pyth_feed_cache_path,
+        )
+
+    def close(self) -> None:
+        """Close pooled connections. The client must not be used afterwards."""
+        self._session.close()
+
+    def on_auth_failure(self, callback: Callable[[], None]) -> None:
+        """Call `callback` whenever the backend answers 401 or 403."""
+
+        def hook(response: requests.Response, *args, **kwargs) -> None:
+            if response.status_code in (401, 403) and response.url.startswith(
+                PRIMEDELTA_BASE_URL
+            ):
+                callback()
+
+        self._session.hooks["response"].append(hook)
+
+    def __enter__(self) -> "PrimeDeltaClient":
+        return self
 
-    @staticmethod
-    def get_nonce() -> str:
-        response = requests.get(f"{PRIMEDELTA_BASE_URL}/users/nonce/")
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_nonce(self) -> str:
+        response = self._session.get(f"{PRIMEDELTA_BASE_URL}/users/nonce/")
         response.raise_for_status()
         return response.json()["nonce"]
 
     def login(self, message: str, signature: str, nonce: str) -> None:
-        response = requests.post(
+        response = self._session.post(
             f"{PRIMEDELTA_BASE_URL}/users/verify/",
             data={"message": message, "signature": signature, "nonce": nonce},
         )
@@ -71,7 +140,7 @@ class PrimeDeltaClient:
         self._token = None
 
     def get_account_status(self) -> AccountStatus:
-        response = requests.get(
+        response = self._session.get(
             f"{PRIMEDELTA_BASE_URL}/verification-status/",
             headers={"Authorization": f"Token {self._token}"},
         )
@@ -85,59 +154,25 @@ class PrimeDeltaClient:
         response = self._authorized_get(
             "/pending-transfers/", {"page": page, "size": size}
         )
-        items = [
-            Transfer(
-                transaction_id=item["transactionId"],
-                amount=Decimal(item["amount"]),
-                symbol=item["symbol"],
-                type=TransactionType(item["type"]),
-                status=TransferHistoryStatus(item["status"]),
-            )
-            for item in response["items"]
-        ]
-        return items
+        return _parse_transfers(response)
 
     def get_closed_transfers(self, page: int, size: int) -> list[Transfer]:
         response = self._authorized_get(
             "/closed-transfers/", {"page": page, "size": size}
         )
-        items = [
-            Transfer(
-                transaction_id=item["transactionId"],
-                amount=Decimal(item["amount"]),
-                symbol=item["symbol"],
-                type=TransactionType(item["type"]),
-                status=TransferHistoryStatus(item["status"]),
-            )
-            for item in response["items"]
-        ]
-        return items
+        return _parse_transfers(response)
 
     def get_distributions(self, page: int, size: int) -> list[Distribution]:
         response = self._authorized_get(
             "/closed-distributions/", {"page": page, "size": size}
         )
-        items = [
-            Distribution(
-                amount=Decimal(item["amount"]),
-                type=DistributionType(item["type"]),
-                stock_symbol=item["stockSymbol"],
-                stock_quantity=Decimal(item["quantity"]),
-            )
-            for item in response["items"]
-        ]
-        return items
+        return _parse_distributions(response)
 
     def create_digital_identity_signature(self) -> DigitalIdentitySignature:
         response = self._authorized_post(
             "/digital-identity-signature/", {"requestedFromLibrary": True}
         )
-        return DigitalIdentitySignature(
-            signature=response["signature"],
-            nonce=response["nonce"],
-            data=response["data"],
-            is_pro=response["isPro"],
-        )
+        return _parse_digital_identity_signature(response)
 
     def cancel_order(self, order_id: int) -> None:
         self._authorized_delete(f"/open-orders/{order_id}/")
@@ -148,45 +183,11 @@ class PrimeDeltaClient:
 
     def open_orders(self, page: int, size: int) -> list[Order]:
         response = self._authorized_get("/open-orders/", {"page": page, "size": size})
-        items = [
-            Order(
-                id=item["id"],
-                order_side=OrderSide(item["actionType"]),
-                type=item["type"],
-                symbol=item["stockSymbol"],
-                quantity=int(Decimal(item["quantity"])),
-                price=Decimal(item["price"]),
-                status=OrderStatus.PENDING,  # Open orders are always pending
-                date_of_cancellation=(
-                    date.fromisoformat(item["dateOfCancellation"])
-                    if item["dateOfCancellation"]
-                    else None
-                ),
-            )
-            for item in response["items"]
-        ]
-        return items
+        return _parse_open_orders(response)
 
     def closed_orders(self, page: int, size: int) -> list[Order]:
         response = self._authorized_get("/closed-orders/", {"page": page, "size": size})
-        items = [
-            Order(
-                id=item["id"],
-                order_side=OrderSide(item["actionType"]),
-                type=item["type"],
-                symbol=item["stockSymbol"],
-                quantity=int(Decimal(item["quantity"])),
-                price=Decimal(item["price"]) if item["price"] is not None else None,
-                status=OrderStatus(item["status"]),
-                date_of_cancellation=(
-                    date.fromisoformat(item["dateOfCancellation"])
-                    if item["dateOfCancellation"]
-                    else None
-                ),
-            )
-            for item in response["items"]
-        ]
-        return items
+        return _parse_closed_orders(response)
 
     def get_deposit_stocks_signature(
         self, amount: int, symbol: str
@@ -220,42 +221,11 @@ class PrimeDeltaClient:
 
     def portfolio(self) -> Portfolio:
         response = self._authorized_get("/portfolio/")
-        balance = response["balance"]
-        positions = response["stocks"]
-        return Portfolio(
-            buying_power=Decimal(balance["available"]),
-            total_equity=Decimal(balance["equity"]),
-            total_funds=Decimal(balance["funds"]),
-            profit_loss=Decimal(balance["profitLoss"]),
-            total_value=Decimal(balance["totalValue"]),
-            positions=[
-                Position(
-                    symbol=stock["symbol"],
-                    name=stock["name"],
-                    total_owned=Decimal(stock["totalOwned"]),
-                    available_to_sell=Decimal(stock["availableToSell"]),
-                    average_purchase_price=Decimal(stock["averagePurchasePrice"]),
-                    last_market_price=Decimal(stock["lastMarketPrice"]),
-                    profit_loss=Decimal(stock["profitLoss"]),
-                    profit_loss_percentage=Decimal(stock["profitLossPercentage"]),
-                    is_offboarded=stock["isOffboarded"],
-                    multiplier_numerator=stock["multiplierNumerator"],
-                    multiplier_denominator=stock["multiplierDenominator"],
-                )
-                for stock in positions
-            ],
-        )
+        return _parse_portfolio(response)
 
     def claimable_withdrawals(self) -> list[ClaimableWithdrawal]:
         response = self._authorized_get("/claimable-withdrawals/")
-        return [
-            ClaimableWithdrawal(
-                withdrawal_id=item["withdrawalId"],
-                amount=Decimal(item["amount"]),
-                asset_type=item["assetType"],
-            )
-            for item in response["items"]
-        ]
+        return _parse_claimable_withdrawals(response)
 
     def send_limit_order(
         self,
@@ -265,14 +235,9 @@ class PrimeDeltaClient:
         price_limit: Decimal,
         date_of_cancellation: Optional[date],
     ) -> int:
-        request_data = {
-            "amount": str(amount),
-            "stockSymbol": asset_type,
-            "priceLimit": str(price_limit),
-            "dateOfCancellation": (
-                str(date_of_cancellation) if date_of_cancellation is not None else None
-            ),
-        }
+        request_data = _limit_order_request(
+            amount, asset_type, price_limit, date_of_cancellation
+        )
         response = self._authorized_post(
             f"/orders/limit/{order_side.value.lower()}/", request_data
         )
@@ -293,41 +258,36 @@ class PrimeDeltaClient:
         return response["orderId"]
 
     def stocks(self) -> dict[str, Stock]:
-        response = requests.get(f"{PRIMEDELTA_BASE_URL}/stocks/", {"size": 100})
+        response = self._session.get(
+            f"{PRIMEDELTA_BASE_URL}/stocks/", params={"size": 100}
+        )
         response.raise_for_status()
-        stocks_data = response.json()["items"]
-        return {
-            stock["symbol"]: Stock(
-                symbol=stock["symbol"],
-                name=stock["name"],
-                cusip=stock["cusipId"],
-                contract_address=stock["smartContractAddress"],
-                number_of_tokens_in_circulation=Decimal(stock["numberOfTokens"]),
-            )
-            for stock in stocks_data
-        }
+        return _parse_stocks(response.json())
 
     def prices_stream_access_token(self) -> str:
         if not self._token:
             raise NotLoggedIn()
         return self._token
 
-    def prices_stream(self, prices_stream_access_token: str):
-        for sse_message in SSEClient(
+    def prices_stream(
+        self, prices_stream_access_token: str, **stream_options: Any
+    ) -> ResilientPriceStream:
+        """Broker price stream that reconnects and resumes across disconnects.
+
+        `stream_options` are passed to `ResilientPriceStream` (backoff,
+        idle timeout, gap detection); its `metrics` describe the connection.
+        """
+        return ResilientPriceStream(
+            self._session,
             f"{PRIMEDELTA_BASE_URL}/prices-stream/",
+            parse=lambda data: _parse_broker_price(json.loads(data)),
             params={"token": prices_stream_access_token},
-        ):
-            price_data = json.loads(sse_message.data)
-            yield Price(
-                symbol=price_data["symbol"],
-                last_price=Decimal(price_data["price"]),
-                timestamp=self._parse_timestamp(price_data["timestamp"]),
-                percentage_change=Decimal(price_data["percentageChange"]),
-            )
+            fatal=_fatal_stream_error,
+            **stream_options,
+        )
 
-    @staticmethod
-    def is_market_open() -> bool:
-        response = requests.get(f"{PRIMEDELTA_BASE_URL}/market-status/")
+    def is_market_open(self) -> bool:
+        response = self._session.get(f"{PRIMEDELTA_BASE_URL}/market-status/")
         response.raise_for_status()
         return response.json()["isMarketOpen"]
 
@@ -340,9 +300,35 @@ class PrimeDeltaClient:
         """
         if not symbols:
             return []
+        return _parse_signed_price_updates(self._fetch_signed_prices(symbols))
+
+    def get_signed_price_updates_by_symbol(self, symbols: list[str]) -> dict[str, bytes]:
+        """Like `get_signed_price_updates`, keyed by symbol.
+
+        Symbols the backend has no price for are absent from the result.
+        """
+        if not symbols:
+            return {}
+        updates = _parse_signed_price_updates_by_symbol(
+            symbols, self._fetch_signed_prices(symbols)
+        )
+        if updates is None:
+            # Untagged response with skipped symbols: positions can't be
+            # trusted, so ask per symbol instead.
+            updates = {}
+            for symbol in symbols:
+                updates.update(
+                    _parse_signed_price_updates_by_symbol(
+                        [symbol], self._fetch_signed_prices([symbol])
+                    )
+                    or {}
+                )
+        return updates
+
+    def _fetch_signed_prices(self, symbols: list[str]) -> list[dict]:
         # `/signed-prices/` accepts Bearer auth, unlike most other endpoints
         # which use `Authorization: Token <token>`.
-        response = requests.get(
+        response = self._session.get(
             f"{PRIMEDELTA_BASE_URL}/signed-prices/",
             params={"symbols": ",".join(symbols)},
             headers={"Authorization": f"Bearer {self._token}"},
@@ -350,98 +336,97 @@ class PrimeDeltaClient:
         if response.status_code == 401:
             raise NotLoggedIn()
         response.raise_for_status()
-        return [bytes.fromhex(item["signature"].removeprefix("0x")) for item in response.json()]
+        return response.json()
 
-    @staticmethod
-    def get_pyth_feed_ids(symbols: list[str]) -> dict[str, str]:
+    def get_pyth_feed_ids(self, symbols: list[str]) -> dict[str, str]:
         """Fetch Pyth price feed IDs for given stock symbols.
 
         Returns a mapping of symbol -> pyth_feed_id for regular market hours feeds.
         """
-        feed_ids = {}
-        for symbol in symbols:
-            response = requests.get(
-                f"{PYTH_HERMES_BASE_URL}/v2/price_feeds",
-                params={"query": symbol, "asset_type": "equity"},
-            )
-            response.raise_for_status()
-            feeds = response.json()
-
-            # Find the regular market hours feed (no suffix like .PRE, .POST, .ON)
-            for feed in feeds:
-                feed_symbol = feed.get("attributes", {}).get("symbol", "")
-                base = feed.get("attributes", {}).get("base", "")
-                if base == symbol and feed_symbol == f"Equity.US.{symbol}/USD":
-                    feed_ids[symbol] = feed["id"]
-                    break
+        return self._pyth_feeds.resolve(symbols)
 
-        return feed_ids
+    def _list_pyth_equity_feeds(self, query: Optional[str] = None) -> list[dict]:
+        params = {"asset_type": "equity"}
+        if query is not None:
+            params["query"] = query
+        response = self._session.get(f"{PYTH_HERMES_BASE_URL}/v2/price_feeds", params=params)
+        response.raise_for_status()
+        return response.json()
 
-    def pyth_prices_stream(self, symbols: list[str]):
+    def pyth_prices_stream(self, symbols: list[str]) -> "_HermesStream[Price]":
         """Stream prices from Pyth Hermes API for given stock symbols.
 
         This method does not require authentication and can be used when not logged in.
+        Unlike a generator, the stream can be closed from another thread,
+        which also closes its connection.
         """
-        feed_ids = self.get_pyth_feed_ids(symbols)
-
-        if not feed_ids:
-            return
-
-        # Build query string with all feed IDs
-        ids_param = "&".join(f"ids[]={fid}" for fid in feed_ids.values())
-        stream_url = f"{PYTH_HERMES_BASE_URL}/v2/updates/price/stream?{ids_param}"
-
-        # Create reverse mapping: feed_id -> symbol
-        id_to_symbol = {v: k for k, v in feed_ids.items()}
+        return _HermesStream(
+            self._session, lambda: self.get_pyth_feed_ids(symbols), _parse_pyth_prices
+        )
 
-        for sse_message in SSEClient(stream_url):
-            if not sse_message.data:
-                continue
+    def pyth_price_batches(
+        self, symbols: list[str], batcher: Optional[PriceBatcher] = None
+    ) -> Iterator[PriceBatch]:
+        """`pyth_prices_stream` as columnar `PriceBatch`es.
+
+        Ticks go straight from the Hermes payload into the batch columns
+        without building `Price` objects. Pass a `PriceBatcher` to choose
+        the batch size, time window or scaled-integer prices. Hermes is
+        read on a background thread, so a batch is cut when its window
+        ends even if the feed has gone quiet, and whatever is pending when
+        the stream ends is flushed.
+        """
+        batcher = batcher or PriceBatcher()
+        stream = _HermesStream(
+            self._session,
+            lambda: self.get_pyth_feed_ids(symbols),
+            lambda data, id_to_symbol: [_parse_pyth_ticks(data, id_to_symbol)],
+        )
+        received: queue.Queue = queue.Queue()
 
+        def read() -> None:
             try:
-                data = json.loads(sse_message.data)
-                parsed_prices = data.get("parsed", [])
-
-                for price_data in parsed_prices:
-                    feed_id = price_data.get("id", "")
-                    symbol = id_to_symbol.get(feed_id)
-
-                    if symbol and "price" in price_data:
-                        price_info = price_data["price"]
-                        # Convert price using exponent (e.g., price=25821026, expo=-5 -> 258.21026)
-                        raw_price = int(price_info["price"])
-                        expo = int(price_info["expo"])
-                        actual_price = Decimal(raw_price) * Decimal(10) ** expo
-
-                        publish_time = price_info.get("publish_time", 0)
-                        timestamp = datetime.fromtimestamp(publish_time, tz=timezone.utc)
-
-                        yield Price(
-                            symbol=symbol,
-                            last_price=actual_price,
-                            timestamp=timestamp,
-                            percentage_change=Decimal(0),  # Pyth doesn't provide percentage change
-                        )
-            except (json.JSONDecodeError, KeyError, ValueError):
-                continue
-
-    @staticmethod
-    def _parse_timestamp(timestamp: str) -> datetime:
-        return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc)
+                for ticks in stream:
+                    received.put(ticks)
+            except Exception as e:
+                received.put(e)
+            finally:
+                received.put(None)
+
+        reader = threading.Thread(target=read, name="primedelta-pyth-batches", daemon=True)
+        reader.start()
+        try:
+            while True:
+                try:
+                    ticks = received.get(timeout=batcher.due_in())
+                except queue.Empty:
+                    batch = batcher.poll()
+                    if batch is not None:
+                        yield batch
+                    continue
+                if ticks is None:
+                    break
+                if isinstance(ticks, Exception):
+                    raise ticks
+                for symbol, raw_price, expo, published in ticks:
+                    batch = batcher.append(
+                        symbol, raw_price, expo, published * 1_000_000_000
+                    )
+                    if batch is not None:
+                        yield batch
+        finally:
+            stream.close()
+        batch = batcher.flush()
+        if batch is not None:
+            yield batch
 
     def _authorized_post(self, endpoint: str, request_data: dict) -> dict:
-        response = requests.post(
+        response = self._session.post(
             f"{PRIMEDELTA_BASE_URL}{endpoint}",
             headers={"Authorization": f"Token {self._token}"},
             json=request_data,
         )
-        if response.status_code == 400:
-            error_code = response.json()["errorCode"]
-            raise APIError(error_code)
-        elif response.status_code == 401:
-            raise NotLoggedIn()
-        elif response.status_code == 403:
-            raise AuthorizationError()
+        _raise_for_api_status(response.status_code, response.json)
         response.raise_for_status()
         if response.status_code == 204:
             return {}
@@ -450,26 +435,343 @@ class PrimeDeltaClient:
     def _authorized_get(
         self, endpoint: str, params: Optional[dict[str, str | int]] = None
     ) -> dict:
-        response = requests.get(
+        response = self._session.get(
             f"{PRIMEDELTA_BASE_URL}{endpoint}",
             headers={"Authorization": f"Token {self._token}"},
             params=params,
         )
-        if response.status_code == 400:
-            error_code = response.json()["errorCode"]
-            raise APIError(error_code)
-        elif response.status_code == 401:
-            raise NotLoggedIn()
-        elif response.status_code == 403:
-            raise AuthorizationError()
+        _raise_for_api_status(response.status_code, response.json)
         response.raise_for_status()
         return response.json()
 
     def _authorized_delete(self, endpoint: str) -> None:
-        response = requests.delete(
+        response = self._session.delete(
             f"{PRIMEDELTA_BASE_URL}{endpoint}",
             headers={"Authorization": f"Token {self._token}"},
         )
         if response.status_code == 401:
             raise NotLoggedIn()
         response.raise_for_status()
+
+
+class _HermesStream(Iterator[_T]):
+    """What `parse` makes of each Hermes SSE message; `close` is safe from
+    any thread.
+
+    It is handed to `SSEClient` as its session, so every (re)connect goes
+    through `get`: `close` shuts the response being read, and once closed
+    no new connection is opened. Feed ids are resolved on first `next`.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        feed_ids: Callable[[], dict[str, str]],
+        parse: Callable[[str, dict[str, str]], Iterable[_T]],
+    ) -> None:
+        self._session = session
+        self._feed_ids = feed_ids
+        self._parse = parse
+        self._closed = threading.Event()
+        self._response: Optional[requests.Response] = None
+        self._messages: Optional[SSEClient] = None
+        self._items = self._iterate()
+
+    def __next__(self) -> _T:
+        return next(self._items)
+
+    def close(self) -> None:
+        self._closed.set()
+        messages = self._messages
+        if messages is not None and hasattr(messages, "retry"):
+            messages.retry = 0  # Don't wait to find out it can't reconnect.
+        response = self._response
+        if response is not None:
+            response.close()
+        try:
+            self._items.close()
+        except ValueError:
+            pass  # Being iterated on another thread; it stops on its own.
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        if self._closed.is_set():
+            raise requests.ConnectionError("stream closed")
+        response = self._response = self._session.get(url, **kwargs)
+        if self._closed.is_set():
+            response.close()
+        return response
+
+    def _iterate(self) -> Generator[_T, None, None]:
+        feed_ids = self._feed_ids()
+        if not feed_ids:
+            return
+        # Create reverse mapping: feed_id -> symbol
+        id_to_symbol = {v: k for k, v in feed_ids.items()}
+        try:
+            url = _pyth_stream_url(feed_ids.values())
+            self._messages = SSEClient(url, session=self)
+            for sse_message in self._messages:
+                if self._closed.is_set():
+                    return
+                if not sse_message.data:
+                    continue
+                yield from self._parse(sse_message.data, id_to_symbol)
+        except Exception:
+            # Reading a response `close` shut fails however it fails.
+            if not self._closed.is_set():
+                raise
+        finally:
+            self._response = None
+
+
+def _raise_for_api_status(status_code: int, json_body: Callable[[], Any]) -> None:
+    """Map the backend's auth/validation status codes onto SDK exceptions.
+
+    `json_body` is only invoked for 400s, which carry an `errorCode` payload.
+    """
+    if status_code == 400:
+        raise APIError(json_body()["errorCode"])
+    elif status_code == 401:
+        raise NotLoggedIn()
+    elif status_code == 403:
+        raise AuthorizationError()
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc)
+
+
+def _parse_date_of_cancellation(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def _parse_transfers(response: dict) -> list[Transfer]:
+    return [
+        Transfer(
+            transaction_id=item["transactionId"],
+            amount=Decimal(item["amount"]),
+            symbol=item["symbol"],
+            type=TransactionType(item["type"]),
+            status=TransferHistoryStatus(item["status"]),
+        )
+        for item in response["items"]
+    ]
+
+
+def _parse_distributions(response: dict) -> list[Distribution]:
+    return [
+        Distribution(
+            amount=Decimal(item["amount"]),
+            type=DistributionType(item["type"]),
+            stock_symbol=item["stockSymbol"],
+            stock_quantity=Decimal(item["quantity"]),
+        )
+        for item in response["items"]
+    ]
+
+
+def _parse_digital_identity_signature(response: dict) -> DigitalIdentitySignature:
+    return DigitalIdentitySignature(
+        signature=response["signature"],
+        nonce=response["nonce"],
+        data=response["data"],
+        is_pro=response["isPro"],
+    )
+
+
+def _parse_open_orders(response: dict) -> list[Order]:
+    return [
+        Order(
+            id=item["id"],
+            order_side=OrderSide(item["actionType"]),
+            type=item["type"],
+            symbol=item["stockSymbol"],
+            quantity=int(Decimal(item["quantity"])),
+            price=Decimal(item["price"]),
+            status=OrderStatus.PENDING,  # Open orders are always pending
+            date_of_cancellation=_parse_date_of_cancellation(
+                item["dateOfCancellation"]
+            ),
+        )
+        for item in response["items"]
+    ]
+
+
+def _parse_closed_orders(response: dict) -> list[Order]:
+    return [
+        Order(
+            id=item["id"],
+            order_side=OrderSide(item["actionType"]),
+            type=item["type"],
+            symbol=item["stockSymbol"],
+            quantity=int(Decimal(item["quantity"])),
+            price=Decimal(item["price"]) if item["price"] is not None else None,
+            status=OrderStatus(item["status"]),
+            date_of_cancellation=_parse_date_of_cancellation(
+                item["dateOfCancellation"]
+            ),
+        )
+        for item in response["items"]
+    ]
+
+
+def _parse_portfolio(response: dict) -> Portfolio:
+    balance = response["balance"]
+    positions = response["stocks"]
+    return Portfolio(
+        buying_power=Decimal(balance["available"]),
+        total_equity=Decimal(balance["equity"]),
+        total_funds=Decimal(balance["funds"]),
+        profit_loss=Decimal(balance["profitLoss"]),
+        total_value=Decimal(balance["totalValue"]),
+        positions=[
+            Position(
+                symbol=stock["symbol"],
+                name=stock["name"],
+                total_owned=Decimal(stock["totalOwned"]),
+                available_to_sell=Decimal(stock["availableToSell"]),
+                average_purchase_price=Decimal(stock["averagePurchasePrice"]),
+                last_market_price=Decimal(stock["lastMarketPrice"]),
+                profit_loss=Decimal(stock["profitLoss"]),
+                profit_loss_percentage=Decimal(stock["profitLossPercentage"]),
+                is_offboarded=stock["isOffboarded"],
+                multiplier_numerator=stock["multiplierNumerator"],
+                multiplier_denominator=stock["multiplierDenominator"],
+            )
+            for stock in positions
+        ],
+    )
+
+
+def _parse_claimable_withdrawals(response: dict) -> list[ClaimableWithdrawal]:
+    return [
+        ClaimableWithdrawal(
+            withdrawal_id=item["withdrawalId"],
+            amount=Decimal(item["amount"]),
+            asset_type=item["assetType"],
+        )
+        for item in response["items"]
+    ]
+
+
+def _limit_order_request(
+    amount: int,
+    asset_type: str,
+    price_limit: Decimal,
+    date_of_cancellation: Optional[date],
+) -> dict:
+    return {
+        "amount": str(amount),
+        "stockSymbol": asset_type,
+        "priceLimit": str(price_limit),
+        "dateOfCancellation": (
+            str(date_of_cancellation) if date_of_cancellation is not None else None
+        ),
+    }
+
+
+def _parse_stocks(response: dict) -> dict[str, Stock]:
+    return {
+        stock["symbol"]: Stock(
+            symbol=stock["symbol"],
+            name=stock["name"],
+            cusip=stock["cusipId"],
+            contract_address=stock["smartContractAddress"],
+            number_of_tokens_in_circulation=Decimal(stock["numberOfTokens"]),
+        )
+        for stock in response["items"]
+    }
+
+
+def _parse_broker_price(price_data: dict) -> Price:
+    return Price(
+        symbol=price_data["symbol"],
+        last_price=Decimal(price_data["price"]),
+        timestamp=_parse_timestamp(price_data["timestamp"]),
+        percentage_change=Decimal(price_data["percentageChange"]),
+    )
+
+
+def _fatal_stream_error(error: Exception) -> Optional[Exception]:
+    """Client errors won't fix themselves on reconnect; everything else might."""
+    response = getattr(error, "response", None)
+    if not isinstance(error, requests.HTTPError) or response is None:
+        return None
+    if response.status_code == 401:
+        return NotLoggedIn()
+    if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+        return error
+    return None
+
+
+def _parse_signed_price_updates(response: list[dict]) -> list[bytes]:
+    return [bytes.fromhex(item["signature"].removeprefix("0x")) for item in response]
+
+
+def _parse_signed_price_updates_by_symbol(
+    symbols: list[str], response: list[dict]
+) -> Optional[dict[str, bytes]]:
+    """Pair updates with symbols; None if the response can't be attributed."""
+    updates = _parse_signed_price_updates(response)
+    if not updates:
+        return {}
+    if all("symbol" in item for item in response):
+        return {item["symbol"]: update for item, update in zip(response, updates)}
+    if len(updates) == len(symbols):
+        return dict(zip(symbols, updates))
+    return None
+
+
+def _pyth_stream_url(feed_ids: Iterable[str]) -> str:
+    # Build query string with all feed IDs
+    ids_param = "&".join(f"ids[]={fid}" for fid in feed_ids)
+    return f"{PYTH_HERMES_BASE_URL}/v2/updates/price/stream?{ids_param}"
+
+
+def _parse_pyth_ticks(
+    message_data: str, id_to_symbol: dict[str, str]
+) -> list[tuple[str, int, int, int]]:
+    """Decode one Hermes SSE payload into raw `(symbol, price, expo,
+    publish_time)` ticks for the symbols we asked for.
+
+    Malformed payloads are skipped rather than raised so one bad frame doesn't
+    tear down a long-lived stream.
+    """
+    ticks = []
+    try:
+        data = json.loads(message_data)
+        parsed_prices = data.get("parsed", [])
+
+        for price_data in parsed_prices:
+            feed_id = price_data.get("id", "")
+            symbol = id_to_symbol.get(feed_id)
+
+            if symbol and "price" in price_data:
+                price_info = price_data["price"]
+                ticks.append(
+                    (
+                        symbol,
+                        int(price_info["price"]),
+                        int(price_info["expo"]),
+                        int(price_info.get("publish_time", 0)),
+                    )
+                )
+    except (json.JSONDecodeError, KeyError, ValueError):
+        return ticks
+    return ticks
+
+
+def _parse_pyth_prices(message_data: str, id_to_symbol: dict[str, str]) -> list[Price]:
+    """Decode one Hermes SSE payload into `Price`s; see `_parse_pyth_ticks`."""
+    return [
+        Price(
+            symbol=symbol,
+            # e.g. price=25821026, expo=-5 -> 258.21026
+            last_price=Decimal(raw_price) * Decimal(10) ** expo,
+            timestamp=datetime.fromtimestamp(publish_time, tz=timezone.utc),
+            percentage_change=Decimal(0),  # Pyth doesn't provide percentage change
+        )
+        for symbol, raw_price, expo, publish_time in _parse_pyth_ticks(
+            message_data, id_to_symbol
+        )
+    ]
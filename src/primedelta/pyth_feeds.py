@@ -0,0 +1,209 @@
+"""Symbol → Pyth feed id directory.
+
+Hermes' `/v2/price_feeds` answers one query per call, and feed ids for a
+listed equity practically never change. `PythFeedDirectory` lists every
+equity feed once, indexes the regular-hours ones by symbol locally, and
+keeps the index for `ttl` seconds — optionally in a JSON file, so a fresh
+process starts streaming without touching `/v2/price_feeds` at all.
+
+`PythFeedIndex` is that index without any I/O: both clients drive one,
+and differ only in how they fetch from Hermes. Nothing is fetched while
+its lock is held.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+_CACHE_VERSION = 1
+# After a failed bulk listing, don't retry it on every lookup.
+_LISTING_RETRY_INTERVAL = 60.0
+
+
+def regular_hours_symbol(feed: dict) -> Optional[str]:
+    """The symbol of a regular-market-hours equity feed, else None.
+
+    Pre/post/overnight feeds (`Equity.US.AAPL.PRE/USD`, ...) are skipped.
+    """
+    attributes = feed.get("attributes", {})
+    base = attributes.get("base", "")
+    if base and attributes.get("symbol", "") == f"Equity.US.{base}/USD":
+        return base
+    return None
+
+
+def feed_id_for(feeds: Iterable[dict], symbol: str) -> Optional[str]:
+    """Id of `symbol`'s regular-hours feed among `feeds`, if listed."""
+    for feed in feeds:
+        if regular_hours_symbol(feed) == symbol:
+            return feed["id"]
+    return None
+
+
+class PythFeedIndex:
+    """Symbol → feed id index with TTL and listing retry throttle; no I/O.
+
+    A resolver calls `claim_listing` and, if it wins, fetches the bulk
+    listing and hands it to `listed` (nothing, on failure: the claim
+    already holds off retries for a minute). While the index is `stale`,
+    it queries the `missing` symbols one by one and hands the results to
+    `found`. `lookup` answers from whatever the index holds.
+
+    Args:
+        ttl: Seconds a listing (and the feed ids in it) is trusted.
+        cache_path: Optional JSON file to persist the index across processes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 24 * 60 * 60,
+        cache_path: Optional[str | os.PathLike] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._ttl = ttl
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._feed_ids: dict[str, str] = {}
+        self._listed_at: Optional[float] = None
+        self._retry_listing_at = 0.0
+        self._loaded = False
+
+    def claim_listing(self) -> bool:
+        """True if the caller should fetch the bulk listing now."""
+        with self._lock:
+            self._load()
+            now = self._clock()
+            if not self._is_stale(now) or now < self._retry_listing_at:
+                return False
+            # Held until the listing lands, or for a minute if it fails.
+            self._retry_listing_at = now + _LISTING_RETRY_INTERVAL
+            return True
+
+    def listed(self, feeds: Iterable[dict]) -> None:
+        """Replace the index with a bulk listing of equity feeds."""
+        feed_ids = {}
+        for feed in feeds:
+            symbol = regular_hours_symbol(feed)
+            if symbol is not None:
+                feed_ids[symbol] = feed["id"]
+        with self._lock:
+            self._feed_ids = feed_ids
+            self._listed_at = self._clock()
+            self._retry_listing_at = 0.0
+            payload = {
+                "version": _CACHE_VERSION,
+                "listed_at": self._listed_at,
+                "feed_ids": feed_ids,
+            }
+        self._write_cache_file(payload)
+
+    def stale(self) -> bool:
+        with self._lock:
+            self._load()
+            return self._is_stale(self._clock())
+
+    def missing(self, symbols: Iterable[str]) -> list[str]:
+        with self._lock:
+            return [s for s in dict.fromkeys(symbols) if s not in self._feed_ids]
+
+    def found(self, feed_ids: dict[str, Optional[str]]) -> None:
+        """Add per-symbol query results; None means no regular-hours feed."""
+        with self._lock:
+            self._feed_ids.update((s, i) for s, i in feed_ids.items() if i is not None)
+
+    def lookup(self, symbols: Iterable[str]) -> dict[str, str]:
+        """Feed id per symbol; symbols without a known feed are left out."""
+        with self._lock:
+            self._load()
+            return {s: self._feed_ids[s] for s in symbols if s in self._feed_ids}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._feed_ids = {}
+            self._listed_at = None
+            self._retry_listing_at = 0.0
+
+    def _is_stale(self, now: float) -> bool:
+        return self._listed_at is None or now - self._listed_at >= self._ttl
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._cache_path is None or not self._cache_path.exists():
+            return
+        try:
+            data = json.loads(self._cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != _CACHE_VERSION:
+            return
+        self._feed_ids = dict(data.get("feed_ids", {}))
+        self._listed_at = data.get("listed_at")
+
+    def _write_cache_file(self, payload: dict) -> None:
+        if self._cache_path is None:
+            return
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_suffix(self._cache_path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(payload))
+            os.replace(tmp_path, self._cache_path)
+        except OSError:
+            pass  # Persistence is an optimisation; never fail a lookup over it.
+
+
+class PythFeedDirectory:
+    """Resolves symbols to Pyth feed ids from one bulk listing.
+
+    Args:
+        list_feeds: Queries Hermes `/v2/price_feeds` for equity feeds, with
+            an optional `query` filter (None lists every equity feed).
+        ttl: Seconds a listing (and the feed ids in it) is trusted.
+        cache_path: Optional JSON file to persist the index across processes.
+        max_workers: Concurrency for per-symbol queries, used only when the
+            bulk listing fails.
+    """
+
+    def __init__(
+        self,
+        list_feeds: Callable[[Optional[str]], list[dict]],
+        ttl: float = 24 * 60 * 60,
+        cache_path: Optional[str | os.PathLike] = None,
+        max_workers: int = 8,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._list_feeds = list_feeds
+        self._max_workers = max_workers
+        self._index = PythFeedIndex(ttl, cache_path, clock)
+
+    def resolve(self, symbols: Iterable[str]) -> dict[str, str]:
+        """Feed id per symbol; symbols without a regular-hours feed are left out."""
+        symbols = list(dict.fromkeys(symbols))
+        if self._index.claim_listing():
+            try:
+                self._index.listed(self._list_feeds(None))
+            except Exception:
+                pass  # The claim holds off the next attempt.
+        if self._index.stale():
+            # Hermes without bulk listing (or a blip): query just the
+            # symbols we don't know yet.
+            self._index.found(self._query_each(self._index.missing(symbols)))
+        return self._index.lookup(symbols)
+
+    def invalidate(self) -> None:
+        self._index.invalidate()
+
+    def _query_each(self, symbols: list[str]) -> dict[str, Optional[str]]:
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(self._max_workers, len(symbols)),
+            thread_name_prefix="primedelta-pyth-feeds",
+        ) as executor:
+            found = executor.map(lambda s: feed_id_for(self._list_feeds(s), s), symbols)
+            return dict(zip(symbols, found))
@@ -0,0 +1,250 @@
+"""Block-driven receipt tracking.
+
+`wait_for_transaction_receipt` polls `eth_getTransactionReceipt` for one
+hash until it appears; with many transactions in flight that is one poller
+each. `ReceiptTracker` instead follows the chain head from a single thread,
+reads each new block's transaction hashes once, and fetches receipts only
+for the hashes it is tracking that actually landed — resolving a future per
+transaction.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+
+def _hex(tx_hash: Any) -> str:
+    value = tx_hash.hex() if hasattr(tx_hash, "hex") else str(tx_hash)
+    value = value.lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+@dataclass
+class _Tracked:
+    future: Future
+    deadline: float
+    receipt: Optional[Any] = None
+    block_hash: Optional[Any] = field(default=None, repr=False)
+    # Asked for its receipt directly once, in case it mined before tracking.
+    looked_up: bool = False
+
+
+class ReceiptTracker:
+    """Resolves receipt futures by watching new blocks.
+
+    Args:
+        web3: Web3 instance for the network.
+        poll_interval: Seconds between head checks while anything is pending.
+            The thread stops when nothing is and restarts on the next `track`.
+        confirmations: Blocks that must be built on top of a transaction's
+            block before its future resolves. Before resolving, the receipt
+            is re-read; if the block was reorganised away the transaction
+            goes back to waiting.
+        timeout: Seconds a transaction may stay unmined before its future
+            fails with `web3.exceptions.TimeExhausted`.
+        on_block: Called with every block the tracker reads, so other
+            services (e.g. `ChainClock`) can follow the head for free.
+    """
+
+    def __init__(
+        self,
+        web3,
+        poll_interval: float = 1.0,
+        confirmations: int = 0,
+        timeout: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_block: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self._web3 = web3
+        self._on_block = on_block
+        self._poll_interval = poll_interval
+        self._confirmations = confirmations
+        self._timeout = timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._tracked: dict[str, _Tracked] = {}
+        self._scanned_block: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def track(self, tx_hash: Any, timeout: Optional[float] = None) -> Future:
+        """Future resolving to `tx_hash`'s receipt once it has mined and
+        gathered the configured confirmations."""
+        future: Future = Future()
+        deadline = self._clock() + (self._timeout if timeout is None else timeout)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ReceiptTracker is closed")
+            existing = self._tracked.get(_hex(tx_hash))
+            if existing is not None:
+                return existing.future
+            self._tracked[_hex(tx_hash)] = _Tracked(future, deadline)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="primedelta-receipts", daemon=True
+                )
+                self._thread.start()
+        return future
+
+    def wait(self, tx_hashes: list[Any], timeout: Optional[float] = None) -> list[Any]:
+        """Receipts for `tx_hashes`, in order, once all have resolved.
+
+        Raises TimeExhausted if they haven't within `timeout` (plus a poll
+        interval of slack), even if the tracking thread itself is stuck.
+        """
+        futures = [self.track(tx_hash, timeout) for tx_hash in tx_hashes]
+        limit = (self._timeout if timeout is None else timeout) + self._poll_interval
+        give_up_at = time.monotonic() + limit
+        receipts = []
+        for tx_hash, future in zip(tx_hashes, futures):
+            try:
+                receipts.append(
+                    future.result(timeout=max(0.0, give_up_at - time.monotonic()))
+                )
+            except FutureTimeout:
+                raise TimeExhausted(
+                    f"Transaction {_hex(tx_hash)} is not in the chain after "
+                    f"{limit} seconds"
+                ) from None
+        return receipts
+
+    def close(self) -> None:
+        """Stop watching; pending futures are cancelled."""
+        with self._lock:
+            self._closed = True
+            tracked, self._tracked = self._tracked, {}
+        self._wakeup.set()
+        for entry in tracked.values():
+            entry.future.cancel()
+
+    def poll(self) -> None:
+        """Process blocks up to the current head once (the thread's body)."""
+        head = self._web3.eth.block_number
+        with self._lock:
+            if self._scanned_block is None:
+                # A hash is tracked right after broadcast, so it can't have
+                # landed earlier than the block before the current head.
+                self._scanned_block = head - 1
+            start = self._scanned_block + 1
+            new = [h for h, entry in self._tracked.items() if not entry.looked_up]
+        # Block scanning only sees what lands from here on; a hash tracked
+        # after it mined (e.g. awaited at the end of a pipeline) is found by
+        # asking for its receipt once.
+        for tx_hash in new:
+            self._lookup_receipt(tx_hash)
+        for number in range(start, head + 1):
+            block = self._web3.eth.get_block(number)
+            if self._on_block is not None:
+                self._on_block(block)
+            landed = {_hex(h) for h in block["transactions"]}
+            with self._lock:
+                mined = [h for h in landed if h in self._tracked]
+            for tx_hash in mined:
+                self._record_receipt(tx_hash)
+            with self._lock:
+                self._scanned_block = number
+        self._settle(head)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                # Transient RPC failure; try again next tick, but don't let
+                # an unreachable node keep futures past their deadlines.
+                self._expire_overdue()
+            with self._lock:
+                if self._closed or not self._tracked:
+                    self._thread = None
+                    self._scanned_block = None
+                    return
+            self._wakeup.wait(self._poll_interval)
+            self._wakeup.clear()
+
+    def _lookup_receipt(self, tx_hash: str) -> None:
+        try:
+            receipt = self._web3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            receipt = None
+        with self._lock:
+            entry = self._tracked.get(tx_hash)
+            if entry is None:
+                return
+            entry.looked_up = True
+            if receipt is not None and entry.receipt is None:
+                entry.receipt = receipt
+                entry.block_hash = receipt.get("blockHash")
+
+    def _record_receipt(self, tx_hash: str) -> None:
+        receipt = self._web3.eth.get_transaction_receipt(tx_hash)
+        with self._lock:
+            entry = self._tracked.get(tx_hash)
+            if entry is not None:
+                entry.receipt = receipt
+                entry.block_hash = receipt.get("blockHash")
+
+    def _settle(self, head: int) -> None:
+        self._expire_overdue()
+        with self._lock:
+            entries = list(self._tracked.items())
+        for tx_hash, entry in entries:
+            if entry.receipt is None:
+                continue
+            if head - entry.receipt["blockNumber"] < self._confirmations:
+                continue
+            if self._confirmations and not self._still_canonical(tx_hash, entry):
+                continue
+            self._resolve(tx_hash, result=entry.receipt)
+
+    def _expire_overdue(self) -> None:
+        """Fail every unmined transaction past its deadline; no RPC."""
+        now = self._clock()
+        with self._lock:
+            overdue = [
+                tx_hash
+                for tx_hash, entry in self._tracked.items()
+                if entry.receipt is None and now >= entry.deadline
+            ]
+        for tx_hash in overdue:
+            self._resolve(
+                tx_hash,
+                exception=TimeExhausted(
+                    f"Transaction {tx_hash} is not in the chain after "
+                    f"{self._timeout} seconds"
+                ),
+            )
+
+    def _still_canonical(self, tx_hash: str, entry: _Tracked) -> bool:
+        try:
+            receipt = self._web3.eth.get_transaction_receipt(tx_hash)
+        except Exception:
+            receipt = None
+        if receipt is None or receipt.get("blockHash") != entry.block_hash:
+            # Reorganised out (or moved): wait for it to land again.
+            entry.receipt = None
+            entry.block_hash = None
+            if receipt is not None:
+                entry.receipt = receipt
+                entry.block_hash = receipt.get("blockHash")
+            return False
+        return True
+
+    def _resolve(
+        self,
+        tx_hash: str,
+        result: Any = None,
+        exception: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            entry = self._tracked.pop(tx_hash, None)
+        if entry is None or entry.future.done():
+            return
+        if exception is not None:
+            entry.future.set_exception(exception)
+        else:
+            entry.future.set_result(result)
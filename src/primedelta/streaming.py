@@ -0,0 +1,532 @@
+"""Supervised SSE price stream that survives disconnects.
+
+`sseclient.SSEClient` reconnects on a fixed 3s timer, gives up the moment a
+reconnect itself fails, and never notices a socket that silently stops
+delivering bytes. `ResilientPriceStream` owns the connection instead:
+
+- reconnects with capped exponential backoff (plus jitter), honouring the
+  server's `retry:` hint as a floor;
+- resumes with `Last-Event-ID` so the server can replay what was missed;
+- treats `idle_timeout` seconds without a byte (data or `:` heartbeat) as a
+  dead connection;
+- drops replayed duplicates after a resume and flags per-symbol timestamp
+  gaps;
+- keeps `StreamMetrics` describing the connection for monitoring.
+
+`PriceStreamHub` shares one such upstream among many subscribers, each with
+its own symbol filter and bounded queue.
+"""
+import codecs
+import collections
+import dataclasses
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+import requests
+from urllib3.exceptions import HTTPError as _Urllib3HTTPError
+
+from primedelta.types import Price
+
+
+class StreamState(str, Enum):
+    CONNECTING = "CONNECTING"
+    CONNECTED = "CONNECTED"
+    BACKOFF = "BACKOFF"
+    CLOSED = "CLOSED"
+
+
+@dataclass
+class StreamMetrics:
+    state: StreamState = StreamState.CONNECTING
+    connects: int = 0
+    reconnects: int = 0
+    messages: int = 0
+    duplicates_dropped: int = 0
+    gaps: int = 0
+    last_event_id: Optional[str] = None
+    last_message_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class _SSEEvent(NamedTuple):
+    id: Optional[str]
+    event: str
+    data: str
+    retry: Optional[int]
+
+
+def _iter_sse_events(chunks: Iterator[bytes]) -> Iterator[_SSEEvent]:
+    """Incremental `text/event-stream` parser over raw byte chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    event_id: Optional[str] = None
+    event_type = "message"
+    data_lines: list[str] = []
+    retry: Optional[int] = None
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line = line.rstrip("\r")
+            if not line:
+                if data_lines:
+                    yield _SSEEvent(event_id, event_type, "\n".join(data_lines), retry)
+                event_type, data_lines, retry = "message", [], None
+                continue
+            if line.startswith(":"):
+                continue
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "data":
+                data_lines.append(value)
+            elif field == "id":
+                event_id = value
+            elif field == "event":
+                event_type = value
+            elif field == "retry" and value.isdigit():
+                retry = int(value)
+
+
+def _read_chunks(response: requests.Response, chunk_size: int = 4096) -> Iterator[bytes]:
+    # `read1` returns whatever is buffered instead of blocking for a full
+    # chunk, so events are delivered as soon as they arrive.
+    raw = response.raw
+    read = getattr(raw, "read1", None) or raw.read
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class ResilientPriceStream:
+    """Iterable of `Price`s from an SSE endpoint, reconnecting as needed.
+
+    Args:
+        session: Session the stream connects through.
+        url: SSE endpoint.
+        parse: Turns one event's `data` into a Price.
+        params: Query parameters for every (re)connect.
+        headers: Extra request headers.
+        idle_timeout: Seconds without any byte before the connection is
+            considered dead and replaced.
+        connect_timeout: Seconds allowed for the TCP/TLS handshake.
+        initial_backoff, max_backoff: Reconnect delay bounds, in seconds.
+        max_reconnects: Give up (re-raising the last error) after this many
+            consecutive failed attempts; None retries forever.
+        gap_threshold: Seconds between consecutive prices of one symbol
+            above which a gap is recorded and `on_gap` called. None disables.
+        on_gap: `(symbol, previous_timestamp, timestamp)` callback.
+        fatal: Maps an error that must not be retried (e.g. a 401) to the
+            exception to raise; returns None for retryable errors.
+        sleep: Waits out a reconnect delay. The default returns as soon as
+            `close()` is called, so a stream in backoff stops promptly.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        parse: Callable[[str], Price],
+        params: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
+        idle_timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_reconnects: Optional[int] = None,
+        gap_threshold: Optional[float] = None,
+        on_gap: Optional[Callable[[str, datetime, datetime], None]] = None,
+        fatal: Callable[[Exception], Optional[Exception]] = lambda e: None,
+        sleep: Optional[Callable[[float], Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session = session
+        self._url = url
+        self._parse = parse
+        self._params = params or {}
+        self._headers = headers or {}
+        self._timeout = (connect_timeout, idle_timeout)
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._max_reconnects = max_reconnects
+        self._gap_threshold = gap_threshold
+        self._on_gap = on_gap
+        self._fatal = fatal
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._metrics = StreamMetrics()
+        self._closed = threading.Event()
+        self._sleep: Callable[[float], Any] = self._closed.wait
+        if sleep is not None:
+            self._sleep = sleep
+        self._response: Optional[requests.Response] = None
+        self._last_seen: dict[str, datetime] = {}
+        self._resuming: set[str] = set()
+        self._server_retry: Optional[float] = None
+
+    @property
+    def metrics(self) -> StreamMetrics:
+        """A snapshot of the connection counters."""
+        with self._lock:
+            return dataclasses.replace(self._metrics)
+
+    def close(self) -> None:
+        """Stop the stream; safe to call from another thread."""
+        self._closed.set()
+        response = self._response
+        if response is not None:
+            response.close()
+        self._set(state=StreamState.CLOSED)
+
+    def __iter__(self) -> Iterator[Price]:
+        failures = 0
+        while not self._closed.is_set():
+            try:
+                for price in self._run_connection():
+                    failures = 0
+                    yield price
+                error: Exception = ConnectionError("server closed the stream")
+            except (requests.RequestException, _Urllib3HTTPError, OSError) as e:
+                error = e
+            if self._closed.is_set():
+                break
+            fatal = self._fatal(error)
+            if fatal is not None:
+                self.close()
+                if fatal is error:
+                    raise error
+                raise fatal from error
+            failures += 1
+            if self._max_reconnects is not None and failures > self._max_reconnects:
+                self.close()
+                raise error
+            self._set(state=StreamState.BACKOFF, last_error=repr(error))
+            self._sleep(self._backoff(failures))
+        self._set(state=StreamState.CLOSED)
+
+    def _run_connection(self) -> Iterator[Price]:
+        self._set(state=StreamState.CONNECTING)
+        headers = {
+            **self._headers,
+            "Accept": "text/event-stream",
+            "Cache-Control": "no-cache",
+        }
+        last_event_id = self._metrics.last_event_id
+        if last_event_id:
+            headers["Last-Event-ID"] = last_event_id
+        response = self._session.get(
+            self._url,
+            params=self._params,
+            headers=headers,
+            stream=True,
+            timeout=self._timeout,
+        )
+        self._response = response
+        try:
+            response.raise_for_status()
+            with self._lock:
+                if self._metrics.connects:
+                    self._metrics.reconnects += 1
+                    # Whatever the server replays for these symbols may
+                    # overlap what we've already delivered.
+                    self._resuming = set(self._last_seen)
+                self._metrics.connects += 1
+                self._metrics.state = StreamState.CONNECTED
+            for event in _iter_sse_events(_read_chunks(response)):
+                if event.retry is not None:
+                    self._server_retry = event.retry / 1000
+                price = self._accept(event)
+                if price is not None:
+                    yield price
+        finally:
+            self._response = None
+            response.close()
+
+    def _accept(self, event: _SSEEvent) -> Optional[Price]:
+        try:
+            price = self._parse(event.data)
+        except (ValueError, KeyError, TypeError):
+            return None  # Malformed event; the stream itself is fine.
+        with self._lock:
+            if event.id:
+                self._metrics.last_event_id = event.id
+            self._metrics.last_message_at = self._clock()
+            previous = self._last_seen.get(price.symbol)
+            if price.symbol in self._resuming:
+                if previous is not None and price.timestamp <= previous:
+                    self._metrics.duplicates_dropped += 1
+                    return None
+                self._resuming.discard(price.symbol)
+            gap = (
+                self._gap_threshold is not None
+                and previous is not None
+                and (price.timestamp - previous).total_seconds() > self._gap_threshold
+            )
+            if gap:
+                self._metrics.gaps += 1
+            self._last_seen[price.symbol] = price.timestamp
+            self._metrics.messages += 1
+        if gap and previous is not None and self._on_gap is not None:
+            self._on_gap(price.symbol, previous, price.timestamp)
+        return price
+
+    def _backoff(self, failures: int) -> float:
+        delay = min(self._max_backoff, self._initial_backoff * 2 ** (failures - 1))
+        delay *= random.uniform(0.5, 1.0)
+        if self._server_retry is not None:
+            delay = max(delay, self._server_retry)
+        return delay
+
+    def _set(self, **changes: Any) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self._metrics, name, value)
+
+
+class OverflowPolicy(str, Enum):
+    """What a full subscriber queue does with the next price.
+
+    DROP_OLDEST discards the oldest queued price, DROP_NEWEST discards the
+    incoming one, and CONFLATE keeps only the latest price per symbol (the
+    queue then never holds more than one entry per symbol).
+    """
+
+    DROP_OLDEST = "DROP_OLDEST"
+    DROP_NEWEST = "DROP_NEWEST"
+    CONFLATE = "CONFLATE"
+
+
+_END = object()
+
+
+class PriceSubscription:
+    """One consumer's view of a `PriceStreamHub`: an iterable of `Price`s.
+
+    Iteration blocks until a price arrives and stops when the subscription
+    is closed or the upstream stream ends; an upstream error is re-raised
+    here. `dropped` counts prices lost to the overflow policy.
+    """
+
+    def __init__(
+        self,
+        hub: "PriceStreamHub",
+        symbols: Optional[frozenset[str]],
+        maxsize: int,
+        policy: OverflowPolicy,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.symbols = symbols
+        self.dropped = 0
+        self._hub = hub
+        self._maxsize = maxsize
+        self._policy = OverflowPolicy(policy)
+        self._cond = threading.Condition()
+        self._queue: collections.deque = collections.deque()
+        self._latest: dict[str, Price] = {}
+        self._end: Any = None
+
+    def __iter__(self) -> Iterator[Price]:
+        try:
+            while True:
+                price = self.get()
+                if price is None:
+                    return
+                yield price
+        finally:
+            self.close()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Price]:
+        """Next price; None once the stream has ended (or on `timeout`)."""
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._queue or self._end is not None, timeout
+            ):
+                return None
+            if not self._queue:
+                if isinstance(self._end, Exception):
+                    raise self._end
+                return None
+            item = self._queue.popleft()
+            if self._policy == OverflowPolicy.CONFLATE:
+                return self._latest.pop(item)
+            return item
+
+    def close(self) -> None:
+        self._hub._unsubscribe(self)
+        self._finish(_END)
+
+    def __enter__(self) -> "PriceSubscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _put(self, price: Price) -> None:
+        with self._cond:
+            if self._end is not None:
+                return
+            if self._policy == OverflowPolicy.CONFLATE:
+                if price.symbol in self._latest:
+                    self.dropped += 1
+                else:
+                    self._queue.append(price.symbol)
+                self._latest[price.symbol] = price
+            elif len(self._queue) >= self._maxsize:
+                self.dropped += 1
+                if self._policy == OverflowPolicy.DROP_NEWEST:
+                    return
+                self._queue.popleft()
+                self._queue.append(price)
+            else:
+                self._queue.append(price)
+            self._cond.notify()
+
+    def _finish(self, end: Any) -> None:
+        with self._cond:
+            if self._end is None:
+                self._end = end
+            self._cond.notify_all()
+
+
+class PriceStreamHub:
+    """Fans one upstream price stream out to many filtered subscribers.
+
+    The upstream connection is opened (on a daemon thread) by the first
+    `subscribe` and closed when the last subscriber leaves. Each price is
+    routed only to subscribers that asked for its symbol, into their own
+    bounded queue, so a slow consumer never stalls the socket or its peers.
+
+    Args:
+        open_stream: Opens the upstream; the result's `close()` (if any) is
+            called to tear it down.
+    """
+
+    def __init__(self, open_stream: Callable[[], Iterable[Price]]) -> None:
+        self._open_stream = open_stream
+        self._lock = threading.Lock()
+        self._by_symbol: dict[str, set[PriceSubscription]] = {}
+        self._wildcard: set[PriceSubscription] = set()
+        self._upstream: Optional[Iterable[Price]] = None
+        self._thread: Optional[threading.Thread] = None
+        # Set once the running pump has been told to wind down; it then ends
+        # no subscriber, and a newcomer starts a pump of its own.
+        self._stopping = False
+
+    def subscribe(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        maxsize: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> PriceSubscription:
+        """Receive prices for `symbols` (all symbols if None)."""
+        wanted = frozenset(symbols) if symbols is not None else None
+        subscription = PriceSubscription(self, wanted, maxsize, policy)
+        with self._lock:
+            if wanted is None:
+                self._wildcard.add(subscription)
+            else:
+                for symbol in wanted:
+                    self._by_symbol.setdefault(symbol, set()).add(subscription)
+            if self._thread is None or self._stopping:
+                self._stopping = False
+                self._upstream = None
+                self._thread = threading.Thread(
+                    target=self._pump, name="primedelta-price-hub", daemon=True
+                )
+                self._thread.start()
+        return subscription
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers())
+
+    def close(self) -> None:
+        """End every subscription and drop the upstream connection."""
+        with self._lock:
+            subscribers = self._subscribers()
+            self._by_symbol.clear()
+            self._wildcard.clear()
+            upstream = self._upstream
+            self._stopping = self._thread is not None
+        for subscription in subscribers:
+            subscription._finish(_END)
+        _close_quietly(upstream)
+
+    def _subscribers(self) -> set[PriceSubscription]:
+        subscribers = set(self._wildcard)
+        for group in self._by_symbol.values():
+            subscribers |= group
+        return subscribers
+
+    def _unsubscribe(self, subscription: PriceSubscription) -> None:
+        with self._lock:
+            self._wildcard.discard(subscription)
+            for symbol in subscription.symbols or ():
+                group = self._by_symbol.get(symbol)
+                if group is not None:
+                    group.discard(subscription)
+                    if not group:
+                        del self._by_symbol[symbol]
+            idle = not self._wildcard and not self._by_symbol
+            upstream = self._upstream if idle else None
+            if idle and self._thread is not None:
+                self._stopping = True
+        _close_quietly(upstream)
+
+    def _pump(self) -> None:
+        end: Any = _END
+        upstream = None
+        try:
+            upstream = self._open_stream()
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._upstream = upstream
+                if not self._wildcard and not self._by_symbol:
+                    self._stopping = True
+                    return
+            for price in upstream:
+                with self._lock:
+                    if self._stopping or self._thread is not threading.current_thread():
+                        break
+                    targets = list(self._wildcard)
+                    targets.extend(self._by_symbol.get(price.symbol, ()))
+                    if not targets and not self._by_symbol and not self._wildcard:
+                        self._stopping = True
+                        break
+                for subscription in targets:
+                    subscription._put(price)
+        except Exception as e:
+            end = e
+        finally:
+            subscribers: set[PriceSubscription] = set()
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    if not self._stopping:
+                        # The upstream ended or failed under its subscribers.
+                        subscribers = self._subscribers()
+                        self._by_symbol.clear()
+                        self._wildcard.clear()
+                    self._upstream = None
+                    self._thread = None
+                    self._stopping = False
+            _close_quietly(upstream)
+            for subscription in subscribers:
+                subscription._finish(end)
+
+
+def _close_quietly(stream: Any) -> None:
+    close = getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception:
+        pass
@@ -79,6 +79,61 @@ class TestClaimDigitalIdentity:
                 primedelta.claim_digital_identity()
 
 
+class TestAccountStatusCache:
+    def _make_primedelta(self, ttl: float = 60.0) -> PrimeDelta:
+        with patch("primedelta.primedelta.Web3"):
+            return PrimeDelta(
+                private_key="0x" + "1" * 64,
+                web3_provider_url="http://localhost:8545",
+                account_status_ttl=ttl,
+            )
+
+    def test_did_minted_is_fetched_once(self):
+        primedelta = self._make_primedelta(ttl=0)
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "get_account_status",
+            return_value=AccountStatus.DID_MINTED,
+        ) as mock_status:
+            assert primedelta.logged_in()
+            for _ in range(5):
+                primedelta._require_logged_in_and_did_minted()
+
+        mock_status.assert_called_once()
+
+    def test_other_states_expire_after_ttl(self):
+        primedelta = self._make_primedelta(ttl=0)
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "get_account_status",
+            side_effect=[AccountStatus.VERIFIED, AccountStatus.DID_MINTED],
+        ):
+            with pytest.raises(AccountNotVerified):
+                primedelta._require_logged_in_and_did_minted()
+            primedelta._require_logged_in_and_did_minted()
+
+    def test_unauthorized_response_and_logout_forget_status(self):
+        from primedelta.settings import PRIMEDELTA_BASE_URL
+
+        primedelta = self._make_primedelta()
+        client = primedelta._primedelta_client
+        unauthorized = MagicMock(status_code=401, url=f"{PRIMEDELTA_BASE_URL}/portfolio/")
+
+        with patch.object(
+            client, "get_account_status", return_value=AccountStatus.DID_MINTED
+        ) as mock_status, patch.object(client, "logout"):
+            primedelta.logged_in()
+            for hook in client._session.hooks["response"]:
+                hook(unauthorized)
+            primedelta.logged_in()
+            primedelta.logout()
+            primedelta.logged_in()
+
+        assert mock_status.call_count == 3
+
+
 class TestPortfolio:
     def test_should_get_portfolio(self):
         with patch("primedelta.primedelta.Web3"):
@@ -136,3 +191,119 @@ class TestPortfolio:
         ):
             with pytest.raises(AccountNotVerified):
                 primedelta.portfolio()
+
+
+def _portfolio_with_positions(*positions: Position) -> Portfolio:
+    return Portfolio(
+        buying_power=Decimal("1000.00"),
+        total_equity=Decimal("5000.00"),
+        total_funds=Decimal("1200.00"),
+        profit_loss=Decimal("100.00"),
+        total_value=Decimal("5000.00"),
+        positions=list(positions),
+    )
+
+
+def _position(symbol: str, owned: str, available: str) -> Position:
+    return Position(
+        symbol=symbol,
+        name=symbol,
+        total_owned=Decimal(owned),
+        available_to_sell=Decimal(available),
+        average_purchase_price=Decimal("1"),
+        last_market_price=Decimal("1"),
+        profit_loss=Decimal("0"),
+        profit_loss_percentage=Decimal("0"),
+        is_offboarded=False,
+        multiplier_numerator=1,
+        multiplier_denominator=1,
+    )
+
+
+class TestPortfolioCache:
+    def _make_primedelta(self, ttl: float = 60.0) -> PrimeDelta:
+        with patch("primedelta.primedelta.Web3"):
+            return PrimeDelta(
+                private_key="0x" + "1" * 64,
+                web3_provider_url="http://localhost:8545",
+                portfolio_cache_ttl=ttl,
+            )
+
+    def test_balance_getters_share_one_portfolio_fetch(self):
+        primedelta = self._make_primedelta()
+        portfolio = _portfolio_with_positions(
+            _position("AAPL", "10", "8"), _position("TSLA", "3", "3")
+        )
+
+        with patch.object(
+            primedelta._primedelta_client, "portfolio", return_value=portfolio
+        ) as mock_portfolio:
+            assert primedelta.get_stablecoin_available_balance() == Decimal("1000.00")
+            assert primedelta.get_stablecoin_total_balance() == Decimal("1200.00")
+            assert primedelta.get_stock_available_balance("AAPL") == Decimal("8")
+            assert primedelta.get_stock_total_balance("TSLA") == Decimal("3")
+            assert primedelta.get_stock_total_balance("MSFT") == Decimal(0)
+
+        mock_portfolio.assert_called_once()
+
+    def test_zero_ttl_disables_cache(self):
+        primedelta = self._make_primedelta(ttl=0)
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "portfolio",
+            return_value=_portfolio_with_positions(),
+        ) as mock_portfolio:
+            primedelta.get_stablecoin_available_balance()
+            primedelta.get_stablecoin_available_balance()
+
+        assert mock_portfolio.call_count == 2
+
+    def test_orders_invalidate_cache(self):
+        primedelta = self._make_primedelta()
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "portfolio",
+            return_value=_portfolio_with_positions(),
+        ) as mock_portfolio, patch.object(
+            primedelta._primedelta_client, "send_sell_market_order", return_value=1
+        ):
+            primedelta.get_stablecoin_available_balance()
+            primedelta.send_sell_market_order("AAPL", 1)
+            primedelta.get_stablecoin_available_balance()
+
+        assert mock_portfolio.call_count == 2
+
+    def test_sent_transactions_invalidate_cache_even_on_failure(self):
+        primedelta = self._make_primedelta()
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "portfolio",
+            return_value=_portfolio_with_positions(),
+        ) as mock_portfolio, patch.object(
+            primedelta,
+            "_build_and_send_transaction_once",
+            side_effect=RuntimeError("boom"),
+        ):
+            primedelta.get_stablecoin_available_balance()
+            with pytest.raises(RuntimeError):
+                primedelta._build_and_send_transaction(MagicMock())
+            primedelta.get_stablecoin_available_balance()
+
+        assert mock_portfolio.call_count == 2
+
+    def test_explicit_invalidation(self):
+        primedelta = self._make_primedelta()
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "portfolio",
+            return_value=_portfolio_with_positions(),
+        ) as mock_portfolio:
+            primedelta.get_stablecoin_available_balance()
+            primedelta.invalidate_portfolio_cache()
+            primedelta.get_stablecoin_available_balance()
+
+        assert mock_portfolio.call_count == 2
@@ -0,0 +1,155 @@
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from primedelta import ApprovalPolicy, SwapSide
+from primedelta.contracts import ContractRef, Contracts, CoreContracts, StockPools
+from primedelta.dex.allowances import MAX_UINT256, AllowanceManager
+from primedelta.dex.handlers import _RouterSwapHandler
+
+
+_OWNER = "0x" + "9" * 40
+_SPENDER = "0x" + "5" * 40
+_TOKEN = "0x" + "1" * 40
+_AAPL_TOKEN = "0x" + "A" * 40
+
+
+def _web3() -> MagicMock:
+    web3 = MagicMock()
+    web3.to_checksum_address.side_effect = lambda a: a
+    web3.eth.get_block.return_value = {"timestamp": 1_700_000_000}
+    return web3
+
+
+def _token(allowance: int) -> MagicMock:
+    token = MagicMock()
+    token.address = _TOKEN
+    token.functions.allowance.return_value.call.return_value = allowance
+    return token
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAllowanceManager:
+    def test_skips_approve_when_allowance_covers_amount(self):
+        send_tx = MagicMock()
+        manager = AllowanceManager(_web3(), _OWNER, send_tx)
+
+        assert manager.ensure(_token(500), _SPENDER, 200) is None
+
+        send_tx.assert_not_called()
+
+    def test_approves_exact_amount_and_tracks_spend(self):
+        send_tx = MagicMock(return_value="0xAPPROVE")
+        token = _token(100)
+        manager = AllowanceManager(_web3(), _OWNER, send_tx)
+
+        assert manager.ensure(token, _SPENDER, 300) == "0xAPPROVE"
+        token.functions.approve.assert_called_once_with(_SPENDER, 300)
+        # The approved 300 was consumed by the action that followed.
+        manager.ensure(token, _SPENDER, 1)
+
+        assert send_tx.call_count == 2
+        token.functions.allowance.return_value.call.assert_called_once()
+
+    def test_max_policy_approves_once(self):
+        send_tx = MagicMock()
+        token = _token(0)
+        manager = AllowanceManager(_web3(), _OWNER, send_tx, policy=ApprovalPolicy.MAX)
+
+        for _ in range(3):
+            manager.ensure(token, _SPENDER, 10**24)
+
+        send_tx.assert_called_once()
+        token.functions.approve.assert_called_once_with(_SPENDER, MAX_UINT256)
+
+    def test_rereads_chain_after_ttl(self):
+        clock = _Clock()
+        token = _token(10**6)
+        manager = AllowanceManager(_web3(), _OWNER, MagicMock(), ttl=60, clock=clock)
+
+        manager.ensure(token, _SPENDER, 1)
+        clock.now = 61
+        manager.ensure(token, _SPENDER, 1)
+
+        assert token.functions.allowance.return_value.call.call_count == 2
+
+    def test_failed_approve_forgets_cached_allowance(self):
+        send_tx = MagicMock(side_effect=[RuntimeError("boom"), "0xOK"])
+        token = _token(0)
+        manager = AllowanceManager(_web3(), _OWNER, send_tx)
+
+        try:
+            manager.ensure(token, _SPENDER, 5)
+        except RuntimeError:
+            pass
+        manager.ensure(token, _SPENDER, 5)
+
+        assert token.functions.allowance.return_value.call.call_count == 2
+
+    def test_approve_is_sent_without_holding_the_lock(self):
+        manager = None
+
+        def send_tx(fn):
+            # Concurrent actions on other tokens must not wait on this send.
+            assert manager._lock.acquire(blocking=False)
+            manager._lock.release()
+            return "0xAPPROVE"
+
+        manager = AllowanceManager(_web3(), _OWNER, send_tx)
+
+        assert manager.ensure(_token(0), _SPENDER, 5) == "0xAPPROVE"
+
+    def test_invalidate_one_spender(self):
+        token = _token(10**6)
+        manager = AllowanceManager(_web3(), _OWNER, MagicMock())
+        other_spender = "0x" + "6" * 40
+        manager.ensure(token, _SPENDER, 1)
+        manager.ensure(token, other_spender, 1)
+
+        manager.invalidate(_TOKEN, _SPENDER)
+        manager.ensure(token, _SPENDER, 1)
+        manager.ensure(token, other_spender, 1)
+
+        assert token.functions.allowance.return_value.call.call_count == 3
+
+
+class TestHandlerIntegration:
+    def test_repeat_swap_skips_approve(self):
+        web3 = _web3()
+        contract = web3.eth.contract.return_value
+        contract.address = _TOKEN
+        contract.functions.allowance.return_value.call.return_value = MAX_UINT256
+        send_tx = MagicMock(return_value="0xTX")
+        contracts = Contracts(
+            chain_id=31337,
+            core=CoreContracts(
+                stablecoin=ContractRef(address=_TOKEN, abi=[]),
+                vault=ContractRef(address="0x" + "2" * 40, abi=[]),
+                factory=ContractRef(address="0x" + "3" * 40, abi=[]),
+                digital_identity=ContractRef(address="0x" + "4" * 40, abi=[]),
+                dex_router=ContractRef(address=_SPENDER, abi=[]),
+            ),
+            pool_abis={"erc20": []},
+            pools={"AAPL": StockPools(symbol="AAPL", stock_token_address=_AAPL_TOKEN)},
+        )
+        handler = _RouterSwapHandler(
+            web3=web3,
+            account=MagicMock(),
+            contracts_provider=lambda: contracts,
+            signed_prices_fetcher=lambda symbols: [b"\x01"],
+            send_tx=send_tx,
+            allowances=AllowanceManager(web3, _OWNER, send_tx),
+        )
+
+        handler.swap_exact_input(
+            "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0")
+        )
+
+        assert send_tx.call_count == 1
+        contract.functions.approve.assert_not_called()
@@ -0,0 +1,226 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from primedelta import AccountNotVerified, AsyncPrimeDelta, SwapSide
+from primedelta.async_primedelta_client import AsyncPrimeDeltaClient, _iter_sse_data
+from primedelta.contracts import ContractRef, Contracts, CoreContracts, StockPools
+from primedelta.dex.async_handlers import _AsyncRouterSwapHandler
+from primedelta.types import AccountStatus, Price
+
+
+_STABLECOIN_ADDRESS = "0x" + "1" * 40
+_ROUTER_ADDRESS = "0x" + "5" * 40
+_AAPL_TOKEN = "0x" + "A" * 40
+
+
+def _ref(address: str) -> ContractRef:
+    return ContractRef(address=address, abi=[])
+
+
+def _contracts() -> Contracts:
+    return Contracts(
+        chain_id=31337,
+        core=CoreContracts(
+            stablecoin=_ref(_STABLECOIN_ADDRESS),
+            vault=_ref("0x" + "2" * 40),
+            factory=_ref("0x" + "3" * 40),
+            digital_identity=_ref("0x" + "4" * 40),
+            dex_router=_ref(_ROUTER_ADDRESS),
+        ),
+        pool_abis={"erc20": []},
+        pools={"AAPL": StockPools(symbol="AAPL", stock_token_address=_AAPL_TOKEN)},
+    )
+
+
+class _FakeContent:
+    def __init__(self, lines: list[bytes]) -> None:
+        self._lines = lines
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for line in self._lines:
+            yield line
+
+
+class TestSSEParsing:
+    def test_joins_multiline_data_and_skips_comments(self):
+        response = MagicMock()
+        response.content = _FakeContent(
+            [
+                b": keep-alive\n",
+                b"id: 1\n",
+                b"data: {\"a\":\n",
+                b"data: 1}\n",
+                b"\n",
+                b"data: second\r\n",
+                b"\r\n",
+            ]
+        )
+
+        async def collect():
+            return [data async for data in _iter_sse_data(response)]
+
+        assert asyncio.run(collect()) == ['{"a":\n1}', "second"]
+
+
+class TestAsyncClient:
+    def test_pyth_prices_stream_returns_early_when_no_feed_ids(self):
+        client = AsyncPrimeDeltaClient()
+
+        async def collect():
+            with patch.object(client, "get_pyth_feed_ids", AsyncMock(return_value={})):
+                return [p async for p in client.pyth_prices_stream(["INVALID"])]
+
+        assert asyncio.run(collect()) == []
+
+    def test_failed_feed_listing_is_retried_at_most_once_a_minute(self):
+        client = AsyncPrimeDeltaClient()
+        feed = {
+            "id": "0xaapl",
+            "attributes": {"base": "AAPL", "symbol": "Equity.US.AAPL/USD"},
+        }
+
+        async def list_feeds(query=None):
+            if query is None:
+                raise asyncio.TimeoutError()
+            return [feed]
+
+        async def run():
+            with patch.object(
+                client, "_list_pyth_equity_feeds", side_effect=list_feeds
+            ) as listing:
+                first = await client.get_pyth_feed_ids(["AAPL"])
+                second = await client.get_pyth_feed_ids(["AAPL"])
+                return first, second, [c.args for c in listing.call_args_list]
+
+        first, second, calls = asyncio.run(run())
+
+        assert first == second == {"AAPL": "0xaapl"}
+        # One bulk attempt, one per-symbol query; the second call is cached.
+        assert calls == [(), ("AAPL",)]
+
+    def test_context_manager_closes_session(self):
+        async def run():
+            async with AsyncPrimeDeltaClient() as client:
+                session = client._get_session()
+            return session
+
+        assert asyncio.run(run()).closed
+
+
+def _make_async_web3() -> MagicMock:
+    web3 = MagicMock()
+    web3.to_checksum_address.side_effect = lambda a: a
+    web3.eth.get_block = AsyncMock(return_value={"timestamp": 1_700_000_000})
+    return web3
+
+
+class TestAsyncRouterSwapHandler:
+    def test_swap_exact_input_approves_then_buys(self):
+        web3 = _make_async_web3()
+        send_tx = AsyncMock(return_value="0xTX")
+        handler = _AsyncRouterSwapHandler(
+            web3=web3,
+            account=MagicMock(),
+            contracts_provider=_contracts,
+            signed_prices_fetcher=AsyncMock(return_value=[b"\x01"]),
+            send_tx=send_tx,
+        )
+
+        tx = asyncio.run(
+            handler.swap_exact_input(
+                "AAPL",
+                SwapSide.STABLECOIN_TO_STOCK,
+                amount_in=Decimal("100"),
+                min_amount_out=Decimal("0.5"),
+            )
+        )
+
+        assert tx == "0xTX"
+        assert send_tx.await_count == 2
+        contract = web3.eth.contract.return_value
+        contract.functions.approve.assert_called_once_with(_ROUTER_ADDRESS, 100 * 10**6)
+        contract.functions.buyExactInput.assert_called_once_with(
+            _AAPL_TOKEN,
+            100 * 10**6,
+            int(Decimal("0.5") * 10**18),
+            1_700_000_000 + 600,
+            [b"\x01"],
+        )
+
+
+def _make_async_primedelta() -> AsyncPrimeDelta:
+    with patch("primedelta.async_primedelta.AsyncWeb3"):
+        return AsyncPrimeDelta(
+            private_key="0x" + "1" * 64,
+            web3_provider_url="http://localhost:8545",
+        )
+
+
+class TestAsyncPrimeDelta:
+    def test_swap_requires_did_minted(self):
+        primedelta = _make_async_primedelta()
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "get_account_status",
+            AsyncMock(return_value=AccountStatus.VERIFIED),
+        ):
+            with pytest.raises(AccountNotVerified):
+                asyncio.run(
+                    primedelta.swap_exact_input(
+                        "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("1"), Decimal("0")
+                    )
+                )
+
+    def test_did_minted_status_is_cached(self):
+        primedelta = _make_async_primedelta()
+        status = AsyncMock(return_value=AccountStatus.DID_MINTED)
+
+        async def run():
+            assert await primedelta.logged_in()
+            await primedelta._require_logged_in_and_did_minted()
+            await primedelta._require_logged_in_and_did_minted()
+
+        with patch.object(primedelta._primedelta_client, "get_account_status", status):
+            asyncio.run(run())
+
+        status.assert_awaited_once()
+
+    def test_prices_stream_uses_pyth_when_not_logged_in(self):
+        primedelta = _make_async_primedelta()
+        price = Price(
+            symbol="TSLA",
+            last_price=Decimal("200"),
+            timestamp=MagicMock(),
+            percentage_change=Decimal(0),
+        )
+
+        async def fake_stream(symbols):
+            assert symbols == ["TSLA"]
+            yield price
+
+        async def collect():
+            return [p async for p in primedelta.prices_stream(symbols=["TSLA"])]
+
+        with patch.object(
+            primedelta, "logged_in", AsyncMock(return_value=False)
+        ), patch.object(
+            primedelta._primedelta_client, "pyth_prices_stream", fake_stream
+        ):
+            assert asyncio.run(collect()) == [price]
+
+    def test_reserve_nonce_never_reuses_under_concurrency(self):
+        primedelta = _make_async_primedelta()
+        primedelta._web3 = MagicMock()
+        primedelta._web3.eth.get_transaction_count = AsyncMock(return_value=7)
+
+        async def reserve_many():
+            return await asyncio.gather(*(primedelta._reserve_nonce() for _ in range(5)))
+
+        assert sorted(asyncio.run(reserve_many())) == [7, 8, 9, 10, 11]
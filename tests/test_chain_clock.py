@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+from primedelta.chain_clock import ChainClock
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _web3(timestamp: int = 5000, number: int = 10) -> MagicMock:
+    web3 = MagicMock()
+    web3.eth.get_block.return_value = {"number": number, "timestamp": timestamp}
+    return web3
+
+
+class TestChainClock:
+    def test_calibrates_once_then_follows_local_clock(self):
+        clock = _Clock()
+        chain_clock = ChainClock(clock=clock)
+        web3 = _web3()
+
+        assert chain_clock.now(web3) == 5000
+        clock.now += 7.5
+        assert chain_clock.now(web3) == 5007
+
+        web3.eth.get_block.assert_called_once_with("latest")
+        assert chain_clock.head_block == 10
+
+    def test_observed_blocks_recalibrate_and_old_ones_are_ignored(self):
+        clock = _Clock()
+        chain_clock = ChainClock(clock=clock)
+        chain_clock.observe({"number": 10, "timestamp": 5000})
+
+        chain_clock.observe({"number": 11, "timestamp": 5030})
+        chain_clock.observe({"number": 9, "timestamp": 1})
+
+        assert chain_clock.now(MagicMock()) == 5030
+        assert chain_clock.head_block == 11
+
+    def test_never_steps_backwards(self):
+        clock = _Clock()
+        chain_clock = ChainClock(clock=clock)
+        chain_clock.observe({"number": 10, "timestamp": 5010})
+        assert chain_clock.now(MagicMock()) == 5010
+
+        chain_clock.observe({"number": 11, "timestamp": 5002})
+
+        assert chain_clock.now(MagicMock()) == 5010
+
+    def test_stale_calibration_refreshes_in_background(self):
+        clock = _Clock()
+        chain_clock = ChainClock(refresh_interval=60, clock=clock)
+        chain_clock.observe({"number": 10, "timestamp": 5000})
+        release = threading.Event()
+        web3 = MagicMock()
+        web3.eth.get_block.side_effect = lambda _: (
+            release.wait(5) and {"number": 40, "timestamp": 5100}
+        )
+
+        clock.now += 60
+        assert chain_clock.now(web3) == 5060  # Served from the old offset.
+
+        release.set()
+        for _ in range(500):
+            if chain_clock.head_block == 40:
+                break
+            threading.Event().wait(0.01)
+        assert chain_clock.now(web3) == 5100
+        web3.eth.get_block.assert_called_once_with("latest")
+
+    def test_async_now(self):
+        chain_clock = ChainClock(clock=_Clock())
+        web3 = MagicMock()
+        web3.eth.get_block = AsyncMock(return_value={"number": 1, "timestamp": 42})
+
+        async def run():
+            return [await chain_clock.now_async(web3) for _ in range(3)]
+
+        assert asyncio.run(run()) == [42, 42, 42]
+        web3.eth.get_block.assert_awaited_once()
@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from primedelta import PrimeDelta
+from primedelta.primedelta_client import NotLoggedIn, PrimeDeltaClient
+
+
+def _response(status_code: int = 200, payload=None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload if payload is not None else {}
+    return response
+
+
+class TestPooledTransport:
+    def test_adapter_uses_configured_pool_limits(self):
+        client = PrimeDeltaClient(pool_connections=3, pool_maxsize=7, pool_block=True)
+
+        adapter = client._session.get_adapter("https://api-dev.primedelta.io")
+
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+        assert adapter._pool_block is True
+
+    def test_all_calls_share_one_session(self):
+        client = PrimeDeltaClient()
+        client._token = "tok"
+
+        with patch.object(
+            client._session,
+            "get",
+            side_effect=[
+                _response(payload={"nonce": "abc"}),
+                _response(payload={"isMarketOpen": True}),
+                _response(payload={"orderStatus": "PENDING"}),
+            ],
+        ) as mock_get:
+            assert client.get_nonce() == "abc"
+            assert client.is_market_open() is True
+            client.get_order_status(1)
+
+        assert mock_get.call_count == 3
+        assert mock_get.call_args.kwargs["headers"] == {"Authorization": "Token tok"}
+
+    def test_authorized_post_maps_401_to_not_logged_in(self):
+        client = PrimeDeltaClient()
+
+        with patch.object(client._session, "post", return_value=_response(401)):
+            with pytest.raises(NotLoggedIn):
+                client.logout()
+
+    def test_context_manager_closes_session(self):
+        client = PrimeDeltaClient()
+
+        with patch.object(client._session, "close") as mock_close:
+            with client:
+                pass
+
+        mock_close.assert_called_once()
+
+    def test_primedelta_close_closes_backend_client(self):
+        with patch("primedelta.primedelta.Web3"):
+            primedelta = PrimeDelta(
+                private_key="0x" + "1" * 64,
+                web3_provider_url="http://localhost:8545",
+            )
+
+        with patch.object(primedelta._primedelta_client, "close") as mock_close:
+            with primedelta:
+                pass
+
+        mock_close.assert_called_once()
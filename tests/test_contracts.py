@@ -1,8 +1,11 @@
+import json
+import pickle
+import shutil
 from unittest.mock import patch
 
 import pytest
 
-from primedelta import PrimeDelta
+from primedelta import PrimeDelta, networks
 from primedelta.contracts import Contracts, ContractRef
 
 
@@ -143,3 +146,57 @@ class TestPrimeDeltaContractsLoading:
                     web3_provider_url="http://localhost:8545",
                     network="does-not-exist",
                 )
+
+
+class TestLazyABILoading:
+    def setup_method(self):
+        networks._read_abi.cache_clear()
+        networks._load_bundle.cache_clear()
+
+    def teardown_method(self):
+        networks._read_abi.cache_clear()
+        networks._load_bundle.cache_clear()
+
+    def test_load_reads_no_abi_until_used(self):
+        contracts = networks.load("dev")
+        assert networks._read_abi.cache_info().currsize == 0
+
+        assert any(e.get("name") == "allStockTokens" for e in contracts.core.dex_router.abi)
+        assert "erc20" in contracts.pool_abis
+        assert contracts.pool_abis.get("erc20")
+        assert networks._read_abi.cache_info().currsize == 2
+
+    def test_abis_are_shared_across_loads(self):
+        first = networks.load("dev")
+        second = networks.load("dev")
+        assert first.core.factory.abi is second.core.factory.abi
+
+    def test_bundle_is_used_when_in_sync(self, tmp_path, monkeypatch):
+        bundle_path = networks.build_abi_bundle(tmp_path / "abis.pickle")
+        monkeypatch.setattr(networks, "_BUNDLE_PATH", bundle_path)
+
+        contracts = networks.load("dev")
+        with patch.object(networks.json, "loads", side_effect=AssertionError):
+            abi = contracts.core.vault.abi
+
+        assert abi == json.loads((networks._ABIS_DIR / "vault.json").read_text())
+
+    def test_stale_bundle_entry_falls_back_to_json(self, tmp_path, monkeypatch):
+        bundle_path = tmp_path / "abis.pickle"
+        bundle_path.write_bytes(
+            pickle.dumps({"sources": {"vault.json": "0" * 64}, "abis": {"vault.json": []}})
+        )
+        monkeypatch.setattr(networks, "_BUNDLE_PATH", bundle_path)
+
+        assert networks.load("dev").core.vault.abi != []
+
+    def test_same_size_edit_invalidates_bundle_entry(self, tmp_path, monkeypatch):
+        abis_dir = tmp_path / "abis"
+        shutil.copytree(networks._ABIS_DIR, abis_dir, ignore=shutil.ignore_patterns("*.pickle"))
+        monkeypatch.setattr(networks, "_ABIS_DIR", abis_dir)
+        bundle_path = networks.build_abi_bundle(tmp_path / "abis.pickle")
+        monkeypatch.setattr(networks, "_BUNDLE_PATH", bundle_path)
+        vault = abis_dir / "vault.json"
+        vault.write_text("[]".ljust(vault.stat().st_size))
+
+        assert networks.load("dev").core.vault.abi == []
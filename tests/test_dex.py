@@ -1,3 +1,6 @@
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
@@ -7,13 +10,18 @@ from primedelta import (
     AccountNotVerified,
     AMMAddLiquidity,
     AMMRemoveLiquidity,
+    PoolState,
+    PoolType,
     PrimeDelta,
     PriceFeedAddLiquidity,
     PriceFeedRemoveLiquidity,
+    RouteKind,
+    SwapLeg,
     SwapSide,
     TransactionFailed,
 )
 from primedelta.primedelta import _decode_revert
+from primedelta.dex.allowances import AllowanceManager
 from primedelta.contracts import (
     ContractRef,
     Contracts,
@@ -133,6 +141,96 @@ class TestRouterSwapHandler:
             pyth_data,
         )
 
+    def test_swap_batch_shares_setup_and_coalesces_approvals(self):
+        web3 = _make_web3_mock()
+        send_tx = MagicMock(return_value="0xAPPROVE")
+        by_symbol = MagicMock(return_value={"AAPL": b"\xde\xad"})
+        submit = MagicMock(side_effect=["f1", "f2", ValueError("nonce"), "f4"])
+        handler = _RouterSwapHandler(
+            web3=web3,
+            account=_make_account(),
+            contracts_provider=lambda: _contracts(),
+            signed_prices_fetcher=MagicMock(),
+            send_tx=send_tx,
+            signed_prices_by_symbol=by_symbol,
+        )
+        legs = [
+            SwapLeg("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5")),
+            SwapLeg(
+                "AAPL",
+                SwapSide.STABLECOIN_TO_STOCK,
+                Decimal("0.1"),
+                Decimal("30"),
+                exact_output=True,
+            ),
+            SwapLeg("AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("2"), Decimal("390")),
+            SwapLeg("AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("1"), Decimal("190")),
+        ]
+
+        outcomes = handler.swap_batch(legs, submit)
+
+        assert outcomes[:2] == ["f1", "f2"] and outcomes[3] == "f4"
+        assert isinstance(outcomes[2], ValueError)
+        by_symbol.assert_called_once_with(["AAPL"])
+        web3.eth.get_block.assert_called_once()
+        router = web3.eth.contract.return_value
+        assert [c.args for c in router.functions.approve.call_args_list] == [
+            (_ROUTER_ADDRESS, 130 * 10**6),
+            (_ROUTER_ADDRESS, 3 * 10**18),
+        ]
+        assert send_tx.call_count == 2
+        router.functions.buyExactOutput.assert_called_once_with(
+            _AAPL_TOKEN, 10**17, 30 * 10**6, 1_700_000_000 + 600, [b"\xde\xad"]
+        )
+
+    def test_swap_batch_reports_a_leg_that_cannot_be_built(self):
+        web3 = _make_web3_mock()
+        router = web3.eth.contract.return_value
+        router.functions.sellExactInput.side_effect = ValueError("bad amount")
+        submit = MagicMock(return_value="f")
+        handler = _RouterSwapHandler(
+            web3=web3,
+            account=_make_account(),
+            contracts_provider=lambda: _contracts(),
+            signed_prices_fetcher=MagicMock(),
+            send_tx=MagicMock(),
+            signed_prices_by_symbol=MagicMock(return_value={"AAPL": b"\xde\xad"}),
+        )
+        legs = [
+            SwapLeg("AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("2"), Decimal("390")),
+            SwapLeg("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5")),
+        ]
+
+        outcomes = handler.swap_batch(legs, submit)
+
+        assert isinstance(outcomes[0], ValueError) and outcomes[1] == "f"
+        # The failed leg's stock is not approved.
+        router.functions.approve.assert_called_once_with(_ROUTER_ADDRESS, 100 * 10**6)
+
+    def test_swap_batch_charges_the_oracle_fee_per_leg_update(self):
+        web3 = _make_web3_mock()
+        web3.eth.contract.return_value.functions.getUpdateFee.return_value.call.return_value = 7
+        base = _contracts(with_amm_pools=True)
+        contracts = replace(base, core=replace(base.core, oracle=_ref("0x" + "8" * 40)))
+        submit = MagicMock(return_value="f")
+        handler = _RouterSwapHandler(
+            web3=web3,
+            account=_make_account(),
+            contracts_provider=lambda: contracts,
+            signed_prices_fetcher=MagicMock(),
+            send_tx=MagicMock(),
+            signed_prices_by_symbol=MagicMock(return_value={"AAPL": b"\xde\xad"}),
+        )
+        legs = [
+            SwapLeg("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5")),
+            SwapLeg("AMMT1", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5")),
+        ]
+
+        handler.swap_batch(legs, submit)
+
+        # Only AAPL ships a signed update; the AMM leg owes no oracle fee.
+        assert [c.kwargs["value"] for c in submit.call_args_list] == [7, 0]
+
     def test_swap_exact_input_stock_to_stablecoin_approves_stock_and_calls_sell(self):
         web3 = _make_web3_mock()
         send_tx = MagicMock(return_value="0xTX")
@@ -543,6 +641,66 @@ class TestDispatcher:
             "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5"), 600, 0
         )
 
+    def test_swap_route_executes_split_legs_in_order(self):
+        primedelta = _make_primedelta()
+        primedelta._pool_types.update(AAPL=PoolType.PRICE_FEED, TSLA=PoolType.PRICE_FEED)
+        primedelta._quoter.pool_state = MagicMock(
+            return_value=PoolState(
+                stock_reserve=Decimal(1000), stablecoin_reserve=Decimal(250_000)
+            )
+        )
+        primedelta._quoter.prefetch = MagicMock()
+        primedelta._quoter._oracle_price = MagicMock(return_value=Decimal(200))
+        route = replace(
+            primedelta.best_route_exact_input("AAPL", "TSLA", Decimal("10")),
+            kind=RouteKind.SPLIT_LEGS,
+        )
+        with patch.object(
+            primedelta._primedelta_client,
+            "get_account_status",
+            return_value=AccountStatus.DID_MINTED,
+        ), patch.object(
+            primedelta._router_swapper, "swap_exact_input", side_effect=["0xA", "0xB"]
+        ) as mock_swap:
+            txs = primedelta.swap_route(route, Decimal("0.01"))
+
+        assert txs == ["0xA", "0xB"]
+        sell, buy = mock_swap.call_args_list
+        assert sell.args[:4] == (
+            "AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("10"), Decimal("1980.000000")
+        )
+        assert buy.args[:3] == ("TSLA", SwapSide.STABLECOIN_TO_STOCK, Decimal("1980.000000"))
+        # Re-quoted for the 1980 dUSD actually spent, not the 2000 the route saw.
+        assert buy.args[3] == Decimal("9.801")
+        assert buy.args[3] < route.min_amount_out(Decimal("0.01"))
+
+    def test_swap_batch_reports_each_leg(self):
+        primedelta = _make_primedelta()
+        legs = [
+            SwapLeg("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5")),
+            SwapLeg("NOPE", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"), Decimal("0.5")),
+            SwapLeg("TSLA", SwapSide.STOCK_TO_STABLECOIN, Decimal("1"), Decimal("200")),
+        ]
+        mined, reverted = Future(), Future()
+        mined.set_result("0xA")
+        reverted.set_exception(TransactionFailed("sellExactInput", "slippage"))
+        with patch.object(
+            primedelta._primedelta_client,
+            "get_account_status",
+            return_value=AccountStatus.DID_MINTED,
+        ) as status, patch.object(
+            primedelta._router_swapper,
+            "swap_batch",
+            return_value=[mined, PoolNotFound("NOPE"), reverted],
+        ):
+            results = primedelta.swap_batch(legs)
+
+        status.assert_called_once()
+        assert [r.leg for r in results] == legs
+        assert results[0].ok and results[0].tx_hash == "0xA"
+        assert isinstance(results[1].error, PoolNotFound)
+        assert isinstance(results[2].error, TransactionFailed)
+
     def test_swap_exact_output_routes_to_router_swapper(self):
         primedelta = _make_primedelta()
         with patch.object(
@@ -828,6 +986,7 @@ class TestBuildAndSendTransaction:
         # Replace the lazy auto-mock with a fresh MagicMock we control end-to-end.
         pd._web3 = MagicMock()
         pd._web3.to_checksum_address.side_effect = lambda a: a
+        pd._web3.eth.get_transaction_count.return_value = 0
         pd._account = MagicMock()
         pd._account.address = _USER_ADDRESS
         pd._account.sign_transaction.return_value.rawTransaction = b"\x00"
@@ -886,3 +1045,249 @@ class TestBuildAndSendTransaction:
         assert info.value.function_name == "buyExactInput"
         assert info.value.tx_hash == "0xabc"
         assert "Error('bad')" in info.value.reason
+
+
+class TestNonceRecovery:
+    def test_nonce_too_low_adopts_expected_nonce_and_retries(self):
+        pd = TestBuildAndSendTransaction()._make_pd_with_fresh_web3()
+        pd._web3.eth.get_transaction_count.return_value = 3
+        pd._web3.eth.wait_for_transaction_receipt.return_value = {"status": 1}
+        pd._web3.eth.send_raw_transaction.return_value.hex.return_value = "0xok"
+        fn = MagicMock()
+        fn.fn_name = "approve"
+        fn.build_transaction.side_effect = [
+            TransactionFailed("approve", "Nonce too low. account nonce 9"),
+            {},
+        ]
+
+        assert pd._build_and_send_transaction(fn) == "0xok"
+
+        nonces = [c.args[0]["nonce"] for c in fn.build_transaction.call_args_list]
+        assert nonces == [3, 9]
+        pd._web3.eth.get_transaction_count.assert_called_once()
+
+    def test_failure_before_broadcast_hands_the_nonce_back(self):
+        pd = TestBuildAndSendTransaction()._make_pd_with_fresh_web3()
+        pd._web3.eth.get_transaction_count.return_value = 4
+        pd._web3.eth.wait_for_transaction_receipt.return_value = {"status": 1}
+        pd._web3.eth.send_raw_transaction.return_value.hex.return_value = "0xok"
+        fn = MagicMock()
+        fn.fn_name = "approve"
+        # Not a revert: e.g. web3's gas estimate failing on a dropped RPC.
+        fn.build_transaction.side_effect = [ValueError("estimate_gas failed"), {}]
+
+        with pytest.raises(ValueError):
+            pd._build_and_send_transaction(fn)
+        assert pd._build_and_send_transaction(fn) == "0xok"
+
+        nonces = [c.args[0]["nonce"] for c in fn.build_transaction.call_args_list]
+        assert nonces == [4, 4]
+        pd._web3.eth.send_raw_transaction.assert_called_once()
+
+
+class TestGasLimits:
+    def test_learns_limit_from_receipt_for_next_send(self):
+        pd = TestBuildAndSendTransaction()._make_pd_with_fresh_web3()
+        pd._web3.eth.gas_price = 1
+        pd._web3.eth.send_raw_transaction.return_value.hex.return_value = "0xok"
+        pd._web3.eth.wait_for_transaction_receipt.return_value = {
+            "status": 1,
+            "gasUsed": 60_000,
+        }
+        fn = MagicMock()
+        fn.fn_name = "approve"
+        fn.address = "0xToken"
+        fn._encode_transaction_data.return_value = "0x095ea7b3" + "00" * 64
+        fn.build_transaction.side_effect = lambda params: {
+            **params,
+            "to": "0xToken",
+            "data": "0x095ea7b3" + "00" * 64,
+        }
+
+        pd._build_and_send_transaction(fn)
+        pd._build_and_send_transaction(fn)
+
+        sent = [c.args[0] for c in fn.build_transaction.call_args_list]
+        assert [tx["gas"] for tx in sent] == [5_000_000, 90_000]
+        assert all(tx["gasPrice"] == 1 for tx in sent)
+        pd._web3.eth.estimate_gas.assert_not_called()
+
+
+class TestSubmit:
+    def _make_pd(self) -> PrimeDelta:
+        pd = TestBuildAndSendTransaction()._make_pd_with_fresh_web3()
+        pd._web3.eth.block_number = 100
+        pd._web3.eth.get_block.return_value = {"transactions": []}
+        pd._web3.eth.send_raw_transaction.return_value.hex.return_value = "0xa1"
+        # Drive the tracker's `poll` by hand instead of from its thread.
+        pd._receipt_tracker()._thread = MagicMock()
+        return pd
+
+    def _fn(self) -> MagicMock:
+        fn = MagicMock()
+        fn.fn_name = "approve"
+        fn.build_transaction.side_effect = lambda params: dict(params)
+        return fn
+
+    def test_returns_future_resolving_to_tx_hash(self):
+        pd = self._make_pd()
+
+        future = pd.submit(self._fn())
+        assert not future.done()
+
+        pd._web3.eth.block_number = 101
+        pd._web3.eth.get_block.return_value = {"transactions": ["0xa1"]}
+        pd._web3.eth.get_transaction_receipt.return_value = {
+            "status": 1,
+            "blockNumber": 101,
+        }
+        pd._receipts.poll()
+        assert future.result() == "0xa1"
+        pd._web3.eth.wait_for_transaction_receipt.assert_not_called()
+
+    def test_timed_out_submission_resyncs_nonces(self):
+        from web3.exceptions import TimeExhausted, TransactionNotFound
+
+        pd = self._make_pd()
+        pd._web3.eth.get_transaction_receipt.side_effect = TransactionNotFound("0xa1")
+        future = pd.submit(self._fn(), value=0)
+        assert pd._nonces.synced
+
+        pd._receipts._clock = lambda: float("inf")
+        pd._receipts.poll()
+
+        with pytest.raises(TimeExhausted):
+            future.result()
+        assert not pd._nonces.synced
+
+
+class TestPipelinedSubmission:
+    def _make_pd(self) -> PrimeDelta:
+        pd = TestBuildAndSendTransaction()._make_pd_with_fresh_web3()
+        pd._web3.eth.get_transaction_count.return_value = 7
+        hashes = iter(["0xa1", "0xa2", "0xa3"])
+
+        def send_raw_transaction(raw):
+            tx_hash = MagicMock()
+            tx_hash.hex.return_value = next(hashes)
+            return tx_hash
+
+        pd._web3.eth.send_raw_transaction.side_effect = send_raw_transaction
+        return pd
+
+    def _fn(self, name: str) -> MagicMock:
+        fn = MagicMock()
+        fn.fn_name = name
+        fn.build_transaction.side_effect = lambda params: dict(params)
+        return fn
+
+    def test_broadcasts_all_before_waiting_for_receipts(self):
+        pd = self._make_pd()
+        events = []
+        pd._web3.eth.send_raw_transaction.side_effect = (
+            lambda raw: events.append("send") or MagicMock()
+        )
+        pd._web3.eth.wait_for_transaction_receipt.side_effect = (
+            lambda tx_hash: events.append("wait") or {"status": 1}
+        )
+        approve, swap = self._fn("approve"), self._fn("buyExactInput")
+
+        with pd.pipelined():
+            pd._build_and_send_transaction(approve)
+            pd._build_and_send_transaction(swap)
+            assert events == ["send", "send"]
+
+        assert events == ["send", "send", "wait", "wait"]
+        nonces = [
+            fn.build_transaction.call_args.args[0]["nonce"] for fn in (approve, swap)
+        ]
+        assert nonces == [7, 8]
+
+    def test_revert_is_reported_for_the_call_that_failed(self):
+        pd = self._make_pd()
+        receipts = {"0xa1": {"status": 1}, "0xa2": {"status": 0, "blockNumber": 5}}
+        pd._web3.eth.wait_for_transaction_receipt.side_effect = (
+            lambda tx_hash: receipts[tx_hash.hex()]
+        )
+
+        with pytest.raises(TransactionFailed) as info:
+            with pd.pipelined():
+                pd._build_and_send_transaction(self._fn("approve"))
+                pd._build_and_send_transaction(self._fn("buyExactInput"))
+
+        assert info.value.function_name == "buyExactInput"
+        assert info.value.tx_hash == "0xa2"
+
+    def test_reverted_approve_forgets_cached_allowance(self):
+        pd = self._make_pd()
+        pd._allowances = AllowanceManager(
+            pd._web3, _USER_ADDRESS, pd._build_and_send_transaction
+        )
+        spender = "0x" + "5" * 40
+        token = MagicMock()
+        token.address = "0x" + "1" * 40
+        token.functions.allowance.return_value.call.return_value = 0
+        approve = token.functions.approve.return_value
+        approve.fn_name = "approve"
+        approve.address = token.address
+        approve._encode_transaction_data.return_value = (
+            "0x095ea7b3" + "0" * 24 + spender[2:] + "0" * 63 + "a"
+        )
+        approve.build_transaction.side_effect = lambda params: dict(params)
+        pd._web3.eth.wait_for_transaction_receipt.return_value = {
+            "status": 0,
+            "blockNumber": 5,
+        }
+
+        with pytest.raises(TransactionFailed):
+            with pd.pipelined():
+                pd._allowances.ensure(token, spender, 10)
+        pd._web3.eth.wait_for_transaction_receipt.return_value = {"status": 1}
+        pd._allowances.ensure(token, spender, 10)
+
+        # The allowance the reverted approve was assumed to grant is re-read.
+        assert token.functions.allowance.return_value.call.call_count == 2
+        assert token.functions.approve.call_count == 2
+
+    def test_pipeline_is_per_thread(self):
+        pd = self._make_pd()
+        waited = []
+        pd._web3.eth.wait_for_transaction_receipt.side_effect = (
+            lambda tx_hash: waited.append(tx_hash.hex()) or {"status": 1}
+        )
+        other_thread_waited = []
+
+        def send_from_other_thread():
+            pd._build_and_send_transaction(self._fn("buyExactInput"))
+            other_thread_waited.extend(waited)
+
+        with pd.pipelined():
+            pd._build_and_send_transaction(self._fn("approve"))
+            worker = threading.Thread(target=send_from_other_thread)
+            worker.start()
+            worker.join()
+            # The other thread's swap waited for its own receipt...
+            assert other_thread_waited == ["0xa2"]
+
+        # ...and the pipeline only awaited this thread's transaction.
+        assert waited == ["0xa2", "0xa1"]
+
+    def test_swap_runs_pipelined_by_default(self):
+        pd = self._make_pd()
+        pd._web3.eth.wait_for_transaction_receipt.return_value = {"status": 1}
+
+        def fake_swap(*args):
+            pd._build_and_send_transaction(self._fn("approve"))
+            tx = pd._build_and_send_transaction(self._fn("buyExactInput"))
+            pd._web3.eth.wait_for_transaction_receipt.assert_not_called()
+            return tx
+
+        with patch.object(pd, "_require_logged_in_and_did_minted"), patch.object(
+            pd._router_swapper, "swap_exact_input", side_effect=fake_swap
+        ):
+            tx = pd.swap_exact_input(
+                "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("1"), Decimal("0")
+            )
+
+        assert tx == "0xa2"
+        assert pd._web3.eth.wait_for_transaction_receipt.call_count == 2
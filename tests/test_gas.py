@@ -0,0 +1,143 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from web3.exceptions import ContractLogicError
+
+from primedelta.gas import DEFAULT_GAS_LIMIT, FeeOracle, GasStrategy, gas_key
+
+_ROUTER = "0xRouter"
+_CALL = {"to": _ROUTER, "data": "0xa9059cbb" + "00" * 64}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_gas_key_is_contract_and_selector():
+    assert gas_key("0xRouter", "0xA9059CBB0000") == ("0xrouter", "0xa9059cbb", ())
+    assert gas_key("0xRouter", bytes.fromhex("a9059cbb00")) == (
+        "0xrouter",
+        "0xa9059cbb",
+        (),
+    )
+    assert gas_key(None, "0xa9059cbb") is None
+    assert gas_key("0xRouter", "0x") is None
+
+
+def test_gas_key_includes_address_arguments():
+    token = "ab" * 20
+    amount = f"{10**24:064x}"
+    data = "0xa9059cbb" + "00" * 12 + token + amount
+
+    assert gas_key(_ROUTER, data) == ("0xrouter", "0xa9059cbb", ("0x" + token,))
+
+
+class TestGasStrategy:
+    def test_uses_default_until_a_receipt_is_seen(self):
+        gas = GasStrategy(margin=1.5)
+        web3 = MagicMock()
+
+        assert gas.gas_limit(web3, _CALL) == DEFAULT_GAS_LIMIT
+
+        gas.observe({**_CALL, "gas": DEFAULT_GAS_LIMIT}, {"status": 1, "gasUsed": 100_000})
+        gas.observe({**_CALL, "gas": 150_000}, {"status": 1, "gasUsed": 80_000})
+
+        assert gas.gas_limit(web3, _CALL) == 150_000
+        assert gas.gas_limit(web3, {**_CALL, "to": "0xOther"}) == DEFAULT_GAS_LIMIT
+        web3.eth.estimate_gas.assert_not_called()
+
+    def test_learns_separately_per_token_argument(self):
+        gas = GasStrategy(margin=1.5)
+        amm, feed = "0x" + "11" * 20, "0x" + "22" * 20
+
+        def call(token: str) -> dict:
+            return {"to": _ROUTER, "data": "0x12345678" + "00" * 12 + token[2:]}
+
+        gas.observe(call(feed), {"status": 1, "gasUsed": 100_000})
+
+        assert gas.gas_limit(MagicMock(), call(feed)) == 150_000
+        # An AMM pool behind the same function hasn't been seen yet.
+        assert gas.gas_limit(MagicMock(), call(amm)) == DEFAULT_GAS_LIMIT
+        gas.observe(call(amm), {"status": 1, "gasUsed": 300_000})
+        assert gas.function_gas_used(_ROUTER, "0x12345678") == 300_000
+
+    def test_out_of_gas_forgets_learned_limit(self):
+        gas = GasStrategy(margin=1.5)
+        gas.observe({**_CALL, "gas": DEFAULT_GAS_LIMIT}, {"status": 1, "gasUsed": 100_000})
+
+        gas.observe({**_CALL, "gas": 150_000}, {"status": 0, "gasUsed": 150_000})
+
+        assert gas.gas_limit(MagicMock(), _CALL) == DEFAULT_GAS_LIMIT
+
+    def test_failure_below_the_limit_also_forgets_learned_limit(self):
+        gas = GasStrategy(margin=1.5)
+        gas.observe({**_CALL, "gas": DEFAULT_GAS_LIMIT}, {"status": 1, "gasUsed": 100_000})
+
+        # An inner call starved by the 63/64 rule fails below the limit.
+        gas.observe({**_CALL, "gas": 150_000}, {"status": 0, "gasUsed": 148_000})
+
+        assert gas.gas_limit(MagicMock(), _CALL) == DEFAULT_GAS_LIMIT
+
+    def test_estimates_only_when_enabled_and_allowed(self):
+        gas = GasStrategy(margin=1.5, estimate=True)
+        web3 = MagicMock()
+        web3.eth.estimate_gas.return_value = 40_000
+
+        assert gas.gas_limit(web3, _CALL, can_estimate=False) == DEFAULT_GAS_LIMIT
+        assert gas.gas_limit(web3, _CALL) == 60_000
+
+    def test_estimate_revert_propagates_other_failures_fall_back(self):
+        gas = GasStrategy(estimate=True)
+        web3 = MagicMock()
+        web3.eth.estimate_gas.side_effect = ContractLogicError("execution reverted")
+        with pytest.raises(ContractLogicError):
+            gas.gas_limit(web3, _CALL)
+
+        web3.eth.estimate_gas.side_effect = ConnectionError()
+        assert gas.gas_limit(web3, _CALL) == DEFAULT_GAS_LIMIT
+
+
+class TestFeeOracle:
+    def test_legacy_gas_price_read_once_per_block_time(self):
+        clock = _Clock()
+        oracle = FeeOracle(block_time=2.0, clock=clock)
+        web3 = MagicMock()
+        web3.eth.gas_price = 7
+
+        assert oracle.fees(web3) == {"gasPrice": 7}
+        web3.eth.gas_price = 9
+        assert oracle.fees(web3) == {"gasPrice": 7}
+
+        clock.now = 2.0
+        assert oracle.fees(web3) == {"gasPrice": 9}
+
+    def test_eip1559_fees_from_latest_base_fee(self):
+        oracle = FeeOracle(eip1559=True, base_fee_multiplier=2)
+        web3 = MagicMock()
+        web3.eth.get_block.return_value = {"baseFeePerGas": 100}
+        web3.eth.max_priority_fee = 3
+
+        assert oracle.fees(web3) == {"maxFeePerGas": 203, "maxPriorityFeePerGas": 3}
+
+    def test_eip1559_without_base_fee_falls_back_to_gas_price(self):
+        oracle = FeeOracle(eip1559=True, priority_fee=1)
+        web3 = MagicMock()
+        web3.eth.get_block.return_value = {}
+        web3.eth.gas_price = 5
+
+        assert oracle.fees(web3) == {"gasPrice": 5}
+
+    def test_async_fees(self):
+        oracle = FeeOracle(eip1559=True, priority_fee=2)
+        web3 = MagicMock()
+        web3.eth.get_block = AsyncMock(return_value={"baseFeePerGas": 10})
+
+        assert asyncio.run(oracle.fees_async(web3)) == {
+            "maxFeePerGas": 22,
+            "maxPriorityFeePerGas": 2,
+        }
@@ -0,0 +1,143 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from web3 import Web3
+
+from primedelta import PrimeDelta, TransactionFailed
+from primedelta.contracts import ContractRef
+from primedelta.multicall import MULTICALL3_ADDRESS, BatchReader
+from primedelta.networks import _read_abi
+
+
+_TOKEN_A = Web3.to_checksum_address("0x" + "a" * 40)
+_TOKEN_B = Web3.to_checksum_address("0x" + "b" * 40)
+_HOLDER = Web3.to_checksum_address("0x" + "c" * 40)
+_ERROR_STRING_REVERT = "0x08c379a0" + Web3().codec.encode(["string"], ["nope"]).hex()
+
+
+def _web3() -> Web3:
+    return Web3(Web3.HTTPProvider("http://localhost:8545"))
+
+
+def _balance_calls(web3: Web3) -> list:
+    erc20_abi = _read_abi("erc20.json")
+    return [
+        web3.eth.contract(address=token, abi=erc20_abi).functions.balanceOf(_HOLDER)
+        for token in (_TOKEN_A, _TOKEN_B)
+    ]
+
+
+def _uint(value: int) -> bytes:
+    return Web3().codec.encode(["uint256"], [value])
+
+
+def _multicall_ref() -> ContractRef:
+    return ContractRef(address=MULTICALL3_ADDRESS, abi=_read_abi("multicall3.json"))
+
+
+class TestBatchReaderAggregate:
+    def test_reads_all_calls_in_one_aggregate3(self):
+        web3 = _web3()
+        aggregate_result = web3.codec.encode(
+            ["(bool,bytes)[]"], [[(True, _uint(5)), (True, _uint(7))]]
+        )
+        with patch.object(web3.eth, "get_code", return_value=b"\x60"), patch.object(
+            web3.eth, "call", return_value=aggregate_result
+        ) as eth_call:
+            reader = BatchReader(web3, _multicall_ref())
+            assert reader.read(_balance_calls(web3)) == [5, 7]
+
+        assert eth_call.call_count == 1
+        assert eth_call.call_args.args[0]["to"] == MULTICALL3_ADDRESS
+
+    def test_revert_is_attributed_to_failing_call(self):
+        web3 = _web3()
+        aggregate_result = web3.codec.encode(
+            ["(bool,bytes)[]"],
+            [[(True, _uint(5)), (False, bytes.fromhex(_ERROR_STRING_REVERT[2:]))]],
+        )
+        with patch.object(web3.eth, "get_code", return_value=b"\x60"), patch.object(
+            web3.eth, "call", return_value=aggregate_result
+        ):
+            reader = BatchReader(web3, _multicall_ref())
+            assert reader.read(_balance_calls(web3), allow_failure=True) == [5, None]
+            with pytest.raises(TransactionFailed) as exc:
+                reader.read(_balance_calls(web3))
+
+        assert exc.value.function_name == "balanceOf"
+        assert "nope" in exc.value.reason
+
+
+class TestBatchReaderRpcBatch:
+    def test_falls_back_to_json_rpc_batch_without_aggregator(self):
+        web3 = _web3()
+        response = json.dumps(
+            [
+                {"jsonrpc": "2.0", "id": 1, "result": "0x" + _uint(7).hex()},
+                {"jsonrpc": "2.0", "id": 0, "result": "0x" + _uint(5).hex()},
+            ]
+        ).encode()
+        with patch.object(web3.eth, "get_code", return_value=b""), patch(
+            "primedelta.multicall.make_post_request", return_value=response
+        ) as post:
+            reader = BatchReader(web3, _multicall_ref())
+            assert reader.read(_balance_calls(web3), block_identifier=12) == [5, 7]
+
+        payload = json.loads(post.call_args.args[1])
+        assert [entry["method"] for entry in payload] == ["eth_call", "eth_call"]
+        assert payload[0]["params"][1] == "0xc"
+
+    def test_chunks_by_max_batch_size(self):
+        web3 = _web3()
+
+        def respond(uri, data, **kwargs):
+            return json.dumps(
+                [
+                    {"jsonrpc": "2.0", "id": entry["id"], "result": "0x" + _uint(1).hex()}
+                    for entry in json.loads(data)
+                ]
+            ).encode()
+
+        with patch("primedelta.multicall.make_post_request", side_effect=respond) as post:
+            reader = BatchReader(web3, max_batch_size=1)
+            assert reader.read(_balance_calls(web3)) == [1, 1]
+
+        assert post.call_count == 2
+
+
+class TestBatchReaderSequential:
+    def test_calls_one_by_one_without_http_provider(self):
+        web3 = MagicMock()
+        del web3.provider.endpoint_uri
+        calls = [MagicMock(), MagicMock()]
+        calls[0].call.return_value = 5
+        calls[1].call.side_effect = RuntimeError("boom")
+
+        reader = BatchReader(web3)
+
+        assert reader.read(calls, allow_failure=True) == [5, None]
+        with pytest.raises(RuntimeError):
+            reader.read(calls)
+
+
+class TestOnchainStockBalances:
+    def test_reads_all_balances_in_one_batch(self):
+        with patch("primedelta.primedelta.Web3"):
+            primedelta = PrimeDelta(
+                private_key="0x" + "1" * 64,
+                web3_provider_url="http://localhost:8545",
+            )
+        primedelta._web3.to_checksum_address.side_effect = lambda a: a
+        tokens = {"AMMT1": _TOKEN_A, "AMMT2": _TOKEN_B}
+
+        with patch.object(
+            primedelta._token_registry, "resolve", side_effect=tokens.get
+        ), patch.object(
+            primedelta._batch_reader, "read", return_value=[10**18, 25 * 10**17]
+        ) as read:
+            balances = primedelta.get_onchain_stock_balances(["AMMT1", "AMMT2", "AMMT1"])
+
+        assert balances == {"AMMT1": 1, "AMMT2": 2.5}
+        assert read.call_count == 1
+        assert len(read.call_args.args[0]) == 2
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+from primedelta.nonces import NonceManager
+
+
+class TestNonceManager:
+    def test_reads_chain_once_then_allocates_locally(self):
+        chain_nonce = MagicMock(return_value=7)
+        nonces = NonceManager()
+
+        assert [nonces.allocate(chain_nonce) for _ in range(3)] == [7, 8, 9]
+        chain_nonce.assert_called_once()
+
+    def test_concurrent_threads_never_share_a_nonce(self):
+        nonces = NonceManager()
+        allocated = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            for _ in range(100):
+                allocated.append(nonces.allocate(lambda: 0))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(allocated) == list(range(800))
+
+    def test_released_nonce_fills_the_gap(self):
+        nonces = NonceManager()
+        first, second, third = (nonces.allocate(lambda: 0) for _ in range(3))
+
+        nonces.release(second)
+
+        assert nonces.allocate(lambda: 0) == second
+        assert nonces.allocate(lambda: 0) == third + 1
+
+    def test_release_of_latest_nonce_rewinds_counter(self):
+        nonces = NonceManager()
+        nonces.allocate(lambda: 5)
+        latest = nonces.allocate(lambda: 5)
+
+        nonces.release(latest)
+
+        assert nonces.allocate(lambda: 5) == 6
+        assert nonces._released == []
+
+    def test_resync_adopts_expected_nonce_or_rereads_chain(self):
+        chain_nonce = MagicMock(side_effect=[0, 3])
+        nonces = NonceManager()
+        nonces.allocate(chain_nonce)
+
+        nonces.resync(10)
+        assert nonces.allocate(chain_nonce) == 10
+
+        nonces.resync()
+        assert nonces.allocate(chain_nonce) == 3
+
+    def test_concurrent_coroutines_never_share_a_nonce(self):
+        chain_nonce = AsyncMock(return_value=4)
+        nonces = NonceManager()
+
+        async def allocate_many():
+            return await asyncio.gather(
+                *(nonces.allocate_async(chain_nonce) for _ in range(5))
+            )
+
+        assert sorted(asyncio.run(allocate_many())) == [4, 5, 6, 7, 8]
@@ -246,3 +246,36 @@ class TestMarketStatus:
             primedelta._primedelta_client, "is_market_open", return_value=False
         ):
             assert primedelta.is_market_open() is False
+
+
+class TestIterClosedOrders:
+    def test_walks_all_pages_of_closed_orders(self):
+        with patch("primedelta.primedelta.Web3"):
+            primedelta = PrimeDelta(
+                private_key="0x" + "1" * 64,
+                web3_provider_url="http://localhost:8545",
+            )
+
+        def make_order(order_id):
+            return Order(
+                id=order_id,
+                order_side=OrderSide.BUY,
+                type="LIMIT",
+                symbol="AAPL",
+                quantity=1,
+                status=OrderStatus.EXECUTED,
+                price=Decimal("150.00"),
+                date_of_cancellation=None,
+            )
+
+        pages = {1: [make_order(1), make_order(2)], 2: [make_order(3)]}
+
+        with patch.object(
+            primedelta._primedelta_client,
+            "closed_orders",
+            side_effect=lambda page, size: pages.get(page, []),
+        ) as mock_closed:
+            orders = list(primedelta.iter_closed_orders(page_size=2))
+
+        assert [order.id for order in orders] == [1, 2, 3]
+        assert mock_closed.call_count == 2
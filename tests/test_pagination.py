@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+
+from primedelta.pagination import aiter_pages, iter_pages
+
+
+class TestIterPages:
+    def test_walks_until_short_page(self):
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+        calls = []
+
+        def fetch(page, size):
+            calls.append((page, size))
+            return pages.get(page, [])
+
+        assert list(iter_pages(fetch, page_size=2)) == [1, 2, 3, 4, 5]
+        assert calls == [(1, 2), (2, 2), (3, 2)]
+
+    def test_stops_on_empty_page_after_full_page(self):
+        pages = {1: [1, 2]}
+
+        assert list(iter_pages(lambda p, s: pages.get(p, []), page_size=2)) == [1, 2]
+
+    def test_prefetches_next_page_while_current_is_consumed(self):
+        second_page_requested = threading.Event()
+
+        def fetch(page, size):
+            if page == 2:
+                second_page_requested.set()
+                return []
+            return [1, 2]
+
+        iterator = iter_pages(fetch, page_size=2)
+        assert next(iterator) == 1
+        # Page 2 is in flight before the caller has finished page 1.
+        assert second_page_requested.wait(timeout=1)
+
+    def test_is_lazy(self):
+        calls = []
+        iterator = iter_pages(lambda p, s: calls.append(p) or [p], page_size=1)
+        assert calls == []
+        next(iterator)
+        assert calls[0] == 1
+
+    def test_rejects_non_positive_page_size(self):
+        with pytest.raises(ValueError):
+            list(iter_pages(lambda p, s: [], page_size=0))
+
+
+class TestAsyncIterPages:
+    def test_walks_until_short_page(self):
+        pages = {1: ["a", "b"], 2: ["c"]}
+
+        async def fetch(page, size):
+            return pages.get(page, [])
+
+        async def collect():
+            return [item async for item in aiter_pages(fetch, page_size=2)]
+
+        assert asyncio.run(collect()) == ["a", "b", "c"]
@@ -0,0 +1,148 @@
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from primedelta import PriceBatcher, batch_prices
+from primedelta.primedelta_client import PrimeDeltaClient
+from primedelta.types import Price
+
+
+def _hermes_message(*ticks) -> MagicMock:
+    parsed = ",".join(
+        f'{{"id": "{feed}", "price": {{"price": "{price}", "expo": -5, "publish_time": {ts}}}}}'
+        for feed, price, ts in ticks
+    )
+    message = MagicMock()
+    message.data = f'{{"parsed": [{parsed}]}}'
+    return message
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPriceBatcher:
+    def test_cuts_batches_by_size(self):
+        batcher = PriceBatcher(max_size=2)
+
+        assert batcher.append("AAPL", 100, -2, 1) is None
+        batch = batcher.append("TSLA", 250, -1, 2)
+
+        assert list(batch.symbol_ids) == [0, 1]
+        assert batch.symbols == ("AAPL", "TSLA")
+        assert list(batch.prices) == [1.0, 25.0]
+        assert list(batch.timestamps_ns) == [1, 2]
+        assert batcher.flush() is None
+
+    def test_poll_cuts_batch_once_window_ends(self):
+        clock = _Clock()
+        batcher = PriceBatcher(max_size=100, max_interval=1.0, clock=clock)
+        assert batcher.due_in() is None
+        batcher.append("AAPL", 1, 0, 1)
+
+        clock.now = 0.25
+        assert batcher.due_in() == 0.75
+        assert batcher.poll() is None
+        clock.now = 1.0
+        assert len(batcher.poll()) == 1
+        assert batcher.due_in() is None
+
+    def test_cuts_batches_by_time_window(self):
+        clock = _Clock()
+        batcher = PriceBatcher(max_size=100, max_interval=1.0, clock=clock)
+        batcher.append("AAPL", 1, 0, 1)
+
+        clock.now = 1.5
+        batch = batcher.append("AAPL", 2, 0, 2)
+
+        assert len(batch) == 2
+
+    def test_scaled_int_prices(self):
+        batcher = PriceBatcher(price_scale=2)
+        batcher.append("AAPL", 25821026, -5, 0)
+        batcher.append("AAPL", 7, 1, 0)
+
+        batch = batcher.flush()
+
+        assert batch.prices.typecode == "q"
+        assert list(batch.prices) == [25821, 7000]
+
+    def test_batch_prices_round_trips_price_objects(self):
+        price = Price(
+            symbol="AAPL",
+            last_price=Decimal("258.21"),
+            timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            percentage_change=Decimal("-1.5"),
+        )
+
+        (batch,) = batch_prices([price])
+
+        assert list(batch.to_prices()) == [price]
+
+    def test_to_numpy_is_zero_copy(self):
+        np = pytest.importorskip("numpy")
+        batcher = PriceBatcher()
+        batcher.append("AAPL", 1, 0, 5)
+        batch = batcher.flush()
+
+        columns = batch.to_numpy()
+        batch.timestamps_ns[0] = 6
+
+        assert columns["timestamps_ns"].dtype == np.int64
+        assert columns["timestamps_ns"][0] == 6
+
+
+class TestPythPriceBatches:
+    def test_streams_hermes_ticks_as_columns(self):
+        client = PrimeDeltaClient()
+        messages = [
+            _hermes_message(("abc", 25821026, 1700000000), ("def", 100000, 1700000001)),
+            _hermes_message(("abc", 25821027, 1700000002)),
+        ]
+
+        with patch.object(
+            PrimeDeltaClient,
+            "get_pyth_feed_ids",
+            return_value={"AAPL": "abc", "TSLA": "def"},
+        ), patch("primedelta.primedelta_client.SSEClient", return_value=messages):
+            batches = list(client.pyth_price_batches(["AAPL", "TSLA"], PriceBatcher(max_size=2)))
+
+        assert [len(b) for b in batches] == [2, 1]
+        assert [batches[0].symbols[i] for i in batches[0].symbol_ids] == ["AAPL", "TSLA"]
+        assert batches[1].prices[0] == pytest.approx(258.21027)
+        assert batches[1].timestamps_ns[0] == 1700000002 * 10**9
+
+    def test_cuts_batch_on_time_while_feed_is_quiet(self):
+        client = PrimeDeltaClient()
+        message = _hermes_message(("abc", 100000, 1700000000))
+        chunks = [f"data: {message.data}\n\n".encode()]
+        closed = threading.Event()
+        response = MagicMock(encoding="utf-8")
+        response.close.side_effect = closed.set
+
+        def read1(size):
+            if chunks:
+                return chunks.pop(0)
+            closed.wait(5)  # After one tick the feed goes quiet.
+            return b""
+
+        response.raw._fp.fp.read1.side_effect = read1
+        client._session = MagicMock()
+        client._session.get.side_effect = [response]
+
+        with patch.object(
+            PrimeDeltaClient, "get_pyth_feed_ids", return_value={"AAPL": "abc"}
+        ):
+            batches = client.pyth_price_batches(["AAPL"], PriceBatcher(max_interval=0.05))
+            batch = next(batches)
+            batches.close()
+
+        assert list(batch.prices) == [1.0]
+        assert closed.is_set()
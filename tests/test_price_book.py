@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from primedelta import PriceBook
+from primedelta.primedelta_client import PrimeDeltaClient
+from primedelta.types import Price
+
+
+def _price(symbol: str, last_price: str) -> Price:
+    return Price(
+        symbol=symbol,
+        last_price=Decimal(last_price),
+        timestamp=datetime(2024, 1, 1),
+        percentage_change=Decimal("0"),
+    )
+
+
+async def _agen(prices):
+    for price in prices:
+        yield price
+
+
+class TestPriceBook:
+    def test_keeps_latest_price_and_version_per_symbol(self):
+        book = PriceBook()
+        for symbol, last_price in [("AAPL", "1"), ("TSLA", "5"), ("AAPL", "2")]:
+            book.update(_price(symbol, last_price))
+
+        assert book.get("AAPL").last_price == Decimal("2")
+        assert book.versions() == {"AAPL": 2, "TSLA": 1}
+        assert book.version("MSFT") == 0
+        assert set(book.snapshot(["AAPL", "MSFT"])) == {"AAPL"}
+
+    def test_drains_stream_on_background_thread(self):
+        release = threading.Event()
+
+        def stream():
+            yield _price("AAPL", "1")
+            release.wait(1)
+            yield _price("AAPL", "2")
+
+        book = PriceBook().start(stream())
+        assert book.wait_for_update("AAPL", since=0, timeout=1).last_price == Decimal("1")
+
+        release.set()
+        assert book.wait_for_update("AAPL", since=1, timeout=1).last_price == Decimal("2")
+        book.close()
+
+    def test_close_shuts_a_blocked_pyth_connection(self):
+        tick = {"id": "f1", "price": {"price": "7", "expo": 0, "publish_time": 1}}
+        chunks = [f"data: {json.dumps({'parsed': [tick]})}\n\n".encode()]
+        closed = threading.Event()
+        response = MagicMock(encoding="utf-8")
+        response.close.side_effect = closed.set
+        # A quiet feed: after the first event the read blocks until closed.
+        response.raw._fp.fp.read1.side_effect = lambda size: (
+            chunks.pop(0) if chunks else closed.wait(5) and b""
+        )
+        session = MagicMock()
+        session.get.return_value = response
+        client = PrimeDeltaClient()
+        client._session = session
+        client.get_pyth_feed_ids = lambda symbols: {"AAPL": "f1"}
+
+        book = PriceBook().start(client.pyth_prices_stream(["AAPL"]))
+        assert book.wait_for_update("AAPL", since=0, timeout=1).last_price == 7
+        book.close()
+
+        assert closed.is_set()
+        book._thread.join(5)
+        assert not book._thread.is_alive()
+        assert session.get.call_count == 1
+
+    def test_wait_times_out_without_update(self):
+        book = PriceBook()
+        book.update(_price("AAPL", "1"))
+
+        assert book.wait_for_update("AAPL", timeout=0.01) is None
+
+    def test_feed_error_is_raised_to_waiters(self):
+        def stream():
+            raise ConnectionError("gone")
+            yield
+
+        book = PriceBook().start(stream())
+
+        with pytest.raises(ConnectionError):
+            book.wait_for_update("AAPL", timeout=1)
+
+    def test_async_feed_and_wait(self):
+        async def main():
+            book = PriceBook().start_async(_agen([_price("AAPL", "3")]))
+            price = await book.wait_for_update_async("AAPL", since=0, timeout=1)
+            book.close()
+            return price
+
+        assert asyncio.run(main()).last_price == Decimal("3")
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from primedelta import PriceLogReader, PriceRecorder
+from primedelta.types import Price
+
+_T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _price(symbol: str, last_price: str, seconds: int = 0) -> Price:
+    return Price(
+        symbol=symbol,
+        last_price=Decimal(last_price),
+        timestamp=_T0 + timedelta(seconds=seconds, microseconds=123),
+        percentage_change=Decimal("-0.25"),
+    )
+
+
+def _record(path, prices, step_ns=1_000_000_000):
+    clock = iter(range(0, step_ns * len(prices), step_ns))
+    with PriceRecorder(path, clock_ns=lambda: next(clock)) as recorder:
+        return list(recorder.tee(prices))
+
+
+class TestPriceLog:
+    def test_replays_exact_prices(self, tmp_path):
+        prices = [_price("AAPL", "258.21026"), _price("TSLA", "-1.5", 1), _price("AAPL", "7")]
+        _record(tmp_path / "prices.log", prices)
+
+        with PriceLogReader(tmp_path / "prices.log") as reader:
+            assert list(reader.prices()) == prices
+            assert reader.symbols == ("AAPL", "TSLA")
+
+    def test_filters_by_symbol_and_receive_time(self, tmp_path):
+        prices = [_price("AAPL" if i % 2 else "TSLA", str(i), i) for i in range(3000)]
+        _record(tmp_path / "prices.log", prices)
+
+        with PriceLogReader(tmp_path / "prices.log") as reader:
+            selected = list(
+                reader.prices(
+                    symbols=["AAPL"],
+                    start=datetime.fromtimestamp(2000, tz=timezone.utc),
+                    end=datetime.fromtimestamp(2010, tz=timezone.utc),
+                )
+            )
+
+        assert [p.last_price for p in selected] == [Decimal(i) for i in range(2001, 2010, 2)]
+
+    def test_appends_to_existing_log(self, tmp_path):
+        path = tmp_path / "prices.log"
+        _record(path, [_price("AAPL", "1")])
+        _record(path, [_price("TSLA", "2"), _price("AAPL", "3")])
+
+        with PriceLogReader(path) as reader:
+            assert [(p.symbol, p.last_price) for p in reader.prices()] == [
+                ("AAPL", 1),
+                ("TSLA", 2),
+                ("AAPL", 3),
+            ]
+
+    def test_replay_paces_by_recorded_gaps(self, tmp_path):
+        _record(tmp_path / "prices.log", [_price("AAPL", "1"), _price("AAPL", "2")])
+        sleeps = []
+
+        with PriceLogReader(tmp_path / "prices.log") as reader:
+            replayed = list(reader.replay(speed=4, sleep=sleeps.append, clock=lambda: 0.0))
+
+        assert len(replayed) == 2
+        assert sleeps == [0.25]
+
+    def test_batches_share_symbol_ids_with_log(self, tmp_path):
+        _record(tmp_path / "prices.log", [_price("AAPL", "1.5"), _price("TSLA", "2")])
+
+        with PriceLogReader(tmp_path / "prices.log") as reader:
+            (batch,) = list(reader.batches(symbols=["TSLA"]))
+
+        assert batch.symbols[batch.symbol_ids[0]] == "TSLA"
+        assert list(batch.prices) == [2.0]
+
+    def test_ignores_torn_trailing_record(self, tmp_path):
+        path = tmp_path / "prices.log"
+        _record(path, [_price("AAPL", "1")])
+        with open(path, "ab") as f:
+            f.write(b"\x01" * 7)  # A crash mid-write.
+        _record(path, [_price("AAPL", "2")])
+
+        with PriceLogReader(path) as reader:
+            assert [p.last_price for p in reader.prices()] == [1, 2]
+
+    def test_symbol_filter_reads_only_indexed_blocks(self, tmp_path):
+        path = tmp_path / "prices.log"
+        prices = [_price("AAPL", str(i), i) for i in range(5000)]
+        prices[4500] = _price("TSLA", "9", 4500)
+        _record(path, prices[:3000])
+        _record(path, prices[3000:])  # The index carries over a reopen.
+
+        with PriceLogReader(path) as reader:
+            unpack, read = reader._unpack, []
+
+            def counting_unpack(first, stop):
+                read.append(stop - first)
+                return unpack(first, stop)
+
+            reader._unpack = counting_unpack
+            assert [p.last_price for p in reader.prices(symbols=["TSLA"])] == [9]
+            (batch,) = list(reader.batches(symbols=["TSLA"]))
+            assert list(batch.prices) == [9.0]
+            assert [p.last_price for p in reader.prices(symbols=["MSFT"])] == []
+
+        # Only the last block, which the log ends partway through.
+        assert read == [5000 - 4 * 1024]
+
+    def test_indexes_a_log_recorded_without_one(self, tmp_path):
+        path = tmp_path / "prices.log"
+        _record(path, [_price("AAPL", "1"), _price("TSLA", "2")])
+        (tmp_path / "prices.log.index").unlink()
+
+        with PriceLogReader(path) as reader:
+            assert [p.last_price for p in reader.prices(symbols=["TSLA"])] == [2]
+
+        _record(path, [_price("TSLA", "3")])
+        with PriceLogReader(path) as reader:
+            assert [p.last_price for p in reader.prices(symbols=["TSLA"])] == [2, 3]
+            assert [p.last_price for p in reader.prices(symbols=["AAPL"])] == [1]
@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, patch
+
+from primedelta.price_updates import SignedPriceUpdateCache, publish_time
+from primedelta.primedelta_client import (
+    PrimeDeltaClient,
+    _parse_signed_price_updates_by_symbol,
+)
+
+
+def _update(feed: int, published: int) -> bytes:
+    return (
+        feed.to_bytes(32, "big")
+        + (123).to_bytes(8, "big")
+        + (2**32 - 8).to_bytes(4, "big")
+        + published.to_bytes(8, "big")
+        + b"\x1b"
+        + b"\x00" * 64
+    )
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _ImmediateExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+class TestPublishTime:
+    def test_reads_big_endian_publish_time(self):
+        assert publish_time(_update(1, 1_700_000_123)) == 1_700_000_123
+
+    def test_rejects_wrong_length(self):
+        assert publish_time(b"\x00" * 50) is None
+
+
+class TestSignedPriceUpdateCache:
+    def test_serves_fresh_updates_without_refetching(self):
+        fetch = MagicMock(return_value={"AAPL": _update(1, 1000)})
+        cache = SignedPriceUpdateCache(fetch, max_age=10, clock=_Clock(1002))
+
+        assert cache.get(["AAPL"]) == [_update(1, 1000)]
+        assert cache.get(["AAPL"]) == [_update(1, 1000)]
+
+        fetch.assert_called_once_with(["AAPL"])
+
+    def test_refetches_after_max_age(self):
+        clock = _Clock(1002)
+        fetch = MagicMock(
+            side_effect=[{"AAPL": _update(1, 1000)}, {"AAPL": _update(1, 1011)}]
+        )
+        cache = SignedPriceUpdateCache(fetch, max_age=10, clock=clock)
+        cache.get(["AAPL"])
+
+        clock.now = 1012
+        assert cache.get(["AAPL"]) == [_update(1, 1011)]
+
+    def test_multi_symbol_request_fetches_only_misses(self):
+        fetch = MagicMock(
+            side_effect=[
+                {"AAPL": _update(1, 1000)},
+                {"TSLA": _update(2, 1001)},
+            ]
+        )
+        cache = SignedPriceUpdateCache(fetch, max_age=10, clock=_Clock(1002))
+        cache.get(["AAPL"])
+
+        assert cache.get(["TSLA", "AAPL", "TSLA"]) == [_update(2, 1001), _update(1, 1000)]
+        assert fetch.call_args.args[0] == ["TSLA"]
+
+    def test_by_symbol_skips_unpriced_symbols(self):
+        fetch = MagicMock(return_value={"AAPL": _update(1, 1000)})
+        cache = SignedPriceUpdateCache(fetch, max_age=10, clock=_Clock(1002))
+
+        assert cache.get_by_symbol(["TSLA", "AAPL"]) == {"AAPL": _update(1, 1000)}
+
+    def test_refreshes_in_background_near_expiry(self):
+        clock = _Clock(1002)
+        fetch = MagicMock(
+            side_effect=[{"AAPL": _update(1, 1000)}, {"AAPL": _update(1, 1008)}]
+        )
+        cache = SignedPriceUpdateCache(fetch, max_age=10, refresh_margin=3, clock=clock)
+        cache._executor = _ImmediateExecutor()
+        cache.get(["AAPL"])
+
+        clock.now = 1008
+        # Still served from cache, but a refresh is triggered behind it.
+        assert cache.get(["AAPL"]) == [_update(1, 1000)]
+        assert cache.get(["AAPL"]) == [_update(1, 1008)]
+        assert fetch.call_count == 2
+
+
+class TestSignedPricesBySymbol:
+    def test_pairs_tagged_items_by_symbol(self):
+        response = [{"symbol": "TSLA", "signature": "0x02"}]
+        assert _parse_signed_price_updates_by_symbol(["AAPL", "TSLA"], response) == {
+            "TSLA": b"\x02"
+        }
+
+    def test_untagged_partial_response_falls_back_to_per_symbol_requests(self):
+        client = PrimeDeltaClient()
+        responses = {
+            "AAPL,TSLA": [{"signature": "0x02"}],
+            "AAPL": [],
+            "TSLA": [{"signature": "0x02"}],
+        }
+
+        def get(url, params, headers):
+            response = MagicMock(status_code=200)
+            response.json.return_value = responses[params["symbols"]]
+            return response
+
+        with patch.object(client._session, "get", side_effect=get):
+            assert client.get_signed_price_updates_by_symbol(["AAPL", "TSLA"]) == {
+                "TSLA": b"\x02"
+            }
@@ -8,54 +8,44 @@ from primedelta.types import Price
 
 class TestGetPythFeedIds:
     def test_returns_feed_ids_for_valid_symbols(self):
-        # get_pyth_feed_ids issues one HTTP call per symbol — drive each call
-        # from its own response so the test stays honest if extended to >1.
-        def make_response(payload):
-            response = MagicMock()
-            response.raise_for_status = MagicMock()
-            response.json.return_value = payload
-            return response
-
-        symbols = ["AAPL", "TSLA"]
-        responses = [
-            make_response(
-                [
-                    {
-                        "id": "abc123",
-                        "attributes": {"symbol": "Equity.US.AAPL/USD", "base": "AAPL"},
-                    },
-                    {
-                        "id": "def456",
-                        "attributes": {
-                            "symbol": "Equity.US.AAPL.PRE/USD",
-                            "base": "AAPL",
-                        },
-                    },
-                ]
-            ),
-            make_response(
-                [
-                    {
-                        "id": "tsla123",
-                        "attributes": {"symbol": "Equity.US.TSLA/USD", "base": "TSLA"},
-                    },
-                ]
-            ),
+        # One bulk equity listing resolves every symbol.
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.json.return_value = [
+            {
+                "id": "abc123",
+                "attributes": {"symbol": "Equity.US.AAPL/USD", "base": "AAPL"},
+            },
+            {
+                "id": "def456",
+                "attributes": {
+                    "symbol": "Equity.US.AAPL.PRE/USD",
+                    "base": "AAPL",
+                },
+            },
+            {
+                "id": "tsla123",
+                "attributes": {"symbol": "Equity.US.TSLA/USD", "base": "TSLA"},
+            },
         ]
 
-        with patch("requests.get", side_effect=responses) as mock_get:
-            feed_ids = PrimeDeltaClient.get_pyth_feed_ids(symbols)
+        client = PrimeDeltaClient()
+        with patch.object(client._session, "get", return_value=response) as mock_get:
+            feed_ids = client.get_pyth_feed_ids(["AAPL", "TSLA"])
+            assert client.get_pyth_feed_ids(["TSLA"]) == {"TSLA": "tsla123"}
 
         assert feed_ids == {"AAPL": "abc123", "TSLA": "tsla123"}
-        assert mock_get.call_count == len(symbols)
+        mock_get.assert_called_once()
+        assert "query" not in mock_get.call_args.kwargs["params"]
 
     def test_returns_empty_dict_for_no_matching_feeds(self):
         mock_response = MagicMock()
         mock_response.raise_for_status = MagicMock()
         mock_response.json.return_value = []
 
-        with patch("requests.get", return_value=mock_response):
-            feed_ids = PrimeDeltaClient.get_pyth_feed_ids(["INVALID"])
+        client = PrimeDeltaClient()
+        with patch.object(client._session, "get", return_value=mock_response):
+            feed_ids = client.get_pyth_feed_ids(["INVALID"])
 
         assert feed_ids == {}
 
@@ -79,8 +69,9 @@ class TestGetPythFeedIds:
             },
         ]
 
-        with patch("requests.get", return_value=mock_response):
-            feed_ids = PrimeDeltaClient.get_pyth_feed_ids(["AAPL"])
+        client = PrimeDeltaClient()
+        with patch.object(client._session, "get", return_value=mock_response):
+            feed_ids = client.get_pyth_feed_ids(["AAPL"])
 
         assert feed_ids == {}
 
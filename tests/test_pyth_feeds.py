@@ -0,0 +1,79 @@
+import threading
+from unittest.mock import MagicMock
+
+from primedelta.pyth_feeds import PythFeedDirectory
+
+
+def _feed(feed_id: str, symbol: str, suffix: str = "") -> dict:
+    return {
+        "id": feed_id,
+        "attributes": {"symbol": f"Equity.US.{symbol}{suffix}/USD", "base": symbol},
+    }
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPythFeedDirectory:
+    def test_relists_after_ttl(self):
+        clock = _Clock()
+        list_feeds = MagicMock(return_value=[_feed("a", "AAPL")])
+        directory = PythFeedDirectory(list_feeds, ttl=60, clock=clock)
+
+        directory.resolve(["AAPL"])
+        directory.resolve(["AAPL"])
+        clock.now += 61
+        directory.resolve(["AAPL"])
+
+        assert list_feeds.call_count == 2
+
+    def test_persists_index_across_instances(self, tmp_path):
+        path = tmp_path / "pyth_feeds.json"
+        PythFeedDirectory(
+            MagicMock(return_value=[_feed("a", "AAPL")]), cache_path=path
+        ).resolve(["AAPL"])
+        list_feeds = MagicMock()
+
+        assert PythFeedDirectory(list_feeds, cache_path=path).resolve(["AAPL"]) == {
+            "AAPL": "a"
+        }
+        list_feeds.assert_not_called()
+
+    def test_falls_back_to_concurrent_per_symbol_queries(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        def list_feeds(query):
+            if query is None:
+                raise ConnectionError("bulk listing unavailable")
+            barrier.wait()  # Both symbol queries must be in flight at once.
+            return [_feed(query.lower(), query), _feed("pre", query, ".PRE")]
+
+        directory = PythFeedDirectory(list_feeds, clock=_Clock())
+
+        assert directory.resolve(["AAPL", "TSLA"]) == {"AAPL": "aapl", "TSLA": "tsla"}
+
+    def test_lookups_do_not_wait_for_a_listing_in_flight(self):
+        started, listing = threading.Event(), threading.Event()
+
+        def list_feeds(query):
+            if query is None:
+                started.set()
+                listing.wait(5)
+                return [_feed("a", "AAPL")]
+            return [_feed(query.lower(), query)]
+
+        directory = PythFeedDirectory(list_feeds, clock=_Clock())
+        lister = threading.Thread(target=directory.resolve, args=(["AAPL"],))
+        lister.start()
+        started.wait(5)
+
+        # Served by a per-symbol query while the bulk listing hangs.
+        assert directory.resolve(["TSLA"]) == {"TSLA": "tsla"}
+        listing.set()
+        lister.join(5)
+        assert directory.resolve(["AAPL"]) == {"AAPL": "a"}
@@ -0,0 +1,366 @@
+import math
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from primedelta.contracts import ContractRef, Contracts, CoreContracts
+from primedelta.dex.params import SwapSide
+from primedelta.dex.quotes import (
+    InsufficientLiquidity,
+    PoolState,
+    _AMMQuoter,
+    _DclexQuoter,
+    quote_exact_input,
+    quote_exact_output,
+)
+from primedelta.dex.v3_math import Q96, tick_at_sqrt_ratio
+from primedelta.price_updates import oracle_price
+
+_POOL = "0x00000000000000000000000000000000000000aa"
+_STOCK = "0x00000000000000000000000000000000000000bb"
+_STABLECOIN = "0x00000000000000000000000000000000000000cc"
+
+
+def _signed_update(price: int, expo: int, publish_time: int = 0) -> bytes:
+    return (
+        b"\x11" * 32
+        + price.to_bytes(8, "big", signed=True)
+        + expo.to_bytes(4, "big", signed=True)
+        + publish_time.to_bytes(8, "big")
+        + b"\x00" * 65
+    )
+
+
+def _state(**kwargs) -> PoolState:
+    defaults = dict(
+        stock_reserve=Decimal("1000"),
+        stablecoin_reserve=Decimal("200000"),
+        base_fee_rate=Decimal("0.003"),
+        sensitivity=Decimal("0.1"),
+        protocol_fee_rate=Decimal("0.5"),
+    )
+    return PoolState(**{**defaults, **kwargs})
+
+
+def test_oracle_price_decodes_signed_update():
+    assert oracle_price(_signed_update(19_512_345_678, -8)) == Decimal("195.12345678")
+    assert oracle_price(b"\x00" * 10) is None
+
+
+class TestQuoteMath:
+    def test_fee_free_pool_trades_at_oracle_price(self):
+        quote = quote_exact_input(
+            _state(base_fee_rate=Decimal(0), sensitivity=Decimal(0)),
+            "AAPL",
+            SwapSide.STABLECOIN_TO_STOCK,
+            Decimal("400"),
+            Decimal("200"),
+        )
+
+        assert quote.amount_out == Decimal("2")
+        assert quote.fee == 0
+        assert quote.price_impact == 0
+
+    def test_exact_input_applies_fee_curve(self):
+        quote = quote_exact_input(
+            _state(), "AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("10"), Decimal("200")
+        )
+
+        # gross 2000; out = 2000 * 0.997 / (1 + 2000 * 0.1 / 200000)
+        expected_out = Decimal(2000) * Decimal("0.997") / Decimal("1.001")
+        assert quote.amount_out == expected_out.quantize(Decimal("0.000001"), "ROUND_DOWN")
+        assert quote.fee_rate == pytest.approx(
+            Decimal("0.003") + Decimal("0.1") * expected_out / 200000
+        )
+        assert quote.protocol_fee == pytest.approx(quote.fee / 2, abs=Decimal("1e-6"))
+        assert 0 < quote.price_impact < Decimal("0.01")
+
+    def test_exact_output_inverts_exact_input(self):
+        state = _state()
+        out = quote_exact_output(
+            state, "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("5"), Decimal("200")
+        )
+        back = quote_exact_input(
+            state, "AAPL", SwapSide.STABLECOIN_TO_STOCK, out.amount_in, Decimal("200")
+        )
+
+        assert back.amount_out == pytest.approx(Decimal("5"), abs=Decimal("1e-6"))
+        assert out.price_impact > 0
+
+    def test_larger_trades_pay_higher_fee_rate(self):
+        small, large = (
+            quote_exact_input(
+                _state(), "AAPL", SwapSide.STOCK_TO_STABLECOIN, amount, Decimal("200")
+            )
+            for amount in (Decimal("1"), Decimal("500"))
+        )
+
+        assert large.fee_rate > small.fee_rate
+
+    def test_rejects_output_beyond_reserve(self):
+        with pytest.raises(InsufficientLiquidity):
+            quote_exact_output(
+                _state(), "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("1000"), Decimal("200")
+            )
+
+    def test_slippage_bounds_round_to_token_decimals(self):
+        quote = quote_exact_input(
+            _state(), "AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("1"), Decimal("200")
+        )
+
+        bound = quote.min_amount_out(Decimal("0.01"))
+        assert bound <= quote.amount_out * Decimal("0.99")
+        assert bound.as_tuple().exponent >= -6
+        assert quote.max_amount_in(Decimal("0.01")) == Decimal("1.01")
+
+
+def _contracts() -> Contracts:
+    ref = ContractRef(address="0x0", abi=[])
+    return Contracts(
+        chain_id=1,
+        core=CoreContracts(
+            stablecoin=ContractRef(address=_STABLECOIN, abi=[]),
+            vault=ref,
+            factory=ref,
+            digital_identity=ref,
+            dex_router=ContractRef(address="0xrouter", abi=[]),
+        ),
+        pool_abis={"dclex_pool": [], "erc20": []},
+    )
+
+
+class TestDclexQuoter:
+    def _make_quoter(self):
+        web3 = MagicMock()
+        web3.to_checksum_address.side_effect = lambda a: a
+        web3.eth.block_number = 50
+        registry = MagicMock()
+        registry.resolve.return_value = _STOCK
+        contract = MagicMock()
+        web3.eth.contract.return_value = contract
+        contract.functions.stockTokenToPool.return_value.call.return_value = _POOL
+        contract.events.FeeCurveUpdated.get_logs.return_value = [
+            {"args": {"baseFeeRate": 3 * 10**15, "sensitivity": 10**17}}
+        ]
+        contract.events.ProtocolFeeRateChanged.get_logs.return_value = []
+        batch_reader = MagicMock()
+        batch_reader.read.return_value = [
+            1001 * 10**18,
+            200_000 * 10**6,
+            (10**18, 0),
+        ]
+        fetch = MagicMock(return_value=[_signed_update(20_000_000_000, -8)])
+        quoter = _DclexQuoter(
+            web3=web3,
+            contracts_provider=_contracts,
+            signed_prices_fetcher=fetch,
+            token_registry=registry,
+            batch_reader=batch_reader,
+            clock=lambda: 0.0,
+        )
+        return quoter, web3, batch_reader, fetch
+
+    def test_reads_pool_state_net_of_protocol_fees(self):
+        quoter, _, _, _ = self._make_quoter()
+
+        assert quoter.pool_state("AAPL") == PoolState(
+            stock_reserve=Decimal(1000),
+            stablecoin_reserve=Decimal(200_000),
+            base_fee_rate=Decimal("0.003"),
+            sensitivity=Decimal("0.1"),
+        )
+
+    def test_repeated_quotes_reuse_block_state(self):
+        quoter, web3, batch_reader, fetch = self._make_quoter()
+
+        quotes = [
+            quoter.quote_exact_input("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100"))
+            for _ in range(50)
+        ]
+
+        assert quotes[0] == quotes[-1]
+        assert quotes[0].oracle_price == Decimal(200)
+        batch_reader.read.assert_called_once()
+        web3.eth.contract.return_value.functions.stockTokenToPool.assert_called_once()
+        assert fetch.call_count == 50  # served by the signed-price cache in practice
+
+    def test_prefetch_reads_all_stale_pools_in_one_batch(self):
+        quoter, _, batch_reader, _ = self._make_quoter()
+        batch_reader.read.return_value = batch_reader.read.return_value * 2
+
+        quoter.prefetch(["AAPL", "TSLA", "AAPL"])
+        quoter.prefetch(["TSLA"])
+
+        batch_reader.read.assert_called_once()
+        assert len(batch_reader.read.call_args.args[0]) == 6
+        assert quoter.pool_state("TSLA") == quoter.pool_state("AAPL")
+        batch_reader.read.assert_called_once()
+
+    def test_fee_parameter_scan_is_incremental(self):
+        quoter, web3, _, _ = self._make_quoter()
+        events = web3.eth.contract.return_value.events
+        quoter.pool_state("AAPL")
+
+        quoter._states.clear()
+        web3.eth.block_number = 55
+        events.FeeCurveUpdated.get_logs.return_value = []
+        state = quoter.pool_state("AAPL")
+
+        assert events.FeeCurveUpdated.get_logs.call_args.kwargs == {
+            "fromBlock": 51,
+            "toBlock": 55,
+        }
+        assert state.base_fee_rate == Decimal("0.003")
+
+    def test_fee_parameters_are_scanned_from_deployment_in_chunks(self):
+        quoter, web3, _, _ = self._make_quoter()
+        web3.eth.block_number = 12_000
+        web3.eth.get_code.side_effect = (
+            lambda address, block_identifier: b"\x60" if block_identifier >= 1_000 else b""
+        )
+        events = web3.eth.contract.return_value.events
+
+        quoter.pool_state("AAPL")
+
+        ranges = [
+            (c.kwargs["fromBlock"], c.kwargs["toBlock"])
+            for c in events.FeeCurveUpdated.get_logs.call_args_list
+        ]
+        assert ranges == [(1_000, 5_999), (6_000, 10_999), (11_000, 12_000)]
+
+    def test_pool_without_fee_curve_events_marks_quotes(self):
+        quoter, web3, _, _ = self._make_quoter()
+        web3.eth.contract.return_value.events.FeeCurveUpdated.get_logs.return_value = []
+
+        quote = quoter.quote_exact_input(
+            "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("100")
+        )
+
+        assert not quote.fees_known
+        assert quote.fee == 0
+
+
+class TestAMMQuoter:
+    def _make_quoter(self):
+        # Stock is token0; 200 dUSD per stock, one full-range position.
+        sqrt_price = int(math.sqrt(200 * 10**6 / 10**18) * Q96)
+        answers = {
+            "token0": _STOCK,
+            "tickSpacing": 60,
+            "fee": 3000,
+            "slot0": (sqrt_price, tick_at_sqrt_ratio(sqrt_price), 0, 0, 0, 0, True),
+            "liquidity": 10**17,
+        }
+        bitmap = {57: 1 << 195, -58: 1 << 61}  # ticks +/-887220
+        liquidity_net = {-887220: 10**17, 887220: -(10**17)}
+
+        def call(name):
+            return lambda *args: (name, args)
+
+        pool = MagicMock()
+        for name in ("token0", "tickSpacing", "fee", "slot0", "liquidity", "tickBitmap", "ticks"):
+            setattr(pool.functions, name, call(name))
+
+        def read(calls, block_identifier="latest"):
+            results = []
+            for name, args in calls:
+                if name == "tickBitmap":
+                    results.append(bitmap.get(args[0], 0))
+                elif name == "ticks":
+                    results.append((0, liquidity_net[args[0]]))
+                else:
+                    results.append(answers[name])
+            return results
+
+        web3 = MagicMock()
+        web3.to_checksum_address.side_effect = lambda a: a
+        web3.eth.contract.return_value = pool
+        web3.eth.block_number = 77
+        batch_reader = MagicMock()
+        batch_reader.read.side_effect = read
+        contracts = _contracts()
+        quoter = _AMMQuoter(
+            web3=web3,
+            contracts_provider=lambda: Contracts(
+                chain_id=1, core=contracts.core, pool_abis={"univ3_pool": []}
+            ),
+            pool_lookup=lambda symbol: _POOL,
+            batch_reader=batch_reader,
+            clock=lambda: 0.0,
+        )
+        return quoter, batch_reader
+
+    def test_snapshot_reads_words_around_the_current_tick(self):
+        quoter, batch_reader = self._make_quoter()
+
+        snapshot = quoter.snapshot("AAPL")
+
+        word = (snapshot.tick // 60) >> 8
+        assert snapshot.words == (word - 2, word + 2)
+        assert snapshot.ticks == {}
+        words_read = [
+            args[0]
+            for c in batch_reader.read.call_args_list
+            for name, args in c.args[0]
+            if name == "tickBitmap"
+        ]
+        assert words_read == list(range(word - 2, word + 3))
+
+    def test_snapshot_reads_are_pinned_to_one_block(self):
+        quoter, batch_reader = self._make_quoter()
+
+        quoter.snapshot("AAPL")
+
+        state_reads = batch_reader.read.call_args_list[1:]
+        assert state_reads
+        assert all(c.kwargs == {"block_identifier": 77} for c in state_reads)
+
+    def test_swap_past_the_window_extends_the_snapshot(self):
+        quoter, _ = self._make_quoter()
+
+        # Drains almost all stock, walking up to the full-range position's
+        # upper tick, far outside the initial window.
+        with pytest.raises(InsufficientLiquidity):
+            quoter.quote_exact_output(
+                "AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("10")**6
+            )
+        snapshot = quoter.snapshot("AAPL")
+
+        assert snapshot.ticks[887220] == -(10**17)
+        assert snapshot.words[1] == 57
+
+    def test_quotes_buy_against_pool_price(self):
+        quoter, batch_reader = self._make_quoter()
+
+        quote = quoter.quote_exact_input("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("200"))
+        again = quoter.quote_exact_input("AAPL", SwapSide.STABLECOIN_TO_STOCK, Decimal("200"))
+
+        assert quote == again
+        assert quote.oracle_price == pytest.approx(Decimal(200), rel=Decimal("1e-9"))
+        assert quote.amount_out == pytest.approx(Decimal("0.997"), rel=Decimal("1e-3"))
+        assert quote.fee_rate == Decimal("0.003")
+        assert Decimal("0.003") < quote.price_impact < Decimal("0.005")
+        assert batch_reader.read.call_count == 3  # pool info, state, bitmap words
+
+    def test_exact_output_sell(self):
+        quoter, _ = self._make_quoter()
+
+        quote = quoter.quote_exact_output("AAPL", SwapSide.STOCK_TO_STABLECOIN, Decimal("100"))
+
+        assert quote.amount_out == Decimal("100")
+        assert quote.amount_in == pytest.approx(Decimal("0.5015"), rel=Decimal("1e-3"))
+
+    def test_mint_quote_to_params(self):
+        quoter, _ = self._make_quoter()
+        tick = quoter.snapshot("AAPL").tick // 60 * 60
+
+        mint = quoter.mint_amounts(
+            "AAPL", tick - 600, tick + 600, Decimal("1"), Decimal("1000")
+        )
+        params = mint.to_params(Decimal("0.01"))
+
+        assert mint.liquidity > 0
+        assert mint.amount_stock <= 1 and mint.amount_stablecoin <= 1000
+        assert params.amount_stock_min <= mint.amount_stock * Decimal("0.99")
+        assert params.tick_lower == tick - 600
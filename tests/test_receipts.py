@@ -0,0 +1,178 @@
+from unittest.mock import MagicMock, PropertyMock
+
+import pytest
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from primedelta.receipts import ReceiptTracker
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Chain:
+    """Just enough of `web3.eth` to mine blocks by hand."""
+
+    def __init__(self, head: int = 100) -> None:
+        self.block_number = head
+        self.blocks: dict[int, list[str]] = {}
+        self.receipts: dict[str, dict] = {}
+
+    def mine(self, *tx_hashes: str, status: int = 1) -> None:
+        self.block_number += 1
+        self.blocks[self.block_number] = list(tx_hashes)
+        for tx_hash in tx_hashes:
+            self.receipts[tx_hash] = {
+                "status": status,
+                "blockNumber": self.block_number,
+                "blockHash": f"0xblock{self.block_number}",
+            }
+
+    def get_block(self, number: int) -> dict:
+        return {"transactions": self.blocks.get(number, [])}
+
+    def get_transaction_receipt(self, tx_hash: str) -> dict:
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+
+def _make_tracker(chain: _Chain, **kwargs) -> ReceiptTracker:
+    web3 = MagicMock()
+    web3.eth = chain
+    tracker = ReceiptTracker(web3, **kwargs)
+    # Drive `poll` by hand instead of from the background thread.
+    tracker._thread = MagicMock()
+    return tracker
+
+
+class TestReceiptTracker:
+    def test_resolves_every_tracked_hash_from_one_block_read(self):
+        chain = _Chain()
+        tracker = _make_tracker(chain)
+        futures = [tracker.track(h) for h in ("0xa1", "0xa2", "0xa3")]
+        chain.get_block = MagicMock(wraps=chain.get_block)
+        chain.mine("0xa1", "0xa2", "0xff")
+
+        tracker.poll()
+
+        assert [f.done() for f in futures] == [True, True, False]
+        assert futures[0].result()["blockNumber"] == 101
+        chain.get_block.assert_called_once_with(101)
+
+    def test_reports_every_block_read(self):
+        chain = _Chain()
+        seen = []
+        tracker = _make_tracker(chain, on_block=seen.append)
+        tracker.track("0xa1")
+        tracker.poll()
+        seen.clear()
+        chain.mine()
+        chain.mine("0xa1")
+
+        tracker.poll()
+
+        assert seen == [{"transactions": []}, {"transactions": ["0xa1"]}]
+
+    def test_finds_hash_that_mined_before_it_was_tracked(self):
+        chain = _Chain(head=4)
+        chain.mine("0xaa")
+        for _ in range(5):
+            chain.mine()
+        tracker = _make_tracker(chain)
+        future = tracker.track("0xaa")
+
+        tracker.poll()
+
+        assert future.result()["blockNumber"] == 5
+
+    def test_waits_for_confirmations(self):
+        chain = _Chain()
+        tracker = _make_tracker(chain, confirmations=2)
+        future = tracker.track("0xa1")
+        tracker.poll()
+
+        chain.mine("0xa1")
+        tracker.poll()
+        chain.mine()
+        tracker.poll()
+        assert not future.done()
+
+        chain.mine()
+        tracker.poll()
+        assert future.result()["blockNumber"] == 101
+
+    def test_reorged_transaction_waits_to_land_again(self):
+        chain = _Chain()
+        tracker = _make_tracker(chain, confirmations=1)
+        future = tracker.track("0xa1")
+        tracker.poll()
+        chain.mine("0xa1")
+        tracker.poll()
+
+        # The block is replaced; the tx is not in the new canonical chain yet.
+        del chain.receipts["0xa1"]
+        chain.mine()
+        tracker.poll()
+        assert not future.done()
+
+        chain.mine("0xa1")
+        chain.mine()
+        tracker.poll()
+        assert future.result()["blockNumber"] == 103
+
+    def test_unmined_transaction_times_out(self):
+        chain = _Chain()
+        clock = _Clock()
+        tracker = _make_tracker(chain, timeout=30.0, clock=clock)
+        future = tracker.track("0xa1")
+        tracker.poll()
+
+        clock.now = 31.0
+        chain.mine()
+        tracker.poll()
+
+        with pytest.raises(TimeExhausted):
+            future.result()
+
+    def test_close_cancels_pending(self):
+        tracker = _make_tracker(_Chain())
+        future = tracker.track("0xa1")
+
+        tracker.close()
+
+        assert future.cancelled()
+        with pytest.raises(RuntimeError):
+            tracker.track("0xa2")
+
+    def test_background_thread_resolves_wait(self):
+        chain = _Chain()
+        chain.receipts["0xa1"] = {"status": 1, "blockNumber": 100, "blockHash": "0x1"}
+        chain.blocks[100] = ["0xa1"]
+        web3 = MagicMock()
+        web3.eth = chain
+        tracker = ReceiptTracker(web3, poll_interval=0.01)
+
+        assert tracker.wait(["0xa1"]) == [chain.receipts["0xa1"]]
+
+    def test_wait_times_out_while_the_node_is_unreachable(self):
+        web3 = MagicMock()
+        type(web3.eth).block_number = PropertyMock(side_effect=ConnectionError("down"))
+        tracker = ReceiptTracker(web3, poll_interval=0.01, timeout=0.1)
+        future = tracker.track("0xa1")
+
+        # The tracking thread fails it; `wait` alone could mask that.
+        with pytest.raises(TimeExhausted):
+            future.result(timeout=5)
+        with pytest.raises(TimeExhausted):
+            tracker.wait(["0xa2"])
+
+    def test_wait_gives_up_even_if_the_tracker_is_stuck(self):
+        tracker = _make_tracker(_Chain(), poll_interval=0.01, timeout=0.05)
+
+        with pytest.raises(TimeExhausted):
+            tracker.wait(["0xa1"])
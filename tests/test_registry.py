@@ -0,0 +1,134 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from primedelta.contracts import ContractRef, Contracts, CoreContracts
+from primedelta.dex.handlers import PoolNotFound, _resolve_stock_token
+from primedelta.dex.registry import StockTokenRegistry
+
+
+_ROUTER_ADDRESS = "0x" + "5" * 40
+_AMMT1_TOKEN = "0x" + "7" * 40
+_AMMT2_TOKEN = "0x" + "8" * 40
+
+
+def _ref(address: str) -> ContractRef:
+    return ContractRef(address=address, abi=[])
+
+
+def _contracts() -> Contracts:
+    return Contracts(
+        chain_id=31337,
+        core=CoreContracts(
+            stablecoin=_ref("0x" + "1" * 40),
+            vault=_ref("0x" + "2" * 40),
+            factory=_ref("0x" + "3" * 40),
+            digital_identity=_ref("0x" + "4" * 40),
+            dex_router=_ref(_ROUTER_ADDRESS),
+        ),
+        pool_abis={"erc20": []},
+        pools={},
+    )
+
+
+def _make_web3(tokens: dict[str, str]) -> MagicMock:
+    """Web3 mock whose router lists `tokens` (address → symbol)."""
+    web3 = MagicMock()
+    web3.to_checksum_address.side_effect = lambda a: a
+    web3.eth.block_number = 100
+    web3.eth.get_logs.return_value = []
+    contracts_by_addr: dict[str, MagicMock] = {}
+
+    def make_contract(address, abi):
+        contract = contracts_by_addr.setdefault(address, MagicMock())
+        if address == _ROUTER_ADDRESS:
+            contract.functions.allStockTokens.return_value.call.side_effect = (
+                lambda: list(tokens)
+            )
+        else:
+            contract.functions.symbol.return_value.call.return_value = tokens[address]
+        return contract
+
+    web3.eth.contract.side_effect = make_contract
+    web3.router = lambda: contracts_by_addr[_ROUTER_ADDRESS]
+    return web3
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestStockTokenRegistry:
+    def test_enumerates_router_once_across_lookups(self):
+        web3 = _make_web3({_AMMT1_TOKEN: "AMMT1", _AMMT2_TOKEN: "AMMT2"})
+        registry = StockTokenRegistry(web3, _contracts)
+
+        assert registry.resolve("AMMT1") == _AMMT1_TOKEN
+        assert registry.resolve("AMMT2") == _AMMT2_TOKEN
+        assert registry.resolve("MISSING") is None
+
+        assert web3.router().functions.allStockTokens.return_value.call.call_count == 1
+
+    def test_pool_event_triggers_rebuild(self):
+        tokens = {_AMMT1_TOKEN: "AMMT1"}
+        web3 = _make_web3(tokens)
+        clock = _Clock()
+        registry = StockTokenRegistry(
+            web3, _contracts, event_poll_interval=30.0, clock=clock
+        )
+        assert registry.resolve("AMMT2") is None
+
+        tokens[_AMMT2_TOKEN] = "AMMT2"
+        web3.eth.block_number = 105
+        web3.eth.get_logs.return_value = [{"blockNumber": 103}]
+        clock.now = 31.0
+
+        assert registry.resolve("AMMT2") == _AMMT2_TOKEN
+        log_filter = web3.eth.get_logs.call_args.args[0]
+        assert log_filter["fromBlock"] == 101
+        assert log_filter["toBlock"] == 105
+        assert len(log_filter["topics"][0]) == 3
+
+    def test_does_not_poll_events_within_interval(self):
+        web3 = _make_web3({_AMMT1_TOKEN: "AMMT1"})
+        registry = StockTokenRegistry(web3, _contracts, clock=_Clock())
+
+        registry.resolve("AMMT1")
+        registry.resolve("AMMT1")
+
+        web3.eth.get_logs.assert_not_called()
+
+    def test_warm_start_from_cache_file_skips_enumeration(self, tmp_path):
+        cache_path = tmp_path / "tokens.json"
+        cold = _make_web3({_AMMT1_TOKEN: "AMMT1"})
+        StockTokenRegistry(cold, _contracts, cache_path=cache_path).resolve("AMMT1")
+        assert cache_path.exists()
+
+        warm = _make_web3({_AMMT1_TOKEN: "AMMT1"})
+        registry = StockTokenRegistry(warm, _contracts, cache_path=cache_path)
+
+        assert registry.resolve("AMMT1") == _AMMT1_TOKEN
+        warm.eth.contract.assert_not_called()
+
+    def test_ignores_cache_file_for_other_chain(self, tmp_path):
+        cache_path = tmp_path / "tokens.json"
+        cache_path.write_text(
+            '{"chain_id": 1, "router": "%s", "block": 1, "tokens": {"AMMT1": "0xdead"}}'
+            % _ROUTER_ADDRESS
+        )
+        web3 = _make_web3({_AMMT1_TOKEN: "AMMT1"})
+        registry = StockTokenRegistry(web3, _contracts, cache_path=cache_path)
+
+        assert registry.resolve("AMMT1") == _AMMT1_TOKEN
+
+    def test_resolve_stock_token_uses_registry(self):
+        web3 = _make_web3({_AMMT1_TOKEN: "AMMT1"})
+        registry = StockTokenRegistry(web3, _contracts)
+
+        assert _resolve_stock_token(web3, _contracts(), "AMMT1", registry) == _AMMT1_TOKEN
+        with pytest.raises(PoolNotFound):
+            _resolve_stock_token(web3, _contracts(), "AMMT2", registry)
@@ -0,0 +1,143 @@
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from primedelta.dex.params import SwapSide
+from primedelta.dex.quotes import PoolState, quote_exact_input, quote_exact_output
+from primedelta.dex.routing import (
+    _SWAP_ARGS,
+    _TOKEN_SWAP_ARGS,
+    DEFAULT_ROUTE_GAS,
+    RouteKind,
+    RouteOptimizer,
+    _selector,
+)
+
+_PRICES = {"AAPL": Decimal(200), "TSLA": Decimal(250)}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _state() -> PoolState:
+    return PoolState(
+        stock_reserve=Decimal(1000),
+        stablecoin_reserve=Decimal(250_000),
+        base_fee_rate=Decimal("0.003"),
+        sensitivity=Decimal("0.1"),
+    )
+
+
+def _make_optimizer(**kwargs):
+    quote_in = MagicMock(
+        side_effect=lambda symbol, side, amount: quote_exact_input(
+            _state(), symbol, side, amount, _PRICES[symbol]
+        )
+    )
+    quote_out = MagicMock(
+        side_effect=lambda symbol, side, amount: quote_exact_output(
+            _state(), symbol, side, amount, _PRICES[symbol]
+        )
+    )
+    prefetch = MagicMock()
+    optimizer = RouteOptimizer(
+        quote_exact_input=quote_in,
+        quote_exact_output=quote_out,
+        gas_price=lambda: 10**9,
+        prefetch=prefetch,
+        **kwargs,
+    )
+    return optimizer, quote_in, quote_out, prefetch
+
+
+class TestRouteOptimizer:
+    def test_exact_input_chains_legs_through_stablecoin(self):
+        optimizer, quote_in, _, prefetch = _make_optimizer()
+
+        route = optimizer.best_exact_input("AAPL", "TSLA", Decimal("10"))
+
+        assert route.sell.side == SwapSide.STOCK_TO_STABLECOIN
+        assert route.buy.amount_in == route.sell.amount_out
+        assert route.amount_in == Decimal("10")
+        assert 0 < route.amount_out < Decimal(8)
+        prefetch.assert_called_once_with(["AAPL", "TSLA"])
+        assert quote_in.call_count == 2
+
+    def test_less_gas_wins_when_gas_is_unpriced(self):
+        optimizer, _, _, _ = _make_optimizer()
+
+        routes = optimizer.routes_exact_input("AAPL", "TSLA", Decimal("10"))
+
+        assert [r.kind for r in routes] == [RouteKind.ROUTER, RouteKind.SPLIT_LEGS]
+        assert all(r.gas_cost == 0 for r in routes)
+
+    def test_gas_is_charged_in_the_optimised_token(self):
+        optimizer, _, _, _ = _make_optimizer(
+            native_token_price=Decimal(2000),
+            gas_estimates={"ROUTER": 900_000, "SPLIT_LEGS": 400_000},
+        )
+
+        best = optimizer.best_exact_input("AAPL", "TSLA", Decimal("10"))
+
+        # 400k gas at 1 gwei is 0.0004 native = 0.8 dUSD = 0.8/250 TSLA.
+        assert best.kind == RouteKind.SPLIT_LEGS
+        assert best.gas_cost == Decimal("0.0032")
+        assert best.net_amount == best.amount_out - Decimal("0.0032")
+
+    def test_learned_gas_makes_split_legs_win(self):
+        learned = {
+            _selector("swapExactInput" + _TOKEN_SWAP_ARGS): 500_000,
+            _selector("sellExactInput" + _SWAP_ARGS): 180_000,
+            _selector("buyExactInput" + _SWAP_ARGS): 190_000,
+        }
+        optimizer, _, _, _ = _make_optimizer(learned_gas=learned.get)
+
+        routes = optimizer.routes_exact_input("AAPL", "TSLA", Decimal("10"))
+
+        assert [r.kind for r in routes] == [RouteKind.SPLIT_LEGS, RouteKind.ROUTER]
+        assert [r.gas for r in routes] == [370_000, 500_000]
+
+    def test_partly_learned_path_keeps_its_default(self):
+        learned = {_selector("sellExactInput" + _SWAP_ARGS): 100_000}
+        optimizer, _, _, _ = _make_optimizer(learned_gas=learned.get)
+
+        routes = optimizer.routes_exact_input("AAPL", "TSLA", Decimal("10"))
+
+        assert routes[0].kind == RouteKind.ROUTER
+        assert routes[1].gas == DEFAULT_ROUTE_GAS["SPLIT_LEGS"]
+
+    def test_exact_output_ranks_by_least_input(self):
+        optimizer, _, quote_out, _ = _make_optimizer(native_token_price=Decimal(2000))
+
+        routes = optimizer.routes_exact_output("AAPL", "TSLA", Decimal("2"))
+
+        assert routes[0].kind == RouteKind.ROUTER
+        assert routes[0].amount_out == Decimal("2")
+        assert routes[0].sell.amount_out == routes[0].buy.amount_in
+        assert routes[0].net_amount < routes[1].net_amount
+        assert routes[0].gas == DEFAULT_ROUTE_GAS["ROUTER"]
+        assert quote_out.call_count == 2
+
+    def test_routes_are_memoised_for_a_block(self):
+        clock = _Clock()
+        optimizer, quote_in, _, _ = _make_optimizer(block_time=2.0, clock=clock)
+
+        for _ in range(20):
+            optimizer.best_exact_input("AAPL", "TSLA", Decimal("10"))
+        assert quote_in.call_count == 2
+
+        clock.now = 2.0
+        optimizer.best_exact_input("AAPL", "TSLA", Decimal("10"))
+        assert quote_in.call_count == 4
+
+    def test_rejects_same_symbol(self):
+        optimizer, _, _, _ = _make_optimizer()
+
+        with pytest.raises(ValueError):
+            optimizer.best_exact_input("AAPL", "AAPL", Decimal("1"))
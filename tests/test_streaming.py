@@ -0,0 +1,323 @@
+import json
+import queue
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from primedelta import NotLoggedIn
+from primedelta.primedelta_client import PrimeDeltaClient, _parse_broker_price
+from primedelta.types import Price
+from primedelta.streaming import (
+    OverflowPolicy,
+    PriceStreamHub,
+    PriceSubscription,
+    ResilientPriceStream,
+    StreamState,
+    _iter_sse_events,
+)
+
+
+def _event(event_id: str, symbol: str, timestamp: str, price: str = "1") -> bytes:
+    data = json.dumps(
+        {
+            "symbol": symbol,
+            "price": price,
+            "timestamp": timestamp,
+            "percentageChange": "0",
+        }
+    )
+    return f"id: {event_id}\ndata: {data}\n\n".encode()
+
+
+def _response(chunks: list, status_code: int = 200) -> MagicMock:
+    """Fake streaming response; an Exception in `chunks` is raised mid-read."""
+    response = MagicMock()
+    response.status_code = status_code
+    if status_code >= 400:
+        error = requests.HTTPError(response=response)
+        response.raise_for_status.side_effect = error
+    remaining = list(chunks)
+
+    def read1(size):
+        if not remaining:
+            return b""
+        chunk = remaining.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+    response.raw.read1.side_effect = read1
+    return response
+
+
+def _stream(session, **kwargs) -> ResilientPriceStream:
+    return ResilientPriceStream(
+        session,
+        "https://example.test/prices-stream/",
+        parse=lambda data: _parse_broker_price(json.loads(data)),
+        sleep=lambda seconds: None,
+        **kwargs,
+    )
+
+
+class TestSSEParser:
+    def test_handles_events_split_across_chunks(self):
+        chunks = [b"id: 7\nda", b"ta: hel", b"lo\r\n", b": ping\n\n", b"retry: 250\ndata: x\n\n"]
+        events = list(_iter_sse_events(iter(chunks)))
+
+        assert [(e.id, e.data) for e in events] == [("7", "hello"), ("7", "x")]
+        assert events[1].retry == 250
+
+
+class TestResilientPriceStream:
+    def test_reconnects_with_last_event_id_after_drop(self):
+        session = MagicMock()
+        session.get.side_effect = [
+            _response(
+                [
+                    _event("1", "AAPL", "2024-01-01T10:00:00"),
+                    requests.ConnectionError("reset"),
+                ]
+            ),
+            _response([_event("2", "AAPL", "2024-01-01T10:00:01")]),
+        ]
+        stream = _stream(session)
+
+        prices = []
+        for price in stream:
+            prices.append(price)
+            if len(prices) == 2:
+                stream.close()
+
+        assert [p.last_price for p in prices] == [1, 1]
+        second_headers = session.get.call_args_list[1].kwargs["headers"]
+        assert second_headers["Last-Event-ID"] == "1"
+        metrics = stream.metrics
+        assert metrics.reconnects == 1
+        assert metrics.state == StreamState.CLOSED
+
+    def test_drops_replayed_duplicates_after_resume(self):
+        session = MagicMock()
+        session.get.side_effect = [
+            _response([_event("1", "AAPL", "2024-01-01T10:00:00")]),
+            _response(
+                [
+                    _event("1", "AAPL", "2024-01-01T10:00:00"),
+                    _event("2", "AAPL", "2024-01-01T10:00:05", price="2"),
+                ]
+            ),
+        ]
+        stream = _stream(session)
+
+        prices = []
+        for price in stream:
+            prices.append(price)
+            if len(prices) == 2:
+                stream.close()
+
+        assert [p.last_price for p in prices] == [1, 2]
+        assert stream.metrics.duplicates_dropped == 1
+
+    def test_reports_per_symbol_gaps(self):
+        session = MagicMock()
+        session.get.return_value = _response(
+            [
+                _event("1", "AAPL", "2024-01-01T10:00:00"),
+                _event("2", "AAPL", "2024-01-01T10:01:00"),
+            ]
+        )
+        on_gap = MagicMock()
+        stream = _stream(session, gap_threshold=30, on_gap=on_gap)
+
+        prices = []
+        for price in stream:
+            prices.append(price)
+            if len(prices) == 2:
+                stream.close()
+
+        assert stream.metrics.gaps == 1
+        assert on_gap.call_args.args[0] == "AAPL"
+
+    def test_close_interrupts_reconnect_backoff(self):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError("refused")
+        stream = ResilientPriceStream(
+            session,
+            "https://example.test/prices-stream/",
+            parse=lambda data: _parse_broker_price(json.loads(data)),
+            initial_backoff=60.0,
+            max_backoff=60.0,
+        )
+        consumer = threading.Thread(target=lambda: list(stream), daemon=True)
+        consumer.start()
+        while stream.metrics.state != StreamState.BACKOFF:
+            consumer.join(0.01)
+
+        stream.close()
+        consumer.join(5)
+
+        assert not consumer.is_alive()
+        assert session.get.call_count == 1
+
+    def test_gives_up_after_max_reconnects(self):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError("refused")
+        stream = _stream(session, max_reconnects=2)
+
+        with pytest.raises(requests.ConnectionError):
+            list(stream)
+
+        assert session.get.call_count == 3
+
+    def test_unauthorized_is_not_retried(self):
+        client = PrimeDeltaClient()
+        client._session = MagicMock()
+        client._session.get.return_value = _response([], status_code=401)
+
+        stream = client.prices_stream("token", sleep=lambda seconds: None)
+
+        with pytest.raises(NotLoggedIn):
+            list(stream)
+        assert client._session.get.call_count == 1
+
+    def test_backoff_grows_exponentially_and_is_capped(self):
+        stream = _stream(MagicMock(), initial_backoff=1, max_backoff=4)
+
+        delays = [stream._backoff(n) for n in range(1, 6)]
+
+        assert 0.5 <= delays[0] <= 1
+        assert 2 <= delays[2] <= 4
+        assert all(d <= 4 for d in delays)
+
+
+class _Upstream:
+    """Upstream stub fed by the test; iteration ends on close()."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue" = queue.Queue()
+        self.closed = threading.Event()
+
+    def push(self, *prices) -> None:
+        for price in prices:
+            self._queue.put(price)
+
+    def fail(self, error: Exception) -> None:
+        self._queue.put(error)
+
+    def close(self) -> None:
+        self.closed.set()
+        self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def _price(symbol: str, last_price: str = "1") -> Price:
+    return _parse_broker_price(
+        {
+            "symbol": symbol,
+            "price": last_price,
+            "timestamp": "2024-01-01T10:00:00",
+            "percentageChange": "0",
+        }
+    )
+
+
+class TestPriceStreamHub:
+    def test_dispatches_by_symbol_over_one_upstream(self):
+        upstream = _Upstream()
+        open_stream = MagicMock(return_value=upstream)
+        hub = PriceStreamHub(open_stream)
+        apple = hub.subscribe(["AAPL"])
+        everything = hub.subscribe()
+
+        upstream.push(_price("TSLA"), _price("AAPL"))
+
+        assert apple.get(timeout=1).symbol == "AAPL"
+        assert [everything.get(timeout=1).symbol for _ in range(2)] == ["TSLA", "AAPL"]
+        assert apple.get(timeout=0.05) is None
+        open_stream.assert_called_once()
+        hub.close()
+
+    def test_drop_oldest_keeps_newest_prices(self):
+        hub = PriceStreamHub(MagicMock())
+        subscription = PriceSubscription(hub, None, 2, OverflowPolicy.DROP_OLDEST)
+
+        for last_price in "123":
+            subscription._put(_price("AAPL", last_price))
+
+        assert [subscription.get().last_price for _ in range(2)] == [2, 3]
+        assert subscription.dropped == 1
+
+    def test_drop_newest_keeps_queued_prices(self):
+        hub = PriceStreamHub(MagicMock())
+        subscription = PriceSubscription(hub, None, 2, OverflowPolicy.DROP_NEWEST)
+
+        for last_price in "123":
+            subscription._put(_price("AAPL", last_price))
+
+        assert [subscription.get().last_price for _ in range(2)] == [1, 2]
+        assert subscription.dropped == 1
+
+    def test_conflate_keeps_latest_per_symbol_in_arrival_order(self):
+        hub = PriceStreamHub(MagicMock())
+        subscription = PriceSubscription(hub, None, 1, OverflowPolicy.CONFLATE)
+
+        for symbol, last_price in [("AAPL", "1"), ("TSLA", "5"), ("AAPL", "2")]:
+            subscription._put(_price(symbol, last_price))
+
+        assert [(p.symbol, p.last_price) for p in (subscription.get(), subscription.get())] == [
+            ("AAPL", 2),
+            ("TSLA", 5),
+        ]
+
+    def test_last_unsubscribe_closes_upstream(self):
+        upstream = _Upstream()
+        hub = PriceStreamHub(lambda: upstream)
+        first = hub.subscribe(["AAPL"])
+        second = hub.subscribe(["AAPL"])
+        upstream.push(_price("AAPL"))
+        first.get(timeout=1)
+
+        first.close()
+        assert not upstream.closed.is_set()
+        second.close()
+
+        assert upstream.closed.wait(1)
+        assert hub.subscriber_count == 0
+
+    def test_subscriber_arriving_during_shutdown_gets_a_new_pump(self):
+        old, new = _Upstream(), _Upstream()
+        # The old upstream keeps blocking after close(), as a socket read may.
+        old.close = old.closed.set
+        hub = PriceStreamHub(MagicMock(side_effect=[old, new]))
+        first = hub.subscribe(["AAPL"])
+        old.push(_price("AAPL"))
+        first.get(timeout=1)
+
+        first.close()
+        assert old.closed.is_set()
+        second = hub.subscribe(["AAPL"])
+        old.push(None)  # Let the old pump reach its cleanup.
+        new.push(_price("AAPL", "2"))
+
+        assert second.get(timeout=1).last_price == 2
+        hub.close()
+
+    def test_upstream_error_reaches_subscribers(self):
+        upstream = _Upstream()
+        hub = PriceStreamHub(lambda: upstream)
+        subscription = hub.subscribe(["AAPL"])
+
+        upstream.fail(NotLoggedIn())
+
+        with pytest.raises(NotLoggedIn):
+            list(subscription)
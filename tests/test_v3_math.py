@@ -0,0 +1,143 @@
+import math
+from dataclasses import replace
+
+import pytest
+
+from primedelta.dex.handlers import InsufficientLiquidity
+from primedelta.dex.v3_math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    Q96,
+    OutsideSnapshot,
+    V3PoolSnapshot,
+    mint_amounts,
+    simulate_swap,
+    sqrt_ratio_at_tick,
+    tick_at_sqrt_ratio,
+)
+
+_FULL_RANGE = 887220  # Largest multiple of tick spacing 60.
+_L_WIDE = 10**21
+_L_NARROW = 4 * 10**21
+
+
+def _pool(fee: int = 3000) -> V3PoolSnapshot:
+    """Price 1.0, a full-range position plus a concentrated one on [-600, 600)."""
+    return V3PoolSnapshot(
+        sqrt_price_x96=Q96,
+        tick=0,
+        liquidity=_L_WIDE + _L_NARROW,
+        fee=fee,
+        tick_spacing=60,
+        ticks={
+            -_FULL_RANGE: _L_WIDE,
+            _FULL_RANGE: -_L_WIDE,
+            -600: _L_NARROW,
+            600: -_L_NARROW,
+        },
+    )
+
+
+def _reference_out_zero_for_one(amount_in: float) -> float:
+    """Token1 out for token0 in, fee-free, from the piecewise x*y=L^2 curve."""
+    sqrt_p = 1.0
+    sqrt_boundary = math.sqrt(1.0001**-600)
+    liquidity = _L_WIDE + _L_NARROW
+    # Token0 needed to reach the boundary: L * (1/sqrt_b - 1/sqrt_p).
+    to_boundary = liquidity * (1 / sqrt_boundary - 1 / sqrt_p)
+    if amount_in <= to_boundary:
+        sqrt_next = 1 / (amount_in / liquidity + 1 / sqrt_p)
+        return liquidity * (sqrt_p - sqrt_next)
+    out = liquidity * (sqrt_p - sqrt_boundary)
+    remaining = amount_in - to_boundary
+    sqrt_next = 1 / (remaining / _L_WIDE + 1 / sqrt_boundary)
+    return out + _L_WIDE * (sqrt_boundary - sqrt_next)
+
+
+class TestTickMath:
+    def test_known_ratios(self):
+        assert sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+        assert sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+        assert sqrt_ratio_at_tick(0) == Q96
+        assert sqrt_ratio_at_tick(1) == 79232123823359799118286999568
+        assert sqrt_ratio_at_tick(-1) == 79224201403219477170569942574
+
+    @pytest.mark.parametrize("tick", [MIN_TICK + 1, -50_001, -1, 0, 1, 12_345, MAX_TICK - 1])
+    def test_tick_at_sqrt_ratio_inverts(self, tick):
+        sqrt_price = sqrt_ratio_at_tick(tick)
+
+        assert tick_at_sqrt_ratio(sqrt_price) == tick
+        assert tick_at_sqrt_ratio(sqrt_price + 1) == tick
+        assert tick_at_sqrt_ratio(sqrt_price - 1) == tick - 1
+
+
+class TestSimulateSwap:
+    @pytest.mark.parametrize("amount_in", [10**15, 10**18, 10**20, 5 * 10**20])
+    def test_exact_input_matches_piecewise_curve(self, amount_in):
+        result = simulate_swap(_pool(fee=0), True, amount_in)
+
+        assert result.amount_in == amount_in
+        assert result.amount_out == pytest.approx(
+            _reference_out_zero_for_one(amount_in), rel=1e-9
+        )
+
+    def test_crossing_a_tick_lands_beyond_it(self):
+        result = simulate_swap(_pool(fee=0), True, 5 * 10**20)
+
+        assert result.tick < -600
+
+    def test_fee_is_charged_on_input(self):
+        fee_free = simulate_swap(_pool(fee=0), False, 10**18)
+        with_fee = simulate_swap(_pool(fee=3000), False, 10**18)
+
+        assert with_fee.fee == pytest.approx(3 * 10**15, rel=1e-6)
+        assert with_fee.amount_out < fee_free.amount_out
+
+    def test_exact_output_round_trips(self):
+        pool = _pool()
+        wanted = 3 * 10**20
+        exact_out = simulate_swap(pool, True, -wanted)
+
+        assert exact_out.amount_out == wanted
+        # Rounding favours the pool: paying that input buys at least as much.
+        assert simulate_swap(pool, True, exact_out.amount_in).amount_out >= wanted
+
+    def test_draining_the_pool_raises(self):
+        with pytest.raises(InsufficientLiquidity):
+            simulate_swap(_pool(), True, -(10**30))
+
+    def test_walking_past_the_snapshot_words_raises(self):
+        pool = replace(_pool(), ticks={-600: _L_NARROW, 600: -_L_NARROW}, words=(-1, 0))
+
+        with pytest.raises(OutsideSnapshot) as info:
+            simulate_swap(pool, True, 10**24)
+
+        assert info.value.word == -2
+
+    def test_price_limit_allows_partial_fill(self):
+        limit = sqrt_ratio_at_tick(-600)
+        result = simulate_swap(_pool(), True, 10**24, sqrt_price_limit_x96=limit)
+
+        assert result.sqrt_price_x96 == limit
+        assert result.amount_in < 10**24
+
+
+class TestMintAmounts:
+    def test_in_range_position_takes_both_tokens(self):
+        liquidity, amount0, amount1 = mint_amounts(_pool(), -600, 600, 10**18, 10**18)
+
+        assert liquidity > 0
+        # Symmetric range at price 1: both sides are used equally.
+        assert amount0 == amount1 == pytest.approx(10**18, rel=1e-9)
+
+    def test_range_above_price_takes_only_token0(self):
+        _, amount0, amount1 = mint_amounts(_pool(), 600, 1200, 10**18, 10**18)
+
+        assert amount1 == 0
+        assert 0 < amount0 <= 10**18 + 1
+
+    def test_rejects_unaligned_ticks(self):
+        with pytest.raises(ValueError):
+            mint_amounts(_pool(), -61, 600, 1, 1)